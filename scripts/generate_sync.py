@@ -37,6 +37,8 @@ SOURCE_TRANSFORMS = [
     ("limiter.py", "sync_limiter.py"),
     ("lease.py", "sync_lease.py"),
     ("config_cache.py", "sync_config_cache.py"),
+    ("coalescer.py", "sync_coalescer.py"),
+    ("write_behind.py", "sync_write_behind.py"),
     ("infra/stack_manager.py", "infra/sync_stack_manager.py"),
     ("infra/discovery.py", "infra/sync_discovery.py"),
 ]
@@ -58,12 +60,17 @@ CLASS_RENAMES = {
     "RepositoryBuilder": "SyncRepositoryBuilder",
     "Lease": "SyncLease",
     "ConfigCache": "SyncConfigCache",
+    "SpeculativeCoalescer": "SyncSpeculativeCoalescer",
+    "WriteBehindBuffer": "SyncWriteBehindBuffer",
     "StackManager": "SyncStackManager",
     "InfrastructureDiscovery": "SyncInfrastructureDiscovery",
 }
 
 # Import module rewrites (also used for Name references like module.Session)
-IMPORT_MODULE_REWRITES: dict[str, str] = {}
+IMPORT_MODULE_REWRITES: dict[str, str] = {
+    # aiobotocore's AioConfig -> botocore's Config (see IMPORT_NAME_REWRITES)
+    "aiobotocore.config": "botocore.config",
+}
 
 # Method name rewrites for context manager calls
 METHOD_NAME_REWRITES = {
@@ -82,6 +89,7 @@ ATTRIBUTE_NAME_REWRITES = {
 # Used for asyncio.Lock -> threading.Lock, asyncio.sleep -> time.sleep
 ATTRIBUTE_ACCESS_REWRITES = {
     ("asyncio", "Lock"): ("threading", "Lock"),
+    ("asyncio", "Event"): ("threading", "Event"),
     ("asyncio", "sleep"): ("time", "sleep"),
 }
 
@@ -92,6 +100,8 @@ IMPORT_PATH_REWRITES = {
     ".repository_builder": ".sync_repository_builder",
     ".lease": ".sync_lease",
     ".config_cache": ".sync_config_cache",
+    ".coalescer": ".sync_coalescer",
+    ".write_behind": ".sync_write_behind",
     ".infra.stack_manager": ".infra.sync_stack_manager",
     ".infra.discovery": ".infra.sync_discovery",
 }
@@ -103,12 +113,16 @@ IMPORT_NAME_REWRITES = {
     "RepositoryBuilder": "SyncRepositoryBuilder",
     "Lease": "SyncLease",
     "ConfigCache": "SyncConfigCache",
+    "SpeculativeCoalescer": "SyncSpeculativeCoalescer",
+    "WriteBehindBuffer": "SyncWriteBehindBuffer",
     "StackManager": "SyncStackManager",
     "InfrastructureDiscovery": "SyncInfrastructureDiscovery",
     # Decorator rewrites
     "asynccontextmanager": "contextmanager",
     # aiobotocore's get_session() -> boto3.Session()
     "get_session": "boto3.Session",
+    # aiobotocore's AioConfig(...) -> botocore's Config(...)
+    "AioConfig": "Config",
 }
 
 # Type annotation rewrites
@@ -224,6 +238,72 @@ self._executor_fn = self._resolve_parallel_mode(parallel_mode)
 self._thread_pool: Any = None
 """
 
+# Executor injected into SyncRateLimiter for acquire_many(), whose
+# asyncio.gather() calls become self._run_in_executor(...). Reuses the
+# repository's gevent/serial strategy; otherwise uses a thread pool of its own
+# so that nested repository calls never wait on the repository's pool. The
+# pool is sized like the client's connection pool (botocore default: 10),
+# since that bounds how many of its calls can be in flight anyway.
+_LIMITER_EXECUTOR_METHODS = """\
+def _run_in_executor(self, *funcs: Any) -> Any:
+    executor_fn = getattr(self._repository, "_executor_fn", None)
+    if executor_fn is not None:
+        return executor_fn(funcs)
+    with self._thread_pool_lock:
+        if self._thread_pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            client_config = getattr(self._repository, "_client_config", None) or {}
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=client_config.get("max_pool_connections", 10),
+                thread_name_prefix="zae-limiter-limiter",
+            )
+        pool = self._thread_pool
+    futures = [pool.submit(fn) for fn in funcs]
+    return tuple(f.result() for f in futures)
+
+def _cleanup_thread_pool(self) -> None:
+    with self._thread_pool_lock:
+        pool, self._thread_pool = self._thread_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+"""
+
+# Methods replaced wholesale in the generated class: (sync class, method) -> source.
+# For async-only scheduling that has no mechanical sync translation.
+SYNC_METHOD_OVERRIDES = {
+    ("SyncConfigCache", "_spawn_refresh"): """\
+def _spawn_refresh(self, refresh: Callable[[], None]) -> None:
+    \"\"\"Run a refresh on the cache's bounded thread pool (caller holds _sync_lock).\"\"\"
+    if self._refresh_pool is None:
+        from concurrent.futures import ThreadPoolExecutor
+        self._refresh_pool = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="zae-limiter-config-refresh"
+        )
+    self._refresh_pool.submit(refresh)
+""",
+    ("SyncConfigCache", "close"): """\
+def close(self) -> None:
+    \"\"\"Stop background refreshes (called by ``SyncRepository.close()``).
+
+    Queued refreshes still run. The cache stays usable; a later refresh
+    starts a new thread pool.
+    \"\"\"
+    with self._sync_lock:
+        pool, self._refresh_pool = self._refresh_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False)
+""",
+    ("SyncWriteBehindBuffer", "_spawn_flush"): """\
+def _spawn_flush(self, flush: Callable[[], None]) -> None:
+    \"\"\"Run a delayed flush without blocking the caller.\"\"\"
+    threading.Thread(target=flush, name="zae-limiter-write-behind", daemon=True).start()
+""",
+    ("SyncWriteBehindBuffer", "_cancel_flushes"): """\
+def _cancel_flushes(self) -> None:
+    \"\"\"No-op: a delayed flush thread finds the buffer already flushed.\"\"\"
+""",
+}
+
 # Methods/functions to remove (already have sync equivalents)
 REMOVE_METHODS = {
     "get_system_defaults_sync",
@@ -242,6 +322,10 @@ REMOVE_ASSIGNMENTS = {"_T"}
 SKIP_CLASS_DEFINITIONS = {
     "OnUnavailable": ".limiter",
     "CacheStats": ".config_cache",
+    "CoalescingConfig": ".coalescer",
+    "CoalescingStats": ".coalescer",
+    "WriteBehindConfig": ".write_behind",
+    "WriteBehindStats": ".write_behind",
 }
 
 # Test-specific: fixture name rewrites (parameter names in test functions)
@@ -259,12 +343,26 @@ REMOVE_DECORATORS = {"pytest.mark.asyncio"}
 TEST_SKIP_FUNCTIONS = {
     # Uses asyncio.gather for concurrency - no sync equivalent
     "test_async_operations_are_concurrent_safe",
+    "test_duplicate_misses_share_one_fetch",
+    "test_unrelated_misses_fetch_concurrently",
+    "test_fetch_error_shared_then_retried",
+    "test_cancelled_leader_followers_refetch",
+    "test_slow_path_resolves_limits_concurrently",
+    # Awaits background refresh tasks; the sync cache refreshes on a thread
+    "test_entry_near_expiry_refreshed_in_background",
+    "test_one_refresh_per_key",
+    "test_stale_entry_served_within_max_staleness",
+    "test_refresh_failure_keeps_entries",
     # Uses asyncio.wait_for timeout cancellation - time.sleep blocks the thread
     "test_is_available_returns_false_on_timeout",
     # Tests async client __aexit__ cleanup - sync boto3 clients don't use context managers
     "test_close_cleans_up_client",
     # Uses asyncio.Barrier + asyncio.gather for concurrent leases - no sync equivalent
     "test_concurrent_adjust_no_lost_tokens",
+    # Counts overlapping awaits; the sync executor may run serially
+    "test_write_each_dispatches_items_concurrently",
+    # Interleaves leases on one event loop; moto is not atomic across threads
+    "test_contended_parent_never_oversubscribed",
 }
 
 TEST_METHOD_NAME_REWRITES = {
@@ -289,6 +387,8 @@ TEST_IMPORT_PATH_REWRITES = {
     "zae_limiter.repository_builder": "zae_limiter.sync_repository_builder",
     "zae_limiter.limiter": "zae_limiter.sync_limiter",
     "zae_limiter.config_cache": "zae_limiter.sync_config_cache",
+    "zae_limiter.coalescer": "zae_limiter.sync_coalescer",
+    "zae_limiter.write_behind": "zae_limiter.sync_write_behind",
     "zae_limiter.lease": "zae_limiter.sync_lease",
 }
 
@@ -619,6 +719,13 @@ class AsyncToSyncTransformer(ast.NodeTransformer):
         # Continue visiting children
         self.generic_visit(node)
 
+        # Replace methods that have a hand-written sync implementation
+        for i, item in enumerate(node.body):
+            if isinstance(item, ast.FunctionDef):
+                override = SYNC_METHOD_OVERRIDES.get((node.name, item.name))
+                if override is not None:
+                    node.body[i] = ast.parse(override).body[0]
+
         # Inject parallel_mode support and executor methods into SyncRepository
         if node.name == "SyncRepository":
             # 1. Inject parallel_mode parameter into __init__
@@ -690,6 +797,29 @@ class AsyncToSyncTransformer(ast.NodeTransformer):
             executor_stmts = ast.parse(_EXECUTOR_METHODS).body
             node.body.extend(executor_stmts)
 
+        # Inject executor support into SyncRateLimiter (acquire_many)
+        if node.name == "SyncRateLimiter":
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name == "__init__":
+                    item.body.extend(
+                        ast.parse(
+                            "self._thread_pool: Any = None\n"
+                            "self._thread_pool_lock = threading.Lock()"
+                        ).body
+                    )
+                    break
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef) and item.name == "close":
+                    # Shut the pool down even if closing the repository fails
+                    docstring, body = item.body[:1], item.body[1:]
+                    cleanup = ast.parse("try:\n    pass\nfinally:\n    self._cleanup_thread_pool()")
+                    try_node = cleanup.body[0]
+                    assert isinstance(try_node, ast.Try)
+                    try_node.body = body
+                    item.body = [*docstring, try_node]
+                    break
+            node.body.extend(ast.parse(_LIMITER_EXECUTOR_METHODS).body)
+
         # Inject parallel_mode support into SyncRepositoryBuilder
         if node.name == "SyncRepositoryBuilder":
             # 1. Add self._parallel_mode = "auto" to __init__
@@ -39,6 +39,7 @@ Example (custom infrastructure options):
     limiter = RateLimiter(repository=repo)
 """
 
+from .coalescer import CoalescingConfig, CoalescingStats
 from .config_cache import CacheStats, ConfigSource
 from .exceptions import (
     EntityError,
@@ -52,6 +53,7 @@ from .exceptions import (
     LeaseExpiredError,
     NamespaceNotFoundError,
     NamespaceStateError,
+    PartialWriteError,
     RateLimitError,
     RateLimiterUnavailable,
     RateLimitExceeded,
@@ -62,12 +64,25 @@ from .exceptions import (
     VersionMismatchError,
     ZAELimiterError,
 )
+from .histogram import HistogramSnapshot, LatencyHistogram, LatencyHistograms
 from .infra.stack_manager import StackManager
 
 # Sync (generated from async via scripts/generate_sync.py)
 from .infra.sync_stack_manager import SyncStackManager
+from .instrumentation import (
+    AcquireOutcome,
+    AcquirePath,
+    AcquirePhase,
+    AcquireTrace,
+    InMemoryAggregator,
+    InstrumentationListener,
+    InstrumentationStats,
+    SpanEmitter,
+)
+from .io_stats import CapacityStats, IOStats
 from .lease import Lease
 from .limiter import OnUnavailable, RateLimiter
+from .local_rejection import LocalRejectionConfig, LocalRejectionStats
 from .models import (
     AuditAction,
     AuditEvent,
@@ -84,16 +99,24 @@ from .models import (
     Status,
     UsageSnapshot,
     UsageSummary,
+    WarmupResult,
 )
 from .repository import Repository
 from .repository_builder import RepositoryBuilder
 from .repository_protocol import RepositoryProtocol
+from .reservation import ReservationConfig, ReservationStats
+from .speculative_policy import (
+    SpeculativeBucketStats,
+    SpeculativePolicyConfig,
+    SpeculativePolicyStats,
+)
 from .sync_config_cache import SyncConfigCache
 from .sync_lease import SyncLease
 from .sync_limiter import SyncRateLimiter
 from .sync_repository import SyncRepository
 from .sync_repository_builder import SyncRepositoryBuilder
 from .sync_repository_protocol import SyncRepositoryProtocol
+from .write_behind import WriteBehindConfig, WriteBehindStats
 
 try:
     from ._version import __version__
@@ -129,11 +152,39 @@ __all__ = [
     "UsageSummary",
     "ResourceCapacity",
     "EntityCapacity",
+    "WarmupResult",
     "StackOptions",
     "BackendCapabilities",
     "Status",
     "CacheStats",
     "ConfigSource",
+    "ReservationConfig",
+    "ReservationStats",
+    "LocalRejectionConfig",
+    "LocalRejectionStats",
+    "CoalescingConfig",
+    "CoalescingStats",
+    "WriteBehindConfig",
+    "WriteBehindStats",
+    "SpeculativePolicyConfig",
+    "SpeculativePolicyStats",
+    "SpeculativeBucketStats",
+    # Instrumentation
+    "InstrumentationListener",
+    "AcquireTrace",
+    "AcquirePhase",
+    "AcquirePath",
+    "AcquireOutcome",
+    "InMemoryAggregator",
+    "InstrumentationStats",
+    "SpanEmitter",
+    # Latency histograms
+    "LatencyHistograms",
+    "LatencyHistogram",
+    "HistogramSnapshot",
+    # Consumed capacity
+    "IOStats",
+    "CapacityStats",
     # Audit
     "AuditEvent",
     "AuditAction",
@@ -154,6 +205,7 @@ __all__ = [
     "EntityExistsError",
     # Exceptions - Infrastructure
     "RateLimiterUnavailable",
+    "PartialWriteError",
     "StackOperationError",
     "StackAlreadyExistsError",
     "InfrastructureNotFoundError",
@@ -14,6 +14,7 @@ optimized for distributed systems:
 Key functions:
     refill_bucket: Calculate refilled tokens with drift compensation
     try_consume: Attempt to consume tokens (atomic check-and-consume)
+    try_consume_many: All-or-nothing consume across the limits of a bucket
     force_consume: Force consume tokens (can go negative for debt)
     calculate_retry_after: Calculate wait time until tokens available
     would_refill_satisfy: Check if refilling would allow a request to succeed
@@ -22,6 +23,7 @@ For conceptual explanation, see docs/guide/token-bucket.md
 For implementation details, see docs/contributing/architecture.md
 """
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 
 from .models import BucketState, Limit, LimitStatus
@@ -156,6 +158,46 @@ def try_consume(
         )
 
 
+def try_consume_many(
+    states: Sequence[BucketState],
+    amounts: Sequence[int],
+    now_ms: int,
+) -> list[tuple[int, int]] | None:
+    """
+    Attempt to consume from several buckets in one pass, all or nothing.
+
+    Hot-path variant of ``try_consume`` for the limits of a composite bucket:
+    the refill is computed inline with the same integer arithmetic as
+    ``refill_bucket``, and no result objects are allocated. Callers that need
+    ``LimitStatus`` objects build them only when this returns None.
+
+    Args:
+        states: Bucket states to consume from (not modified)
+        amounts: Tokens to consume from each state, in the same order
+        now_ms: Current timestamp in epoch milliseconds
+
+    Returns:
+        (new_tokens_milli, new_last_refill_ms) per state if every bucket can
+        cover its amount, or None as soon as one cannot
+    """
+    results: list[tuple[int, int]] = []
+    for state, amount in zip(states, amounts, strict=True):
+        tokens_milli = state.tokens_milli
+        last_refill_ms = state.last_refill_ms
+        elapsed_ms = now_ms - last_refill_ms
+        if elapsed_ms > 0:
+            refill_amount_milli = state.refill_amount_milli
+            tokens_to_add = (elapsed_ms * refill_amount_milli) // state.refill_period_ms
+            if tokens_to_add:
+                last_refill_ms += (tokens_to_add * state.refill_period_ms) // refill_amount_milli
+                tokens_milli = min(state.capacity_milli, tokens_milli + tokens_to_add)
+        tokens_milli -= amount * 1000
+        if tokens_milli < 0:
+            return None
+        results.append((tokens_milli, last_refill_ms))
+    return results
+
+
 def calculate_retry_after(
     deficit_milli: int,
     refill_amount_milli: int,
@@ -317,6 +359,7 @@ def would_refill_satisfy(
     buckets: list[BucketState],
     consume: dict[str, int],
     now_ms: int,
+    with_statuses: bool = True,
 ) -> tuple[bool, list[LimitStatus]]:
     """Check if refilling buckets would allow the request to succeed.
 
@@ -328,27 +371,29 @@ def would_refill_satisfy(
         buckets: Current bucket states (from ALL_OLD, before refill)
         consume: Amount requested per limit (limit_name -> tokens)
         now_ms: Current timestamp for refill calculation
+        with_statuses: If False, statuses are only built when a limit would
+            still be exceeded (they are only needed for RateLimitExceeded)
 
     Returns:
         Tuple of (would_satisfy, statuses) where:
         - would_satisfy: True if ALL limits pass after refill
         - statuses: LimitStatus for each limit (for RateLimitExceeded if needed)
     """
-    statuses: list[LimitStatus] = []
-    for state in buckets:
-        amount = consume.get(state.limit_name, 0)
-        if amount == 0:
-            continue
-        limit = Limit.from_bucket_state(state)
-        status = build_limit_status(
+    requested = [s for s in buckets if consume.get(s.limit_name, 0) != 0]
+    amounts = [consume[s.limit_name] for s in requested]
+    if not with_statuses and try_consume_many(requested, amounts, now_ms) is not None:
+        return (True, [])
+
+    statuses = [
+        build_limit_status(
             entity_id=state.entity_id,
             resource=state.resource,
-            limit=limit,
+            limit=Limit.from_bucket_state(state),
             state=state,
             requested=amount,
             now_ms=now_ms,
         )
-        statuses.append(status)
-
+        for state, amount in zip(requested, amounts, strict=True)
+    ]
     any_exceeded = any(s.exceeded for s in statuses)
     return (not any_exceeded, statuses)
@@ -0,0 +1,264 @@
+"""Request coalescing for concurrent speculative writes.
+
+When many callers acquire the same (entity, resource) at the same time, each
+one normally issues its own conditional UpdateItem against the same composite
+bucket item. ``SpeculativeCoalescer`` sits in front of
+``Repository.speculative_consume`` and merges concurrent consumes for one
+bucket into a single ``ADD`` with summed amounts (the condition becomes
+``tk >= sum`` per limit). The ``ALL_NEW`` result is split back into one
+``SpeculativeResult`` per caller, so each caller builds its own ``Lease``.
+
+If the merged write fails for any reason, every caller falls back to its own
+individual speculative write, so failure handling (fast rejection, shard
+retry, slow path) is unchanged.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
+
+from .models import BucketState
+from .repository_protocol import SpeculativeResult
+
+if TYPE_CHECKING:
+    from .repository_protocol import RepositoryProtocol
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CoalescingConfig:
+    """Configuration for speculative write coalescing.
+
+    Attributes:
+        window_seconds: How long the first caller for a bucket waits for
+            others to join before issuing the merged write. Adds up to this
+            much latency to every coalesced acquire.
+        max_batch: Maximum number of callers merged into one write. A full
+            batch is issued immediately.
+    """
+
+    window_seconds: float = 0.001
+    max_batch: int = 64
+
+    def __post_init__(self) -> None:
+        if self.window_seconds < 0:
+            raise ValueError("window_seconds must be non-negative")
+        if self.max_batch < 2:
+            raise ValueError("max_batch must be at least 2")
+
+
+@dataclass
+class CoalescingStats:
+    """Counters for speculative write coalescing.
+
+    Attributes:
+        batches: Merged writes issued (batches with more than one caller)
+        coalesced: Callers served by a merged write
+        fallbacks: Callers that fell back to an individual write after a
+            merged write failed
+    """
+
+    batches: int = 0
+    coalesced: int = 0
+    fallbacks: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return stats as a dictionary."""
+        return {
+            "batches": self.batches,
+            "coalesced": self.coalesced,
+            "fallbacks": self.fallbacks,
+        }
+
+
+@dataclass
+class _Batch:
+    """Callers waiting on one merged write."""
+
+    consumes: list[dict[str, int]] = field(default_factory=list)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    # Merged result, or None if the merged write failed (callers fall back)
+    result: SpeculativeResult | None = None
+
+
+class SpeculativeCoalescer:
+    """Merges concurrent speculative writes to the same bucket.
+
+    Args:
+        repository: Repository issuing the speculative writes
+        config: Coalescing window and batch size
+    """
+
+    def __init__(
+        self,
+        repository: "RepositoryProtocol",
+        config: CoalescingConfig | None = None,
+    ) -> None:
+        self._repository = repository
+        self.config = config if config is not None else CoalescingConfig()
+        self.stats = CoalescingStats()
+        self._pending: dict[tuple[str, str], _Batch] = {}
+        self._async_lock = asyncio.Lock()
+
+    async def speculative_consume(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+    ) -> SpeculativeResult:
+        """Speculatively consume, merged with concurrent callers for the bucket.
+
+        Args:
+            entity_id: Entity owning the bucket
+            resource: Resource name
+            consume: Amount per limit (tokens, not milli)
+
+        Returns:
+            This caller's SpeculativeResult. On a merged success, bucket
+            states are reconstructed as if callers had written in order.
+        """
+        key = (entity_id, resource)
+        async with self._async_lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if batch is None:
+                batch = _Batch()
+                self._pending[key] = batch
+            index = len(batch.consumes)
+            batch.consumes.append(consume)
+            if len(batch.consumes) >= self.config.max_batch:
+                # Full: later callers start a new batch
+                del self._pending[key]
+
+        if leader:
+            single = await self._lead(entity_id, resource, batch)
+            if single is not None:
+                return single
+        else:
+            await batch.done.wait()
+
+        if batch.result is not None:
+            return _split_result(batch.result, batch.consumes, index)
+
+        async with self._async_lock:
+            self.stats.fallbacks += 1
+        return await self._repository.speculative_consume(
+            entity_id=entity_id,
+            resource=resource,
+            consume=consume,
+        )
+
+    async def _lead(
+        self,
+        entity_id: str,
+        resource: str,
+        batch: _Batch,
+    ) -> SpeculativeResult | None:
+        """Collect joiners, then issue the merged write for the batch.
+
+        Returns:
+            The leader's own result if nobody joined (no merge needed),
+            otherwise None with ``batch.result`` set for every caller.
+        """
+        key = (entity_id, resource)
+        try:
+            await asyncio.sleep(self.config.window_seconds)
+            async with self._async_lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+
+            if len(batch.consumes) == 1:
+                return await self._repository.speculative_consume(
+                    entity_id=entity_id,
+                    resource=resource,
+                    consume=batch.consumes[0],
+                )
+
+            merged: dict[str, int] = {}
+            for consume in batch.consumes:
+                for name, amount in consume.items():
+                    merged[name] = merged.get(name, 0) + amount
+
+            try:
+                result = await self._repository.speculative_consume(
+                    entity_id=entity_id,
+                    resource=resource,
+                    consume=merged,
+                )
+            except Exception:
+                return None
+
+            parent = result.parent_result
+            if result.success and (parent is None or parent.success):
+                batch.result = result
+                async with self._async_lock:
+                    self.stats.batches += 1
+                    self.stats.coalesced += len(batch.consumes)
+                return None
+
+            # Partial success on the parallel cascade path: undo the half
+            # that succeeded before everyone retries individually.
+            if result.success:
+                await self._compensate(entity_id, resource, merged, result.shard_id)
+            elif parent is not None and parent.success and result.parent_id is not None:
+                await self._compensate(result.parent_id, resource, merged, parent.shard_id)
+            return None
+        finally:
+            batch.done.set()
+
+    async def _compensate(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+        shard_id: int,
+    ) -> None:
+        """Return tokens taken by a merged write that is being abandoned."""
+        deltas = {name: -(amount * 1000) for name, amount in consume.items()}
+        item = self._repository.build_composite_adjust(
+            entity_id=entity_id,
+            resource=resource,
+            deltas=deltas,
+            shard_id=shard_id,
+        )
+        if not item:
+            return
+        try:
+            await self._repository.write_each([item])
+        except Exception:
+            logger.warning(
+                "Failed to compensate merged speculative write for %s/%s",
+                entity_id,
+                resource,
+                exc_info=True,
+            )
+
+
+def _split_result(
+    result: SpeculativeResult,
+    consumes: list[dict[str, int]],
+    index: int,
+) -> SpeculativeResult:
+    """Derive caller ``index``'s view of a merged speculative result.
+
+    Callers are ordered by arrival; each sees the bucket as it was right after
+    its own consumption, i.e. ALL_NEW plus whatever later callers consumed.
+    """
+    later = consumes[index + 1 :]
+
+    def rebuild(states: list[BucketState]) -> list[BucketState]:
+        rebuilt: list[BucketState] = []
+        for state in states:
+            add_back = sum(c.get(state.limit_name, 0) for c in later) * 1000
+            copy = replace(state, tokens_milli=state.tokens_milli + add_back)
+            if copy.total_consumed_milli is not None:
+                copy.total_consumed_milli -= add_back
+            rebuilt.append(copy)
+        return rebuilt
+
+    parent_result = result.parent_result
+    if parent_result is not None:
+        parent_result = replace(parent_result, buckets=rebuild(parent_result.buckets))
+    return replace(result, buckets=rebuild(result.buckets), parent_result=parent_result)
@@ -7,11 +7,14 @@ See ADR-103 for design rationale.
 """
 
 import asyncio
+import logging
 import threading
 import time
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Collection, Coroutine
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Literal, cast
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, cast
+
+from .lru import LRUCache
 
 #: Config source levels returned by :meth:`ConfigCache.resolve_limits`.
 ConfigSource = Literal["entity", "entity_default", "resource", "system"]
@@ -19,12 +22,13 @@ ConfigSource = Literal["entity", "entity_default", "resource", "system"]
 if TYPE_CHECKING:
     from .models import Limit, OnUnavailableAction
 
+logger = logging.getLogger(__name__)
+
 # Sentinel value to distinguish "no config exists" from "not yet cached"
 _NO_CONFIG: object = object()
 
 
-@dataclass
-class CacheEntry:
+class CacheEntry(NamedTuple):
     """A cached value with expiration time."""
 
     value: Any
@@ -39,6 +43,13 @@ class CacheStats:
     misses: int = 0
     size: int = 0
     ttl_seconds: int = 0
+    stale_hits: int = 0
+    refreshes: int = 0
+    refresh_failures: int = 0
+    evictions: int = 0
+    entity_cache_size: int = 0
+    entity_cache_evictions: int = 0
+    entity_cache_expirations: int = 0
 
     def as_dict(self) -> dict[str, int]:
         """Return stats as a dictionary."""
@@ -47,9 +58,25 @@ class CacheStats:
             "misses": self.misses,
             "size": self.size,
             "ttl": self.ttl_seconds,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "evictions": self.evictions,
+            "entity_cache_size": self.entity_cache_size,
+            "entity_cache_evictions": self.entity_cache_evictions,
+            "entity_cache_expirations": self.entity_cache_expirations,
         }
 
 
+@dataclass
+class _Flight:
+    """An in-progress config fetch that concurrent callers wait on."""
+
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
 @dataclass
 class ConfigCache:
     """
@@ -64,27 +91,61 @@ class ConfigCache:
     - Uses asyncio.Lock for async operations
     - Uses threading.Lock for sync operations
     - Locks are per-cache-instance (no global locking)
+    - resolve_limits() never holds a lock across I/O: misses for the same
+      (namespace, entity, resource) share one in-flight fetch, and misses for
+      different keys fetch concurrently
 
     Negative caching:
     - When entity config is not found, caches the "miss" to avoid repeated lookups
     - Uses sentinel _NO_CONFIG to distinguish None from "not cached"
 
+    Refresh-ahead (resolve_limits() only, opt-in):
+    - Entries within refresh_ahead_seconds of expiry are served from cache
+      while one background fetch per key replaces them
+    - Expired entries may be served for up to max_staleness_seconds while a
+      refresh is in progress; past that cutoff the caller fetches inline
+    - A failed refresh is logged and counted; the next call retries it
+
     Args:
         ttl_seconds: Time-to-live for cached entries (0 = disabled)
+        refresh_ahead_seconds: Start a background refresh this long before an
+            entry expires (0 = disabled, must be less than ttl_seconds)
+        max_staleness_seconds: Serve expired entries for at most this long
+            while they are refreshed in the background (0 = never)
+        max_entries: Maximum number of entity config entries kept; the least
+            recently used are evicted beyond this (None = unbounded)
     """
 
     ttl_seconds: int = 60
     namespace_id: str = "default"
+    refresh_ahead_seconds: float = 0.0
+    max_staleness_seconds: float = 0.0
+    max_entries: int | None = None
     _enabled: bool = field(init=False, default=True)
+    _refresh_enabled: bool = field(init=False, default=False)
 
     # Cache storage
     _system_defaults: CacheEntry | None = field(init=False, default=None)
     _resource_defaults: dict[str, CacheEntry] = field(init=False, default_factory=dict)
-    _entity_limits: dict[tuple[str, str, str], CacheEntry] = field(init=False, default_factory=dict)
+    _entity_limits: LRUCache[tuple[str, str, str], CacheEntry] = field(
+        init=False, default_factory=LRUCache
+    )
 
     # Statistics
     _hits: int = field(init=False, default=0)
     _misses: int = field(init=False, default=0)
+    _stale_hits: int = field(init=False, default=0)
+    _refreshes: int = field(init=False, default=0)
+    _refresh_failures: int = field(init=False, default=0)
+
+    # In-flight resolve_limits() fetches, keyed by (namespace, entity, resource)
+    _inflight: dict[tuple[str, str, str], _Flight] = field(init=False, default_factory=dict)
+
+    # Background refresh tasks, referenced until done (async only)
+    _refresh_tasks: set[Any] = field(init=False, default_factory=set)
+
+    # Bounded thread pool for background refreshes, created lazily (sync only)
+    _refresh_pool: Any = field(init=False, default=None)
 
     # Locks for thread/async safety
     _async_lock: asyncio.Lock = field(init=False, default_factory=asyncio.Lock)
@@ -92,12 +153,28 @@ class ConfigCache:
 
     def __post_init__(self) -> None:
         """Initialize derived state after dataclass init."""
+        if self.refresh_ahead_seconds < 0 or self.max_staleness_seconds < 0:
+            raise ValueError("refresh_ahead_seconds and max_staleness_seconds must be >= 0")
+        if self.ttl_seconds > 0 and self.refresh_ahead_seconds >= self.ttl_seconds:
+            raise ValueError("refresh_ahead_seconds must be less than ttl_seconds")
         self._enabled = self.ttl_seconds > 0
+        self._entity_limits = LRUCache(max_entries=self.max_entries)
+        self._refresh_enabled = self._enabled and (
+            self.refresh_ahead_seconds > 0 or self.max_staleness_seconds > 0
+        )
 
     def _is_expired(self, entry: CacheEntry) -> bool:
         """Check if a cache entry has expired."""
         return time.time() > entry.expires_at
 
+    def _is_usable(self, entry: CacheEntry) -> bool:
+        """Check if an entry may still be served, allowing max_staleness_seconds."""
+        return time.time() <= entry.expires_at + self.max_staleness_seconds
+
+    def _needs_refresh(self, entry: CacheEntry) -> bool:
+        """Check if a usable entry is due for a background refresh."""
+        return self._refresh_enabled and time.time() > entry.expires_at - self.refresh_ahead_seconds
+
     def _make_entry(self, value: Any) -> CacheEntry:
         """Create a new cache entry with TTL."""
         return CacheEntry(value=value, expires_at=time.time() + self.ttl_seconds)
@@ -343,6 +420,26 @@ class ConfigCache:
     # Batched config resolution (issue #298)
     # -------------------------------------------------------------------------
 
+    def _get_slot_entry(
+        self,
+        slot_type: str,
+        entity_id: str | None = None,
+        resource: str | None = None,
+    ) -> CacheEntry | None:
+        """Return the raw cache entry for a slot, regardless of expiry."""
+        if slot_type == "entity":
+            assert entity_id is not None and resource is not None
+            return self._entity_limits.get((self.namespace_id, entity_id, resource))
+        if slot_type == "entity_default":
+            assert entity_id is not None
+            return self._entity_limits.get((self.namespace_id, entity_id, "_default_"))
+        if slot_type == "resource":
+            assert resource is not None
+            return self._resource_defaults.get(resource)
+        if slot_type == "system":
+            return self._system_defaults
+        return None
+
     def _check_cache_slot(
         self,
         slot_type: str,
@@ -359,22 +456,10 @@ class ConfigCache:
         Returns:
             (is_cached, value) where is_cached indicates if a valid entry exists.
             For entity slots, _NO_CONFIG sentinel means "confirmed no config" (negative cache).
+            Entries up to max_staleness_seconds past expiry count as cached.
         """
-        if slot_type == "entity":
-            assert entity_id is not None and resource is not None
-            entry = self._entity_limits.get((self.namespace_id, entity_id, resource))
-        elif slot_type == "entity_default":
-            assert entity_id is not None
-            entry = self._entity_limits.get((self.namespace_id, entity_id, "_default_"))
-        elif slot_type == "resource":
-            assert resource is not None
-            entry = self._resource_defaults.get(resource)
-        elif slot_type == "system":
-            entry = self._system_defaults
-        else:
-            return False, None
-
-        if entry is not None and not self._is_expired(entry):
+        entry = self._get_slot_entry(slot_type, entity_id=entity_id, resource=resource)
+        if entry is not None and self._is_usable(entry):
             return True, entry.value
         return False, None
 
@@ -394,6 +479,10 @@ class ConfigCache:
         collects misses, fetches them in a single BatchGetItem call, populates
         the cache, and returns the highest-precedence match.
 
+        With refresh-ahead enabled, a call whose slots are all usable but due
+        for refresh returns the cached result immediately and refreshes those
+        slots in the background.
+
         Args:
             entity_id: Entity to resolve limits for
             resource: Resource being accessed
@@ -409,54 +498,152 @@ class ConfigCache:
         if not self._enabled:
             return await self._resolve_limits_uncached(entity_id, resource, batch_fetch_fn)
 
+        from . import schema
+
+        # Check the cache and join or start a flight; no I/O under the lock
+        flight_key = (self.namespace_id, entity_id, resource)
         async with self._async_lock:
-            return await self._resolve_limits_inner_async(entity_id, resource, batch_fetch_fn)
+            levels, cached_results, miss_keys, refresh_keys = self._build_levels_and_check_cache(
+                entity_id, resource, schema
+            )
+            flight = self._inflight.get(flight_key)
+            if not miss_keys:
+                result = self._evaluate_hierarchy(levels, cached_results, {}, None)
+                if not refresh_keys or flight is not None:
+                    return result
+                refresh_flight = _Flight()
+                self._inflight[flight_key] = refresh_flight
+                self._refreshes += 1
+                refreshing = {slot_type for slot_type, _, _ in refresh_keys}
+                fresh = {k: v for k, v in cached_results.items() if k not in refreshing}
+                self._spawn_refresh(
+                    lambda: self._refresh_in_background(
+                        flight_key, refresh_flight, levels, fresh, refresh_keys, batch_fetch_fn
+                    )
+                )
+                return result
+            leader = flight is None
+            if flight is None:
+                flight = _Flight()
+                self._inflight[flight_key] = flight
+
+        if not leader:
+            await flight.done.wait()
+            if flight.error is not None and not isinstance(flight.error, Exception):
+                # The leader was cancelled before it finished: fetch again
+                return await self.resolve_limits(entity_id, resource, batch_fetch_fn)
+            if flight.error is not None:
+                raise flight.error
+            return cast(
+                "tuple[list[Limit] | None, OnUnavailableAction | None, ConfigSource | None]",
+                flight.result,
+            )
 
-    async def _resolve_limits_inner_async(
+        return await self._lead_flight(
+            flight_key, flight, levels, cached_results, miss_keys, batch_fetch_fn
+        )
+
+    async def _lead_flight(
         self,
-        entity_id: str,
-        resource: str,
+        flight_key: tuple[str, str, str],
+        flight: _Flight,
+        levels: list[tuple[ConfigSource, str, str]],
+        cached_results: dict[str, Any],
+        miss_keys: list[tuple[ConfigSource, str, str]],
         batch_fetch_fn: Callable[
             [list[tuple[str, str]]],
             Awaitable["dict[tuple[str, str], tuple[list[Limit], OnUnavailableAction | None]]"],
         ],
     ) -> "tuple[list[Limit] | None, OnUnavailableAction | None, ConfigSource | None]":
-        """Async inner implementation for batched config resolution."""
-        from . import schema
-
-        levels, cached_results, miss_keys = self._build_levels_and_check_cache(
-            entity_id, resource, schema
+        """Fetch on behalf of a flight and release its followers."""
+        _, entity_id, resource = flight_key
+        try:
+            flight.result = await self._fetch_misses(
+                entity_id, resource, levels, cached_results, miss_keys, batch_fetch_fn
+            )
+        except BaseException as e:
+            # Includes cancellation, so followers never see a missing result
+            flight.error = e
+            raise
+        finally:
+            async with self._async_lock:
+                if self._inflight.get(flight_key) is flight:
+                    del self._inflight[flight_key]
+            flight.done.set()
+        return cast(
+            "tuple[list[Limit] | None, OnUnavailableAction | None, ConfigSource | None]",
+            flight.result,
         )
 
-        # Phase 2: Batch fetch misses
-        fetched_results: dict[str, Any] = {}
-        on_unavailable: OnUnavailableAction | None = None
+    async def _refresh_in_background(
+        self,
+        flight_key: tuple[str, str, str],
+        flight: _Flight,
+        levels: list[tuple[ConfigSource, str, str]],
+        cached_results: dict[str, Any],
+        refresh_keys: list[tuple[ConfigSource, str, str]],
+        batch_fetch_fn: Callable[
+            [list[tuple[str, str]]],
+            Awaitable["dict[tuple[str, str], tuple[list[Limit], OnUnavailableAction | None]]"],
+        ],
+    ) -> None:
+        """Replace entries due for refresh; failures leave the old entries in place."""
+        try:
+            await self._lead_flight(
+                flight_key, flight, levels, cached_results, refresh_keys, batch_fetch_fn
+            )
+        except Exception:
+            async with self._async_lock:
+                self._refresh_failures += 1
+            logger.warning(
+                "Background config refresh failed for %s/%s",
+                flight_key[1],
+                flight_key[2],
+                exc_info=True,
+            )
+
+    def _spawn_refresh(self, refresh: Callable[[], Coroutine[Any, Any, None]]) -> None:
+        """Run a refresh without blocking the caller."""
+        task: asyncio.Task[None] = asyncio.get_running_loop().create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
 
-        if miss_keys:
-            fetch_keys = [(pk, sk) for _, pk, sk in miss_keys]
-            items = await batch_fetch_fn(fetch_keys)
+    def close(self) -> None:
+        """Stop background refreshes (called by ``Repository.close()``).
+
+        The cache stays usable; a later refresh starts a new background worker.
+        """
+        for task in list(self._refresh_tasks):
+            task.cancel()
+
+    async def _fetch_misses(
+        self,
+        entity_id: str,
+        resource: str,
+        levels: list[tuple[ConfigSource, str, str]],
+        cached_results: dict[str, Any],
+        miss_keys: list[tuple[ConfigSource, str, str]],
+        batch_fetch_fn: Callable[
+            [list[tuple[str, str]]],
+            Awaitable["dict[tuple[str, str], tuple[list[Limit], OnUnavailableAction | None]]"],
+        ],
+    ) -> "tuple[list[Limit] | None, OnUnavailableAction | None, ConfigSource | None]":
+        """Fetch cache misses in one batch call, then populate the cache."""
+        fetch_keys = [(pk, sk) for _, pk, sk in miss_keys]
+        items = await batch_fetch_fn(fetch_keys)
+        async with self._async_lock:
             fetched_results, on_unavailable = self._process_fetched_items(
                 miss_keys, items, entity_id, resource
             )
-
-        # Phase 3: Evaluate hierarchy
         return self._evaluate_hierarchy(levels, cached_results, fetched_results, on_unavailable)
 
-    def _build_levels_and_check_cache(
+    def _build_levels(
         self,
         entity_id: str,
         resource: str,
         schema: Any,
-    ) -> tuple[
-        list[tuple[ConfigSource, str, str]],
-        dict[str, Any],
-        list[tuple[ConfigSource, str, str]],
-    ]:
-        """Build config levels and check cache for each, returning misses.
-
-        Returns:
-            (levels, cached_results, miss_keys)
-        """
+    ) -> list[tuple[ConfigSource, str, str]]:
+        """Config levels for an entity and resource, in precedence order."""
         include_entity_default = resource != "_default_"
         ns = self.namespace_id
         levels: list[tuple[ConfigSource, str, str]] = [
@@ -472,22 +659,45 @@ class ConfigCache:
                 ("system", schema.pk_system(ns), schema.sk_config()),
             ]
         )
+        return levels
+
+    def _build_levels_and_check_cache(
+        self,
+        entity_id: str,
+        resource: str,
+        schema: Any,
+    ) -> tuple[
+        list[tuple[ConfigSource, str, str]],
+        dict[str, Any],
+        list[tuple[ConfigSource, str, str]],
+        list[tuple[ConfigSource, str, str]],
+    ]:
+        """Build config levels and check cache for each, returning misses.
+
+        Returns:
+            (levels, cached_results, miss_keys, refresh_keys) where refresh_keys
+            are cached slots due for a background refresh
+        """
+        levels = self._build_levels(entity_id, resource, schema)
 
         cached_results: dict[str, Any] = {}
         miss_keys: list[tuple[ConfigSource, str, str]] = []
+        refresh_keys: list[tuple[ConfigSource, str, str]] = []
 
         for slot_type, pk, sk in levels:
-            is_cached, value = self._check_cache_slot(
-                slot_type, entity_id=entity_id, resource=resource
-            )
-            if is_cached:
+            entry = self._get_slot_entry(slot_type, entity_id=entity_id, resource=resource)
+            if entry is not None and self._is_usable(entry):
                 self._hits += 1
-                cached_results[slot_type] = value
+                cached_results[slot_type] = entry.value
+                if self._is_expired(entry):
+                    self._stale_hits += 1
+                if self._needs_refresh(entry):
+                    refresh_keys.append((slot_type, pk, sk))
             else:
                 self._misses += 1
                 miss_keys.append((slot_type, pk, sk))
 
-        return levels, cached_results, miss_keys
+        return levels, cached_results, miss_keys, refresh_keys
 
     def _process_fetched_items(
         self,
@@ -594,7 +804,7 @@ class ConfigCache:
         """Resolve limits without caching (TTL=0): batch fetch all 4 levels."""
         from . import schema
 
-        levels, _, _ = self._build_levels_and_check_cache(entity_id, resource, schema)
+        levels, _, _, _ = self._build_levels_and_check_cache(entity_id, resource, schema)
         fetch_keys = [(pk, sk) for _, pk, sk in levels]
         items = await batch_fetch_fn(fetch_keys)
         return self._evaluate_uncached(levels, items)
@@ -625,6 +835,114 @@ class ConfigCache:
 
         return None, on_unavailable, None
 
+    # -------------------------------------------------------------------------
+    # Prefetch
+    # -------------------------------------------------------------------------
+
+    def _prefetch_slots(
+        self,
+        entity_ids: list[str],
+        resources: list[str],
+    ) -> list[tuple[ConfigSource, str, str, str, str]]:
+        """Cache slots for entity_ids x resources as (slot_type, PK, SK, entity, resource)."""
+        from . import schema
+
+        ns = self.namespace_id
+        slots: list[tuple[ConfigSource, str, str, str, str]] = [
+            ("system", schema.pk_system(ns), schema.sk_config(), "", ""),
+        ]
+        for resource in resources:
+            pk_resource = schema.pk_resource(ns, resource)
+            slots.append(("resource", pk_resource, schema.sk_config(), "", resource))
+        for entity_id in entity_ids:
+            pk = schema.pk_entity(ns, entity_id)
+            slots.append(("entity_default", pk, schema.sk_config("_default_"), entity_id, ""))
+            for resource in resources:
+                if resource != "_default_":
+                    slots.append(("entity", pk, schema.sk_config(resource), entity_id, resource))
+        return slots
+
+    def prefetch_keys(self, entity_ids: list[str], resources: list[str]) -> list[tuple[str, str]]:
+        """
+        Config keys to fetch so that prime() can fill the cache.
+
+        Covers system defaults, resource defaults for each resource, and the
+        entity-level configs of every entity for every resource. Empty when
+        caching is disabled.
+
+        Args:
+            entity_ids: Entities to prefetch configs for
+            resources: Resources to prefetch configs for
+
+        Returns:
+            List of (PK, SK) tuples
+        """
+        if not self._enabled:
+            return []
+        return [(pk, sk) for _, pk, sk, _, _ in self._prefetch_slots(entity_ids, resources)]
+
+    async def missing_keys(self, keys: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """
+        Config keys resolve_limits() would fetch for (entity_id, resource) pairs.
+
+        Slots that are cached and still usable are left out. Empty when
+        caching is disabled. Does not count hits or misses.
+
+        Args:
+            keys: (entity_id, resource) pairs about to be resolved
+
+        Returns:
+            List of (PK, SK) tuples, without duplicates
+        """
+        if not self._enabled:
+            return []
+        from . import schema
+
+        missing: dict[tuple[str, str], None] = {}
+        async with self._async_lock:
+            for entity_id, resource in keys:
+                for slot_type, pk, sk in self._build_levels(entity_id, resource, schema):
+                    entry = self._get_slot_entry(slot_type, entity_id=entity_id, resource=resource)
+                    if entry is None or not self._is_usable(entry):
+                        missing[(pk, sk)] = None
+        return list(missing)
+
+    async def prime(
+        self,
+        entity_ids: list[str],
+        resources: list[str],
+        items: "dict[tuple[str, str], tuple[list[Limit], OnUnavailableAction | None]]",
+        unread: Collection[tuple[str, str]] = (),
+    ) -> int:
+        """
+        Fill the cache from config items fetched for prefetch_keys().
+
+        Keys missing from ``items`` are cached as "no config", exactly as
+        resolve_limits() caches them after a fetch. Keys in ``unread`` were
+        not read (left in UnprocessedKeys, or not requested because already
+        cached) and their slots are left as they are.
+
+        Args:
+            entity_ids: Entities passed to prefetch_keys()
+            resources: Resources passed to prefetch_keys()
+            items: Fetched configs, mapping (PK, SK) to (limits, on_unavailable)
+            unread: (PK, SK) keys that were not read
+
+        Returns:
+            Number of cache slots filled (0 when caching is disabled)
+        """
+        if not self._enabled:
+            return 0
+        slots = [
+            slot
+            for slot in self._prefetch_slots(entity_ids, resources)
+            if (slot[1], slot[2]) not in unread
+        ]
+        async with self._async_lock:
+            for slot_type, pk, sk, entity_id, resource in slots:
+                self._process_fetched_items([(slot_type, pk, sk)], items, entity_id, resource)
+        return len(slots)
+
     # -------------------------------------------------------------------------
     # Cache management
     # -------------------------------------------------------------------------
@@ -669,6 +987,10 @@ class ConfigCache:
                 misses=self._misses,
                 size=size,
                 ttl_seconds=self.ttl_seconds,
+                stale_hits=self._stale_hits,
+                refreshes=self._refreshes,
+                refresh_failures=self._refresh_failures,
+                evictions=self._entity_limits.evictions,
             )
 
     @property
@@ -199,6 +199,28 @@ class RateLimiterUnavailable(InfrastructureError):  # noqa: N818
         return " ".join(parts)
 
 
+class PartialWriteError(InfrastructureError):
+    """
+    Raised when some of a batch of independent writes fail.
+
+    ``write_each()`` dispatches its items concurrently without cross-item
+    atomicity, so the items not listed in ``failures`` were written.
+
+    Attributes:
+        failures: Mapping of failed item index to the exception it raised
+        item_count: Number of items in the batch
+    """
+
+    def __init__(self, failures: dict[int, Exception], item_count: int) -> None:
+        self.failures = failures
+        self.item_count = item_count
+        first = next(iter(failures.values()))
+        super().__init__(
+            f"{len(failures)} of {item_count} independent writes failed "
+            f"(items {sorted(failures)}): {first}"
+        )
+
+
 # ---------------------------------------------------------------------------
 # Entity Exceptions
 # ---------------------------------------------------------------------------
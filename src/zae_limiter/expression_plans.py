@@ -0,0 +1,251 @@
+"""Cached expression templates for composite bucket writes.
+
+Every acquire writes a composite bucket item (ADR-114) with an
+UpdateExpression, a ConditionExpression and ExpressionAttributeNames that
+depend only on which limits are written and a few flags (TTL handling,
+which limits need a ``tk`` floor), never on the amounts. Building them
+costs several f-strings and dict inserts per limit on every call.
+
+``ExpressionPlans`` builds each shape once, keyed by the sorted limit names
+and flags, and keeps it in a bounded LRU. Per call, only the numeric
+ExpressionAttributeValues are filled in. Plans are never mutated after they
+are built; callers copy ``names`` and ``values`` before adding to them.
+
+This module is shared by the async ``Repository`` and the generated
+``SyncRepository``. Two threads building the same missing plan only cost a
+duplicate build.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from . import schema
+from .lru import LRUCache
+
+_DEFAULT_MAX_ENTRIES = 1024
+
+# ttl_mode values for normal writes
+TTL_UNCHANGED = 0
+TTL_SET = 1
+TTL_REMOVE = 2
+
+
+@dataclass(frozen=True)
+class WritePlan:
+    """Pre-built expression text and attribute names for one write shape.
+
+    Attributes:
+        update_expression: UpdateExpression text
+        condition_expression: ConditionExpression text, or None
+        names: ExpressionAttributeNames
+        values: ExpressionAttributeValues that never change (e.g. wcu amounts)
+        limits: Per limit, in expression order: (limit name, value placeholders)
+    """
+
+    update_expression: str
+    condition_expression: str | None
+    names: dict[str, str]
+    values: dict[str, Any]
+    limits: tuple[tuple[str, tuple[str, ...]], ...]
+
+
+class ExpressionPlans:
+    """Bounded cache of ``WritePlan`` objects per write path and shape.
+
+    Args:
+        max_entries: Maximum number of plans kept. Least recently used plans
+            are evicted beyond this.
+    """
+
+    def __init__(self, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        self._plans: LRUCache[tuple[Any, ...], WritePlan] = LRUCache(max_entries=max_entries)
+
+    def speculative(self, names: tuple[str, ...], with_ttl: bool) -> WritePlan:
+        """Plan for a speculative UpdateItem (consume + 1 WCU, no read).
+
+        Placeholders per limit: (negative amount, amount, threshold).
+        """
+        return self._get(("speculative", names, with_ttl), _build_speculative, names, with_ttl)
+
+    def normal(self, names: tuple[str, ...], floors: tuple[bool, ...], ttl_mode: int) -> WritePlan:
+        """Plan for a Normal write (ADR-115 path 2).
+
+        Placeholders per limit: (tk delta, tc delta, tk floor or "").
+
+        Args:
+            names: Limit names, sorted
+            floors: Per name, whether the condition guards ``tk >= floor``
+            ttl_mode: TTL_UNCHANGED, TTL_SET or TTL_REMOVE
+        """
+        key = ("normal", names, floors, ttl_mode)
+        return self._get(key, _build_normal, names, floors, ttl_mode)
+
+    def retry(self, names: tuple[str, ...]) -> WritePlan:
+        """Plan for a consumption-only Retry write (ADR-115 path 3).
+
+        Placeholders per limit: (negative amount, amount, threshold).
+        """
+        return self._get(("retry", names), _build_retry, names)
+
+    def adjust(self, names: tuple[str, ...], require_exists: bool) -> WritePlan:
+        """Plan for an unconditional Adjust write (ADR-115 path 4).
+
+        Placeholders per limit: (tk delta, tc delta).
+        """
+        return self._get(("adjust", names, require_exists), _build_adjust, names, require_exists)
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def _get(self, key: tuple[Any, ...], build: Callable[..., WritePlan], *args: Any) -> WritePlan:
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = build(*args)
+        return plan
+
+
+def _bucket_names(names: dict[str, str], name: str, tk_alias: str, tc_alias: str) -> None:
+    """Map the tk and tc aliases of one limit to their attribute names."""
+    names[tk_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TK)
+    names[tc_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TC)
+
+
+def _build_speculative(names: tuple[str, ...], with_ttl: bool) -> WritePlan:
+    add_parts: list[str] = []
+    condition_parts: list[str] = ["attribute_exists(PK)"]
+    attr_names: dict[str, str] = {}
+    limits: list[tuple[str, tuple[str, ...]]] = []
+
+    for name in names:
+        tk_alias = f"#tk_{name}"
+        tc_alias = f"#tc_{name}"
+        neg_val = f":neg_{name}"
+        pos_val = f":pos_{name}"
+        thresh_val = f":thresh_{name}"
+        _bucket_names(attr_names, name, tk_alias, tc_alias)
+        add_parts.append(f"{tk_alias} {neg_val}")
+        add_parts.append(f"{tc_alias} {pos_val}")
+        condition_parts.append(f"{tk_alias} >= {thresh_val}")
+        limits.append((name, (neg_val, pos_val, thresh_val)))
+
+    # wcu infrastructure limit consumption (1 WCU = 1000 millitokens per write)
+    _bucket_names(attr_names, schema.WCU_LIMIT_NAME, "#wcu_tk", "#wcu_tc")
+    wcu_milli = 1000
+    values: dict[str, Any] = {
+        ":neg_wcu": {"N": str(-wcu_milli)},
+        ":pos_wcu": {"N": str(wcu_milli)},
+        ":thresh_wcu": {"N": str(wcu_milli)},
+    }
+    add_parts.append("#wcu_tk :neg_wcu")
+    add_parts.append("#wcu_tc :pos_wcu")
+    condition_parts.append("#wcu_tk >= :thresh_wcu")
+
+    update_expr = "ADD " + ", ".join(add_parts)
+    if with_ttl:
+        update_expr = f"SET #ttl = :ttl {update_expr}"
+
+    # Reject expired-but-not-yet-deleted buckets (DynamoDB TTL is eventual)
+    attr_names["#ttl"] = "ttl"
+    condition_parts.append("(attribute_not_exists(#ttl) OR #ttl > :now_epoch)")
+
+    return WritePlan(
+        update_expression=update_expr,
+        condition_expression=" AND ".join(condition_parts),
+        names=attr_names,
+        values=values,
+        limits=tuple(limits),
+    )
+
+
+def _build_normal(names: tuple[str, ...], floors: tuple[bool, ...], ttl_mode: int) -> WritePlan:
+    add_parts: list[str] = []
+    set_parts: list[str] = ["#rf = :now"]
+    remove_parts: list[str] = []
+    attr_names: dict[str, str] = {"#rf": schema.BUCKET_FIELD_RF}
+    condition_parts: list[str] = ["#rf = :expected_rf"]
+    limits: list[tuple[str, tuple[str, ...]]] = []
+
+    if ttl_mode != TTL_UNCHANGED:
+        attr_names["#ttl"] = "ttl"
+        if ttl_mode == TTL_SET:
+            set_parts.append("#ttl = :ttl_val")
+        else:
+            remove_parts.append("#ttl")
+
+    for name, floored in zip(names, floors, strict=True):
+        tk_alias = f"#b_{name}_tk"
+        tc_alias = f"#b_{name}_tc"
+        tk_val = f":b_{name}_tk_delta"
+        tc_val = f":b_{name}_tc_delta"
+        _bucket_names(attr_names, name, tk_alias, tc_alias)
+        add_parts.append(f"{tk_alias} {tk_val}")
+        add_parts.append(f"{tc_alias} {tc_val}")
+        floor_val = ""
+        if floored:
+            floor_val = f":b_{name}_tk_floor"
+            condition_parts.append(f"{tk_alias} >= {floor_val}")
+        limits.append((name, (tk_val, tc_val, floor_val)))
+
+    update_expr = f"SET {', '.join(set_parts)} ADD {', '.join(add_parts)}"
+    if remove_parts:
+        update_expr += f" REMOVE {', '.join(remove_parts)}"
+
+    return WritePlan(
+        update_expression=update_expr,
+        condition_expression=" AND ".join(condition_parts),
+        names=attr_names,
+        values={},
+        limits=tuple(limits),
+    )
+
+
+def _build_retry(names: tuple[str, ...]) -> WritePlan:
+    add_parts: list[str] = []
+    condition_parts: list[str] = []
+    attr_names: dict[str, str] = {}
+    limits: list[tuple[str, tuple[str, ...]]] = []
+
+    for name in names:
+        tk_alias = f"#b_{name}_tk"
+        tc_alias = f"#b_{name}_tc"
+        tk_neg_val = f":b_{name}_tk_neg"
+        tc_val = f":b_{name}_tc_delta"
+        tk_threshold = f":b_{name}_tk_min"
+        _bucket_names(attr_names, name, tk_alias, tc_alias)
+        add_parts.append(f"{tk_alias} {tk_neg_val}")
+        add_parts.append(f"{tc_alias} {tc_val}")
+        condition_parts.append(f"{tk_alias} >= {tk_threshold}")
+        limits.append((name, (tk_neg_val, tc_val, tk_threshold)))
+
+    return WritePlan(
+        update_expression=f"ADD {', '.join(add_parts)}",
+        condition_expression=" AND ".join(condition_parts),
+        names=attr_names,
+        values={},
+        limits=tuple(limits),
+    )
+
+
+def _build_adjust(names: tuple[str, ...], require_exists: bool) -> WritePlan:
+    add_parts: list[str] = []
+    attr_names: dict[str, str] = {}
+    limits: list[tuple[str, tuple[str, ...]]] = []
+
+    for name in names:
+        tk_alias = f"#b_{name}_tk"
+        tc_alias = f"#b_{name}_tc"
+        tk_val = f":b_{name}_tk_delta"
+        tc_val = f":b_{name}_tc_delta"
+        _bucket_names(attr_names, name, tk_alias, tc_alias)
+        add_parts.append(f"{tk_alias} {tk_val}")
+        add_parts.append(f"{tc_alias} {tc_val}")
+        limits.append((name, (tk_val, tc_val)))
+
+    return WritePlan(
+        update_expression=f"ADD {', '.join(add_parts)}",
+        condition_expression="attribute_exists(PK)" if require_exists else None,
+        names=attr_names,
+        values={},
+        limits=tuple(limits),
+    )
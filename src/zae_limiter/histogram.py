@@ -0,0 +1,343 @@
+"""In-process latency histograms with percentile export.
+
+``RateLimiter(latency_histograms=True)`` records the latency of every
+acquire, commit, adjustment commit and rollback, and of every DynamoDB call
+by operation, into log-linear (HDR-style) histograms. Read them with
+``RateLimiter.get_latency_histograms()``, which returns a
+``HistogramSnapshot`` that can be exported as a dict of percentiles
+(``as_dict()``), as Prometheus text (``to_prometheus()``), or serialized
+(``to_dict()``/``from_dict()``) and merged with snapshots from other
+processes (``merge()``).
+
+Each histogram has a fixed number of buckets: 32 per power of two of
+microseconds, up to about 134 seconds (longer values are clamped), so
+percentiles are accurate to within about 3% and memory does not grow with
+the number of recorded values.
+
+Recording takes no lock. Each OS thread records into its own shard, and
+snapshots merge all shards. Shards are keyed by the native thread ID, so
+gevent greenlets (as used by Locust) on one thread share a shard.
+
+This module is shared by the async ``RateLimiter`` and the generated
+``SyncRateLimiter``.
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+from .instrumentation import AcquirePath, AcquirePhase, AcquireTrace, InstrumentationListener
+
+_SUB_BUCKET_BITS = 5
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+# Largest recordable value in microseconds (~134 s); larger values are clamped
+_MAX_MICROS = (1 << 27) - 1
+
+# Percentiles exported by as_dict() and to_prometheus()
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+def _bucket_index(micros: int) -> int:
+    """Bucket of a value: exact below 32 us, then 32 buckets per power of two."""
+    if micros < _SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - 1 - _SUB_BUCKET_BITS
+    return ((shift + 1) << _SUB_BUCKET_BITS) + (micros >> shift) - _SUB_BUCKETS
+
+
+def _bucket_upper(index: int) -> int:
+    """Largest value in microseconds that falls into bucket ``index``."""
+    if index < _SUB_BUCKETS:
+        return index
+    shift = (index >> _SUB_BUCKET_BITS) - 1
+    low = ((index & (_SUB_BUCKETS - 1)) + _SUB_BUCKETS) << shift
+    return low + (1 << shift) - 1
+
+
+_BUCKETS = _bucket_index(_MAX_MICROS) + 1
+
+
+def _percentile_label(percentile: float) -> str:
+    """Key for a percentile: 50.0 -> "p50", 99.9 -> "p999"."""
+    return "p" + f"{percentile:g}".replace(".", "")
+
+
+class LatencyHistogram:
+    """Fixed-size log-linear histogram of durations.
+
+    Not thread-safe: each instance must have a single writer. Use
+    ``merge()`` to combine histograms recorded by different threads or
+    processes.
+    """
+
+    __slots__ = ("counts", "count", "total_s", "max_s")
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record one duration in seconds."""
+        micros = int(seconds * 1_000_000)
+        if micros < 0:
+            micros = 0
+        elif micros > _MAX_MICROS:
+            micros = _MAX_MICROS
+        self.counts[_bucket_index(micros)] += 1
+        self.count += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the values of ``other`` to this histogram."""
+        counts = self.counts
+        for index, value in enumerate(other.counts):
+            if value:
+                counts[index] += value
+        self.count += other.count
+        self.total_s += other.total_s
+        if other.max_s > self.max_s:
+            self.max_s = other.max_s
+
+    def clear(self) -> None:
+        """Remove all values."""
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def copy(self) -> "LatencyHistogram":
+        """Return an independent copy."""
+        result = LatencyHistogram()
+        result.merge(self)
+        return result
+
+    @property
+    def mean_s(self) -> float:
+        """Mean duration in seconds (0.0 if empty)."""
+        return self.total_s / self.count if self.count else 0.0
+
+    def value_at(self, percentile: float) -> float:
+        """Duration in seconds at ``percentile`` (0-100), or 0.0 if empty.
+
+        Returns the upper end of the bucket that holds the value, capped at
+        the largest recorded duration.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank:
+                return min(_bucket_upper(index) / 1_000_000, self.max_s)
+        return self.max_s
+
+    def summary(self) -> dict[str, float]:
+        """Return count, mean, max and exported percentiles in seconds."""
+        result: dict[str, float] = {
+            "count": self.count,
+            "mean_s": self.mean_s,
+            "max_s": self.max_s,
+        }
+        for percentile in PERCENTILES:
+            result[_percentile_label(percentile) + "_s"] = self.value_at(percentile)
+        return result
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict (non-empty buckets only)."""
+        return {
+            "count": self.count,
+            "total_s": self.total_s,
+            "max_s": self.max_s,
+            "buckets": {str(i): value for i, value in enumerate(self.counts) if value},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LatencyHistogram":
+        """Deserialize a dict produced by ``to_dict()``."""
+        result = cls()
+        for index, value in data.get("buckets", {}).items():
+            result.counts[int(index)] = int(value)
+        result.count = int(data.get("count", 0))
+        result.total_s = float(data.get("total_s", 0.0))
+        result.max_s = float(data.get("max_s", 0.0))
+        return result
+
+
+def _merge_into(target: dict[str, LatencyHistogram], source: dict[str, LatencyHistogram]) -> None:
+    for name, histogram in source.items():
+        existing = target.get(name)
+        if existing is None:
+            target[name] = histogram.copy()
+        else:
+            existing.merge(histogram)
+
+
+@dataclass
+class HistogramSnapshot:
+    """Merged latency histograms at one point in time.
+
+    Attributes:
+        operations: Histograms by rate limiter operation (``"acquire"``,
+            ``"commit"``, ``"adjust"``, ``"rollback"``)
+        dynamodb_calls: Histograms by DynamoDB operation name
+    """
+
+    operations: dict[str, LatencyHistogram] = field(default_factory=dict)
+    dynamodb_calls: dict[str, LatencyHistogram] = field(default_factory=dict)
+
+    def merge(self, other: "HistogramSnapshot") -> None:
+        """Add the values of ``other`` (e.g. from another process) to this snapshot."""
+        _merge_into(self.operations, other.operations)
+        _merge_into(self.dynamodb_calls, other.dynamodb_calls)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return count, mean, max and p50/p90/p99/p999 per histogram, in seconds."""
+        return {
+            "operations": {name: h.summary() for name, h in sorted(self.operations.items())},
+            "dynamodb_calls": {
+                name: h.summary() for name, h in sorted(self.dynamodb_calls.items())
+            },
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a JSON-compatible dict (see ``from_dict()``)."""
+        return {
+            "operations": {name: h.to_dict() for name, h in self.operations.items()},
+            "dynamodb_calls": {name: h.to_dict() for name, h in self.dynamodb_calls.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "HistogramSnapshot":
+        """Deserialize a dict produced by ``to_dict()``."""
+        return cls(
+            operations={
+                name: LatencyHistogram.from_dict(h)
+                for name, h in data.get("operations", {}).items()
+            },
+            dynamodb_calls={
+                name: LatencyHistogram.from_dict(h)
+                for name, h in data.get("dynamodb_calls", {}).items()
+            },
+        )
+
+    def to_prometheus(self, prefix: str = "zae_limiter") -> str:
+        """Render as Prometheus text exposition format (one summary per family)."""
+        lines: list[str] = []
+        families = (
+            (
+                f"{prefix}_operation_latency_seconds",
+                "Latency of rate limiter operations.",
+                "operation",
+                self.operations,
+            ),
+            (
+                f"{prefix}_dynamodb_call_latency_seconds",
+                "Latency of DynamoDB calls.",
+                "operation",
+                self.dynamodb_calls,
+            ),
+        )
+        for metric, help_text, label, histograms in families:
+            if not histograms:
+                continue
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for name, histogram in sorted(histograms.items()):
+                for percentile in PERCENTILES:
+                    lines.append(
+                        f'{metric}{{{label}="{name}",quantile="{percentile / 100:g}"}} '
+                        f"{histogram.value_at(percentile):.6f}"
+                    )
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {histogram.total_s:.6f}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {histogram.count}')
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+# Acquire phases recorded as operations (the initial commit only on the slow path,
+# where it writes; on other paths it is a no-op)
+_PHASE_OPERATIONS = {
+    AcquirePhase.COMMIT_INITIAL: "commit",
+    AcquirePhase.COMMIT_ADJUSTMENTS: "adjust",
+    AcquirePhase.ROLLBACK: "rollback",
+}
+
+
+class _Shard:
+    """Histograms written by one thread."""
+
+    __slots__ = ("operations", "dynamodb_calls")
+
+    def __init__(self) -> None:
+        self.operations: dict[str, LatencyHistogram] = {}
+        self.dynamodb_calls: dict[str, LatencyHistogram] = {}
+
+
+class LatencyHistograms(InstrumentationListener):
+    """Listener that records acquire and DynamoDB call latencies into histograms.
+
+    Installed by ``RateLimiter(latency_histograms=True)``; it can also be
+    passed in ``listeners`` directly, e.g. to share one set of histograms
+    between limiters.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._shards: dict[int, _Shard] = {}
+
+    def _shard(self) -> _Shard:
+        shard = self._shards.get(threading.get_native_id())
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(threading.get_native_id(), _Shard())
+        return shard
+
+    @staticmethod
+    def _record(histograms: dict[str, LatencyHistogram], name: str, seconds: float) -> None:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        operations = self._shard().operations
+        self._record(operations, "acquire", trace.acquire_s)
+        for phase, _, duration in trace.phases:
+            name = _PHASE_OPERATIONS.get(phase)
+            if name is None:
+                continue
+            if phase is AcquirePhase.COMMIT_INITIAL and trace.path is not AcquirePath.SLOW:
+                continue
+            self._record(operations, name, duration)
+
+    def on_dynamodb_call(self, operation: str, duration_s: float, error: str | None) -> None:
+        self._record(self._shard().dynamodb_calls, operation, duration_s)
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Merge all threads' histograms into a new snapshot.
+
+        Values recorded while the snapshot is taken may or may not be included.
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+        result = HistogramSnapshot()
+        for shard in shards:
+            _merge_into(result.operations, dict(shard.operations))
+            _merge_into(result.dynamodb_calls, dict(shard.dynamodb_calls))
+        return result
+
+    def reset(self) -> None:
+        """Clear all histograms.
+
+        Values recorded concurrently with the reset may survive it.
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            for histogram in (*shard.operations.values(), *shard.dynamodb_calls.values()):
+                histogram.clear()
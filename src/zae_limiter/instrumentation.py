@@ -0,0 +1,457 @@
+"""Hot-path instrumentation for acquire() and DynamoDB calls.
+
+``RateLimiter.acquire()`` runs several phases (on_unavailable resolution,
+fast path, slow path, initial commit, adjustment commit), and the fast path
+may itself issue speculative writes, shard retries and compensating writes.
+Listeners passed to ``RateLimiter(listeners=[...])`` receive one
+``AcquireTrace`` per acquire with the duration of every phase, the path that
+decided the request, and its retry counts. Listeners added to a
+``Repository`` with ``add_listener()`` also receive the duration of every
+DynamoDB call, measured with botocore's ``before-call``/``after-call`` events.
+
+With no listeners, acquire() does not build a trace; the remaining cost is
+one ``ContextVar`` lookup at each nested phase.
+
+Two adapters are provided: ``InMemoryAggregator`` (counters and phase
+timings, read with ``get_stats()``) and ``SpanEmitter`` (one span per
+acquire and per DynamoDB call, for an OpenTelemetry-compatible tracer).
+
+This module is shared by the async ``RateLimiter``/``Repository`` and the
+generated ``SyncRateLimiter``/``SyncRepository``; ``InMemoryAggregator``
+state is guarded by a ``threading.Lock``.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class AcquirePhase(Enum):
+    """Timed phases of an acquire.
+
+    Top-level phases run one after another; nested phases are timed inside
+    the top-level phase that issues them (fast path or slow path).
+    """
+
+    # Top-level
+    ON_UNAVAILABLE = "on_unavailable"
+    FAST_PATH = "fast_path"
+    SLOW_PATH = "slow_path"
+    COMMIT_INITIAL = "commit_initial"
+    HOLD = "hold"
+    COMMIT_ADJUSTMENTS = "commit_adjustments"
+    ROLLBACK = "rollback"
+    # Nested
+    SPECULATIVE_WRITE = "speculative_write"
+    SHARD_RETRY = "shard_retry"
+    COMPENSATION = "compensation"
+    RESOLVE_LIMITS = "resolve_limits"
+
+
+class AcquirePath(Enum):
+    """Path that granted or rejected an acquire."""
+
+    RESERVED = "reserved"
+    LOCAL_REJECT = "local_reject"
+    SPECULATIVE = "speculative"
+    SHARD_RETRY = "shard_retry"
+    FAST_REJECT = "fast_reject"
+    SLOW = "slow"
+    UNAVAILABLE = "unavailable"
+
+
+class AcquireOutcome(Enum):
+    """How an acquire ended."""
+
+    GRANTED = "granted"
+    REJECTED = "rejected"
+    ERROR = "error"
+
+
+_current_trace: ContextVar["AcquireTrace | None"] = ContextVar(
+    "zae_limiter_acquire_trace", default=None
+)
+
+
+def current_trace() -> "AcquireTrace | None":
+    """The trace of the acquire running in this context, if instrumented."""
+    return _current_trace.get()
+
+
+@dataclass(slots=True)
+class AcquireTrace:
+    """Timings and decisions of one acquire.
+
+    Creating a trace makes it the current trace (see ``current_trace()``)
+    until the lease is yielded or the acquire fails, so nested phases can
+    record into it without threading it through every call.
+
+    Attributes:
+        entity_id: Entity the acquire was for
+        resource: Resource name
+        started_ns: Wall-clock start time in epoch nanoseconds
+        path: Path that decided the request (None if it failed first)
+        outcome: How the acquire ended (set when the trace is closed)
+        phases: ``(phase, offset_s, duration_s)`` in completion order, where
+            offset_s is the phase start relative to the acquire start
+        shard_retries: Speculative writes retried on another shard
+        commit_retries: Initial-commit retries (transaction conflicts and
+            lost optimistic locks)
+        compensations: Compensating writes that returned speculatively
+            consumed tokens
+        acquire_s: Time until the lease was yielded, or until rejection
+        duration_s: Total time including the context body and exit commit
+    """
+
+    entity_id: str
+    resource: str
+    started_ns: int = field(default_factory=time.time_ns)
+    path: AcquirePath | None = None
+    outcome: AcquireOutcome | None = None
+    phases: list[tuple[AcquirePhase, float, float]] = field(default_factory=list)
+    shard_retries: int = 0
+    commit_retries: int = 0
+    compensations: int = 0
+    acquire_s: float = 0.0
+    duration_s: float = 0.0
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+    _phase: AcquirePhase = field(default=AcquirePhase.ON_UNAVAILABLE, repr=False)
+    _phase_start: float = field(default=0.0, repr=False)
+    _token: "Token[AcquireTrace | None] | None" = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self._phase_start = self._start
+        self._token = _current_trace.set(self)
+
+    def enter(self, phase: AcquirePhase) -> None:
+        """End the current top-level phase and start ``phase``."""
+        now = time.perf_counter()
+        self.phases.append((self._phase, self._phase_start - self._start, now - self._phase_start))
+        self._phase = phase
+        self._phase_start = now
+
+    def record(self, phase: AcquirePhase, started: float) -> None:
+        """Record a nested phase that began at ``started`` (``time.perf_counter()``)."""
+        self.phases.append((phase, started - self._start, time.perf_counter() - started))
+
+    def acquired(self) -> None:
+        """Mark the lease as yielded: start the hold phase and stop being current."""
+        self.enter(AcquirePhase.HOLD)
+        self.acquire_s = self._phase_start - self._start
+        self._detach()
+
+    def close(self, outcome: AcquireOutcome) -> None:
+        """End the current phase and record the outcome."""
+        self.enter(self._phase)
+        self.outcome = outcome
+        self.duration_s = self._phase_start - self._start
+        if self._token is not None:  # never yielded
+            self.acquire_s = self.duration_s
+        self._detach()
+
+    def phase_totals(self) -> dict[str, float]:
+        """Total seconds per phase name (a phase may run more than once)."""
+        totals: dict[str, float] = {}
+        for phase, _, duration in self.phases:
+            totals[phase.value] = totals.get(phase.value, 0.0) + duration
+        return totals
+
+    def _detach(self) -> None:
+        if self._token is not None:
+            _current_trace.reset(self._token)
+            self._token = None
+
+
+class InstrumentationListener(Protocol):
+    """Receives acquire traces and DynamoDB call timings.
+
+    Listeners are called synchronously on the hot path and should return
+    quickly. Exceptions raised by a listener are logged and ignored.
+    Subclass to inherit no-op defaults for events you do not need.
+    """
+
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        """Called once per acquire, after the lease is released or the acquire fails."""
+
+    def on_dynamodb_call(self, operation: str, duration_s: float, error: str | None) -> None:
+        """Called after every DynamoDB call.
+
+        Args:
+            operation: API operation name (e.g. ``"UpdateItem"``)
+            duration_s: Time from sending the request to parsing the response
+            error: Error code of a failed call (e.g.
+                ``"ConditionalCheckFailedException"``), or the exception class
+                name if no response was received; None on success
+        """
+
+
+def emit_acquire(listeners: Sequence[InstrumentationListener], trace: AcquireTrace) -> None:
+    """Send a closed trace to every listener."""
+    for listener in listeners:
+        try:
+            listener.on_acquire(trace)
+        except Exception:
+            logger.exception("Instrumentation listener %r failed in on_acquire", listener)
+
+
+def emit_dynamodb_call(
+    listeners: Sequence[InstrumentationListener],
+    operation: str,
+    duration_s: float,
+    error: str | None,
+) -> None:
+    """Send a DynamoDB call timing to every listener."""
+    for listener in listeners:
+        try:
+            listener.on_dynamodb_call(operation, duration_s, error)
+        except Exception:
+            logger.exception("Instrumentation listener %r failed in on_dynamodb_call", listener)
+
+
+_CALL_CONTEXT_KEY = "zae_limiter_call"
+
+
+def register_call_hooks(client: Any, listeners: Sequence[InstrumentationListener]) -> None:
+    """Time every call of a botocore/aiobotocore DynamoDB client.
+
+    ``listeners`` is read on each call, so listeners appended later are
+    notified too. Registering twice on the same client has no effect.
+    """
+
+    def before_call(model: Any, context: dict[str, Any], **kwargs: Any) -> None:
+        context[_CALL_CONTEXT_KEY] = (model.name, time.perf_counter())
+
+    def after_call(
+        http_response: Any, parsed: dict[str, Any], context: dict[str, Any], **kwargs: Any
+    ) -> None:
+        call = context.pop(_CALL_CONTEXT_KEY, None)
+        if call is None:
+            return
+        error = None
+        if http_response.status_code >= 300:
+            error = parsed.get("Error", {}).get("Code") or str(http_response.status_code)
+        emit_dynamodb_call(listeners, call[0], time.perf_counter() - call[1], error)
+
+    def after_call_error(exception: BaseException, context: dict[str, Any], **kwargs: Any) -> None:
+        call = context.pop(_CALL_CONTEXT_KEY, None)
+        if call is None:
+            return
+        emit_dynamodb_call(
+            listeners, call[0], time.perf_counter() - call[1], type(exception).__name__
+        )
+
+    events = client.meta.events
+    events.register("before-call.dynamodb", before_call, unique_id=f"{__name__}.before-call")
+    events.register("after-call.dynamodb", after_call, unique_id=f"{__name__}.after-call")
+    events.register(
+        "after-call-error.dynamodb", after_call_error, unique_id=f"{__name__}.after-call-error"
+    )
+
+
+@dataclass
+class TimingStats:
+    """Count and duration totals of one phase or DynamoDB operation.
+
+    Attributes:
+        count: Number of timed runs
+        total_s: Sum of durations in seconds
+        max_s: Longest duration in seconds
+        errors: Failed runs (DynamoDB calls only)
+    """
+
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+    errors: int = 0
+
+    @property
+    def mean_s(self) -> float:
+        """Mean duration in seconds (0.0 if never run)."""
+        return self.total_s / self.count if self.count else 0.0
+
+    def add(self, duration_s: float) -> None:
+        self.count += 1
+        self.total_s += duration_s
+        if duration_s > self.max_s:
+            self.max_s = duration_s
+
+    def as_dict(self) -> dict[str, float]:
+        """Return stats as a dictionary."""
+        return {
+            "count": self.count,
+            "total_s": self.total_s,
+            "mean_s": self.mean_s,
+            "max_s": self.max_s,
+            "errors": self.errors,
+        }
+
+
+@dataclass
+class InstrumentationStats:
+    """Aggregated acquire and DynamoDB call statistics.
+
+    Attributes:
+        acquires: Acquires traced
+        outcomes: Acquires by ``AcquireOutcome`` value
+        paths: Acquires by ``AcquirePath`` value
+        shard_retries: Speculative writes retried on another shard
+        commit_retries: Initial-commit retries
+        compensations: Compensating writes
+        acquire: Time until the lease was yielded or the acquire was rejected
+        phases: Timings by ``AcquirePhase`` value
+        dynamodb_calls: Timings by DynamoDB operation name
+    """
+
+    acquires: int = 0
+    outcomes: dict[str, int] = field(default_factory=dict)
+    paths: dict[str, int] = field(default_factory=dict)
+    shard_retries: int = 0
+    commit_retries: int = 0
+    compensations: int = 0
+    acquire: TimingStats = field(default_factory=TimingStats)
+    phases: dict[str, TimingStats] = field(default_factory=dict)
+    dynamodb_calls: dict[str, TimingStats] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return stats as a dictionary."""
+        return {
+            "acquires": self.acquires,
+            "outcomes": dict(self.outcomes),
+            "paths": dict(self.paths),
+            "shard_retries": self.shard_retries,
+            "commit_retries": self.commit_retries,
+            "compensations": self.compensations,
+            "acquire": self.acquire.as_dict(),
+            "phases": {name: stats.as_dict() for name, stats in self.phases.items()},
+            "dynamodb_calls": {
+                name: stats.as_dict() for name, stats in self.dynamodb_calls.items()
+            },
+        }
+
+
+class InMemoryAggregator(InstrumentationListener):
+    """Listener that accumulates counters and timings in memory.
+
+    Example:
+        stats = InMemoryAggregator()
+        limiter = RateLimiter(repository=repo, listeners=[stats])
+        ...
+        print(stats.get_stats().as_dict()["phases"])
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = InstrumentationStats()
+
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        with self._lock:
+            stats = self._stats
+            stats.acquires += 1
+            if trace.outcome is not None:
+                key = trace.outcome.value
+                stats.outcomes[key] = stats.outcomes.get(key, 0) + 1
+            if trace.path is not None:
+                key = trace.path.value
+                stats.paths[key] = stats.paths.get(key, 0) + 1
+            stats.shard_retries += trace.shard_retries
+            stats.commit_retries += trace.commit_retries
+            stats.compensations += trace.compensations
+            stats.acquire.add(trace.acquire_s)
+            for phase, _, duration in trace.phases:
+                timing = stats.phases.get(phase.value)
+                if timing is None:
+                    timing = stats.phases[phase.value] = TimingStats()
+                timing.add(duration)
+
+    def on_dynamodb_call(self, operation: str, duration_s: float, error: str | None) -> None:
+        with self._lock:
+            timing = self._stats.dynamodb_calls.get(operation)
+            if timing is None:
+                timing = self._stats.dynamodb_calls[operation] = TimingStats()
+            timing.add(duration_s)
+            if error is not None:
+                timing.errors += 1
+
+    def get_stats(self) -> InstrumentationStats:
+        """Return a copy of the aggregated statistics."""
+        with self._lock:
+            stats = self._stats
+            return InstrumentationStats(
+                acquires=stats.acquires,
+                outcomes=dict(stats.outcomes),
+                paths=dict(stats.paths),
+                shard_retries=stats.shard_retries,
+                commit_retries=stats.commit_retries,
+                compensations=stats.compensations,
+                acquire=TimingStats(**vars(stats.acquire)),
+                phases={k: TimingStats(**vars(v)) for k, v in stats.phases.items()},
+                dynamodb_calls={k: TimingStats(**vars(v)) for k, v in stats.dynamodb_calls.items()},
+            )
+
+    def reset(self) -> None:
+        """Clear all statistics."""
+        with self._lock:
+            self._stats = InstrumentationStats()
+
+
+class SpanEmitter(InstrumentationListener):
+    """Listener that records spans on an OpenTelemetry-compatible tracer.
+
+    Emits a ``zae_limiter.acquire`` span per acquire, with the path, outcome
+    and retry counts as attributes and one span event per phase, and a
+    ``DynamoDB.<operation>`` span per DynamoDB call. Spans are created after
+    the fact with explicit start and end times, so they are not parents of
+    spans created during the acquire.
+
+    ``tracer`` is used through ``start_span(name, start_time=..., attributes=...)``,
+    ``span.add_event(name, attributes=..., timestamp=...)`` and
+    ``span.end(end_time=...)``, as provided by
+    ``opentelemetry.trace.get_tracer(...)``; opentelemetry itself is not
+    imported.
+    """
+
+    def __init__(self, tracer: Any) -> None:
+        self._tracer = tracer
+
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        attributes: dict[str, Any] = {
+            "zae_limiter.entity_id": trace.entity_id,
+            "zae_limiter.resource": trace.resource,
+            "zae_limiter.shard_retries": trace.shard_retries,
+            "zae_limiter.commit_retries": trace.commit_retries,
+            "zae_limiter.compensations": trace.compensations,
+            "zae_limiter.acquire_ms": trace.acquire_s * 1000,
+        }
+        if trace.path is not None:
+            attributes["zae_limiter.path"] = trace.path.value
+        if trace.outcome is not None:
+            attributes["zae_limiter.outcome"] = trace.outcome.value
+        span = self._tracer.start_span(
+            "zae_limiter.acquire", start_time=trace.started_ns, attributes=attributes
+        )
+        for phase, offset, duration in trace.phases:
+            span.add_event(
+                phase.value,
+                attributes={"duration_ms": duration * 1000},
+                timestamp=trace.started_ns + int(offset * 1e9),
+            )
+        span.end(end_time=trace.started_ns + int(trace.duration_s * 1e9))
+
+    def on_dynamodb_call(self, operation: str, duration_s: float, error: str | None) -> None:
+        end_ns = time.time_ns()
+        attributes = {"db.system": "dynamodb", "db.operation": operation}
+        if error is not None:
+            attributes["error.type"] = error
+        span = self._tracer.start_span(
+            f"DynamoDB.{operation}",
+            start_time=end_ns - int(duration_s * 1e9),
+            attributes=attributes,
+        )
+        span.end(end_time=end_ns)
@@ -0,0 +1,200 @@
+"""Consumed-capacity accounting for DynamoDB calls.
+
+When enabled on a ``Repository`` (``enable_io_stats()`` or the builder's
+``io_stats()``), every call that supports it is sent with
+``ReturnConsumedCapacity="INDEXES"`` and the capacity DynamoDB reports is
+accumulated per API operation and per table or index. Read the totals with
+``Repository.get_io_stats()``.
+
+Parameters and responses are handled with botocore's
+``provide-client-params`` and ``after-call`` events, so every call made
+through the repository's client is covered, including calls added later.
+
+DynamoDB does not report consumed capacity for failed calls (for example a
+``ConditionalCheckFailedException``), even though a failed conditional write
+is billed. Such calls are counted in ``errors``; their capacity is not.
+
+This module is shared by the async ``Repository`` and the generated
+``SyncRepository``; counters are guarded by a ``threading.Lock``.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+# Operations that accept ReturnConsumedCapacity
+_CAPACITY_OPERATIONS = (
+    "GetItem",
+    "PutItem",
+    "UpdateItem",
+    "DeleteItem",
+    "Query",
+    "Scan",
+    "BatchGetItem",
+    "BatchWriteItem",
+    "TransactGetItems",
+    "TransactWriteItems",
+)
+
+# Operations whose unlabeled CapacityUnits are read units
+_READ_OPERATIONS = frozenset({"GetItem", "Query", "Scan", "BatchGetItem", "TransactGetItems"})
+
+# Key under which base-table capacity is reported in IOStats.indexes
+TABLE = "table"
+
+
+@dataclass
+class CapacityStats:
+    """Consumed capacity of one API operation or one table/index.
+
+    Attributes:
+        calls: Calls made (per operation) or calls that touched this
+            table/index (per index)
+        errors: Failed calls, whose capacity DynamoDB does not report
+            (per operation only)
+        read_units: Read capacity units consumed
+        write_units: Write capacity units consumed
+    """
+
+    calls: int = 0
+    errors: int = 0
+    read_units: float = 0.0
+    write_units: float = 0.0
+
+    @property
+    def capacity_units(self) -> float:
+        """Read and write units combined."""
+        return self.read_units + self.write_units
+
+    def add(self, capacity: dict[str, Any], is_read: bool) -> None:
+        """Add one ``ConsumedCapacity`` (or per-index) entry."""
+        read = capacity.get("ReadCapacityUnits")
+        write = capacity.get("WriteCapacityUnits")
+        if read is None and write is None:
+            # On-demand tables report only the combined CapacityUnits
+            units = float(capacity.get("CapacityUnits", 0.0))
+            if is_read:
+                self.read_units += units
+            else:
+                self.write_units += units
+            return
+        self.read_units += float(read or 0.0)
+        self.write_units += float(write or 0.0)
+
+    def as_dict(self) -> dict[str, float]:
+        """Return stats as a dictionary."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "read_units": self.read_units,
+            "write_units": self.write_units,
+            "capacity_units": self.capacity_units,
+        }
+
+
+@dataclass
+class IOStats:
+    """Consumed DynamoDB capacity since the stats were enabled or reset.
+
+    Attributes:
+        operations: Capacity by API operation name (e.g. ``"UpdateItem"``)
+        indexes: Capacity by table/index: ``"table"`` for the base table,
+            otherwise the index name (e.g. ``"GSI2"``)
+    """
+
+    operations: dict[str, CapacityStats] = field(default_factory=dict)
+    indexes: dict[str, CapacityStats] = field(default_factory=dict)
+
+    @property
+    def read_units(self) -> float:
+        """Total read capacity units across all operations."""
+        return sum(stats.read_units for stats in self.operations.values())
+
+    @property
+    def write_units(self) -> float:
+        """Total write capacity units across all operations."""
+        return sum(stats.write_units for stats in self.operations.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return stats as a dictionary."""
+        return {
+            "read_units": self.read_units,
+            "write_units": self.write_units,
+            "operations": {name: stats.as_dict() for name, stats in self.operations.items()},
+            "indexes": {name: stats.as_dict() for name, stats in self.indexes.items()},
+        }
+
+
+class IOStatsCollector:
+    """Thread-safe accumulator of consumed capacity."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats = IOStats()
+
+    def record(self, operation: str, parsed: dict[str, Any], failed: bool) -> None:
+        """Record one call from its parsed response."""
+        consumed = parsed.get("ConsumedCapacity")
+        # Batch and transact calls report a list (one entry per table)
+        entries = consumed if isinstance(consumed, list) else [consumed] if consumed else []
+        is_read = operation in _READ_OPERATIONS
+        with self._lock:
+            op_stats = self._stats.operations.get(operation)
+            if op_stats is None:
+                op_stats = self._stats.operations[operation] = CapacityStats()
+            op_stats.calls += 1
+            if failed:
+                op_stats.errors += 1
+            for entry in entries:
+                op_stats.add(entry, is_read)
+                table = entry.get("Table")
+                if table is not None:
+                    self._index(TABLE).add(table, is_read)
+                for key in ("GlobalSecondaryIndexes", "LocalSecondaryIndexes"):
+                    for name, capacity in entry.get(key, {}).items():
+                        self._index(name).add(capacity, is_read)
+
+    def _index(self, name: str) -> CapacityStats:
+        # Caller holds the lock
+        stats = self._stats.indexes.get(name)
+        if stats is None:
+            stats = self._stats.indexes[name] = CapacityStats()
+        stats.calls += 1
+        return stats
+
+    def get_stats(self) -> IOStats:
+        """Return a copy of the accumulated statistics."""
+        with self._lock:
+            return IOStats(
+                operations={k: CapacityStats(**vars(v)) for k, v in self._stats.operations.items()},
+                indexes={k: CapacityStats(**vars(v)) for k, v in self._stats.indexes.items()},
+            )
+
+    def reset(self) -> None:
+        """Clear all statistics."""
+        with self._lock:
+            self._stats = IOStats()
+
+
+def register_capacity_hooks(client: Any, collector: IOStatsCollector) -> None:
+    """Request and record consumed capacity on a botocore/aiobotocore DynamoDB client.
+
+    Registering twice on the same client has no effect. An explicit
+    ``ReturnConsumedCapacity`` passed by the caller is left unchanged.
+    """
+
+    def provide_params(params: dict[str, Any], **kwargs: Any) -> None:
+        params.setdefault("ReturnConsumedCapacity", "INDEXES")
+
+    def after_call(http_response: Any, parsed: dict[str, Any], model: Any, **kwargs: Any) -> None:
+        if model.name in _CAPACITY_OPERATIONS:
+            collector.record(model.name, parsed, http_response.status_code >= 300)
+
+    events = client.meta.events
+    for operation in _CAPACITY_OPERATIONS:
+        events.register(
+            f"provide-client-params.dynamodb.{operation}",
+            provide_params,
+            unique_id=f"{__name__}.provide-client-params.{operation}",
+        )
+    events.register("after-call.dynamodb", after_call, unique_id=f"{__name__}.after-call")
@@ -2,10 +2,12 @@
 
 import asyncio
 import logging
+import random
 import time
 import warnings
-from collections.abc import AsyncIterator
+from collections.abc import AsyncIterator, Sequence
 from contextlib import asynccontextmanager
+from dataclasses import replace
 from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, Any, Literal
@@ -17,16 +19,29 @@ from .bucket import (
     build_limit_status,
     calculate_available,
     calculate_time_until_available,
-    try_consume,
+    try_consume_many,
     would_refill_satisfy,
 )
+from .bucket_array import available_tokens
+from .coalescer import CoalescingConfig, CoalescingStats, SpeculativeCoalescer
 from .config_cache import ConfigSource
 from .exceptions import (
     RateLimiterUnavailable,
     RateLimitExceeded,
     ValidationError,
 )
+from .histogram import HistogramSnapshot, LatencyHistograms
+from .instrumentation import (
+    AcquireOutcome,
+    AcquirePath,
+    AcquirePhase,
+    AcquireTrace,
+    InstrumentationListener,
+    current_trace,
+    emit_acquire,
+)
 from .lease import Lease, LeaseEntry
+from .local_rejection import BucketMirror, LocalRejectionConfig, LocalRejectionStats
 from .models import (
     AuditEvent,
     BucketState,
@@ -34,7 +49,6 @@ from .models import (
     EntityCapacity,
     Limit,
     LimiterInfo,
-    LimitStatus,
     OnUnavailableAction,
     ResourceCapacity,
     StackOptions,
@@ -45,7 +59,21 @@ from .models import (
 )
 from .repository import Repository
 from .repository_protocol import SpeculativeFailureReason
+from .reservation import (
+    ReservationBlock,
+    ReservationConfig,
+    ReservationPool,
+    ReservationStats,
+    ReservedBucket,
+)
 from .schema import DEFAULT_RESOURCE
+from .speculative_policy import (
+    SpeculativeBucketStats,
+    SpeculativePolicy,
+    SpeculativePolicyConfig,
+    SpeculativePolicyStats,
+)
+from .write_behind import WriteBehindBuffer, WriteBehindConfig, WriteBehindStats
 
 _UNSET: Any = object()  # sentinel for detecting explicitly-passed deprecated params
 
@@ -103,6 +131,14 @@ class RateLimiter:
         bucket_ttl_refill_multiplier: "int | Any" = _UNSET,
         # Business logic config (not deprecated)
         speculative_writes: bool = True,
+        reservation: ReservationConfig | None = None,
+        local_rejection: LocalRejectionConfig | None = None,
+        coalescing: CoalescingConfig | None = None,
+        write_behind: WriteBehindConfig | None = None,
+        speculative_policy: SpeculativePolicyConfig | None = None,
+        transactional_commit: bool = True,
+        listeners: Sequence[InstrumentationListener] | None = None,
+        latency_histograms: bool = False,
     ) -> None:
         """
         Initialize the rate limiter.
@@ -123,6 +159,48 @@ class RateLimiter:
             speculative_writes: Enable speculative UpdateItem fast path.
                 When True, acquire() tries a speculative write first, falling
                 back to the full read-write path only when needed.
+            reservation: Enable client-side token reservation blocks for hot
+                (entity, resource) keys. When set, acquire() reserves a block of
+                tokens in one write once a key's request rate is high enough and
+                serves later acquires from it locally. Unused tokens are returned
+                when the block expires or on close(). None (default) disables it.
+            local_rejection: Enable predictive local rejection. When set, the
+                bucket state returned by each speculative write is mirrored
+                in-process, and acquire() rejects requests that the mirrored
+                state (refilled to now) cannot satisfy without calling DynamoDB.
+                None (default) disables it.
+            coalescing: Enable request coalescing for the speculative path.
+                When set, concurrent acquires for the same (entity, resource)
+                are merged into a single UpdateItem with summed amounts.
+                None (default) disables it.
+            write_behind: Enable write-behind buffering of ``Lease.adjust()``
+                deltas. When set, adjustments made inside acquire() are summed
+                per bucket in-process and written in the background, one
+                update per bucket per flush interval. Buffered deltas are
+                flushed on close(). None (default) writes them on context exit.
+            speculative_policy: Enable the adaptive speculative-write policy.
+                When set, speculative outcomes are tracked per (entity,
+                resource), and buckets where the speculative write rarely
+                decides the request (usually near empty or waiting on refill)
+                use the read-modify-write path directly, with periodic probes.
+                None (default) always speculates when speculative_writes is on.
+            transactional_commit: Commit slow-path leases that span several
+                buckets (cascade child + parent) in one TransactWriteItems,
+                at 2 WCU per bucket. When False, each bucket is written with
+                its own concurrent UpdateItem at 1 WCU; if one write fails,
+                the others are compensated with ADD adjustments, as on the
+                speculative path. Other requests may briefly observe the
+                compensated tokens as consumed.
+            listeners: Instrumentation listeners. Each acquire() sends them an
+                ``AcquireTrace`` with per-phase timings, the path that decided
+                the request, and retry counts. When the repository is a
+                ``Repository``, they are also added to it and receive the
+                duration of every DynamoDB call. None (default) disables
+                instrumentation.
+            latency_histograms: Record acquire, commit, adjustment and
+                rollback latencies, and DynamoDB call latencies, into
+                in-process histograms (read with ``get_latency_histograms()``).
+                Uses the same instrumentation as ``listeners``. Default False.
 
         Raises:
             ValueError: If both repository and name/region/endpoint_url/stack_options
@@ -212,6 +290,47 @@ class RateLimiter:
         # Speculative writes fast path (issue #315)
         self._speculative_writes = speculative_writes
 
+        # Client-side reservation blocks for hot keys (opt-in)
+        self._reservations: ReservationPool | None = (
+            ReservationPool(config=reservation) if reservation is not None else None
+        )
+
+        # Last-seen bucket states for predictive local rejection (opt-in)
+        self._bucket_mirror: BucketMirror | None = (
+            BucketMirror(config=local_rejection) if local_rejection is not None else None
+        )
+
+        # Micro-batching of concurrent speculative writes per bucket (opt-in)
+        self._coalescer: SpeculativeCoalescer | None = (
+            SpeculativeCoalescer(self._repository, coalescing) if coalescing is not None else None
+        )
+
+        # Background per-bucket merging of lease adjustment deltas (opt-in)
+        self._write_behind: WriteBehindBuffer | None = (
+            WriteBehindBuffer(self._repository, write_behind) if write_behind is not None else None
+        )
+
+        # Independent single-item writes for multi-bucket slow-path commits (opt-in)
+        self._transactional_commit = transactional_commit
+
+        # Per-bucket speculative success tracking (opt-in)
+        self._speculative_policy: SpeculativePolicy | None = (
+            SpeculativePolicy(config=speculative_policy) if speculative_policy is not None else None
+        )
+
+        # In-process latency histograms, recorded as an instrumentation listener (opt-in)
+        self._histograms: LatencyHistograms | None = (
+            LatencyHistograms() if latency_histograms else None
+        )
+        if self._histograms is not None:
+            listeners = [*(listeners or ()), self._histograms]
+
+        # Hot-path instrumentation listeners (opt-in)
+        self._listeners: tuple[InstrumentationListener, ...] = tuple(listeners or ())
+        if isinstance(self._repository, Repository):
+            for listener in self._listeners:
+                self._repository.add_listener(listener)
+
     @property
     def name(self) -> str:
         """DEPRECATED. Use ``repository.stack_name`` instead."""
@@ -326,8 +445,23 @@ class RateLimiter:
         self._initialized = True
 
     async def close(self) -> None:
-        """Close the underlying connections."""
-        await self._repository.close()
+        """Close the underlying connections.
+
+        Returns unused reserved tokens to their buckets and flushes buffered
+        adjustment deltas first.
+        """
+        if self._reservations is not None:
+            for block in self._reservations.drain():
+                await self._release_block(block)
+        try:
+            if self._write_behind is not None:
+                await self._write_behind.close()
+        finally:
+            # The repository may be shared: leave no listeners of ours behind
+            if isinstance(self._repository, Repository):
+                for listener in self._listeners:
+                    self._repository.remove_listener(listener)
+            await self._repository.close()
 
     async def __aenter__(self) -> "RateLimiter":
         await self._ensure_initialized()
@@ -650,56 +784,620 @@ class RateLimiter:
                 stacklevel=2,
             )
 
-        # Resolve on_unavailable mode
-        mode = await self._resolve_on_unavailable(on_unavailable)
+        # Per-phase timings for instrumentation listeners (opt-in)
+        trace = AcquireTrace(entity_id, resource) if self._listeners else None
 
-        # Acquire the lease (this may fail due to rate limit or infrastructure)
         try:
+            # Resolve on_unavailable mode
+            mode = await self._resolve_on_unavailable(on_unavailable)
+
+            # Acquire the lease (this may fail due to rate limit or infrastructure)
             lease: Lease | None = None
+            try:
+                if trace is not None:
+                    trace.enter(AcquirePhase.FAST_PATH)
+                lease = await self._try_fast_acquire(entity_id, resource, consume)
+
+                # Fall back to slow path if speculative didn't succeed
+                if lease is None:
+                    if trace is not None:
+                        trace.enter(AcquirePhase.SLOW_PATH)
+                        trace.path = AcquirePath.SLOW
+                    lease = await self._do_acquire(
+                        entity_id=entity_id,
+                        resource=resource,
+                        limits_override=limits,
+                        consume=consume,
+                    )
+                elif trace is not None and trace.path is None:
+                    trace.path = AcquirePath.SPECULATIVE
+            except (RateLimitExceeded, ValidationError):
+                raise
+            except Exception as e:
+                if mode != OnUnavailable.ALLOW:
+                    raise RateLimiterUnavailable(
+                        str(e),
+                        cause=e,
+                        stack_name=self._repository.stack_name,
+                        entity_id=entity_id,
+                        resource=resource,
+                    ) from e
+
+            if lease is not None:
+                # Write initial consumption to DynamoDB before yielding (Issue #309)
+                # No-op for speculative leases (already committed by UpdateItem)
+                if trace is not None:
+                    trace.enter(AcquirePhase.COMMIT_INITIAL)
+                await lease._commit_initial()
+        except BaseException as e:
+            if trace is not None:
+                self._finish_trace(trace, e)
+            raise
+
+        if lease is None:
+            # ALLOW: return a no-op lease
+            if trace is not None:
+                trace.path = AcquirePath.UNAVAILABLE
+                self._finish_trace(trace)
+            yield Lease(repository=self._repository)
+            return
+
+        lease._write_behind = self._write_behind
+
+        # Lease committed - manage the context
+        if trace is not None:
+            trace.acquired()
+        try:
+            yield lease
+            if trace is not None:
+                trace.enter(AcquirePhase.COMMIT_ADJUSTMENTS)
+            await lease._commit_adjustments()
+        except Exception:
+            if trace is not None:
+                trace.enter(AcquirePhase.ROLLBACK)
+            await lease._rollback()
+            raise
+        finally:
+            if trace is not None:
+                self._finish_trace(trace)
+
+    def _finish_trace(self, trace: AcquireTrace, error: BaseException | None = None) -> None:
+        """Close an acquire trace and send it to the listeners."""
+        if error is None:
+            outcome = AcquireOutcome.GRANTED
+        elif isinstance(error, RateLimitExceeded):
+            outcome = AcquireOutcome.REJECTED
+            if trace.path is None:
+                trace.path = AcquirePath.FAST_REJECT
+        else:
+            outcome = AcquireOutcome.ERROR
+        trace.close(outcome)
+        emit_acquire(self._listeners, trace)
+
+    @asynccontextmanager
+    async def acquire_many(
+        self,
+        requests: Sequence[tuple[str, str, dict[str, int]]],
+        limits: list[Limit] | None = None,
+        on_unavailable: OnUnavailable | None = None,
+    ) -> AsyncIterator[list[Lease | RateLimitExceeded]]:
+        """
+        Acquire rate limit capacity for many (entity, resource) pairs at once.
+
+        Each request is acquired independently: the yielded list holds, in
+        request order, either a ``Lease`` or the ``RateLimitExceeded`` that
+        rejected that request. A rejection never affects the other requests.
+
+        Compared to calling ``acquire()`` in a loop, round trips are shared:
 
-            # Try speculative fast path first (issue #315)
-            if self._speculative_writes:
+        1. Fast paths (reservation blocks, speculative writes) run
+           concurrently for every request.
+        2. Requests that need the slow path resolve limits through the config
+           cache, then read every entity META and bucket they touch with
+           chunked BatchGetItem calls (one pass for the requested entities,
+           one for cascade parents).
+        3. Slow-path leases are committed concurrently.
+
+        On context exit, every lease's adjustments are committed; if the
+        block raises, every lease is rolled back.
+
+        Args:
+            requests: ``(entity_id, resource, consume)`` tuples
+            limits: Override stored config with explicit limits for every
+                request (optional)
+            on_unavailable: Override default on_unavailable behavior
+
+        Yields:
+            One ``Lease`` or ``RateLimitExceeded`` per request, in order
+
+        Raises:
+            RateLimiterUnavailable: If DynamoDB unavailable and BLOCK
+            ValidationError: If an identifier is invalid or a request has no
+                limits configured at any level
+
+        Example:
+            async with limiter.acquire_many([
+                ("user-1", "gpt-4", {"rpm": 1}),
+                ("user-2", "gpt-4", {"rpm": 1}),
+            ]) as results:
+                for result in results:
+                    if isinstance(result, RateLimitExceeded):
+                        ...
+        """
+        await self._ensure_initialized()
+
+        for entity_id, resource, _ in requests:
+            validate_identifier(entity_id, "entity_id")
+            validate_resource(resource)
+
+        mode = await self._resolve_on_unavailable(on_unavailable)
+
+        results: list[Lease | RateLimitExceeded | None] = [None] * len(requests)
+        try:
+            # Phase 1: fast paths for every request, concurrently
+            if self._reservations is not None or self._speculative_writes:
+                outcomes = await asyncio.gather(
+                    *[self._try_fast_acquire_item(request) for request in requests]
+                )
+                error: Exception | None = None
+                for i, outcome in enumerate(outcomes):
+                    if isinstance(outcome, Lease | RateLimitExceeded):
+                        results[i] = outcome
+                    elif outcome is not None and error is None:
+                        error = outcome
+                if error is not None:
+                    raise error
+
+            # Phase 2: batched slow path for the rest
+            pending = [i for i, result in enumerate(results) if result is None]
+            if pending:
+                await self._do_acquire_many(requests, pending, results, limits)
+        except ValidationError:
+            await self._rollback_leases(results)
+            raise
+        except Exception as e:
+            if mode == OnUnavailable.BLOCK:
+                await self._rollback_leases(results)
+                raise RateLimiterUnavailable(
+                    str(e),
+                    cause=e,
+                    stack_name=self._repository.stack_name,
+                ) from e
+            # ALLOW: requests without a result get a no-op lease below
+
+        final: list[Lease | RateLimitExceeded] = [
+            result if result is not None else Lease(repository=self._repository)
+            for result in results
+        ]
+        leases = [result for result in final if isinstance(result, Lease)]
+        for lease in leases:
+            lease._write_behind = self._write_behind
+        try:
+            yield final
+            await asyncio.gather(*[lease._commit_adjustments() for lease in leases])
+        except Exception:
+            await self._rollback_leases(leases)
+            raise
+
+    async def _try_fast_acquire(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+    ) -> Lease | None:
+        """Try the reservation block and speculative fast paths.
+
+        Returns:
+            A lease already committed to DynamoDB, or None if the slow path
+            is needed.
+
+        Raises:
+            RateLimitExceeded: If the fast path can reject without the slow path
+        """
+        lease: Lease | None = None
+
+        # Serve from a local reservation block for hot keys (opt-in)
+        if self._reservations is not None:
+            lease = await self._try_reserved_acquire(
+                entity_id=entity_id,
+                resource=resource,
+                consume=consume,
+            )
+            if lease is not None:
+                trace = current_trace()
+                if trace is not None:
+                    trace.path = AcquirePath.RESERVED
+
+        # Try speculative fast path first (issue #315)
+        if lease is None and self._speculative_writes:
+            policy = self._speculative_policy
+            if policy is not None and not policy.should_speculate(entity_id, resource):
+                return None
+            try:
                 lease = await self._try_speculative_acquire(
                     entity_id=entity_id,
                     resource=resource,
                     consume=consume,
                 )
+            except RateLimitExceeded:
+                if policy is not None:
+                    policy.record_outcome(entity_id, resource, fast=True)
+                raise
+            if policy is not None:
+                policy.record_outcome(entity_id, resource, fast=lease is not None)
+        return lease
+
+    async def _try_fast_acquire_item(
+        self,
+        request: tuple[str, str, dict[str, int]],
+    ) -> Lease | Exception | None:
+        """Run ``_try_fast_acquire`` for one acquire_many() request.
+
+        Errors are returned rather than raised so one failing request does
+        not abandon leases that other concurrent requests already committed.
+        """
+        entity_id, resource, consume = request
+        try:
+            return await self._try_fast_acquire(entity_id, resource, consume)
+        except Exception as e:
+            return e
 
-            # Fall back to slow path if speculative didn't succeed
-            if lease is None:
-                lease = await self._do_acquire(
+    async def _do_acquire_many(
+        self,
+        requests: Sequence[tuple[str, str, dict[str, int]]],
+        pending: list[int],
+        results: list[Lease | RateLimitExceeded | None],
+        limits_override: list[Limit] | None,
+    ) -> None:
+        """Slow path for the ``pending`` indices of an acquire_many() batch.
+
+        Stores a committed Lease or a RateLimitExceeded in ``results`` for
+        each pending request. Requests sharing an existing bucket each consume
+        from their own copy of the fetched state; the commit's optimistic lock
+        and consumption-only retry reconcile them in DynamoDB. Requests sharing
+        a bucket that does not exist yet cannot both create it, so all but the
+        first are acquired one by one after the batch commits.
+        """
+        now_ms = int(time.time() * 1000)
+
+        # Resolve limits once per (entity, resource), all keys concurrently
+        child_keys = list(dict.fromkeys((requests[i][0], requests[i][1]) for i in pending))
+        resolved = await self._resolve_limits_many(child_keys, limits_override)
+
+        # Pass 1: META + buckets of every requested entity
+        entities, buckets = await self._fetch_entities_and_buckets(
+            [entity_id for entity_id, _ in child_keys], child_keys
+        )
+
+        # Pass 2: buckets of cascade parents not already fetched
+        parent_keys: list[tuple[str, str]] = []
+        for entity_id, resource in child_keys:
+            entity = entities.get(entity_id)
+            if entity is None or not entity.cascade or not entity.parent_id:
+                continue
+            key = (entity.parent_id, resource)
+            if key not in resolved and key not in parent_keys:
+                parent_keys.append(key)
+        if parent_keys:
+            resolved.update(await self._resolve_limits_many(parent_keys, limits_override))
+            _, parent_buckets = await self._fetch_entities_and_buckets([], parent_keys)
+            buckets.update(parent_buckets)
+
+        leases: dict[int, Lease] = {}
+        deferred: list[int] = []
+        claimed_new: set[tuple[str, str]] = set()
+        for i in pending:
+            entity_id, resource, consume = requests[i]
+            entity = entities.get(entity_id)
+            limits, config_source = resolved[(entity_id, resource)]
+            entity_limits: dict[str, list[Limit]] = {entity_id: limits}
+            entity_config_sources: dict[str, str] = {entity_id: config_source}
+            if entity is not None and entity.cascade and entity.parent_id:
+                parent_limits, parent_source = resolved[(entity.parent_id, resource)]
+                entity_limits[entity.parent_id] = parent_limits
+                entity_config_sources[entity.parent_id] = parent_source
+
+            existing_buckets: dict[tuple[str, str, str], BucketState] = {}
+            for eid, eid_limits in entity_limits.items():
+                for limit in eid_limits:
+                    bucket_key = (eid, resource, limit.name)
+                    if bucket_key in buckets:
+                        existing_buckets[bucket_key] = replace(buckets[bucket_key])
+
+            new_keys = {
+                (eid, resource)
+                for eid, eid_limits in entity_limits.items()
+                if not any((eid, resource, limit.name) in buckets for limit in eid_limits)
+            }
+            if new_keys & claimed_new:
+                deferred.append(i)
+                continue
+            claimed_new |= new_keys
+
+            try:
+                leases[i] = self._build_lease(
                     entity_id=entity_id,
                     resource=resource,
-                    limits_override=limits,
                     consume=consume,
+                    entity=entity,
+                    entity_limits=entity_limits,
+                    entity_config_sources=entity_config_sources,
+                    existing_buckets=existing_buckets,
+                    now_ms=now_ms,
                 )
-        except (RateLimitExceeded, ValidationError):
-            raise
-        except Exception as e:
-            if mode == OnUnavailable.ALLOW:
-                # Return a no-op lease
-                yield Lease(repository=self._repository)
-                return
+            except RateLimitExceeded as e:
+                results[i] = e
+
+        # Commit every slow-path lease concurrently
+        indices = list(leases)
+        outcomes = await asyncio.gather(*[self._commit_initial_item(leases[i]) for i in indices])
+        error: Exception | None = None
+        for i, outcome in zip(indices, outcomes, strict=True):
+            if outcome is None:
+                results[i] = leases[i]
+            elif isinstance(outcome, RateLimitExceeded):
+                results[i] = outcome
+            elif error is None:
+                error = outcome
+        if error is not None:
+            raise error
+
+        for i in deferred:
+            entity_id, resource, consume = requests[i]
+            try:
+                lease = await self._do_acquire(entity_id, resource, limits_override, consume)
+                await lease._commit_initial()
+            except RateLimitExceeded as e:
+                results[i] = e
             else:
-                raise RateLimiterUnavailable(
-                    str(e),
-                    cause=e,
-                    stack_name=self._repository.stack_name,
-                    entity_id=entity_id,
-                    resource=resource,
-                ) from e
+                results[i] = lease
 
-        # Write initial consumption to DynamoDB before yielding (Issue #309)
-        # No-op for speculative leases (already committed by UpdateItem)
-        await lease._commit_initial()
+    async def _resolve_limits_many(
+        self,
+        keys: list[tuple[str, str]],
+        limits_override: list[Limit] | None,
+    ) -> dict[tuple[str, str], tuple[list[Limit], str]]:
+        """Resolve limits for every (entity, resource) key concurrently.
 
-        # Lease committed - manage the context
+        Config slots missing from the cache are first read in one batched
+        read when the repository supports it, so the resolutions below are
+        cache hits instead of one fetch per key.
+        """
+        prefetch = getattr(self._repository, "prefetch_configs", None)
+        if limits_override is None and prefetch is not None:
+            await prefetch(keys)
+        resolutions = await asyncio.gather(
+            *[self._resolve_limits(key[0], key[1], limits_override) for key in keys]
+        )
+        return dict(zip(keys, resolutions, strict=True))
+
+    async def _commit_initial_item(self, lease: Lease) -> Exception | None:
+        """Commit one acquire_many() lease, returning the error if it fails."""
         try:
-            yield lease
-            await lease._commit_adjustments()
+            await lease._commit_initial()
+        except Exception as e:
+            return e
+        return None
+
+    async def _rollback_leases(
+        self,
+        results: Sequence[Lease | RateLimitExceeded | None],
+    ) -> None:
+        """Roll back every lease in an acquire_many() result list."""
+        leases = [result for result in results if isinstance(result, Lease)]
+        await asyncio.gather(*[lease._rollback() for lease in leases])
+
+    async def _try_reserved_acquire(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+    ) -> Lease | None:
+        """Try to serve an acquire from a client-side reservation block.
+
+        Serves the request from the live block for (entity_id, resource) when
+        it has enough tokens. Otherwise, if the key is hot enough, reserves a
+        new block sized from the observed request rate with one speculative
+        write (two for cascade) and serves the request from it.
+
+        Never raises RateLimitExceeded: any shortfall returns None so the
+        regular speculative/slow path decides.
+
+        Returns:
+            Pre-committed Lease if served from a block, None otherwise.
+        """
+        pool = self._reservations
+        assert pool is not None  # caller checks this
+        if not any(amount > 0 for amount in consume.values()):
+            return None
+
+        for expired in pool.sweep():
+            await self._release_block(expired)
+
+        key = (entity_id, resource)
+        pool.observe(key)
+
+        served = pool.take(key, consume)
+        if served is not None:
+            return self._build_reserved_lease(served, consume)
+
+        multiplier = pool.block_multiplier(key)
+        if multiplier == 0 or pool.backing_off(key):
+            return None
+
+        # The current block (if any) cannot cover this request: return it
+        displaced = pool.pop(key)
+        if displaced is not None:
+            await self._release_block(displaced)
+
+        amounts = pool.capped_amounts(key, consume, multiplier)
+        if amounts == consume:
+            # Capacity too small for a block to cover more than this request
+            return None
+
+        buckets = await self._reserve_block(entity_id, resource, amounts)
+        if buckets is None:
+            return None
+
+        # Serve the current request from the new block before publishing it
+        for bucket in buckets:
+            bucket.remaining = {
+                name: total - consume.get(name, 0) for name, total in amounts.items()
+            }
+        displaced = pool.put(key, buckets)
+        if displaced is not None:
+            await self._release_block(displaced)
+        return self._build_reserved_lease(buckets, consume)
+
+    async def _reserve_block(
+        self,
+        entity_id: str,
+        resource: str,
+        amounts: dict[str, int],
+    ) -> list[ReservedBucket] | None:
+        """Reserve ``amounts`` from the entity's bucket (and parent's, for cascade).
+
+        All-or-nothing: if any bucket cannot cover the block, tokens already
+        taken from the other bucket are returned and None is returned. The
+        failure is recorded in the pool with the short bucket's ``ALL_OLD``
+        states, which size the next block for the key.
+        """
+        pool = self._reservations
+        assert pool is not None  # blocks only exist with a pool
+        key = (entity_id, resource)
+        result = await self._repository.speculative_consume(
+            entity_id=entity_id,
+            resource=resource,
+            consume=amounts,
+        )
+
+        if not result.success:
+            parent = result.parent_result
+            if parent is not None and parent.success and result.parent_id is not None:
+                await self._release_reserved(
+                    [self._reserved_bucket(result.parent_id, resource, parent, amounts)]
+                )
+            pool.record_failure(key, result.old_buckets)
+            return None
+
+        child = self._reserved_bucket(entity_id, resource, result, amounts)
+        child.cascade = result.cascade
+        child.parent_id = result.parent_id
+
+        parent_result = result.parent_result
+        if parent_result is None and result.cascade and result.parent_id:
+            # Cache miss cascade — sequential parent reservation
+            parent_result = await self._repository.speculative_consume(
+                entity_id=result.parent_id,
+                resource=resource,
+                consume=amounts,
+            )
+
+        if parent_result is None:
+            return [child]
+
+        if not parent_result.success:
+            await self._release_reserved([child])
+            pool.record_failure(key, parent_result.old_buckets)
+            return None
+
+        assert result.parent_id is not None  # cascade implies a parent
+        return [child, self._reserved_bucket(result.parent_id, resource, parent_result, amounts)]
+
+    @staticmethod
+    def _reserved_bucket(
+        entity_id: str,
+        resource: str,
+        result: "SpeculativeResult",
+        amounts: dict[str, int],
+    ) -> ReservedBucket:
+        """Wrap a successful speculative result as a reserved bucket."""
+        return ReservedBucket(
+            entity_id=entity_id,
+            resource=resource,
+            shard_id=result.shard_id,
+            states=result.buckets,
+            remaining=dict(amounts),
+        )
+
+    def _build_reserved_lease(
+        self,
+        buckets: list[ReservedBucket],
+        consume: dict[str, int],
+    ) -> Lease:
+        """Build a pre-committed Lease for a request served from a block.
+
+        The tokens were already debited in DynamoDB when the block was
+        reserved, so the lease is marked as initially committed. Adjustments
+        and rollback write ADD deltas to the bucket as for any other lease.
+        Bucket states are copied so lease mutations never reach the block.
+        """
+        entries: list[LeaseEntry] = []
+        for bucket in buckets:
+            for state in bucket.states:
+                amount = consume.get(state.limit_name, 0)
+                if amount == 0:
+                    continue
+                entries.append(
+                    LeaseEntry(
+                        entity_id=bucket.entity_id,
+                        resource=bucket.resource,
+                        limit=Limit.from_bucket_state(state),
+                        state=replace(state),
+                        consumed=amount,
+                        _cascade=bucket.cascade,
+                        _parent_id=bucket.parent_id,
+                    )
+                )
+        lease = Lease(
+            repository=self._repository,
+            entries=entries,
+        )
+        lease._initial_committed = True
+        for entry in entries:
+            entry._initial_consumed = entry.consumed
+        return lease
+
+    async def _release_block(self, block: ReservationBlock) -> None:
+        """Return a block's unused tokens to DynamoDB.
+
+        Failures are logged, not raised: unreturned tokens refill naturally,
+        so a failed release only under-grants until then.
+        """
+        try:
+            await self._release_reserved(block.buckets)
         except Exception:
-            await lease._rollback()
-            raise
+            logger.warning(
+                "Failed to release reserved tokens for %s",
+                [(b.entity_id, b.resource) for b in block.buckets],
+                exc_info=True,
+            )
+            return
+        assert self._reservations is not None  # blocks only exist with a pool
+        self._reservations.record_release(block)
+
+    async def _release_reserved(self, buckets: list[ReservedBucket]) -> None:
+        """Write unconditional ADDs returning unserved tokens to each bucket."""
+        items: list[dict[str, Any]] = []
+        for bucket in buckets:
+            deltas = bucket.release_deltas()
+            if deltas:
+                items.append(
+                    self._repository.build_composite_adjust(
+                        entity_id=bucket.entity_id,
+                        resource=bucket.resource,
+                        deltas=deltas,
+                        shard_id=bucket.shard_id,
+                    )
+                )
+        if items:
+            await self._repository.write_each(items)
+
+    def get_reservation_stats(self) -> ReservationStats | None:
+        """Get reservation block counters, or None if reservations are disabled."""
+        if self._reservations is None:
+            return None
+        return self._reservations.stats
 
     async def _try_speculative_acquire(
         self,
@@ -723,14 +1421,25 @@ class RateLimiter:
         """
         now_ms = int(time.time() * 1000)
 
+        # Predictive local rejection: last-seen state says refill won't help yet
+        if self._bucket_mirror is not None:
+            statuses = self._bucket_mirror.check(entity_id, resource, consume, now_ms)
+            if statuses is not None:
+                trace = current_trace()
+                if trace is not None:
+                    trace.path = AcquirePath.LOCAL_REJECT
+                raise RateLimitExceeded(statuses)
+
         # Repository handles cache check and parallel writes (issue #318)
-        result = await self._repository.speculative_consume(
-            entity_id=entity_id,
-            resource=resource,
-            consume=consume,
-        )
+        result = await self._speculative_consume(entity_id, resource, consume)
+        self._mirror_result(entity_id, resource, result)
+        if result.parent_result is not None and result.parent_id is not None:
+            self._mirror_result(result.parent_id, resource, result.parent_result)
 
         if not result.success:
+            if self._speculative_policy is not None:
+                self._speculative_policy.record_failure(entity_id, resource, result.failure_reason)
+
             # Child failed — check if parent was also tried (parallel path)
             if result.parent_result is not None and result.parent_result.success:
                 assert result.parent_id is not None  # set by repository cache path
@@ -802,11 +1511,8 @@ class RateLimiter:
         elif result.cascade and result.parent_id:
             # Cache miss cascade — sequential parent speculative
             parent_id = result.parent_id
-            parent_result = await self._repository.speculative_consume(
-                entity_id=parent_id,
-                resource=resource,
-                consume=consume,
-            )
+            parent_result = await self._speculative_consume(parent_id, resource, consume)
+            self._mirror_result(parent_id, resource, parent_result)
 
             if parent_result.success:
                 for state in parent_result.buckets:
@@ -834,7 +1540,7 @@ class RateLimiter:
                     return None
 
                 would_help, parent_statuses = would_refill_satisfy(
-                    parent_result.old_buckets, consume, now_ms
+                    parent_result.old_buckets, consume, now_ms, with_statuses=False
                 )
                 if not would_help:
                     await self._compensate_child(entity_id, resource, consume)
@@ -875,6 +1581,98 @@ class RateLimiter:
             entry._initial_consumed = entry.consumed
         return lease
 
+    async def _speculative_consume(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+    ) -> "SpeculativeResult":
+        """Issue a speculative write, merged with concurrent callers when enabled."""
+        trace = current_trace()
+        started = time.perf_counter() if trace is not None else 0.0
+        if self._coalescer is not None:
+            result = await self._coalescer.speculative_consume(entity_id, resource, consume)
+        else:
+            result = await self._repository.speculative_consume(
+                entity_id=entity_id,
+                resource=resource,
+                consume=consume,
+            )
+        if trace is not None:
+            trace.record(AcquirePhase.SPECULATIVE_WRITE, started)
+        return result
+
+    def get_coalescing_stats(self) -> CoalescingStats | None:
+        """Get request coalescing counters, or None if coalescing is disabled."""
+        if self._coalescer is None:
+            return None
+        return self._coalescer.stats
+
+    def get_speculative_policy_stats(self) -> SpeculativePolicyStats | None:
+        """Get speculative policy counters, or None if the policy is disabled."""
+        if self._speculative_policy is None:
+            return None
+        return self._speculative_policy.stats
+
+    def get_speculative_bucket_stats(
+        self,
+        entity_id: str,
+        resource: str,
+    ) -> SpeculativeBucketStats | None:
+        """Get speculative statistics for one (entity, resource).
+
+        Returns:
+            The bucket's success rate and failure reasons, or None if the
+            policy is disabled or the bucket has not been tracked yet.
+        """
+        if self._speculative_policy is None:
+            return None
+        return self._speculative_policy.bucket_stats(entity_id, resource)
+
+    def get_write_behind_stats(self) -> WriteBehindStats | None:
+        """Get write-behind buffer counters, or None if write-behind is disabled."""
+        if self._write_behind is None:
+            return None
+        return self._write_behind.stats
+
+    def _mirror_result(
+        self,
+        entity_id: str,
+        resource: str,
+        result: "SpeculativeResult",
+    ) -> None:
+        """Record a speculative result's bucket state for local rejection.
+
+        Mirrors ALL_NEW on success and ALL_OLD on failure. Missing buckets
+        are forgotten; multi-shard buckets are never mirrored.
+        """
+        mirror = self._bucket_mirror
+        if mirror is None or result.shard_count > 1:
+            return
+        states = result.buckets if result.success else result.old_buckets
+        if states is None:
+            mirror.invalidate(entity_id, resource)
+            return
+        parent_id = result.parent_id if result.cascade else None
+        mirror.record(entity_id, resource, states, parent_id=parent_id)
+
+    def get_local_rejection_stats(self) -> LocalRejectionStats | None:
+        """Get local rejection counters, or None if local rejection is disabled."""
+        if self._bucket_mirror is None:
+            return None
+        return self._bucket_mirror.stats
+
+    def get_latency_histograms(self) -> HistogramSnapshot | None:
+        """Get a snapshot of the latency histograms, or None if they are disabled."""
+        if self._histograms is None:
+            return None
+        return self._histograms.snapshot()
+
+    def reset_latency_histograms(self) -> None:
+        """Clear the latency histograms (no-op if disabled)."""
+        if self._histograms is not None:
+            self._histograms.reset()
+
     async def _handle_nested_parent_failure(
         self,
         entity_id: str,
@@ -912,7 +1710,7 @@ class RateLimiter:
             return None
 
         would_help, parent_statuses = would_refill_satisfy(
-            parent_result.old_buckets, consume, now_ms
+            parent_result.old_buckets, consume, now_ms, with_statuses=False
         )
         if not would_help:
             await self._compensate_child(entity_id, resource, consume)
@@ -978,6 +1776,8 @@ class RateLimiter:
         consume: dict[str, int],
     ) -> None:
         """Compensate a speculative write by adding consumed tokens back."""
+        trace = current_trace()
+        started = time.perf_counter() if trace is not None else 0.0
         deltas = {name: -(amount * 1000) for name, amount in consume.items()}
         compensate_item = self._repository.build_composite_adjust(
             entity_id=entity_id,
@@ -985,6 +1785,9 @@ class RateLimiter:
             deltas=deltas,
         )
         await self._repository.write_each([compensate_item])
+        if trace is not None:
+            trace.compensations += 1
+            trace.record(AcquirePhase.COMPENSATION, started)
 
     @staticmethod
     def _check_speculative_failure(
@@ -1004,7 +1807,9 @@ class RateLimiter:
         if not all(name in bucket_names for name in consume):
             return
 
-        would_help, statuses = would_refill_satisfy(result.old_buckets, consume, now_ms)
+        would_help, statuses = would_refill_satisfy(
+            result.old_buckets, consume, now_ms, with_statuses=False
+        )
         if not would_help:
             raise RateLimitExceeded(statuses)
 
@@ -1022,7 +1827,9 @@ class RateLimiter:
 
         When application limits are exhausted on one shard, other shards may
         still have available tokens (since capacity is divided across shards).
-        This method picks random untried shards up to ``_MAX_SHARD_RETRIES``.
+        This method tries untried shards chosen by the repository's
+        ``choose_shard()`` (random untried shards for backends without it)
+        up to ``_MAX_SHARD_RETRIES``.
 
         Args:
             entity_id: Entity owning the bucket
@@ -1035,22 +1842,34 @@ class RateLimiter:
             Lease if a retry on another shard succeeded, None if all retries
             failed or no untried shards remain.
         """
-        import random
-
         tried_shards = {result.shard_id}
         shard_count = result.shard_count
+        trace = current_trace()
+        choose_shard = getattr(self._repository, "choose_shard", None)
 
         for _ in range(self._MAX_SHARD_RETRIES):
-            untried = [s for s in range(shard_count) if s not in tried_shards]
-            if not untried:
+            new_shard: int | None
+            if choose_shard is not None:
+                new_shard = choose_shard(
+                    entity_id, resource, shard_count, consume, exclude=tried_shards
+                )
+            else:
+                untried = [s for s in range(shard_count) if s not in tried_shards]
+                new_shard = random.choice(untried) if untried else None
+            if new_shard is None:
                 break
-            new_shard = random.choice(untried)
             tried_shards.add(new_shard)
 
+            started = time.perf_counter() if trace is not None else 0.0
             retry = await self._repository.speculative_consume(
                 entity_id, resource, consume, ttl_seconds, shard_id=new_shard
             )
+            if trace is not None:
+                trace.shard_retries += 1
+                trace.record(AcquirePhase.SHARD_RETRY, started)
             if retry.success:
+                if trace is not None:
+                    trace.path = AcquirePath.SHARD_RETRY
                 return self._build_lease_from_speculative(entity_id, resource, consume, retry)
         return None
 
@@ -1101,7 +1920,7 @@ class RateLimiter:
     ) -> Lease | None:
         """Attempt parent-only slow path after child speculative succeeded.
 
-        Reads parent buckets, resolves limits, does refill + try_consume,
+        Reads parent buckets, resolves limits, does refill + consume,
         and writes parent via single-item UpdateItem. Returns a Lease combining
         child's speculative entries with parent's slow-path entries.
 
@@ -1115,60 +1934,44 @@ class RateLimiter:
         # Fetch parent buckets
         parent_buckets = await self._fetch_buckets([parent_id], resource)
 
-        # Process parent buckets: refill + try_consume
-        parent_entries: list[LeaseEntry] = []
-        statuses: list[LimitStatus] = []
-        has_custom_config = parent_config_source == "entity"
-
+        # Process parent buckets: refill + consume in one pass
+        states: list[BucketState] = []
         for limit in parent_limits:
-            bucket_key = (parent_id, resource, limit.name)
-            existing = parent_buckets.get(bucket_key)
+            existing = parent_buckets.get((parent_id, resource, limit.name))
             if existing is None:
                 # Parent bucket missing for this limit — can't proceed
                 return None
+            states.append(existing)
+        amounts = [consume.get(limit.name, 0) for limit in parent_limits]
+        results = try_consume_many(states, amounts, now_ms)
+        if results is None:
+            return None
 
-            original_tk = existing.tokens_milli
-            original_rf = existing.last_refill_ms
-
-            amount = consume.get(limit.name, 0)
-            result = try_consume(existing, amount, now_ms)
-
-            status = LimitStatus(
-                entity_id=parent_id,
-                resource=resource,
-                limit_name=limit.name,
-                limit=limit,
-                available=result.available,
-                requested=amount,
-                exceeded=not result.success,
-                retry_after_seconds=result.retry_after_seconds,
-            )
-            statuses.append(status)
-
-            if result.success:
-                existing.tokens_milli = result.new_tokens_milli
-                existing.last_refill_ms = result.new_last_refill_ms
-                if existing.total_consumed_milli is not None and amount > 0:
-                    existing.total_consumed_milli += amount * 1000
+        parent_entries: list[LeaseEntry] = []
+        has_custom_config = parent_config_source == "entity"
+        for limit, state, amount, (new_tokens, new_refill) in zip(
+            parent_limits, states, amounts, results, strict=True
+        ):
+            original_tk = state.tokens_milli
+            original_rf = state.last_refill_ms
+            state.tokens_milli = new_tokens
+            state.last_refill_ms = new_refill
+            if state.total_consumed_milli is not None and amount > 0:
+                state.total_consumed_milli += amount * 1000
 
             parent_entries.append(
                 LeaseEntry(
                     entity_id=parent_id,
                     resource=resource,
                     limit=limit,
-                    state=existing,
-                    consumed=amount if result.success else 0,
+                    state=state,
+                    consumed=amount,
                     _original_tokens_milli=original_tk,
                     _original_rf_ms=original_rf,
                     _has_custom_config=has_custom_config,
                 )
             )
 
-        # Check for violations
-        violations = [s for s in statuses if s.exceeded]
-        if violations:
-            return None
-
         # Write parent only via _commit_initial on a parent-only lease
         all_entries = list(child_entries) + parent_entries
         lease = Lease(
@@ -1208,116 +2011,152 @@ class RateLimiter:
 
         now_ms = int(time.time() * 1000)
 
-        # Phase 1: Resolve child limits, then fetch child META + child buckets
-        # in a single BatchGetItem call (no separate get_entity round trip).
-        child_limits, child_config_source = await self._resolve_limits(
-            entity_id, resource, limits_override
+        # Phase 1: Resolve limits while reading child META + buckets. When the
+        # entity cache already knows the cascade parent, its bucket rides in
+        # the same BatchGetItem and its limits resolve concurrently, so a warm
+        # cascade slow path is a single round trip. get_cached_parent() is
+        # optional for backends (see RepositoryProtocol).
+        get_cached_parent = getattr(self._repository, "get_cached_parent", None)
+        cached_parent_id: str | None = (
+            get_cached_parent(entity_id) if get_cached_parent is not None else None
         )
-
-        entity, child_buckets = await self._fetch_entity_and_buckets(entity_id, resource)
+        parent_resolution: tuple[list[Limit], str] | None = None
+        if cached_parent_id is None:
+            (child_limits, child_config_source), (entity, fetched_buckets) = await asyncio.gather(
+                self._resolve_limits(entity_id, resource, limits_override),
+                self._fetch_entity_and_buckets(entity_id, resource),
+            )
+        else:
+            (
+                (child_limits, child_config_source),
+                parent_resolution,
+                (entity, fetched_buckets),
+            ) = await asyncio.gather(
+                self._resolve_limits(entity_id, resource, limits_override),
+                self._resolve_cached_parent_limits(cached_parent_id, resource, limits_override),
+                self._fetch_entity_and_buckets(entity_id, resource, cached_parent_id),
+            )
 
         # Determine cascade
-        entity_ids = [entity_id]
-        existing_buckets: dict[tuple[str, str, str], BucketState] = dict(child_buckets)
+        existing_buckets: dict[tuple[str, str, str], BucketState] = dict(fetched_buckets)
         entity_limits: dict[str, list[Limit]] = {entity_id: child_limits}
         # Track config source per entity (for TTL calculation, issue #271)
         entity_config_sources: dict[str, str] = {entity_id: child_config_source}
 
         if entity and entity.cascade and entity.parent_id:
             parent_id = entity.parent_id
-            entity_ids.append(parent_id)
 
-            # Phase 2: Resolve parent limits + fetch parent buckets
-            parent_limits, parent_config_source = await self._resolve_limits(
-                parent_id, resource, limits_override
-            )
+            if parent_id == cached_parent_id and parent_resolution is not None:
+                # Parent limits and bucket were fetched in phase 1
+                parent_limits, parent_config_source = parent_resolution
+            else:
+                # Phase 2: entity cache was cold or stale; resolve parent
+                # limits and fetch parent buckets concurrently
+                (parent_limits, parent_config_source), parent_buckets = await asyncio.gather(
+                    self._resolve_limits(parent_id, resource, limits_override),
+                    self._fetch_buckets([parent_id], resource),
+                )
+                existing_buckets.update(parent_buckets)
             entity_limits[parent_id] = parent_limits
             entity_config_sources[parent_id] = parent_config_source
-            parent_buckets = await self._fetch_buckets([parent_id], resource)
-            existing_buckets.update(parent_buckets)
 
-        # Process buckets and build lease entries
-        entries: list[LeaseEntry] = []
-        statuses: list[LimitStatus] = []
+        return self._build_lease(
+            entity_id=entity_id,
+            resource=resource,
+            consume=consume,
+            entity=entity,
+            entity_limits=entity_limits,
+            entity_config_sources=entity_config_sources,
+            existing_buckets=existing_buckets,
+            now_ms=now_ms,
+        )
 
-        for eid in entity_ids:
-            # Track whether any bucket existed for this entity+resource
-            any_existing = any(
-                (eid, resource, limit.name) in existing_buckets for limit in entity_limits[eid]
-            )
+    def _build_lease(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+        entity: Entity | None,
+        entity_limits: dict[str, list[Limit]],
+        entity_config_sources: dict[str, str],
+        existing_buckets: dict[tuple[str, str, str], BucketState],
+        now_ms: int,
+    ) -> Lease:
+        """Consume from fetched buckets locally and build the slow-path lease.
 
-            for limit in entity_limits[eid]:
-                # Get existing bucket from batch result or create new one
-                bucket_key = (eid, resource, limit.name)
-                existing = existing_buckets.get(bucket_key)
+        ``entity_limits`` is ordered child first, then parent (for cascade).
+        Bucket states in ``existing_buckets`` are updated in place.
+
+        Raises:
+            RateLimitExceeded: If any limit would be exceeded
+        """
+        # Collect every (entity, limit) bucket, creating missing ones
+        keys: list[tuple[str, Limit, bool]] = []  # (entity_id, limit, is_new)
+        states: list[BucketState] = []
+        amounts: list[int] = []
+        for eid, limits in entity_limits.items():
+            for limit in limits:
+                existing = existing_buckets.get((eid, resource, limit.name))
                 if existing is None:
-                    is_new = True
-                    state = BucketState.from_limit(eid, resource, limit, now_ms)
+                    states.append(BucketState.from_limit(eid, resource, limit, now_ms))
                 else:
-                    is_new = False
-                    state = existing
-
-                # Capture original values before try_consume modifies them (ADR-115)
-                original_tk = state.tokens_milli
-                original_rf = state.last_refill_ms
+                    states.append(existing)
+                keys.append((eid, limit, existing is None))
+                amounts.append(consume.get(limit.name, 0))
+
+        # Statuses are only needed to report a violation
+        results = try_consume_many(states, amounts, now_ms)
+        if results is None:
+            raise RateLimitExceeded(
+                [
+                    build_limit_status(eid, resource, limit, state, amount, now_ms)
+                    for (eid, limit, _), state, amount in zip(keys, states, amounts, strict=True)
+                ]
+            )
 
-                # Try to consume
-                amount = consume.get(limit.name, 0)
-                result = try_consume(state, amount, now_ms)
+        # Track whether any bucket existed for each entity+resource
+        any_existing = {eid for eid, _, is_new in keys if not is_new}
+        entries: list[LeaseEntry] = []
+        for (eid, limit, is_new), state, amount, (new_tokens, new_refill) in zip(
+            keys, states, amounts, results, strict=True
+        ):
+            # Capture original values before consuming (ADR-115)
+            original_tk = state.tokens_milli
+            original_rf = state.last_refill_ms
+            state.tokens_milli = new_tokens
+            state.last_refill_ms = new_refill
+            # Update consumption counter if initialized (issue #179)
+            if state.total_consumed_milli is not None and amount > 0:
+                state.total_consumed_milli += amount * 1000
 
-                status = LimitStatus(
+            entries.append(
+                LeaseEntry(
                     entity_id=eid,
                     resource=resource,
-                    limit_name=limit.name,
                     limit=limit,
-                    available=result.available,
-                    requested=amount,
-                    exceeded=not result.success,
-                    retry_after_seconds=result.retry_after_seconds,
-                )
-                statuses.append(status)
-
-                if result.success:
-                    # Update local state
-                    state.tokens_milli = result.new_tokens_milli
-                    state.last_refill_ms = result.new_last_refill_ms
-                    # Update consumption counter if initialized (issue #179)
-                    if state.total_consumed_milli is not None and amount > 0:
-                        state.total_consumed_milli += amount * 1000
-
-                # Determine if entity has custom config for TTL (Issue #271)
-                has_custom_config = entity_config_sources.get(eid) == "entity"
-
-                entries.append(
-                    LeaseEntry(
-                        entity_id=eid,
-                        resource=resource,
-                        limit=limit,
-                        state=state,
-                        consumed=amount if result.success else 0,
-                        _original_tokens_milli=original_tk,
-                        _original_rf_ms=original_rf,
-                        _is_new=is_new and not any_existing,
-                        _has_custom_config=has_custom_config,
-                        _cascade=entity.cascade if entity and eid == entity_id else False,
-                        _parent_id=entity.parent_id if entity and eid == entity_id else None,
-                    )
+                    state=state,
+                    consumed=amount,
+                    _original_tokens_milli=original_tk,
+                    _original_rf_ms=original_rf,
+                    _is_new=is_new and eid not in any_existing,
+                    # Entity has custom config: no TTL (Issue #271)
+                    _has_custom_config=entity_config_sources.get(eid) == "entity",
+                    _cascade=entity.cascade if entity and eid == entity_id else False,
+                    _parent_id=entity.parent_id if entity and eid == entity_id else None,
                 )
-
-        # Check for any violations
-        violations = [s for s in statuses if s.exceeded]
-        if violations:
-            raise RateLimitExceeded(statuses)
+            )
 
         return Lease(
             repository=self._repository,
             entries=entries,
+            _transactional=self._transactional_commit,
         )
 
     async def _fetch_entity_and_buckets(
         self,
         entity_id: str,
         resource: str,
+        parent_id: str | None = None,
     ) -> tuple[Entity | None, dict[tuple[str, str, str], BucketState]]:
         """
         Fetch entity metadata and its composite bucket in a single call.
@@ -1325,10 +2164,17 @@ class RateLimiter:
         With composite items (ADR-114), one item per (entity_id, resource)
         contains all limits. Uses batch_get_entity_and_buckets if the backend
         supports batch operations, otherwise falls back to separate calls.
+
+        Args:
+            entity_id: Entity whose META and bucket to fetch
+            resource: Resource name
+            parent_id: Parent whose bucket to read in the same call, when
+                already known from the entity cache
         """
+        entity_ids = [entity_id] if parent_id is None else [entity_id, parent_id]
         if self._repository.capabilities.supports_batch_operations:
             # Composite key: one item per (entity_id, resource)
-            bucket_keys = [(entity_id, resource)]
+            bucket_keys = [(eid, resource) for eid in entity_ids]
             result: tuple[
                 Entity | None, dict[tuple[str, str, str], BucketState]
             ] = await self._repository.batch_get_entity_and_buckets(entity_id, bucket_keys)
@@ -1336,12 +2182,47 @@ class RateLimiter:
 
         # Fallback: sequential calls
         entity = await self._repository.get_entity(entity_id)
-        buckets = await self._repository.get_buckets(entity_id, resource)
-        bucket_dict: dict[tuple[str, str, str], BucketState] = {
-            (b.entity_id, b.resource, b.limit_name): b for b in buckets
-        }
+        bucket_dict: dict[tuple[str, str, str], BucketState] = {}
+        for eid in entity_ids:
+            for bucket in await self._repository.get_buckets(eid, resource):
+                bucket_dict[(bucket.entity_id, bucket.resource, bucket.limit_name)] = bucket
         return entity, bucket_dict
 
+    async def _fetch_entities_and_buckets(
+        self,
+        entity_ids: list[str],
+        bucket_keys: list[tuple[str, str]],
+    ) -> tuple[dict[str, Entity], dict[tuple[str, str, str], BucketState]]:
+        """
+        Fetch META for many entities and composite buckets for many keys.
+
+        Uses batch_get_entities_and_buckets (chunked BatchGetItem) if the
+        backend supports batch operations and defines it, otherwise falls back
+        to sequential calls.
+
+        Returns:
+            Tuple of (entities, bucket_dict). Entities without a META record
+            and missing buckets are omitted.
+        """
+        batch_get = getattr(self._repository, "batch_get_entities_and_buckets", None)
+        if batch_get is not None and self._repository.capabilities.supports_batch_operations:
+            result: tuple[
+                dict[str, Entity], dict[tuple[str, str, str], BucketState]
+            ] = await batch_get(entity_ids, bucket_keys)
+            return result
+
+        # Fallback: sequential calls
+        entities: dict[str, Entity] = {}
+        for eid in dict.fromkeys(entity_ids):
+            entity = await self._repository.get_entity(eid)
+            if entity is not None:
+                entities[eid] = entity
+        bucket_dict: dict[tuple[str, str, str], BucketState] = {}
+        for eid, resource in dict.fromkeys(bucket_keys):
+            for bucket in await self._repository.get_buckets(eid, resource):
+                bucket_dict[(bucket.entity_id, bucket.resource, bucket.limit_name)] = bucket
+        return entities, bucket_dict
+
     async def _fetch_buckets(
         self,
         entity_ids: list[str],
@@ -1414,10 +2295,14 @@ class RateLimiter:
             return limits_override, "override"
 
         # Delegate to repository (ADR-122)
+        trace = current_trace()
+        started = time.perf_counter() if trace is not None else 0.0
         limits, _, config_source = await self._repository.resolve_limits(
             entity_id,
             resource,
         )
+        if trace is not None:
+            trace.record(AcquirePhase.RESOLVE_LIMITS, started)
 
         if limits is not None and config_source is not None:
             return limits, config_source
@@ -1433,6 +2318,23 @@ class RateLimiter:
             ),
         )
 
+    async def _resolve_cached_parent_limits(
+        self,
+        parent_id: str,
+        resource: str,
+        limits_override: list[Limit] | None,
+    ) -> tuple[list[Limit], str] | None:
+        """Resolve limits for a parent known only from the entity cache.
+
+        The cached parent is speculative, so a missing config is not an error
+        yet: returns None and lets ``_do_acquire`` re-resolve (and raise) once
+        the fetched entity confirms the cascade.
+        """
+        try:
+            return await self._resolve_limits(parent_id, resource, limits_override)
+        except ValidationError:
+            return None
+
     async def _resolve_on_unavailable(
         self,
         on_unavailable_param: OnUnavailable | None,
@@ -1860,9 +2762,14 @@ class RateLimiter:
         # Group buckets by entity_id to deduplicate shards (GHSA-76rv).
         # Each shard stores full undivided capacity; available tokens are
         # distributed across shards.
+        # Refill math runs vectorized when numpy is installed.
         entity_buckets: dict[str, list[BucketState]] = {}
-        for bucket in buckets:
+        entity_available: dict[str, int] = {}
+        for bucket, available in zip(buckets, available_tokens(buckets, now_ms), strict=True):
             entity_buckets.setdefault(bucket.entity_id, []).append(bucket)
+            entity_available[bucket.entity_id] = (
+                entity_available.get(bucket.entity_id, 0) + available
+            )
 
         entities: list[EntityCapacity] = []
         total_capacity = 0
@@ -1870,8 +2777,7 @@ class RateLimiter:
 
         for entity_id, entity_bucket_list in entity_buckets.items():
             capacity = entity_bucket_list[0].capacity
-            available = sum(calculate_available(b, now_ms) for b in entity_bucket_list)
-            available = min(available, capacity)
+            available = min(entity_available[entity_id], capacity)
 
             total_capacity += capacity
             total_available += available
@@ -218,6 +218,37 @@ def _display_benchmark_results(stats: dict[str, Any]) -> None:
     click.echo(f"  p95: {p95:.0f}ms")
     click.echo(f"  p99: {p99:.0f}ms")
 
+    histograms = stats.get("latency_histograms")
+    if histograms:
+        _display_latency_histograms(histograms)
+
+
+def _display_latency_histograms(data: dict[str, Any]) -> None:
+    """Display in-process latency histogram percentiles as a table.
+
+    Args:
+        data: Serialized ``HistogramSnapshot`` (``HistogramSnapshot.to_dict()``).
+    """
+    from zae_limiter.histogram import HistogramSnapshot
+
+    summary = HistogramSnapshot.from_dict(data).as_dict()
+    rows = [("", name, values) for name, values in summary["operations"].items()]
+    rows += [("DynamoDB ", name, values) for name, values in summary["dynamodb_calls"].items()]
+    if not rows:
+        return
+
+    click.echo("\nIn-process latency (ms):")
+    click.echo(
+        f"  {'Operation':<26} {'Count':>9} {'p50':>8} {'p90':>8} {'p99':>8} {'p99.9':>8} {'Max':>8}"
+    )
+    for prefix, name, values in rows:
+        click.echo(
+            f"  {prefix + name:<26} {values['count']:>9,} "
+            f"{values['p50_s'] * 1000:>8.1f} {values['p90_s'] * 1000:>8.1f} "
+            f"{values['p99_s'] * 1000:>8.1f} {values['p999_s'] * 1000:>8.1f} "
+            f"{values['max_s'] * 1000:>8.1f}"
+        )
+
 
 def _map_locust_stats(locust_json: dict[str, Any]) -> dict[str, Any]:
     """Map Locust /stats/requests JSON to standard benchmark stats format.
@@ -976,6 +1007,14 @@ def list_cmd(region: str | None) -> None:
     hidden=True,
     help="Run Locust in single-process Fargate mode",
 )
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Save results as JSON (Lambda mode only; render histograms with "
+    "'zae-limiter loadtest histograms')",
+)
 @click.argument("user_classes", nargs=-1)
 def run_cmd(
     name: str,
@@ -989,6 +1028,7 @@ def run_cmd(
     port: int,
     workers: int | None,
     standalone: bool,
+    output: Path | None,
     user_classes: tuple[str, ...],
 ) -> None:
     """Run a single load test execution.
@@ -998,6 +1038,8 @@ def run_cmd(
 
     Optionally pass User class names to run specific classes (default: all).
     """
+    if output is not None and (workers is not None or standalone):
+        raise click.UsageError("--output is only supported in Lambda mode")
     user_classes_str = ",".join(user_classes) or None
     if workers is not None:
         _benchmark_distributed(
@@ -1035,9 +1077,45 @@ def run_cmd(
             spawn_rate=spawn_rate,
             locustfile=locustfile,
             user_classes=user_classes_str,
+            output=output,
         )
 
 
+@loadtest.command("histograms")
+@click.argument("results", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "json", "prometheus"]),
+    default="table",
+    help="Output format (default: table)",
+)
+def histograms_cmd(results: Path, output_format: str) -> None:
+    """Render in-process latency histograms from saved load test results.
+
+    RESULTS is a file written by 'loadtest run --output' from a user class
+    with ``latency_histograms = True``, or a serialized HistogramSnapshot.
+    """
+    import json
+
+    from zae_limiter.histogram import HistogramSnapshot
+
+    data = json.loads(results.read_text())
+    data = data.get("latency_histograms", data)
+    if not data.get("operations") and not data.get("dynamodb_calls"):
+        raise click.ClickException(
+            f"No latency histograms in {results}. "
+            "Set latency_histograms = True on the RateLimiterUser class."
+        )
+
+    if output_format == "json":
+        click.echo(json.dumps(HistogramSnapshot.from_dict(data).as_dict(), indent=2))
+    elif output_format == "prometheus":
+        click.echo(HistogramSnapshot.from_dict(data).to_prometheus(), nl=False)
+    else:
+        _display_latency_histograms(data)
+
+
 @loadtest.command("tune")
 @click.option("--name", "-n", required=True, help="zae-limiter name")
 @click.option("--region", default=None, help="AWS region")
@@ -1194,6 +1272,7 @@ def _run_lambda(
     spawn_rate: int,
     locustfile: str,
     user_classes: str | None = None,
+    output: Path | None = None,
 ) -> None:
     """Run Lambda benchmark (single invocation)."""
     lambda_client, func_name, memory_mb, timeout_seconds = _get_lambda_client_and_config(
@@ -1235,6 +1314,12 @@ def _run_lambda(
 
     _display_benchmark_results(stats)
 
+    if output is not None:
+        import json
+
+        output.write_text(json.dumps(stats, indent=2))
+        click.echo(f"\nResults saved to {output}")
+
 
 def _tune_lambda(
     name: str,
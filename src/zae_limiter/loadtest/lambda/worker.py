@@ -206,7 +206,7 @@ def _run_headless(
         flush=True,
     )
 
-    return {
+    result: dict[str, Any] = {
         "total_requests": stats.num_requests,
         "total_failures": stats.num_failures,
         "avg_response_time": stats.avg_response_time,
@@ -218,6 +218,22 @@ def _run_headless(
         "requests_per_second": stats.total_rps,
         "failure_rate": stats.fail_ratio,
     }
+    histograms = _latency_histograms()
+    if histograms is not None:
+        result["latency_histograms"] = histograms
+    return result
+
+
+def _latency_histograms() -> dict[str, Any] | None:
+    """Serialized in-process latency histograms of the shared RateLimiterUser limiter.
+
+    Returns None unless the user class set ``latency_histograms = True``.
+    """
+    from zae_limiter.locust import RateLimiterUser
+
+    limiter = RateLimiterUser._limiter
+    snapshot = limiter.get_latency_histograms() if limiter is not None else None
+    return snapshot.to_dict() if snapshot is not None else None
 
 
 def _run_as_worker(
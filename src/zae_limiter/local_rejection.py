@@ -0,0 +1,204 @@
+"""Predictive local rejection from last-seen bucket state.
+
+Every speculative UpdateItem returns the bucket's full state: ``ALL_NEW`` on
+success, ``ALL_OLD`` on a failed condition. ``BucketMirror`` keeps the most
+recent of those states per (entity, resource) in a bounded LRU map. Before
+issuing the next speculative write, the limiter refills the mirrored state
+to "now" (``try_consume`` -> ``refill_bucket``) and, if the request still
+cannot be satisfied, rejects it locally with no DynamoDB round trip.
+
+Mirrored state only grows more pessimistic as other clients consume, so the
+main source of false rejections is tokens returned by other clients (release,
+rollback) or a raised limit. ``max_staleness_seconds`` bounds how long such a
+state is trusted. Multi-shard buckets are never mirrored, since one exhausted
+shard says nothing about the others.
+
+This module is shared by the async ``RateLimiter`` and the generated
+``SyncRateLimiter``; all state is guarded by a ``threading.Lock``.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from .bucket import would_refill_satisfy
+from .models import BucketState, LimitStatus
+
+
+@dataclass(frozen=True)
+class LocalRejectionConfig:
+    """Configuration for predictive local rejection.
+
+    Attributes:
+        max_staleness_seconds: How long a mirrored bucket state may be used
+            to reject requests locally. Older states are ignored and the
+            request goes to DynamoDB.
+        max_entries: Maximum number of (entity, resource) states mirrored.
+            Least recently used entries are evicted beyond this.
+    """
+
+    max_staleness_seconds: float = 1.0
+    max_entries: int = 10_000
+
+    def __post_init__(self) -> None:
+        if self.max_staleness_seconds <= 0:
+            raise ValueError("max_staleness_seconds must be positive")
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+
+@dataclass
+class LocalRejectionStats:
+    """Counters for predictive local rejection.
+
+    Attributes:
+        rejections: Requests rejected locally (no DynamoDB call)
+        passes: Checks where the mirrored state allowed the request through
+        stale: Checks skipped because the mirrored state was too old
+        evictions: Entries evicted to respect max_entries
+        size: Current number of mirrored entries
+    """
+
+    rejections: int = 0
+    passes: int = 0
+    stale: int = 0
+    evictions: int = 0
+    size: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return stats as a dictionary."""
+        return {
+            "rejections": self.rejections,
+            "passes": self.passes,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "size": self.size,
+        }
+
+
+@dataclass
+class _MirrorEntry:
+    """Last-seen state of one composite bucket."""
+
+    states: list[BucketState]
+    observed_at: float  # time.monotonic() when the state was recorded
+    parent_id: str | None = None  # set for cascade entities
+
+
+@dataclass
+class BucketMirror:
+    """Bounded in-process mirror of last-seen bucket states."""
+
+    config: LocalRejectionConfig = field(default_factory=LocalRejectionConfig)
+    _entries: OrderedDict[tuple[str, str], _MirrorEntry] = field(default_factory=OrderedDict)
+    _stats: LocalRejectionStats = field(default_factory=LocalRejectionStats)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(
+        self,
+        entity_id: str,
+        resource: str,
+        states: list[BucketState],
+        parent_id: str | None = None,
+        now: float | None = None,
+    ) -> None:
+        """Mirror the state returned by a speculative write.
+
+        Args:
+            entity_id: Entity owning the bucket
+            resource: Resource name
+            states: Bucket states from ALL_NEW or ALL_OLD
+            parent_id: Parent to check as well, for cascade entities
+            now: Monotonic timestamp (defaults to ``time.monotonic()``)
+        """
+        now = time.monotonic() if now is None else now
+        key = (entity_id, resource)
+        with self._lock:
+            self._entries[key] = _MirrorEntry(states=states, observed_at=now, parent_id=parent_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, entity_id: str, resource: str) -> None:
+        """Forget the mirrored state for (entity_id, resource)."""
+        with self._lock:
+            self._entries.pop((entity_id, resource), None)
+
+    def check(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+        now_ms: int,
+        now: float | None = None,
+    ) -> list[LimitStatus] | None:
+        """Predict whether a request would be rejected.
+
+        Refills the mirrored states of the entity (and its parent, for
+        cascade) to ``now_ms`` and checks ``consume`` against them.
+
+        Args:
+            entity_id: Entity to acquire capacity for
+            resource: Resource being accessed
+            consume: Amounts to consume by limit name
+            now_ms: Current epoch milliseconds for refill
+            now: Monotonic timestamp for staleness (defaults to ``time.monotonic()``)
+
+        Returns:
+            Statuses for RateLimitExceeded if the request is predicted to be
+            rejected, or None if it should go to DynamoDB.
+        """
+        now = time.monotonic() if now is None else now
+        entry = self._fresh_entry((entity_id, resource), now)
+        if entry is None:
+            return None
+        entries = [entry]
+        if entry.parent_id is not None:
+            parent_entry = self._fresh_entry((entry.parent_id, resource), now)
+            if parent_entry is not None:
+                entries.append(parent_entry)
+
+        statuses: list[LimitStatus] = []
+        rejected = False
+        for e in entries:
+            names = {s.limit_name for s in e.states}
+            if not all(name in names for name in consume if consume[name] > 0):
+                # Config changed since the state was seen: let DynamoDB decide
+                return None
+            would_help, e_statuses = would_refill_satisfy(e.states, consume, now_ms)
+            statuses.extend(e_statuses)
+            rejected = rejected or not would_help
+
+        with self._lock:
+            if rejected:
+                self._stats.rejections += 1
+            else:
+                self._stats.passes += 1
+        return statuses if rejected else None
+
+    @property
+    def stats(self) -> LocalRejectionStats:
+        """Snapshot of the mirror's counters."""
+        with self._lock:
+            return LocalRejectionStats(
+                rejections=self._stats.rejections,
+                passes=self._stats.passes,
+                stale=self._stats.stale,
+                evictions=self._stats.evictions,
+                size=len(self._entries),
+            )
+
+    def _fresh_entry(self, key: tuple[str, str], now: float) -> _MirrorEntry | None:
+        """Return the entry for ``key`` if it is within max_staleness_seconds."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if now - entry.observed_at > self.config.max_staleness_seconds:
+                del self._entries[key]
+                self._stats.stale += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry
@@ -20,6 +20,9 @@ Usage::
                 name="gpt-4/baseline",
             ):
                 pass  # simulate work
+
+Set ``phase_stats = True`` on the user class to also report where each
+acquire spent its time (see :class:`PhaseStatsListener`).
 """
 
 from __future__ import annotations
@@ -34,6 +37,7 @@ from locust.exception import StopTest
 
 from zae_limiter import SyncRateLimiter
 from zae_limiter.exceptions import RateLimitExceeded
+from zae_limiter.instrumentation import AcquirePhase, AcquireTrace, InstrumentationListener
 
 if TYPE_CHECKING:
     from collections.abc import Generator
@@ -70,6 +74,52 @@ def _configure_boto3_pool(max_connections: int = 1000) -> None:
     _configure_boto3_pool._configured = True  # type: ignore[attr-defined]
 
 
+class PhaseStatsListener(InstrumentationListener):
+    """Instrumentation listener that reports hot-path stats as Locust events.
+
+    Fires, for every acquire:
+
+    - **PHASE** — one event per timed phase (``fast_path``,
+      ``speculative_write``, ``slow_path``, ``commit_initial``, ...), named
+      after the phase. Time spent inside the ``with`` block is not reported.
+    - **PATH** — one event named after the path that decided the request
+      (``speculative``, ``slow``, ``fast_reject``, ...), with the acquire
+      latency as response time.
+
+    and **DYNAMODB** for every DynamoDB call, named after the operation
+    (with the error code appended for failed calls).
+    """
+
+    def __init__(self, request_event: Any) -> None:
+        """Initialize the listener.
+
+        Args:
+            request_event: Locust environment request event hook.
+        """
+        self.request_event = request_event
+
+    def _fire(self, request_type: str, name: str, seconds: float) -> None:
+        self.request_event.fire(
+            request_type=request_type,
+            name=name,
+            response_time=seconds * 1000,
+            response_length=0,
+            exception=None,
+            context={},
+        )
+
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        for phase, _, duration in trace.phases:
+            if phase is not AcquirePhase.HOLD:
+                self._fire("PHASE", phase.value, duration)
+        if trace.path is not None:
+            self._fire("PATH", trace.path.value, trace.acquire_s)
+
+    def on_dynamodb_call(self, operation: str, duration_s: float, error: str | None) -> None:
+        name = operation if error is None else f"{operation} ({error})"
+        self._fire("DYNAMODB", name, duration_s)
+
+
 class RateLimiterSession:
     """Instrumented wrapper around SyncRateLimiter.
 
@@ -633,6 +683,12 @@ class RateLimiterUser(User):
     stack_name: str
     region: str = "us-east-1"
 
+    # Report acquire phases, paths and DynamoDB calls (PhaseStatsListener)
+    phase_stats: bool = False
+
+    # Record in-process latency histograms (returned with headless Lambda results)
+    latency_histograms: bool = False
+
     # Shared SyncRateLimiter across all user instances (thread-safe with boto3)
     _limiter: SyncRateLimiter | None = None
 
@@ -658,9 +714,15 @@ class RateLimiterUser(User):
         # Lazily share a single SyncRateLimiter across all users
         if RateLimiterUser._limiter is None:
             _configure_boto3_pool()
+            options: dict[str, Any] = {}
+            if self.phase_stats:
+                options["listeners"] = [PhaseStatsListener(self.environment.events.request)]
+            if self.latency_histograms:
+                options["latency_histograms"] = True
             RateLimiterUser._limiter = SyncRateLimiter(
                 name=self.stack_name,
                 region=self.region,
+                **options,
             )
 
         self.client = RateLimiterSession(
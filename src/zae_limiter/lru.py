@@ -0,0 +1,163 @@
+"""Bounded LRU map for per-entity client-side caches.
+
+``Repository._entity_cache`` and ``ConfigCache._entity_limits`` are keyed by
+entity, so a process that sees millions of distinct entities would otherwise
+keep one entry per entity forever. ``LRUCache`` is a dict-like wrapper over
+``OrderedDict`` that evicts the least recently used entry beyond
+``max_entries`` and, optionally, drops entries older than ``ttl_seconds``.
+
+With neither bound set it behaves like a plain dict and skips recency
+tracking, so the default unbounded configuration costs nothing extra.
+
+Individual operations are safe to call from multiple threads (the sync
+repository's parallel mode), but compound read-modify-write sequences are
+not atomic; callers that need that hold their own lock.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Generic, TypeVar, cast, overload
+
+K = TypeVar("K")
+V = TypeVar("V")
+D = TypeVar("D")
+
+_MISSING: object = object()
+
+
+@dataclass
+class LRUCacheStats:
+    """Counters for an LRUCache.
+
+    Attributes:
+        size: Current number of entries
+        max_entries: Configured capacity (0 = unbounded)
+        evictions: Entries evicted to respect max_entries
+        expirations: Entries dropped because they outlived ttl_seconds
+    """
+
+    size: int = 0
+    max_entries: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return stats as a dictionary."""
+        return {
+            "size": self.size,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class LRUCache(Generic[K, V]):
+    """Dict-like map with an optional entry cap and per-entry TTL.
+
+    Args:
+        max_entries: Maximum number of entries; the least recently used entry
+            is evicted beyond this (None = unbounded)
+        ttl_seconds: Drop entries this long after they were written
+            (None = never expire)
+    """
+
+    __slots__ = ("max_entries", "ttl_seconds", "evictions", "expirations", "_data", "_track")
+
+    def __init__(self, max_entries: int | None = None, ttl_seconds: float | None = None) -> None:
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be positive")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self.expirations = 0
+        # With a TTL, values are stored as (value, expires_at) tuples
+        self._data: OrderedDict[K, object] = OrderedDict()
+        self._track = max_entries is not None
+
+    @overload
+    def get(self, key: K) -> V | None: ...
+
+    @overload
+    def get(self, key: K, default: V | D) -> V | D: ...
+
+    def get(self, key: K, default: object = None) -> object:
+        """Return the value for key (marking it recently used), else default."""
+        stored = self._data.get(key, _MISSING)
+        if stored is _MISSING:
+            return default
+        if self.ttl_seconds is not None:
+            value, expires_at = cast(tuple[V, float], stored)
+            if time.time() > expires_at:
+                if self._data.pop(key, None) is not None:
+                    self.expirations += 1
+                return default
+        else:
+            value = cast(V, stored)
+        if self._track:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                pass  # Removed concurrently; the value read above is still valid
+        return value
+
+    def __getitem__(self, key: K) -> V:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return cast(V, value)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        data = self._data
+        if self.ttl_seconds is not None:
+            data[key] = (value, time.time() + self.ttl_seconds)
+        else:
+            data[key] = value
+        if self._track:
+            data.move_to_end(key)
+            while len(data) > cast(int, self.max_entries):
+                try:
+                    data.popitem(last=False)
+                except KeyError:
+                    break
+                self.evictions += 1
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(cast(K, key), _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(list(self._data))
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        """Remove key and return its value, else default."""
+        stored = self._data.pop(key, _MISSING)
+        if stored is _MISSING:
+            return default
+        if self.ttl_seconds is not None:
+            return cast(tuple[V, float], stored)[0]
+        return cast(V, stored)
+
+    def values(self) -> list[V]:
+        """Return a snapshot of the stored values, including expired ones."""
+        if self.ttl_seconds is not None:
+            return [cast(tuple[V, float], stored)[0] for stored in list(self._data.values())]
+        return cast(list[V], list(self._data.values()))
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are kept."""
+        self._data.clear()
+
+    def get_stats(self) -> LRUCacheStats:
+        """Return current size and eviction counters."""
+        return LRUCacheStats(
+            size=len(self._data),
+            max_entries=self.max_entries or 0,
+            evictions=self.evictions,
+            expirations=self.expirations,
+        )
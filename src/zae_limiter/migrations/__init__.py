@@ -114,3 +114,4 @@ async def apply_migrations(
 from . import m_0_8_0_composite_limits as _  # noqa: F401, E402
 from . import m_0_9_0_bucket_pk as __  # noqa: F401, E402
 from . import m_0_10_0_lsi as ___  # noqa: F401, E402
+from . import m_0_11_0_gsi5 as ____  # noqa: F401, E402
@@ -0,0 +1,95 @@
+"""
+Migration 0.11.0: KEYS_ONLY bucket discovery index (GSI5).
+
+Bucket items used to carry GSI2PK/GSI2SK for resource aggregation. GSI2 has
+an ALL projection, so every token update on a bucket was also written to
+GSI2, roughly doubling the write cost of the hot path. Buckets now carry
+GSI5PK/GSI5SK instead. GSI5 is KEYS_ONLY, and DynamoDB skips index writes
+when an update touches no key or projected attribute, so token updates no
+longer write to any index. ``get_resource_buckets()`` queries GSI5 for keys
+and reads the composite items from the base table.
+
+GSI2 is unchanged and still serves usage snapshots and access tracking.
+
+GSI5 is added by the CloudFormation stack update. This migration re-keys
+existing bucket items: it sets the GSI5 keys and removes the GSI2 keys.
+New buckets are created with GSI5 keys only.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from botocore.exceptions import ClientError
+
+from .. import schema
+from . import Migration, register_migration
+
+if TYPE_CHECKING:
+    from ..repository import Repository
+
+
+async def migrate_to_0_11_0(repository: Repository) -> None:
+    """
+    Move existing bucket items from GSI2 to GSI5.
+
+    Note: GSI5 must be added via CloudFormation update before
+    running this migration. The migration only re-keys data.
+
+    Steps:
+    1. List namespaces from the namespace registry
+    2. Discover bucket keys per namespace through GSI4 (KEYS_ONLY)
+    3. SET GSI5PK/GSI5SK and REMOVE GSI2PK/GSI2SK on each bucket item
+    """
+    client = await repository._get_client()
+
+    for namespace in await repository.list_namespaces():
+        query_params: dict[str, Any] = {
+            "TableName": repository.table_name,
+            "IndexName": schema.GSI4_NAME,
+            "KeyConditionExpression": "GSI4PK = :ns AND begins_with(GSI4SK, :prefix)",
+            "ExpressionAttributeValues": {
+                ":ns": {"S": namespace["namespace_id"]},
+                ":prefix": {"S": schema.BUCKET_PREFIX},
+            },
+        }
+        while True:
+            response = await client.query(**query_params)
+            for item in response.get("Items", []):
+                try:
+                    namespace_id, entity_id, resource, shard_id = schema.parse_bucket_pk(
+                        item["PK"]["S"]
+                    )
+                except ValueError:
+                    continue
+                try:
+                    await client.update_item(
+                        TableName=repository.table_name,
+                        Key={"PK": item["PK"], "SK": item["SK"]},
+                        UpdateExpression=(
+                            "SET GSI5PK = :gsi5pk, GSI5SK = :gsi5sk REMOVE GSI2PK, GSI2SK"
+                        ),
+                        ConditionExpression="attribute_exists(PK)",
+                        ExpressionAttributeValues={
+                            ":gsi5pk": {"S": schema.gsi5_pk_resource(namespace_id, resource)},
+                            ":gsi5sk": {"S": schema.gsi5_sk_bucket(entity_id, shard_id)},
+                        },
+                    )
+                except ClientError as e:
+                    # Bucket expired or was deleted since discovery
+                    if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+            if "LastEvaluatedKey" not in response:
+                break
+            query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+# Register the migration
+register_migration(
+    Migration(
+        version="0.11.0",
+        description="KEYS_ONLY bucket discovery index (GSI5) - re-keys buckets off GSI2",
+        reversible=False,  # GSI changes are not easily reversible
+        migrate=migrate_to_0_11_0,
+    )
+)
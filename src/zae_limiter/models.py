@@ -393,7 +393,7 @@ class Entity:
         return self.parent_id is not None
 
 
-@dataclass
+@dataclass(slots=True)
 class LimitStatus:
     """
     Status of a specific limit check.
@@ -420,7 +420,7 @@ class LimitStatus:
         return max(0, self.requested - self.available)
 
 
-@dataclass
+@dataclass(slots=True)
 class BucketState:
     """
     Internal state of a token bucket.
@@ -632,6 +632,29 @@ class EntityCapacity:
     utilization_pct: float
 
 
+@dataclass
+class WarmupResult:
+    """What ``Repository.warm()`` loaded before traffic arrived.
+
+    Attributes:
+        connections: Connections opened (successful pings)
+        configs: Config cache slots filled, including confirmed-missing configs
+        entities: Entity META records found and cached
+        shard_counts: Bucket shard counts cached
+        requests: DynamoDB requests issued, including pings and retries
+        unprocessed: Keys still unprocessed after retries, left uncached
+        duration_s: Wall-clock time of the warm-up in seconds
+    """
+
+    connections: int = 0
+    configs: int = 0
+    entities: int = 0
+    shard_counts: int = 0
+    requests: int = 0
+    unprocessed: int = 0
+    duration_s: float = 0.0
+
+
 class LimitName:
     """Common limit name constants."""
 
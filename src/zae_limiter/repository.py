@@ -2,18 +2,28 @@
 
 import asyncio
 import logging
-import random
 import time
 import warnings
+from collections.abc import Collection
 from typing import TYPE_CHECKING, Any, cast
 
+from aiobotocore.config import AioConfig
 from aiobotocore.session import AioSession, get_session
 from botocore.exceptions import ClientError
 from ulid import ULID
 
 from . import schema
 from .config_cache import CacheStats, ConfigCache, ConfigSource
-from .exceptions import EntityExistsError, NamespaceStateError, ValidationError
+from .exceptions import (
+    EntityExistsError,
+    NamespaceStateError,
+    PartialWriteError,
+    ValidationError,
+)
+from .expression_plans import TTL_REMOVE, TTL_SET, TTL_UNCHANGED, ExpressionPlans
+from .instrumentation import InstrumentationListener, register_call_hooks
+from .io_stats import IOStats, IOStatsCollector, register_capacity_hooks
+from .lru import LRUCache
 from .models import (
     AuditAction,
     AuditEvent,
@@ -25,17 +35,24 @@ from .models import (
     StackOptions,
     UsageSnapshot,
     UsageSummary,
+    WarmupResult,
     validate_identifier,
     validate_resource,
 )
 from .naming import normalize_stack_name
 from .repository_protocol import SpeculativeFailureReason, SpeculativeResult
+from .shard_balance import ShardBalance
 
 if TYPE_CHECKING:
     from .repository_builder import RepositoryBuilder
 
 logger = logging.getLogger(__name__)
 
+# BatchGetItem attempts per chunk while DynamoDB returns UnprocessedKeys,
+# with exponential backoff starting at _BATCH_GET_BACKOFF_S between attempts
+_BATCH_GET_MAX_ATTEMPTS = 5
+_BATCH_GET_BACKOFF_S = 0.05
+
 
 class Repository:
     """Async DynamoDB repository for rate limiter data.
@@ -122,15 +139,27 @@ class Repository:
         )
 
         # Config cache for resolve_limits() (ADR-122)
-        self._config_cache = ConfigCache(
-            ttl_seconds=config_cache_ttl, namespace_id=self._namespace_id
-        )
         self._config_cache_ttl = config_cache_ttl
+        # Refresh-ahead for the config cache (set by builder; 0 = disabled)
+        self._config_cache_refresh_ahead = 0.0
+        self._config_cache_max_staleness = 0.0
+        # Cap on cached entity configs (set by builder; None = unbounded)
+        self._config_cache_max_entries: int | None = None
+        self._config_cache = self._new_config_cache(self._namespace_id)
 
         # Entity metadata cache for parallel cascade writes (issue #318)
         # Value: (cascade, parent_id, {resource: shard_count})
         # cascade/parent_id are immutable; shard_count updated on doubling
-        self._entity_cache: dict[tuple[str, str], tuple[bool, str | None, dict[str, int]]] = {}
+        # Unbounded by default; the builder can cap it (LRU) and add a TTL
+        self._entity_cache: LRUCache[tuple[str, str], tuple[bool, str | None, dict[str, int]]] = (
+            LRUCache()
+        )
+
+        # Last-seen shard states for load-aware shard selection
+        self._shard_balance = ShardBalance()
+
+        # Expression templates for bucket writes, keyed by limit names
+        self._expression_plans = ExpressionPlans()
 
         # Cached on_unavailable from system config (issue #366)
         # Once loaded, used as fallback when DynamoDB is unreachable
@@ -139,6 +168,18 @@ class Repository:
         # Namespace resolution cache: shared across scoped repos
         self._namespace_cache: dict[str, str] = {}
 
+        # Instrumentation listeners notified of each DynamoDB call (opt-in),
+        # with the number of add_listener() calls for each (by identity)
+        self._listeners: list[InstrumentationListener] = []
+        self._listener_users: dict[int, int] = {}
+
+        # Consumed-capacity totals (opt-in; None = not requested)
+        self._io_stats: IOStatsCollector | None = None
+
+        # botocore Config options for the DynamoDB client: pool size, timeouts,
+        # TCP keepalive, retries (set by builder; empty = botocore defaults)
+        self._client_config: dict[str, Any] = {}
+
     @classmethod
     def builder(cls) -> "RepositoryBuilder":
         """Create a RepositoryBuilder for fluent configuration.
@@ -298,9 +339,74 @@ class Repository:
                 "dynamodb",
                 region_name=self.region,
                 endpoint_url=self.endpoint_url,
+                config=AioConfig(**self._client_config) if self._client_config else None,
             ).__aenter__()
+            if self._listeners:
+                register_call_hooks(self._client, self._listeners)
+            if self._io_stats is not None:
+                register_capacity_hooks(self._client, self._io_stats)
         return self._client
 
+    def add_listener(self, listener: InstrumentationListener) -> None:
+        """Notify ``listener`` of the duration of every DynamoDB call.
+
+        Listeners are shared with scoped repositories created by
+        ``namespace()``, which use the same client. Adding a listener that is
+        already registered (e.g. by another limiter on this repository) does
+        not notify it twice; it stays registered until each add is matched by
+        ``remove_listener()``.
+
+        Args:
+            listener: Receives ``on_dynamodb_call(operation, duration_s, error)``
+        """
+        key = id(listener)
+        if key in self._listener_users:
+            self._listener_users[key] += 1
+            return
+        self._listener_users[key] = 1
+        self._listeners.append(listener)
+        if self._client is not None:
+            register_call_hooks(self._client, self._listeners)
+
+    def remove_listener(self, listener: InstrumentationListener) -> None:
+        """Undo one ``add_listener()`` call; a no-op for unknown listeners.
+
+        Args:
+            listener: Listener passed to ``add_listener()``
+        """
+        key = id(listener)
+        users = self._listener_users.get(key, 0)
+        if users > 1:
+            self._listener_users[key] = users - 1
+        elif users == 1:
+            del self._listener_users[key]
+            # In place: the client's call hooks read this list on every call
+            self._listeners[:] = [other for other in self._listeners if other is not listener]
+
+    def enable_io_stats(self) -> None:
+        """Request and accumulate consumed capacity on every DynamoDB call.
+
+        Calls are sent with ``ReturnConsumedCapacity="INDEXES"`` and the
+        reported capacity is totalled per operation and per table/index.
+        Totals are shared with scoped repositories created by
+        ``namespace()`` afterwards. Calling this again keeps the existing totals.
+        """
+        if self._io_stats is None:
+            self._io_stats = IOStatsCollector()
+        if self._client is not None:
+            register_capacity_hooks(self._client, self._io_stats)
+
+    def get_io_stats(self) -> IOStats | None:
+        """Get consumed-capacity totals, or None if ``enable_io_stats()`` was not called."""
+        if self._io_stats is None:
+            return None
+        return self._io_stats.get_stats()
+
+    def reset_io_stats(self) -> None:
+        """Clear consumed-capacity totals (no-op if not enabled)."""
+        if self._io_stats is not None:
+            self._io_stats.reset()
+
     async def namespace(
         self,
         name: str,
@@ -352,6 +458,7 @@ class Repository:
         scoped._stack_options = None  # scoped repos don't manage infrastructure
         scoped._session = self._session
         scoped._client = self._client
+        scoped._client_config = self._client_config
         scoped._caller_identity_arn = self._caller_identity_arn
         scoped._caller_identity_fetched = self._caller_identity_fetched
         scoped._audit_retention_days_cache = self._audit_retention_days_cache
@@ -360,12 +467,18 @@ class Repository:
         scoped._is_scoped = True
         scoped._capabilities = self._capabilities
         scoped._config_cache_ttl = self._config_cache_ttl
-        scoped._config_cache = ConfigCache(
-            ttl_seconds=self._config_cache_ttl, namespace_id=namespace_id
-        )
+        scoped._config_cache_refresh_ahead = self._config_cache_refresh_ahead
+        scoped._config_cache_max_staleness = self._config_cache_max_staleness
+        scoped._config_cache_max_entries = self._config_cache_max_entries
+        scoped._config_cache = scoped._new_config_cache(namespace_id)
         # Share mutable caches
         scoped._entity_cache = self._entity_cache
+        scoped._shard_balance = self._shard_balance
+        scoped._expression_plans = self._expression_plans
         scoped._namespace_cache = self._namespace_cache
+        scoped._listeners = self._listeners
+        scoped._listener_users = self._listener_users
+        scoped._io_stats = self._io_stats
         # Scoped repos start with no on_unavailable cache (each namespace
         # has its own system config)
         scoped._on_unavailable_cache = None
@@ -381,10 +494,11 @@ class Repository:
         return scoped
 
     async def close(self) -> None:
-        """Close the DynamoDB client.
+        """Close the DynamoDB client and stop background config refreshes.
 
-        No-op for scoped repos (created via ``namespace()``).
+        The client is left open for scoped repos (created via ``namespace()``).
         """
+        self._config_cache.close()
         if self._is_scoped:
             return
         if self._client is not None:
@@ -1120,11 +1234,19 @@ class Repository:
             },
         )
 
+    def _new_config_cache(self, namespace_id: str) -> ConfigCache:
+        """Create a config cache for a namespace using this repository's settings."""
+        return ConfigCache(
+            ttl_seconds=self._config_cache_ttl,
+            namespace_id=namespace_id,
+            refresh_ahead_seconds=self._config_cache_refresh_ahead,
+            max_staleness_seconds=self._config_cache_max_staleness,
+            max_entries=self._config_cache_max_entries,
+        )
+
     def _reinitialize_config_cache(self, namespace_id: str) -> None:
         """Reinitialize the config cache with a new namespace_id."""
-        self._config_cache = ConfigCache(
-            ttl_seconds=self._config_cache_ttl, namespace_id=namespace_id
-        )
+        self._config_cache = self._new_config_cache(namespace_id)
 
     # -------------------------------------------------------------------------
     # Version management (used by builder; replaces limiter-level version check)
@@ -1622,17 +1744,41 @@ class Repository:
             DynamoDB BatchGetItem supports up to 100 items per request.
             The META key counts toward that limit.
         """
-        client = await self._get_client()
+        entities, buckets = await self.batch_get_entities_and_buckets([entity_id], bucket_keys)
+        return entities.get(entity_id), buckets
 
-        # Build all keys: META key + composite bucket keys
-        meta_key = {
-            "PK": {"S": schema.pk_entity(self._namespace_id, entity_id)},
-            "SK": {"S": schema.sk_meta()},
-        }
+    async def batch_get_entities_and_buckets(
+        self,
+        entity_ids: list[str],
+        bucket_keys: list[tuple[str, str]],
+    ) -> tuple[dict[str, Entity], dict[tuple[str, str, str], BucketState]]:
+        """
+        Fetch metadata for many entities and composite buckets in one pass.
+
+        META and bucket keys share BatchGetItem requests, chunked by 100.
+        Used by ``acquire_many()`` to read every entity and bucket a batch of
+        requests touches without one round trip per entity.
+
+        Args:
+            entity_ids: Entities whose META records to include
+            bucket_keys: List of (entity_id, resource) for composite buckets
 
-        request_keys = [meta_key]
-        unique_bucket_keys = list(set(bucket_keys))
-        for eid, resource in unique_bucket_keys:
+        Returns:
+            Tuple of (entities, bucket_dict). ``entities`` maps entity_id to
+            Entity and omits entities without a META record; bucket_dict maps
+            (entity_id, resource, limit_name) to BucketState.
+        """
+        client = await self._get_client()
+
+        unique_entity_ids = list(dict.fromkeys(entity_ids))
+        request_keys = [
+            {
+                "PK": {"S": schema.pk_entity(self._namespace_id, eid)},
+                "SK": {"S": schema.sk_meta()},
+            }
+            for eid in unique_entity_ids
+        ]
+        for eid, resource in dict.fromkeys(bucket_keys):
             request_keys.append(
                 {
                     "PK": {"S": schema.pk_bucket(self._namespace_id, eid, resource, 0)},
@@ -1640,7 +1786,7 @@ class Repository:
                 }
             )
 
-        entity: Entity | None = None
+        entities: dict[str, Entity] = {}
         buckets: dict[tuple[str, str, str], BucketState] = {}
 
         # BatchGetItem in chunks of 100
@@ -1660,20 +1806,41 @@ class Repository:
                 sk = item.get("SK", {}).get("S", "")
                 if sk == schema.sk_meta():
                     entity = self._deserialize_entity(item)
+                    entities[entity.id] = entity
                 elif sk == schema.sk_state():
                     for bucket in self._deserialize_composite_bucket(item):
                         key = (bucket.entity_id, bucket.resource, bucket.limit_name)
                         buckets[key] = bucket
 
         # Populate entity cache transparently (issue #318)
-        cache_key = (self._namespace_id, entity_id)
-        existing_shards = self._entity_cache.get(cache_key, (False, None, {}))[2]
-        if entity is not None:
-            self._entity_cache[cache_key] = (entity.cascade, entity.parent_id, existing_shards)
-        else:
-            self._entity_cache[cache_key] = (False, None, existing_shards)
+        for eid in unique_entity_ids:
+            cache_key = (self._namespace_id, eid)
+            existing_shards = self._entity_cache.get(cache_key, (False, None, {}))[2]
+            meta = entities.get(eid)
+            if meta is not None:
+                self._entity_cache[cache_key] = (meta.cascade, meta.parent_id, existing_shards)
+            else:
+                self._entity_cache[cache_key] = (False, None, existing_shards)
 
-        return entity, buckets
+        return entities, buckets
+
+    def get_cached_parent(self, entity_id: str) -> str | None:
+        """
+        Get an entity's cascade parent from the entity cache, if known.
+
+        Populated by entity reads (get_entity, batch META fetches). Returns
+        None on a cache miss or when the entity does not cascade.
+
+        Args:
+            entity_id: Entity to look up
+
+        Returns:
+            Parent ID if the entity is cached with cascade enabled, else None
+        """
+        entry = self._entity_cache.get((self._namespace_id, entity_id))
+        if entry is None or not entry[0]:
+            return None
+        return entry[1]
 
     async def batch_get_configs(
         self,
@@ -1734,16 +1901,145 @@ class Repository:
                 pk = item.get("PK", {}).get("S", "")
                 sk = item.get("SK", {}).get("S", "")
                 if pk and sk:
-                    limits = self._deserialize_composite_limits(item)
-                    ou_attr = item.get("on_unavailable", {})
-                    ou_str = ou_attr.get("S") if ou_attr else None
-                    on_unavailable: OnUnavailableAction | None = (
-                        cast(OnUnavailableAction, ou_str) if ou_str else None
-                    )
-                    result[(pk, sk)] = (limits, on_unavailable)
+                    result[(pk, sk)] = self._deserialize_config(item)
 
         return result
 
+    async def warm(
+        self,
+        entity_ids: Collection[str] = (),
+        resources: Collection[str] = (),
+        connections: int = 1,
+    ) -> WarmupResult:
+        """
+        Prefetch configs and entity metadata before traffic arrives.
+
+        Opens ``connections`` pooled connections with concurrent pings, then
+        reads, in concurrent BatchGetItem calls of up to 100 keys:
+
+        - system, resource and entity configs for every entity and resource,
+          filling the config cache
+        - each entity's META record (cascade, parent_id) and the shard-0
+          bucket (shard_count) of each entity and resource, filling the
+          entity cache
+
+        The first acquires after a deploy or cold start then skip config
+        resolution and, for cascading entities, take the parallel speculative
+        path instead of paying for TLS setup and cache misses.
+
+        Args:
+            entity_ids: Entities expected to receive traffic
+            resources: Resources those entities will acquire
+            connections: Connections to open; concurrent requests beyond the
+                client's pool size (see ``RepositoryBuilder.connection_pool()``)
+                reuse connections
+
+        Returns:
+            WarmupResult with what was loaded and how long it took
+        """
+        start = time.perf_counter()
+        entity_id_list = list(dict.fromkeys(entity_ids))
+        resource_list = list(dict.fromkeys(resources))
+
+        pings = await asyncio.gather(*[self.ping() for _ in range(connections)])
+
+        config_keys = self._config_cache.prefetch_keys(entity_id_list, resource_list)
+        request_keys = [{"PK": {"S": pk}, "SK": {"S": sk}} for pk, sk in config_keys]
+        for eid in entity_id_list:
+            request_keys.append(
+                {
+                    "PK": {"S": schema.pk_entity(self._namespace_id, eid)},
+                    "SK": {"S": schema.sk_meta()},
+                }
+            )
+            for resource in resource_list:
+                request_keys.append(
+                    {
+                        "PK": {"S": schema.pk_bucket(self._namespace_id, eid, resource, 0)},
+                        "SK": {"S": schema.sk_state()},
+                    }
+                )
+        chunks = [request_keys[i : i + 100] for i in range(0, len(request_keys), 100)]
+
+        responses = await asyncio.gather(*[self._batch_get_chunk(chunk) for chunk in chunks])
+
+        # Keys DynamoDB never returned are unknown, not missing: leave them
+        # out of both caches so the first acquire reads them normally
+        unread: set[tuple[str, str]] = set()
+        for _, unprocessed, _ in responses:
+            for key in unprocessed:
+                unread.add((key["PK"]["S"], key["SK"]["S"]))
+
+        config_key_set = set(config_keys)
+        configs: dict[tuple[str, str], tuple[list[Limit], OnUnavailableAction | None]] = {}
+        entities: dict[str, Entity] = {}
+        shard_counts: dict[str, dict[str, int]] = {}
+        for items, _, _ in responses:
+            for item in items:
+                pk = item.get("PK", {}).get("S", "")
+                sk = item.get("SK", {}).get("S", "")
+                if (pk, sk) in config_key_set:
+                    configs[(pk, sk)] = self._deserialize_config(item)
+                elif sk == schema.sk_meta():
+                    entity = self._deserialize_entity(item)
+                    entities[entity.id] = entity
+                elif sk == schema.sk_state():
+                    eid = item.get("entity_id", {}).get("S", "")
+                    resource = item.get("resource", {}).get("S", "")
+                    count = int(item.get("shard_count", {}).get("N", "1"))
+                    shard_counts.setdefault(eid, {})[resource] = count
+        primed = await self._config_cache.prime(entity_id_list, resource_list, configs, unread)
+
+        for eid in entity_id_list:
+            cache_key = (self._namespace_id, eid)
+            if (schema.pk_entity(self._namespace_id, eid), schema.sk_meta()) in unread:
+                continue
+            existing_shards = self._entity_cache.get(cache_key, (False, None, {}))[2]
+            shards = {**existing_shards, **shard_counts.get(eid, {})}
+            meta = entities.get(eid)
+            if meta is not None:
+                self._entity_cache[cache_key] = (meta.cascade, meta.parent_id, shards)
+            else:
+                self._entity_cache[cache_key] = (False, None, shards)
+
+        if unread:
+            logger.warning("warm() left %d keys unread after retrying UnprocessedKeys", len(unread))
+
+        return WarmupResult(
+            connections=sum(pings),
+            configs=primed,
+            entities=len(entities),
+            shard_counts=sum(len(counts) for counts in shard_counts.values()),
+            requests=connections + sum(calls for _, _, calls in responses),
+            unprocessed=len(unread),
+            duration_s=time.perf_counter() - start,
+        )
+
+    async def _batch_get_chunk(
+        self, keys: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], int]:
+        """
+        Read up to 100 items with BatchGetItem, retrying UnprocessedKeys.
+
+        Returns:
+            Tuple of (items, keys still unprocessed, BatchGetItem calls made)
+        """
+        client = await self._get_client()
+        items: list[dict[str, Any]] = []
+        pending = keys
+        calls = 0
+        while pending and calls < _BATCH_GET_MAX_ATTEMPTS:
+            if calls:
+                await asyncio.sleep(_BATCH_GET_BACKOFF_S * 2 ** (calls - 1))
+            response = await client.batch_get_item(
+                RequestItems={self.table_name: {"Keys": pending}}
+            )
+            calls += 1
+            items.extend(response.get("Responses", {}).get(self.table_name, []))
+            unprocessed = response.get("UnprocessedKeys", {}).get(self.table_name, {})
+            pending = unprocessed.get("Keys", [])
+        return items, pending, calls
+
     async def get_or_create_bucket(
         self,
         entity_id: str,
@@ -1890,8 +2186,6 @@ class Repository:
             "entity_id": {"S": entity_id},
             "resource": {"S": resource},
             schema.BUCKET_FIELD_RF: {"N": str(now_ms)},
-            "GSI2PK": {"S": schema.gsi2_pk_resource(self._namespace_id, resource)},
-            "GSI2SK": {"S": schema.gsi2_sk_bucket(entity_id, shard_id)},
             "cascade": {"BOOL": cascade},
             # GSI3: bucket discovery by entity
             "GSI3PK": {"S": schema.gsi3_pk_entity(self._namespace_id, entity_id)},
@@ -1899,6 +2193,9 @@ class Repository:
             # GSI4: namespace-scoped item discovery
             "GSI4PK": {"S": self._namespace_id},
             "GSI4SK": {"S": schema.gsi4_sk_bucket(entity_id, resource, shard_id)},
+            # GSI5: bucket discovery by resource (KEYS_ONLY, skipped by token writes)
+            "GSI5PK": {"S": schema.gsi5_pk_resource(self._namespace_id, resource)},
+            "GSI5SK": {"S": schema.gsi5_sk_bucket(entity_id, shard_id)},
             "shard_count": {"N": str(shard_count)},
         }
         if parent_id is not None:
@@ -1950,6 +2247,8 @@ class Repository:
                 "TableName": self.table_name,
                 "Item": item,
                 "ConditionExpression": "attribute_not_exists(PK)",
+                # A create race returns the winner's item for the retry
+                "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
             }
         }
 
@@ -1982,59 +2281,32 @@ class Repository:
                 - >0: SET ttl to (now + ttl_seconds)
             shard_id: Shard index for this bucket (default 0)
         """
-        add_parts: list[str] = []
-        set_parts: list[str] = ["#rf = :now"]
-        remove_parts: list[str] = []
-        attr_names: dict[str, str] = {"#rf": schema.BUCKET_FIELD_RF}
         attr_values: dict[str, Any] = {
             ":now": {"N": str(now_ms)},
             ":expected_rf": {"N": str(expected_rf)},
         }
-
-        # Handle TTL
-        if ttl_seconds is not None:
-            attr_names["#ttl"] = "ttl"
-            if ttl_seconds > 0:
-                # SET ttl to new value
-                set_parts.append("#ttl = :ttl_val")
-                attr_values[":ttl_val"] = {"N": str(schema.calculate_ttl(now_ms, ttl_seconds))}
-            else:
-                # REMOVE ttl (entity has custom limits, should persist)
-                remove_parts.append("#ttl")
-
-        condition_parts: list[str] = ["#rf = :expected_rf"]
-
-        for name in consumed:
+        if ttl_seconds is None:
+            ttl_mode = TTL_UNCHANGED
+        elif ttl_seconds > 0:
+            ttl_mode = TTL_SET
+            attr_values[":ttl_val"] = {"N": str(schema.calculate_ttl(now_ms, ttl_seconds))}
+        else:
+            # REMOVE ttl (entity has custom limits, should persist)
+            ttl_mode = TTL_REMOVE
+
+        # Guard against concurrent speculative consumption draining tk.
+        # Speculative writes modify tk without touching rf, so the rf lock
+        # alone can't detect them. Ensure tk can absorb the net decrease.
+        names = tuple(sorted(consumed))
+        floors = tuple(consumed[n] > refill_amounts.get(n, 0) for n in names)
+        plan = self._expression_plans.normal(names, floors, ttl_mode)
+        for name, (tk_val, tc_val, floor_val) in plan.limits:
             c = consumed[name]
-            r = refill_amounts.get(name, 0)
-            tk_delta = r - c  # refill minus consumption
-
-            tk_alias = f"#b_{name}_tk"
-            tc_alias = f"#b_{name}_tc"
-            tk_val = f":b_{name}_tk_delta"
-            tc_val = f":b_{name}_tc_delta"
-
-            attr_names[tk_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TK)
-            attr_names[tc_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TC)
+            tk_delta = refill_amounts.get(name, 0) - c  # refill minus consumption
             attr_values[tk_val] = {"N": str(tk_delta)}
             attr_values[tc_val] = {"N": str(c)}
-
-            add_parts.append(f"{tk_alias} {tk_val}")
-            add_parts.append(f"{tc_alias} {tc_val}")
-
-            # Guard against concurrent speculative consumption draining tk.
-            # Speculative writes modify tk without touching rf, so the rf lock
-            # alone can't detect them. Ensure tk can absorb the net decrease.
-            floor = max(0, c - r)
-            if floor > 0:
-                floor_val = f":b_{name}_tk_floor"
-                attr_values[floor_val] = {"N": str(floor)}
-                condition_parts.append(f"{tk_alias} >= {floor_val}")
-
-        # Build update expression
-        update_expr = f"SET {', '.join(set_parts)} ADD {', '.join(add_parts)}"
-        if remove_parts:
-            update_expr += f" REMOVE {', '.join(remove_parts)}"
+            if floor_val:
+                attr_values[floor_val] = {"N": str(-tk_delta)}
 
         return {
             "Update": {
@@ -2045,10 +2317,12 @@ class Repository:
                     },
                     "SK": {"S": schema.sk_state()},
                 },
-                "UpdateExpression": update_expr,
-                "ConditionExpression": " AND ".join(condition_parts),
-                "ExpressionAttributeNames": attr_names,
+                "UpdateExpression": plan.update_expression,
+                "ConditionExpression": plan.condition_expression,
+                "ExpressionAttributeNames": dict(plan.names),
                 "ExpressionAttributeValues": attr_values,
+                # A lost optimistic lock returns the current state for the retry
+                "ReturnValuesOnConditionCheckFailure": "ALL_OLD",
             }
         }
 
@@ -2065,31 +2339,14 @@ class Repository:
         ADD tk:(-consumed), tc:consumed for each limit.
         CONDITION: tk >= consumed per limit (prevent negative on acquire).
         """
-        add_parts: list[str] = []
-        condition_parts: list[str] = []
-        attr_names: dict[str, str] = {}
+        plan = self._expression_plans.retry(tuple(sorted(consumed)))
         attr_values: dict[str, Any] = {}
-
-        for name in consumed:
+        for name, (tk_neg_val, tc_val, tk_threshold) in plan.limits:
             c = consumed[name]
-            tk_alias = f"#b_{name}_tk"
-            tc_alias = f"#b_{name}_tc"
-            tk_neg_val = f":b_{name}_tk_neg"
-            tc_val = f":b_{name}_tc_delta"
-            tk_threshold = f":b_{name}_tk_min"
-
-            attr_names[tk_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TK)
-            attr_names[tc_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TC)
+            amount = {"N": str(c)}
             attr_values[tk_neg_val] = {"N": str(-c)}
-            attr_values[tc_val] = {"N": str(c)}
-            attr_values[tk_threshold] = {"N": str(c)}
-
-            add_parts.append(f"{tk_alias} {tk_neg_val}")
-            add_parts.append(f"{tc_alias} {tc_val}")
-            condition_parts.append(f"{tk_alias} >= {tk_threshold}")
-
-        update_expr = f"ADD {', '.join(add_parts)}"
-        condition_expr = " AND ".join(condition_parts)
+            attr_values[tc_val] = amount
+            attr_values[tk_threshold] = amount
 
         return {
             "Update": {
@@ -2100,9 +2357,9 @@ class Repository:
                     },
                     "SK": {"S": schema.sk_state()},
                 },
-                "UpdateExpression": update_expr,
-                "ConditionExpression": condition_expr,
-                "ExpressionAttributeNames": attr_names,
+                "UpdateExpression": plan.update_expression,
+                "ConditionExpression": plan.condition_expression,
+                "ExpressionAttributeNames": dict(plan.names),
                 "ExpressionAttributeValues": attr_values,
             }
         }
@@ -2119,48 +2376,65 @@ class Repository:
         Unconditional ADD for post-hoc correction. Can go negative by design.
         Positive delta = consumed more (subtract tokens, add to counter).
         Negative delta = consumed less (add tokens, subtract from counter).
-        """
-        add_parts: list[str] = []
-        attr_names: dict[str, str] = {}
-        attr_values: dict[str, Any] = {}
 
-        for name, delta in deltas.items():
-            if delta == 0:
-                continue
-            tk_alias = f"#b_{name}_tk"
-            tc_alias = f"#b_{name}_tc"
-            tk_val = f":b_{name}_tk_delta"
-            tc_val = f":b_{name}_tc_delta"
+        Writes to a shard other than 0 require the item to exist: a shard
+        merge may have deleted it and folded its balance into another shard,
+        and an ADD would recreate it as a partial item. ``write_each()``
+        sends such a write on to the shard the balance was folded into.
+        """
+        names = tuple(sorted(name for name, delta in deltas.items() if delta != 0))
+        if not names:
+            # Nothing to adjust
+            return {}
 
-            attr_names[tk_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TK)
-            attr_names[tc_alias] = schema.bucket_attr(name, schema.BUCKET_FIELD_TC)
+        plan = self._expression_plans.adjust(names, require_exists=shard_id > 0)
+        attr_values: dict[str, Any] = {}
+        for name, (tk_val, tc_val) in plan.limits:
+            delta = deltas[name]
             # delta > 0 means consumed more: subtract from tk, add to tc
             attr_values[tk_val] = {"N": str(-delta)}
             attr_values[tc_val] = {"N": str(delta)}
 
-            add_parts.append(f"{tk_alias} {tk_val}")
-            add_parts.append(f"{tc_alias} {tc_val}")
+        update: dict[str, Any] = {
+            "TableName": self.table_name,
+            "Key": {
+                "PK": {"S": schema.pk_bucket(self._namespace_id, entity_id, resource, shard_id)},
+                "SK": {"S": schema.sk_state()},
+            },
+            "UpdateExpression": plan.update_expression,
+            "ExpressionAttributeNames": dict(plan.names),
+            "ExpressionAttributeValues": attr_values,
+        }
+        if plan.condition_expression is not None:
+            update["ConditionExpression"] = plan.condition_expression
+        return {"Update": update}
 
-        if not add_parts:
-            # Nothing to adjust
-            return {}
+    def condition_failure_buckets(self, exc: Exception) -> dict[int, list[BucketState] | None]:
+        """Stored bucket states returned by a write whose condition failed.
 
-        update_expr = f"ADD {', '.join(add_parts)}"
+        A single-item write carries the ALL_OLD item in the error response; a
+        cancelled transaction carries one per ConditionalCheckFailed reason.
+        """
+        response = getattr(exc, "response", None) or {}
+        code = response.get("Error", {}).get("Code")
+        reasons: list[dict[str, Any]]
+        if code == "ConditionalCheckFailedException":
+            reasons = [{"Code": "ConditionalCheckFailed", "Item": response.get("Item")}]
+        elif code == "TransactionCanceledException":
+            reasons = response.get("CancellationReasons", [])
+        else:
+            return {}
 
-        return {
-            "Update": {
-                "TableName": self.table_name,
-                "Key": {
-                    "PK": {
-                        "S": schema.pk_bucket(self._namespace_id, entity_id, resource, shard_id)
-                    },
-                    "SK": {"S": schema.sk_state()},
-                },
-                "UpdateExpression": update_expr,
-                "ExpressionAttributeNames": attr_names,
-                "ExpressionAttributeValues": attr_values,
-            }
-        }
+        buckets: dict[int, list[BucketState] | None] = {}
+        for index, reason in enumerate(reasons):
+            if reason.get("Code") != "ConditionalCheckFailed":
+                continue
+            item = reason.get("Item")
+            if isinstance(item, dict) and item:
+                buckets[index] = self._deserialize_composite_bucket(item)
+            else:
+                buckets[index] = None
+        return buckets
 
     async def transact_write(self, items: list[dict[str, Any]]) -> None:
         """Execute a write, using single-item API when possible to halve WCU cost."""
@@ -2187,20 +2461,91 @@ class Repository:
 
         Each item is dispatched as a single PutItem, UpdateItem, or DeleteItem
         call. Use for unconditional writes (e.g., ADD adjustments) where partial
-        success is acceptable.
+        success is acceptable. Multiple items are dispatched concurrently, so a
+        cascade adjustment costs one round trip instead of one per item.
+
+        Raises:
+            PartialWriteError: If any of several items fails. Every other item
+                is still attempted. A single item's error propagates unchanged.
         """
         if not items:
             return
 
         client = await self._get_client()
 
-        for item in items:
-            if "Put" in item:
-                await client.put_item(**item["Put"])
-            elif "Update" in item:
+        if len(items) == 1:
+            await self._write_one(client, items[0])
+            return
+
+        outcomes = await asyncio.gather(*[self._write_one_safe(client, item) for item in items])
+        failures = {i: outcome for i, outcome in enumerate(outcomes) if outcome is not None}
+        if failures:
+            raise PartialWriteError(failures, len(items)) from next(iter(failures.values()))
+
+    async def _write_one(self, client: Any, item: dict[str, Any]) -> None:
+        """Dispatch one write_each() item as a single-item API call."""
+        if "Put" in item:
+            await client.put_item(**item["Put"])
+        elif "Update" in item:
+            try:
                 await client.update_item(**item["Update"])
-            elif "Delete" in item:
-                await client.delete_item(**item["Delete"])
+            except ClientError as e:
+                folded = self._fold_retired_adjust(item["Update"], e)
+                if folded is None:
+                    raise
+                await self._write_one(client, {"Update": folded})
+        elif "Delete" in item:
+            await client.delete_item(**item["Delete"])
+
+    def _fold_retired_adjust(
+        self, update: dict[str, Any], exc: ClientError
+    ) -> dict[str, Any] | None:
+        """Retarget an adjustment whose shard was retired by a merge.
+
+        Halving shard_count to ``n`` folds shard ``s`` into ``s % n``, which is
+        ``s`` without its highest set bit. Repeated merges are followed one
+        write at a time down to shard 0, which always exists.
+
+        Returns:
+            The update for the partner shard, or None if ``exc`` is not a
+            missing-shard failure of a ``build_composite_adjust()`` write.
+        """
+        if exc.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+            return None
+        if update.get("ConditionExpression") != "attribute_exists(PK)":
+            return None
+        try:
+            namespace_id, entity_id, resource, shard_id = schema.parse_bucket_pk(
+                update["Key"]["PK"]["S"]
+            )
+        except ValueError:
+            return None
+        if shard_id == 0:
+            return None
+
+        self._forget_shard_count(entity_id, resource)
+        partner = shard_id & ~(1 << (shard_id.bit_length() - 1))
+        folded = {
+            **update,
+            "Key": {
+                **update["Key"],
+                "PK": {"S": schema.pk_bucket(namespace_id, entity_id, resource, partner)},
+            },
+        }
+        if partner == 0:
+            del folded["ConditionExpression"]
+        return folded
+
+    async def _write_one_safe(self, client: Any, item: dict[str, Any]) -> Exception | None:
+        """Run ``_write_one``, returning its error instead of raising it.
+
+        Lets write_each() attempt every item even when one of them fails.
+        """
+        try:
+            await self._write_one(client, item)
+        except Exception as e:
+            return e
+        return None
 
     async def speculative_consume(
         self,
@@ -2247,7 +2592,10 @@ class Repository:
         shard_count = 1
         if cache_entry is not None:
             shard_count = cache_entry[2].get(resource, 1)
-        effective_shard_id = random.randrange(shard_count) if shard_count > 1 else 0
+        effective_shard_id = 0
+        if shard_count > 1:
+            chosen = self.choose_shard(entity_id, resource, shard_count, consume)
+            effective_shard_id = chosen if chosen is not None else 0
 
         if cache_entry is not None:
             cascade_cached, parent_id_cached, shards_cached = cache_entry
@@ -2292,6 +2640,40 @@ class Repository:
             self._entity_cache[cache_key] = (result.cascade, result.parent_id, existing_shards)
         return result
 
+    def choose_shard(
+        self,
+        entity_id: str,
+        resource: str,
+        shard_count: int,
+        consume: dict[str, int],
+        exclude: Collection[int] = (),
+    ) -> int | None:
+        """
+        Pick the shard a speculative write should target.
+
+        Uses the last-seen state of each shard (from earlier speculative
+        writes) to prefer shards whose tokens cover the request, choosing
+        between two of them by headroom after a local refill. Shards never
+        seen are assumed full.
+
+        Args:
+            entity_id: Entity owning the bucket
+            resource: Resource name
+            shard_count: Current number of shards
+            consume: Amount per limit (tokens, not milli)
+            exclude: Shards already tried
+
+        Returns:
+            Shard index, or None if every shard is excluded
+        """
+        return self._shard_balance.choose(
+            (self._namespace_id, entity_id, resource),
+            shard_count,
+            consume,
+            self._now_ms(),
+            exclude,
+        )
+
     async def _speculative_consume_single(
         self,
         entity_id: str,
@@ -2318,62 +2700,20 @@ class Repository:
         """
         client = await self._get_client()
 
-        # Build ADD expression for each limit
-        add_parts: list[str] = []
-        condition_parts: list[str] = ["attribute_exists(PK)"]
-        attr_names: dict[str, str] = {}
-        attr_values: dict[str, Any] = {}
-
-        for limit_name, amount in consume.items():
-            amount_milli = amount * 1000
-            tk_attr = schema.bucket_attr(limit_name, schema.BUCKET_FIELD_TK)
-            tc_attr = schema.bucket_attr(limit_name, schema.BUCKET_FIELD_TC)
-            tk_alias = f"#tk_{limit_name}"
-            tc_alias = f"#tc_{limit_name}"
-            neg_val = f":neg_{limit_name}"
-            pos_val = f":pos_{limit_name}"
-            thresh_val = f":thresh_{limit_name}"
-
-            attr_names[tk_alias] = tk_attr
-            attr_names[tc_alias] = tc_attr
+        plan = self._expression_plans.speculative(tuple(sorted(consume)), ttl_seconds is not None)
+        attr_values: dict[str, Any] = dict(plan.values)  # wcu consumption
+        for limit_name, (neg_val, pos_val, thresh_val) in plan.limits:
+            amount_milli = consume[limit_name] * 1000
+            amount = {"N": str(amount_milli)}
             attr_values[neg_val] = {"N": str(-amount_milli)}
-            attr_values[pos_val] = {"N": str(amount_milli)}
-            attr_values[thresh_val] = {"N": str(amount_milli)}
-
-            add_parts.append(f"{tk_alias} {neg_val}")
-            add_parts.append(f"{tc_alias} {pos_val}")
-            condition_parts.append(f"{tk_alias} >= {thresh_val}")
-
-        # Add wcu infrastructure limit consumption (1 WCU = 1000 millitokens per write)
-        wcu_tk_attr = schema.bucket_attr(schema.WCU_LIMIT_NAME, schema.BUCKET_FIELD_TK)
-        wcu_tc_attr = schema.bucket_attr(schema.WCU_LIMIT_NAME, schema.BUCKET_FIELD_TC)
-        attr_names["#wcu_tk"] = wcu_tk_attr
-        attr_names["#wcu_tc"] = wcu_tc_attr
-        wcu_milli = 1000  # 1 WCU = 1000 millitokens
-        attr_values[":neg_wcu"] = {"N": str(-wcu_milli)}
-        attr_values[":pos_wcu"] = {"N": str(wcu_milli)}
-        attr_values[":thresh_wcu"] = {"N": str(wcu_milli)}
-        add_parts.append("#wcu_tk :neg_wcu")
-        add_parts.append("#wcu_tc :pos_wcu")
-        condition_parts.append("#wcu_tk >= :thresh_wcu")
-
-        update_expr = "ADD " + ", ".join(add_parts)
-
-        # Handle TTL
-        if ttl_seconds is not None:
-            now_ms = self._now_ms()
-            ttl_epoch = schema.calculate_ttl(now_ms, ttl_seconds)
-            update_expr = f"SET #ttl = :ttl {update_expr}"
-            attr_names["#ttl"] = "ttl"
-            attr_values[":ttl"] = {"N": str(ttl_epoch)}
+            attr_values[pos_val] = amount
+            attr_values[thresh_val] = amount
 
+        now_ms = self._now_ms()
+        if ttl_seconds is not None:
+            attr_values[":ttl"] = {"N": str(schema.calculate_ttl(now_ms, ttl_seconds))}
         # Reject expired-but-not-yet-deleted buckets (DynamoDB TTL is eventual)
-        now_epoch = self._now_ms() // 1000
-        attr_names["#ttl"] = "ttl"
-        attr_values[":now_epoch"] = {"N": str(now_epoch)}
-        condition_parts.append("(attribute_not_exists(#ttl) OR #ttl > :now_epoch)")
-
-        condition_expr = " AND ".join(condition_parts)
+        attr_values[":now_epoch"] = {"N": str(now_ms // 1000)}
 
         try:
             response = await client.update_item(
@@ -2384,9 +2724,9 @@ class Repository:
                     },
                     "SK": {"S": schema.sk_state()},
                 },
-                UpdateExpression=update_expr,
-                ConditionExpression=condition_expr,
-                ExpressionAttributeNames=attr_names,
+                UpdateExpression=plan.update_expression,
+                ConditionExpression=plan.condition_expression,
+                ExpressionAttributeNames=dict(plan.names),
                 ExpressionAttributeValues=attr_values,
                 ReturnValues="ALL_NEW",
                 ReturnValuesOnConditionCheckFailure="ALL_OLD",
@@ -2398,6 +2738,10 @@ class Repository:
             cascade = item.get("cascade", {}).get("BOOL", False)
             parent_id = item.get("parent_id", {}).get("S")
             shard_count = int(item.get("shard_count", {}).get("N", "1"))
+            if shard_count > 1:
+                self._shard_balance.record(
+                    (self._namespace_id, entity_id, resource), shard_id, buckets
+                )
             return SpeculativeResult(
                 success=True,
                 buckets=buckets,
@@ -2413,6 +2757,10 @@ class Repository:
                 if old_item:
                     old_buckets = self._deserialize_composite_bucket(old_item)
                     old_shard_count = int(old_item.get("shard_count", {}).get("N", "1"))
+                    if old_shard_count > 1:
+                        self._shard_balance.record(
+                            (self._namespace_id, entity_id, resource), shard_id, old_buckets
+                        )
 
                     # Classify failure reason (GHSA-76rv)
                     wcu_exhausted = any(
@@ -2439,6 +2787,8 @@ class Repository:
                         failure_reason=reason,
                     )
                 else:
+                    if shard_id > 0:
+                        self._forget_shard_count(entity_id, resource)
                     return SpeculativeResult(
                         success=False,
                         shard_id=shard_id,
@@ -2446,13 +2796,28 @@ class Repository:
                     )
             raise
 
+    def _forget_shard_count(self, entity_id: str, resource: str) -> None:
+        """Drop the cached shard_count so the next write targets shard 0.
+
+        A shard other than 0 is missing when a merge has retired it (or
+        propagation has not created it yet after doubling). Shard 0 always
+        exists, and its ``ALL_NEW`` carries the current shard_count.
+        """
+        cache_key = (self._namespace_id, entity_id)
+        entry = self._entity_cache.get(cache_key)
+        if entry is not None and resource in entry[2]:
+            shards = {name: count for name, count in entry[2].items() if name != resource}
+            self._entity_cache[cache_key] = (entry[0], entry[1], shards)
+        self._shard_balance.forget((self._namespace_id, entity_id, resource))
+
     async def bump_shard_count(self, entity_id: str, resource: str, current_count: int) -> int:
         """Double shard_count on shard 0 via conditional write.
 
         Shard 0 is the source of truth for shard_count. The conditional
         expression ``shard_count = :old`` prevents double-bumping when
-        multiple clients race to double concurrently. Also updates the
-        entity cache with the new shard_count.
+        multiple clients race to double concurrently. The doubling time is
+        stored on shard 0 so the aggregator does not merge right away. Also
+        updates the entity cache with the new shard_count.
 
         Args:
             entity_id: Entity owning the bucket.
@@ -2472,11 +2837,12 @@ class Repository:
                     "PK": {"S": schema.pk_bucket(self._namespace_id, entity_id, resource, 0)},
                     "SK": {"S": schema.sk_state()},
                 },
-                UpdateExpression="SET shard_count = :new",
+                UpdateExpression=f"SET shard_count = :new, {schema.BUCKET_FIELD_SD} = :now",
                 ConditionExpression="shard_count = :old",
                 ExpressionAttributeValues={
                     ":old": {"N": str(current_count)},
                     ":new": {"N": str(new_count)},
+                    ":now": {"N": str(int(time.time() * 1000))},
                 },
             )
             effective_count = new_count
@@ -3940,29 +4306,43 @@ class Repository:
     ) -> list[BucketState]:
         """Get all buckets for a resource across all entities.
 
-        With composite items, each GSI2 entry is one composite item per
-        entity. Returns individual BucketStates, optionally filtered by limit_name.
+        Discovers bucket keys through GSI5 (KEYS_ONLY, so hot token updates
+        never write to it), then reads the composite items from the base
+        table. Returns individual BucketStates, optionally filtered by
+        limit_name.
         """
         client = await self._get_client()
 
-        key_condition = "GSI2PK = :pk AND begins_with(GSI2SK, :sk_prefix)"
-        expression_values: dict[str, Any] = {
-            ":pk": {"S": schema.gsi2_pk_resource(self._namespace_id, resource)},
-            ":sk_prefix": {"S": "BUCKET#"},
+        # Step 1: GSI5 query to discover bucket PKs (KEYS_ONLY projection)
+        request_keys: list[dict[str, Any]] = []
+        query_params: dict[str, Any] = {
+            "TableName": self.table_name,
+            "IndexName": schema.GSI5_NAME,
+            "KeyConditionExpression": "GSI5PK = :pk",
+            "ExpressionAttributeValues": {
+                ":pk": {"S": schema.gsi5_pk_resource(self._namespace_id, resource)},
+            },
         }
+        while True:
+            response = await client.query(**query_params)
+            request_keys.extend(
+                {"PK": item["PK"], "SK": item["SK"]} for item in response.get("Items", [])
+            )
+            if "LastEvaluatedKey" not in response:
+                break
+            query_params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
 
-        response = await client.query(
-            TableName=self.table_name,
-            IndexName=schema.GSI2_NAME,
-            KeyConditionExpression=key_condition,
-            ExpressionAttributeValues=expression_values,
-        )
-
+        # Step 2: BatchGetItem to fetch full items from main table
         buckets: list[BucketState] = []
-        for item in response.get("Items", []):
-            for bucket in self._deserialize_composite_bucket(item):
-                if limit_name is None or bucket.limit_name == limit_name:
-                    buckets.append(bucket)
+        for i in range(0, len(request_keys), 100):
+            chunk = request_keys[i : i + 100]
+            batch_response = await client.batch_get_item(
+                RequestItems={self.table_name: {"Keys": chunk}}
+            )
+            for item in batch_response.get("Responses", {}).get(self.table_name, []):
+                for bucket in self._deserialize_composite_bucket(item):
+                    if limit_name is None or bucket.limit_name == limit_name:
+                        buckets.append(bucket)
 
         return buckets
 
@@ -4144,6 +4524,20 @@ class Repository:
             }
         return base_item
 
+    def _deserialize_config(
+        self, item: dict[str, Any]
+    ) -> tuple[list[Limit], OnUnavailableAction | None]:
+        """Deserialize a config item to (limits, on_unavailable).
+
+        on_unavailable is only set on system config items (None for others).
+        """
+        ou_attr = item.get("on_unavailable", {})
+        ou_str = ou_attr.get("S") if ou_attr else None
+        on_unavailable: OnUnavailableAction | None = (
+            cast(OnUnavailableAction, ou_str) if ou_str else None
+        )
+        return self._deserialize_composite_limits(item), on_unavailable
+
     def _deserialize_composite_limits(self, item: dict[str, Any]) -> list[Limit]:
         """Deserialize l_* attributes from a DynamoDB item to Limit objects.
 
@@ -4217,6 +4611,33 @@ class Repository:
         # Sequential fallback (or non-batch backend)
         return await self._resolve_limits_sequential(entity_id, resource)
 
+    async def prefetch_configs(self, keys: list[tuple[str, str]]) -> None:
+        """Fill the config cache for many (entity_id, resource) pairs at once.
+
+        Reads every config slot the pairs would miss in one batched read
+        (BatchGetItem, chunked at 100 keys), so the resolve_limits() calls
+        that follow are served from the cache. A no-op when caching or batch
+        operations are unavailable; a failed read is left to resolve_limits().
+
+        Args:
+            keys: (entity_id, resource) pairs about to be resolved
+        """
+        if not self.capabilities.supports_batch_operations:
+            return
+        cache = self._config_cache
+        missing = await cache.missing_keys(keys)
+        if not missing:
+            return
+        entity_ids = list(dict.fromkeys(entity_id for entity_id, _ in keys))
+        resources = list(dict.fromkeys(resource for _, resource in keys))
+        try:
+            items = await self.batch_get_configs(missing)
+        except Exception:
+            logger.debug("Batched config prefetch failed, leaving it to resolve_limits()")
+            return
+        unread = set(cache.prefetch_keys(entity_ids, resources)).difference(missing)
+        await cache.prime(entity_ids, resources, items, unread)
+
     async def _resolve_limits_sequential(
         self,
         entity_id: str,
@@ -4299,8 +4720,12 @@ class Repository:
         self._on_unavailable_cache = None
 
     def get_cache_stats(self) -> CacheStats:
-        """Get config cache performance statistics (ADR-122)."""
-        return self._config_cache.get_stats()
+        """Get config and entity cache statistics (ADR-122)."""
+        stats = self._config_cache.get_stats()
+        stats.entity_cache_size = len(self._entity_cache)
+        stats.entity_cache_evictions = self._entity_cache.evictions
+        stats.entity_cache_expirations = self._entity_cache.expirations
+        return stats
 
 
 # Type assertion: Repository implements RepositoryProtocol
@@ -25,6 +25,7 @@ import warnings
 from typing import TYPE_CHECKING, Any
 
 from .exceptions import NamespaceNotFoundError
+from .lru import LRUCache
 from .naming import resolve_stack_name
 
 if TYPE_CHECKING:
@@ -48,6 +49,13 @@ class RepositoryBuilder:
         self._endpoint_url: str | None = None
         self._namespace_name: str | None = None
         self._config_cache_ttl = 60
+        self._config_cache_refresh_ahead = 0.0
+        self._config_cache_max_staleness = 0.0
+        self._config_cache_max_entries: int | None = None
+        self._entity_cache_max_entries: int | None = None
+        self._entity_cache_ttl: float | None = None
+        self._io_stats = False
+        self._client_config: dict[str, Any] = {}
         self._auto_update = True
         self._bucket_ttl_multiplier = 7
         self._on_unavailable: OnUnavailableAction | None = None
@@ -72,6 +80,43 @@ class RepositoryBuilder:
         self._endpoint_url = url
         return self
 
+    def connection_pool(
+        self, max_connections: int, tcp_keepalive: bool | None = None
+    ) -> "RepositoryBuilder":
+        """Size the DynamoDB client's connection pool (default: 10 connections).
+
+        Args:
+            max_connections: Maximum pooled HTTP connections. Raise this to at
+                least the number of concurrent acquires.
+            tcp_keepalive: Enable TCP keepalive on pooled connections
+                (default: botocore default, off).
+        """
+        self._client_config["max_pool_connections"] = max_connections
+        if tcp_keepalive is not None:
+            self._client_config["tcp_keepalive"] = tcp_keepalive
+        return self
+
+    def timeouts(
+        self, connect: float | None = None, read: float | None = None
+    ) -> "RepositoryBuilder":
+        """Set DynamoDB client timeouts in seconds (default: botocore's 60s each)."""
+        if connect is not None:
+            self._client_config["connect_timeout"] = connect
+        if read is not None:
+            self._client_config["read_timeout"] = read
+        return self
+
+    def retries(self, max_attempts: int, mode: str = "standard") -> "RepositoryBuilder":
+        """Set the DynamoDB client retry policy (default: botocore's legacy mode).
+
+        Args:
+            max_attempts: Total attempts per call, including the first.
+            mode: botocore retry mode: ``"legacy"``, ``"standard"`` or
+                ``"adaptive"``.
+        """
+        self._client_config["retries"] = {"mode": mode, "total_max_attempts": max_attempts}
+        return self
+
     # -------------------------------------------------------------------------
     # Behavioral configuration
     # -------------------------------------------------------------------------
@@ -89,6 +134,48 @@ class RepositoryBuilder:
         self._config_cache_ttl = seconds
         return self
 
+    def config_cache_refresh(
+        self, refresh_ahead: float, max_staleness: float = 0.0
+    ) -> "RepositoryBuilder":
+        """Refresh config cache entries in the background (default: disabled).
+
+        Args:
+            refresh_ahead: Seconds before expiry at which a cache hit also
+                starts a background refresh. Must be less than the TTL.
+            max_staleness: Seconds past expiry an entry may still be served
+                while its refresh is in progress (default: 0).
+        """
+        self._config_cache_refresh_ahead = refresh_ahead
+        self._config_cache_max_staleness = max_staleness
+        return self
+
+    def config_cache_max_entries(self, value: int) -> "RepositoryBuilder":
+        """Cap cached entity configs; least recently used are evicted (default: unbounded)."""
+        self._config_cache_max_entries = value
+        return self
+
+    def entity_cache(
+        self, max_entries: int | None = None, ttl: float | None = None
+    ) -> "RepositoryBuilder":
+        """Bound the entity metadata cache used by the speculative path (default: unbounded).
+
+        Args:
+            max_entries: Maximum number of entities kept; the least recently
+                used are evicted beyond this.
+            ttl: Seconds after which an entry is dropped and re-read.
+        """
+        self._entity_cache_max_entries = max_entries
+        self._entity_cache_ttl = ttl
+        return self
+
+    def io_stats(self, enabled: bool = True) -> "RepositoryBuilder":
+        """Accumulate consumed capacity of every DynamoDB call (default: disabled).
+
+        Read the totals with ``Repository.get_io_stats()``.
+        """
+        self._io_stats = enabled
+        return self
+
     def auto_update(self, enabled: bool) -> "RepositoryBuilder":
         """Enable/disable auto-update of Lambda on version mismatch (default: True)."""
         self._auto_update = enabled
@@ -283,6 +370,15 @@ class RepositoryBuilder:
             _skip_deprecation_warning=True,
         )
         repo._bucket_ttl_refill_multiplier = self._bucket_ttl_multiplier
+        repo._config_cache_refresh_ahead = self._config_cache_refresh_ahead
+        repo._config_cache_max_staleness = self._config_cache_max_staleness
+        repo._config_cache_max_entries = self._config_cache_max_entries
+        repo._entity_cache = LRUCache(
+            max_entries=self._entity_cache_max_entries, ttl_seconds=self._entity_cache_ttl
+        )
+        if self._io_stats:
+            repo.enable_io_stats()
+        repo._client_config = dict(self._client_config)
         repo._auto_update = self._auto_update
 
         # 2. Ensure infrastructure exists
@@ -38,7 +38,7 @@ class SpeculativeFailureReason(Enum):
     BUCKET_MISSING = "bucket_missing"
 
 
-@dataclass
+@dataclass(slots=True)
 class SpeculativeResult:
     """Result of a speculative UpdateItem attempt.
 
@@ -86,6 +86,32 @@ class RepositoryProtocol(Protocol):
     - **Audit logging**: Security audit trail
     - **Usage snapshots**: Historical consumption tracking
 
+    Optional methods are not part of the protocol: RateLimiter calls them
+    only when a backend defines them and otherwise falls back to the
+    behaviour before they were added. ``Repository`` implements them all.
+
+    - ``get_cached_parent(entity_id) -> str | None``: cascade parent from
+      client-side entity metadata, if known, so the slow path reads the
+      parent bucket in the same round trip as the child. May be stale;
+      callers confirm it against the fetched entity. Fallback: None.
+    - ``choose_shard(entity_id, resource, shard_count, consume, exclude=())
+      -> int | None``: shard a speculative write should target, preferring
+      shards likely to satisfy ``consume``; None if every shard is excluded.
+      Fallback: a random shard not in ``exclude``.
+    - ``condition_failure_buckets(exc) -> dict[int, list[BucketState] | None]``:
+      stored bucket states (ALL_OLD) returned by a write whose condition
+      failed, per index of each failed item, so a lost optimistic lock is
+      retried on the returned state. Fallback: no states, so the
+      consumption-only retry is used.
+    - ``batch_get_entities_and_buckets(entity_ids, bucket_keys)``: metadata
+      for many entities and composite buckets in one pass, for
+      ``acquire_many()``; used only with ``supports_batch_operations``.
+      Fallback: ``get_entity()`` and ``get_buckets()`` per key.
+    - ``prefetch_configs(keys)``: fill the config cache for many
+      (entity_id, resource) pairs in one batched read before
+      ``acquire_many()`` resolves them. Fallback: one ``resolve_limits()``
+      per pair.
+
     Example:
         # Custom backend implementation
         class MyBackend:
@@ -528,6 +554,7 @@ class RepositoryProtocol(Protocol):
         entity_id: str,
         resource: str,
         deltas: dict[str, int],
+        shard_id: int = 0,
     ) -> dict[str, Any]:
         """Build an UpdateItem for the adjust write path (ADR-115 path 4).
 
@@ -539,6 +566,7 @@ class RepositoryProtocol(Protocol):
             entity_id: Entity owning the bucket
             resource: Resource name
             deltas: Delta per limit (millitokens, positive=consume, negative=release)
+            shard_id: Bucket shard to adjust (default 0)
         """
         ...
 
@@ -565,10 +593,15 @@ class RepositoryProtocol(Protocol):
 
         Each item is dispatched as a single PutItem, UpdateItem, or DeleteItem
         call (1 WCU each). Use for unconditional writes (e.g., ADD adjustments)
-        where partial success is acceptable.
+        where partial success is acceptable. Backends may dispatch items
+        concurrently.
 
         Args:
             items: List of items to write independently
+
+        Raises:
+            PartialWriteError: If any of several items fails; the remaining
+                items are still attempted
         """
         ...
 
@@ -592,8 +625,9 @@ class RepositoryProtocol(Protocol):
             resource: Resource name
             consume: Amount per limit (tokens, not milli)
             ttl_seconds: TTL in seconds from now, or None for no TTL change
-            shard_id: Explicit shard to target (skips random selection and
-                cascade logic). None means auto-select from entity cache.
+            shard_id: Explicit shard to target (skips shard selection and
+                cascade logic). None means auto-select via ``choose_shard()``
+                using the shard count from the entity cache.
 
         Returns:
             SpeculativeResult with success flag and either:
@@ -0,0 +1,392 @@
+"""Client-side token reservation blocks for hot entities.
+
+A reservation block is a batch of tokens taken from a bucket in a single
+speculative ``ADD`` and then served locally to subsequent ``acquire()`` calls
+for the same (entity, resource). Unused tokens are returned to the bucket with
+an unconditional ``ADD`` (ADR-115 adjust path) when the block expires or when
+the limiter is closed.
+
+Block size adapts to the observed request rate: a key that sees ``r``
+acquires per second reserves roughly ``r * window_seconds`` requests worth of
+tokens, clamped to ``[min_block, max_block]`` and to a fraction of the
+bucket's capacity. Keys below ``min_block`` keep using the regular path.
+
+A reservation that fails (the bucket cannot cover the block) costs a write
+and a round trip on top of the regular path. The ``ALL_OLD`` image of the
+failed write tells the pool the bucket's capacity and stored tokens, and the
+next block is sized to fit them. The key also backs off for 1, 2, 4, ...
+windows after consecutive failures, so a hot key whose bucket runs low does
+not pay for a failed reservation on every acquire.
+
+This module holds only in-process bookkeeping; it is shared by the async
+``RateLimiter`` and the generated ``SyncRateLimiter``. All state is guarded by
+a ``threading.Lock`` so the pool is safe to use from either.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .models import BucketState
+
+# Rate estimator smoothing: new_rate = alpha * sample + (1 - alpha) * old_rate
+_RATE_ALPHA = 0.5
+
+# Trackers idle for this many windows are pruned on sweep
+_IDLE_WINDOWS = 10
+
+# Backoff after consecutive failed reservations doubles up to this many windows
+_MAX_BACKOFF_WINDOWS = 32
+
+
+@dataclass(frozen=True)
+class ReservationConfig:
+    """Configuration for client-side token reservation blocks.
+
+    Attributes:
+        window_seconds: Lifetime of a reservation block. Unused tokens are
+            returned to the bucket once the block is older than this. Also the
+            horizon used to size blocks from the observed request rate.
+        min_block: Minimum number of requests a block must cover to be worth
+            reserving. Keys with a lower expected rate use the regular path.
+        max_block: Maximum number of requests a single block may cover.
+        max_capacity_fraction: Upper bound on the tokens reserved per limit,
+            as a fraction of that limit's capacity. Keeps one client from
+            draining a bucket that other clients share.
+        max_keys: Maximum number of (entity, resource) keys tracked. When
+            exceeded, the least recently seen trackers are dropped.
+    """
+
+    window_seconds: float = 1.0
+    min_block: int = 4
+    max_block: int = 100
+    max_capacity_fraction: float = 0.25
+    max_keys: int = 10_000
+
+    def __post_init__(self) -> None:
+        if self.window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        if self.min_block < 2:
+            raise ValueError("min_block must be at least 2")
+        if self.max_block < self.min_block:
+            raise ValueError("max_block must be >= min_block")
+        if not 0 < self.max_capacity_fraction <= 1:
+            raise ValueError("max_capacity_fraction must be in (0, 1]")
+        if self.max_keys < 1:
+            raise ValueError("max_keys must be positive")
+
+
+@dataclass
+class ReservedBucket:
+    """Reserved tokens held locally for one bucket (entity, resource, shard).
+
+    Attributes:
+        entity_id: Entity owning the bucket
+        resource: Resource name
+        shard_id: Shard the tokens were taken from (returned to the same shard)
+        states: Bucket states from the ALL_NEW response of the reserving write
+        remaining: Unserved tokens per limit name (tokens, not milli)
+        cascade: Whether the entity has cascade enabled (child bucket only)
+        parent_id: The entity's parent_id (child bucket only)
+    """
+
+    entity_id: str
+    resource: str
+    shard_id: int
+    states: list[BucketState]
+    remaining: dict[str, int]
+    cascade: bool = False
+    parent_id: str | None = None
+
+    def release_deltas(self) -> dict[str, int]:
+        """Millitoken deltas that return all unserved tokens to the bucket."""
+        return {name: -(tokens * 1000) for name, tokens in self.remaining.items() if tokens > 0}
+
+
+@dataclass
+class ReservationBlock:
+    """A block of reserved tokens for one (entity, resource) key.
+
+    Holds the child bucket and, for cascade entities, the parent bucket.
+    A block is only served when every bucket in it covers the request.
+    """
+
+    buckets: list[ReservedBucket]
+    expires_at: float
+
+    def covers(self, consume: dict[str, int]) -> bool:
+        """Whether every bucket in the block has enough tokens for ``consume``."""
+        for bucket in self.buckets:
+            for name, amount in consume.items():
+                if amount > 0 and bucket.remaining.get(name, 0) < amount:
+                    return False
+        return True
+
+    def take(self, consume: dict[str, int]) -> list[ReservedBucket]:
+        """Debit ``consume`` from every bucket and return the buckets.
+
+        Bucket states are shared with the block; callers must copy them
+        before handing them to a lease.
+        """
+        for bucket in self.buckets:
+            for name, amount in consume.items():
+                if amount > 0:
+                    bucket.remaining[name] -= amount
+        return list(self.buckets)
+
+
+@dataclass
+class _RateTracker:
+    """Smoothed request rate for one key (requests per second)."""
+
+    window_start: float
+    last_seen: float
+    count: int = 0
+    rate: float = 0.0
+    # Bucket states from the most recent reservation attempt (for capacity caps)
+    states: list[BucketState] = field(default_factory=list)
+    # Stored tokens per limit seen by the last failed reservation (block size cap)
+    tokens: dict[str, int] | None = None
+    failures: int = 0  # consecutive failed reservations
+    retry_at: float = 0.0  # no reservation before this time
+
+
+@dataclass
+class ReservationStats:
+    """Counters describing reservation block effectiveness.
+
+    Attributes:
+        served: Acquires served entirely from a local block (0 round trips)
+        reserved: Blocks taken from DynamoDB
+        reserve_failures: Block reservations that fell back to the regular path
+        backed_off: Reservations skipped because the key's last one failed
+        released: Blocks whose unused tokens were returned to DynamoDB
+        released_tokens: Total tokens returned to DynamoDB across all limits
+    """
+
+    served: int = 0
+    reserved: int = 0
+    reserve_failures: int = 0
+    backed_off: int = 0
+    released: int = 0
+    released_tokens: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return stats as a dictionary."""
+        return {
+            "served": self.served,
+            "reserved": self.reserved,
+            "reserve_failures": self.reserve_failures,
+            "backed_off": self.backed_off,
+            "released": self.released,
+            "released_tokens": self.released_tokens,
+        }
+
+
+@dataclass
+class ReservationPool:
+    """In-process store of reservation blocks and per-key request rates.
+
+    The pool never talks to DynamoDB. The limiter reserves and releases
+    blocks; the pool decides when a block is worth reserving, serves requests
+    from live blocks, and hands back blocks that must be released.
+    """
+
+    config: ReservationConfig = field(default_factory=ReservationConfig)
+    stats: ReservationStats = field(default_factory=ReservationStats)
+    _blocks: dict[tuple[str, str], ReservationBlock] = field(default_factory=dict)
+    _trackers: dict[tuple[str, str], _RateTracker] = field(default_factory=dict)
+    _last_sweep: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def observe(self, key: tuple[str, str], now: float | None = None) -> None:
+        """Record one acquire attempt for ``key`` in the rate estimator."""
+        now = time.monotonic() if now is None else now
+        window = self.config.window_seconds
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                if len(self._trackers) >= self.config.max_keys:
+                    self._evict_trackers()
+                tracker = _RateTracker(window_start=now, last_seen=now)
+                self._trackers[key] = tracker
+            tracker.count += 1
+            tracker.last_seen = now
+            elapsed = now - tracker.window_start
+            if elapsed >= window:
+                sample = tracker.count / elapsed
+                tracker.rate = _RATE_ALPHA * sample + (1 - _RATE_ALPHA) * tracker.rate
+                tracker.window_start = now
+                tracker.count = 0
+
+    def block_multiplier(self, key: tuple[str, str], now: float | None = None) -> int:
+        """Number of requests a new block for ``key`` should cover.
+
+        Returns 0 when the observed rate is too low to justify a block.
+        """
+        now = time.monotonic() if now is None else now
+        window = self.config.window_seconds
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                return 0
+            # Blend the in-progress window so a burst is noticed before it ends
+            elapsed = max(now - tracker.window_start, 1e-3)
+            rate = tracker.rate
+            if elapsed >= window / 4:
+                rate = max(rate, tracker.count / elapsed)
+        multiplier = min(int(rate * window), self.config.max_block)
+        return multiplier if multiplier >= self.config.min_block else 0
+
+    def backing_off(self, key: tuple[str, str], now: float | None = None) -> bool:
+        """Whether ``key`` must skip reserving after a recent failed reservation."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None or now >= tracker.retry_at:
+                return False
+            self.stats.backed_off += 1
+            return True
+
+    def capped_amounts(
+        self, key: tuple[str, str], consume: dict[str, int], multiplier: int
+    ) -> dict[str, int]:
+        """Scale ``consume`` by ``multiplier``, capped by known bucket capacities.
+
+        Capacities come from the last reservation attempt for ``key``, whether
+        it succeeded or failed. Before the first attempt they are unknown and
+        only the conditional write bounds the reservation. After a failure the
+        block is also capped at the tokens the bucket held.
+
+        Returns:
+            Amount to reserve per limit. Never below the per-request amount.
+        """
+        with self._lock:
+            tracker = self._trackers.get(key)
+            states = tracker.states if tracker is not None else []
+            tokens = (tracker.tokens if tracker is not None else None) or {}
+        capacities = {s.limit_name: s.capacity_milli // 1000 for s in states}
+        fraction = self.config.max_capacity_fraction
+        amounts: dict[str, int] = {}
+        for name, amount in consume.items():
+            total = amount * multiplier
+            capacity = capacities.get(name)
+            if capacity is not None:
+                total = min(total, int(capacity * fraction))
+            if name in tokens:
+                total = min(total, tokens[name])
+            amounts[name] = max(total, amount)
+        return amounts
+
+    def take(
+        self, key: tuple[str, str], consume: dict[str, int], now: float | None = None
+    ) -> list[ReservedBucket] | None:
+        """Serve ``consume`` from the live block for ``key``.
+
+        Returns:
+            Per-bucket snapshots for building a lease, or None if there is no
+            live block or it cannot cover the request.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            block = self._blocks.get(key)
+            if block is None or block.expires_at <= now or not block.covers(consume):
+                return None
+            self.stats.served += 1
+            return block.take(consume)
+
+    def put(
+        self, key: tuple[str, str], buckets: list[ReservedBucket], now: float | None = None
+    ) -> ReservationBlock | None:
+        """Install a freshly reserved block for ``key``.
+
+        Returns:
+            The displaced block (whose unused tokens must be released), if any.
+        """
+        now = time.monotonic() if now is None else now
+        block = ReservationBlock(buckets=buckets, expires_at=now + self.config.window_seconds)
+        with self._lock:
+            self.stats.reserved += 1
+            tracker = self._trackers.get(key)
+            if tracker is not None:
+                if buckets:
+                    tracker.states = buckets[0].states
+                tracker.tokens = None
+                tracker.failures = 0
+                tracker.retry_at = 0.0
+            displaced = self._blocks.get(key)
+            self._blocks[key] = block
+            return displaced
+
+    def pop(self, key: tuple[str, str]) -> ReservationBlock | None:
+        """Remove and return the block for ``key`` (e.g. before replacing it)."""
+        with self._lock:
+            return self._blocks.pop(key, None)
+
+    def sweep(self, now: float | None = None) -> list[ReservationBlock]:
+        """Remove expired blocks and idle trackers.
+
+        Runs at most once per window; cheap to call on every acquire.
+
+        Returns:
+            Expired blocks whose unused tokens must be released.
+        """
+        now = time.monotonic() if now is None else now
+        window = self.config.window_seconds
+        with self._lock:
+            if now - self._last_sweep < window:
+                return []
+            self._last_sweep = now
+            expired_keys = [k for k, b in self._blocks.items() if b.expires_at <= now]
+            expired = [self._blocks.pop(k) for k in expired_keys]
+            idle_cutoff = now - window * _IDLE_WINDOWS
+            for k in [k for k, t in self._trackers.items() if t.last_seen < idle_cutoff]:
+                del self._trackers[k]
+            return expired
+
+    def drain(self) -> list[ReservationBlock]:
+        """Remove and return every block (used on close)."""
+        with self._lock:
+            blocks = list(self._blocks.values())
+            self._blocks.clear()
+            return blocks
+
+    def record_release(self, block: ReservationBlock) -> None:
+        """Update counters after a block's unused tokens were returned."""
+        tokens = sum(t for b in block.buckets for t in b.remaining.values() if t > 0)
+        with self._lock:
+            self.stats.released += 1
+            self.stats.released_tokens += tokens
+
+    def record_failure(
+        self,
+        key: tuple[str, str],
+        states: list[BucketState] | None = None,
+        now: float | None = None,
+    ) -> None:
+        """Record a block reservation that fell back to the regular path.
+
+        Args:
+            key: The (entity, resource) key
+            states: Bucket states from the failed write's ``ALL_OLD``, if any.
+                The next block is sized to fit their capacity and tokens.
+            now: Current monotonic time
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.stats.reserve_failures += 1
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                return
+            if states:
+                tracker.states = states
+                tracker.tokens = {s.limit_name: max(0, s.tokens_milli // 1000) for s in states}
+            tracker.failures += 1
+            backoff = min(2 ** (tracker.failures - 1), _MAX_BACKOFF_WINDOWS)
+            tracker.retry_at = now + backoff * self.config.window_seconds
+
+    def _evict_trackers(self) -> None:
+        """Drop the least recently seen half of the trackers (lock held)."""
+        by_age = sorted(self._trackers.items(), key=lambda kv: kv[1].last_seen)
+        for k, _ in by_age[: max(1, len(by_age) // 2)]:
+            del self._trackers[k]
@@ -8,9 +8,10 @@ if TYPE_CHECKING:
 # Table and index names
 DEFAULT_TABLE_NAME = "rate_limits"
 GSI1_NAME = "GSI1"  # For parent -> children lookups
-GSI2_NAME = "GSI2"  # For resource aggregation
+GSI2_NAME = "GSI2"  # For resource aggregation (usage snapshots, access)
 GSI3_NAME = "GSI3"  # For entity config queries (sparse)
 GSI4_NAME = "GSI4"  # For namespace-scoped item discovery
+GSI5_NAME = "GSI5"  # For bucket discovery by resource (KEYS_ONLY)
 LSI1_NAME = "LSI1"  # Reserved, ALL projection (ADR-123)
 LSI2_NAME = "LSI2"  # Reserved, KEYS_ONLY projection (ADR-123)
 LSI3_NAME = "LSI3"  # Reserved, ALL projection (ADR-123)
@@ -66,6 +67,7 @@ BUCKET_FIELD_RA = "ra"  # refill amount (millitokens)
 BUCKET_FIELD_RP = "rp"  # refill period (ms)
 BUCKET_FIELD_TC = "tc"  # total consumed counter (millitokens)
 BUCKET_FIELD_RF = "rf"  # shared refill timestamp (ms) — optimistic lock
+BUCKET_FIELD_SD = "sd"  # last shard_count doubling (ms) — delays shard merges
 
 # Infrastructure limit: DynamoDB partition write capacity ceiling (GHSA-76rv)
 # Auto-injected on every bucket to track per-partition write pressure.
@@ -233,7 +235,11 @@ def gsi2_pk_resource(namespace_id: str, resource: str) -> str:
 
 
 def gsi2_sk_bucket(entity_id: str, shard_id: int = 0) -> str:
-    """Build GSI2 sort key for a composite bucket entry.
+    """Build GSI2 sort key for a composite bucket entry (pre-0.11.0 layout).
+
+    Buckets are no longer written with GSI2 keys (see ``gsi5_sk_bucket``).
+    Kept only for the 0.11.0 migration window, to describe the legacy items
+    ``migrate_to_0_11_0`` rewrites; remove once that migration is dropped.
 
     Args:
         entity_id: Entity owning the bucket
@@ -245,6 +251,26 @@ def gsi2_sk_bucket(entity_id: str, shard_id: int = 0) -> str:
     return f"BUCKET#{entity_id}#{shard_id}"
 
 
+def gsi5_pk_resource(namespace_id: str, resource: str) -> str:
+    """Build GSI5 partition key for bucket discovery by resource."""
+    return f"{namespace_id}/{RESOURCE_PREFIX}{resource}"
+
+
+def gsi5_sk_bucket(entity_id: str, shard_id: int) -> str:
+    """Build GSI5 sort key for a composite bucket entry.
+
+    GSI5 is KEYS_ONLY, so token updates on bucket items never write to it.
+
+    Args:
+        entity_id: Entity owning the bucket
+        shard_id: Shard index (0-based)
+
+    Returns:
+        GSI5SK string in format ``BUCKET#{entity_id}#{shard_id}``
+    """
+    return f"{BUCKET_PREFIX}{entity_id}#{shard_id}"
+
+
 def gsi2_sk_access(entity_id: str) -> str:
     """Build GSI2 sort key for access tracking entry."""
     return f"ACCESS#{entity_id}"
@@ -451,6 +477,8 @@ def get_table_definition(table_name: str) -> dict[str, Any]:
             {"AttributeName": "GSI3SK", "AttributeType": "S"},
             {"AttributeName": "GSI4PK", "AttributeType": "S"},
             {"AttributeName": "GSI4SK", "AttributeType": "S"},
+            {"AttributeName": "GSI5PK", "AttributeType": "S"},
+            {"AttributeName": "GSI5SK", "AttributeType": "S"},
             {"AttributeName": "LSI1SK", "AttributeType": "S"},
             {"AttributeName": "LSI2SK", "AttributeType": "S"},
             {"AttributeName": "LSI3SK", "AttributeType": "S"},
@@ -494,6 +522,14 @@ def get_table_definition(table_name: str) -> dict[str, Any]:
                 ],
                 "Projection": {"ProjectionType": "KEYS_ONLY"},
             },
+            {
+                "IndexName": GSI5_NAME,
+                "KeySchema": [
+                    {"AttributeName": "GSI5PK", "KeyType": "HASH"},
+                    {"AttributeName": "GSI5SK", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "KEYS_ONLY"},
+            },
         ],
         "LocalSecondaryIndexes": [
             {
@@ -0,0 +1,151 @@
+"""Load-aware shard selection for multi-shard buckets.
+
+A bucket with ``shard_count > 1`` splits its capacity across shard items, and
+each speculative write targets one shard. Picking the shard uniformly at
+random ignores that shards drain unevenly: a request routed to an exhausted
+shard fails its condition and the limiter retries on other shards, one
+UpdateItem each.
+
+Every speculative write already returns the targeted shard's full state
+(``ALL_NEW`` on success, ``ALL_OLD`` on a failed condition). ``ShardBalance``
+keeps the last-seen state of each shard and picks shards with
+power-of-two-choices: two random shards whose last-seen stored tokens cover
+the request (shards never seen count as covering), keeping the one with more
+headroom after a local refill (``refill_bucket``) to now. Two random choices
+rather than the single best shard keep clients that share the same view from
+all piling onto one shard and exhausting its ``wcu`` limit.
+
+Estimates ignore other clients' consumption since the state was seen, so they
+are optimistic; a failed write returns ``ALL_OLD`` and corrects the estimate.
+This module is shared by the async ``Repository`` and the generated
+``SyncRepository``; all state is guarded by a ``threading.Lock``.
+"""
+
+import random
+import threading
+from collections.abc import Collection
+
+from .bucket import refill_bucket
+from .lru import LRUCache
+from .models import BucketState
+from .schema import WCU_LIMIT_NAME
+
+_DEFAULT_MAX_ENTRIES = 10_000
+
+
+class ShardBalance:
+    """Last-seen per-shard bucket states, used to route speculative writes.
+
+    Args:
+        max_entries: Maximum number of multi-shard buckets tracked. Least
+            recently used buckets are evicted beyond this.
+    """
+
+    def __init__(self, max_entries: int = _DEFAULT_MAX_ENTRIES) -> None:
+        # (namespace_id, entity_id, resource) -> shard_id -> last-seen states
+        self._shards: LRUCache[tuple[str, str, str], dict[int, list[BucketState]]] = LRUCache(
+            max_entries=max_entries
+        )
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        key: tuple[str, str, str],
+        shard_id: int,
+        states: list[BucketState],
+    ) -> None:
+        """Store the state of one shard returned by a speculative write.
+
+        Args:
+            key: (namespace_id, entity_id, resource)
+            shard_id: Shard the write targeted
+            states: Bucket states from ALL_NEW or ALL_OLD
+        """
+        with self._lock:
+            shards = self._shards.get(key)
+            if shards is None:
+                shards = self._shards[key] = {}
+            shards[shard_id] = states
+
+    def forget(self, key: tuple[str, str, str]) -> None:
+        """Drop every shard estimate for a bucket."""
+        with self._lock:
+            self._shards.pop(key, None)
+
+    def choose(
+        self,
+        key: tuple[str, str, str],
+        shard_count: int,
+        consume: dict[str, int],
+        now_ms: int,
+        exclude: Collection[int] = (),
+    ) -> int | None:
+        """Pick the shard most likely to satisfy ``consume``.
+
+        Args:
+            key: (namespace_id, entity_id, resource)
+            shard_count: Current number of shards
+            consume: Amount per limit (tokens, not milli)
+            now_ms: Current epoch milliseconds for the local refill
+            exclude: Shards not to pick (already tried)
+
+        Returns:
+            A shard index, or None if every shard is excluded.
+        """
+        candidates = [s for s in range(shard_count) if s not in exclude]
+        if not candidates:
+            return None
+        with self._lock:
+            shards = dict(self._shards.get(key) or {})
+        if not shards:
+            return random.choice(candidates)
+
+        # Prefer shards whose stored tokens cover the request: the speculative
+        # condition checks stored tokens, not refilled ones
+        covering = [s for s in candidates if _covers(shards.get(s), consume)]
+        if not covering:
+            # Every shard needs a refill; the slow path refills the fullest
+            return max(candidates, key=lambda s: _headroom(shards.get(s), consume, now_ms))
+        if len(covering) == 1:
+            return covering[0]
+        first, second = random.sample(covering, 2)
+        if _headroom(shards.get(second), consume, now_ms) > _headroom(
+            shards.get(first), consume, now_ms
+        ):
+            return second
+        return first
+
+
+def _required_milli(state: BucketState, consume: dict[str, int]) -> int:
+    """Millitokens a speculative write needs from this limit."""
+    if state.limit_name == WCU_LIMIT_NAME:
+        return 1000  # every write consumes 1 WCU
+    return consume.get(state.limit_name, 0) * 1000
+
+
+def _covers(states: list[BucketState] | None, consume: dict[str, int]) -> bool:
+    """Whether the last-seen stored tokens pass the speculative condition."""
+    if states is None:
+        return True  # Never seen: assume a fresh shard
+    return all(s.tokens_milli >= _required_milli(s, consume) for s in states)
+
+
+def _headroom(states: list[BucketState] | None, consume: dict[str, int], now_ms: int) -> float:
+    """Smallest fraction of capacity left after the request, refilled to now."""
+    if states is None:
+        return 1.0
+    headroom = 1.0
+    for state in states:
+        required = _required_milli(state, consume)
+        if required == 0:
+            continue
+        refill = refill_bucket(
+            tokens_milli=state.tokens_milli,
+            last_refill_ms=state.last_refill_ms,
+            now_ms=now_ms,
+            capacity_milli=state.capacity_milli,
+            refill_amount_milli=state.refill_amount_milli,
+            refill_period_ms=state.refill_period_ms,
+        )
+        headroom = min(headroom, (refill.new_tokens_milli - required) / state.capacity_milli)
+    return headroom
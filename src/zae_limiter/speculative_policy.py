@@ -0,0 +1,234 @@
+"""Adaptive choice between the speculative and read-modify-write acquire paths.
+
+A speculative UpdateItem costs one WCU and one round trip. When it succeeds,
+or when its ``ALL_OLD`` response proves the request must be rejected, it
+saves the slow path's read. When it fails because the stored tokens need a
+refill (or the bucket does not exist yet), the write was wasted and the
+request pays for both paths.
+
+``SpeculativePolicy`` tracks, per (entity, resource), an exponentially
+weighted rate of speculative attempts that decided the request on their own,
+plus counts of ``SpeculativeFailureReason`` values. Buckets whose rate drops
+below ``min_success_rate`` go straight to the read-modify-write path. Every
+``probe_every``-th acquire of such a bucket still speculates, so a bucket
+that recovers (traffic drops, limit raised) is moved back to the fast path.
+
+This module is shared by the async ``RateLimiter`` and the generated
+``SyncRateLimiter``; all state is guarded by a ``threading.Lock``.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from enum import Enum
+
+_REASONS = ("app_limit_exhausted", "wcu_exhausted", "both_exhausted", "bucket_missing")
+
+
+@dataclass(frozen=True)
+class SpeculativePolicyConfig:
+    """Configuration for the adaptive speculative-write policy.
+
+    Attributes:
+        min_success_rate: Buckets whose speculative success rate falls below
+            this skip the speculative write and use the read-modify-write path.
+        smoothing: Weight of the newest outcome in the success rate (EWMA).
+            Higher values adapt faster but react to single failures.
+        probe_every: A bypassed bucket still speculates on every
+            ``probe_every``-th acquire to detect recovery.
+        max_entries: Maximum number of (entity, resource) pairs tracked.
+            Least recently used entries are evicted beyond this.
+    """
+
+    min_success_rate: float = 0.5
+    smoothing: float = 0.2
+    probe_every: int = 16
+    max_entries: int = 10_000
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.min_success_rate <= 1:
+            raise ValueError("min_success_rate must be between 0 and 1")
+        if not 0 < self.smoothing <= 1:
+            raise ValueError("smoothing must be in (0, 1]")
+        if self.probe_every < 1:
+            raise ValueError("probe_every must be positive")
+        if self.max_entries < 1:
+            raise ValueError("max_entries must be positive")
+
+
+@dataclass
+class SpeculativePolicyStats:
+    """Counters for the adaptive speculative-write policy.
+
+    Attributes:
+        speculated: Acquires that tried the speculative write (including probes)
+        fast: Speculative attempts that granted or rejected the request
+        fallbacks: Speculative attempts that fell through to the slow path
+        skipped: Acquires sent straight to the read-modify-write path
+        probes: Speculative attempts on buckets that were otherwise bypassed
+        app_limit_exhausted: Failed writes where an application limit was short
+        wcu_exhausted: Failed writes where only the ``wcu`` limit was short
+        both_exhausted: Failed writes where both were short
+        bucket_missing: Failed writes against a bucket that did not exist
+        evictions: Entries evicted to respect max_entries
+        size: Current number of tracked entries
+    """
+
+    speculated: int = 0
+    fast: int = 0
+    fallbacks: int = 0
+    skipped: int = 0
+    probes: int = 0
+    app_limit_exhausted: int = 0
+    wcu_exhausted: int = 0
+    both_exhausted: int = 0
+    bucket_missing: int = 0
+    evictions: int = 0
+    size: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return stats as a dictionary."""
+        return {
+            "speculated": self.speculated,
+            "fast": self.fast,
+            "fallbacks": self.fallbacks,
+            "skipped": self.skipped,
+            "probes": self.probes,
+            "app_limit_exhausted": self.app_limit_exhausted,
+            "wcu_exhausted": self.wcu_exhausted,
+            "both_exhausted": self.both_exhausted,
+            "bucket_missing": self.bucket_missing,
+            "evictions": self.evictions,
+            "size": self.size,
+        }
+
+
+@dataclass
+class SpeculativeBucketStats:
+    """Speculative-write statistics for one (entity, resource).
+
+    Attributes:
+        success_rate: Smoothed share of speculative attempts that decided the
+            request without the slow path
+        speculated: Speculative attempts
+        fallbacks: Speculative attempts that fell through to the slow path
+        skipped: Acquires sent straight to the read-modify-write path
+        failure_reasons: Failed writes by ``SpeculativeFailureReason`` value
+    """
+
+    success_rate: float = 1.0
+    speculated: int = 0
+    fallbacks: int = 0
+    skipped: int = 0
+    failure_reasons: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class _PolicyEntry:
+    """Tracked state of one composite bucket."""
+
+    stats: SpeculativeBucketStats = field(default_factory=SpeculativeBucketStats)
+    since_probe: int = 0  # skips since the last speculative attempt
+
+
+@dataclass
+class SpeculativePolicy:
+    """Per-bucket speculative success tracking with periodic probing."""
+
+    config: SpeculativePolicyConfig = field(default_factory=SpeculativePolicyConfig)
+    _entries: OrderedDict[tuple[str, str], _PolicyEntry] = field(default_factory=OrderedDict)
+    _stats: SpeculativePolicyStats = field(default_factory=SpeculativePolicyStats)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def should_speculate(self, entity_id: str, resource: str) -> bool:
+        """Decide whether this acquire should try the speculative write.
+
+        Args:
+            entity_id: Entity to acquire capacity for
+            resource: Resource being accessed
+
+        Returns:
+            True to speculate (healthy bucket, unknown bucket, or probe),
+            False to use the read-modify-write path directly.
+        """
+        with self._lock:
+            entry = self._entries.get((entity_id, resource))
+            if entry is None or entry.stats.success_rate >= self.config.min_success_rate:
+                self._stats.speculated += 1
+                return True
+            self._entries.move_to_end((entity_id, resource))
+            entry.since_probe += 1
+            if entry.since_probe >= self.config.probe_every:
+                entry.since_probe = 0
+                self._stats.speculated += 1
+                self._stats.probes += 1
+                return True
+            entry.stats.skipped += 1
+            self._stats.skipped += 1
+            return False
+
+    def record_failure(self, entity_id: str, resource: str, reason: Enum | None) -> None:
+        """Count why a speculative write's condition failed.
+
+        Args:
+            entity_id: Entity the write targeted
+            resource: Resource name
+            reason: ``SpeculativeFailureReason`` of the failed write, if known
+        """
+        if reason is None:
+            return
+        with self._lock:
+            reasons = self._entry((entity_id, resource)).stats.failure_reasons
+            reasons[reason.value] = reasons.get(reason.value, 0) + 1
+            if reason.value in _REASONS:
+                setattr(self._stats, reason.value, getattr(self._stats, reason.value) + 1)
+
+    def record_outcome(self, entity_id: str, resource: str, fast: bool) -> None:
+        """Record whether a speculative attempt decided the request.
+
+        Args:
+            entity_id: Entity the write targeted
+            resource: Resource name
+            fast: True if the speculative path granted or rejected the request,
+                False if the slow path was still needed
+        """
+        with self._lock:
+            entry = self._entry((entity_id, resource)).stats
+            entry.speculated += 1
+            weight = self.config.smoothing
+            entry.success_rate += weight * ((1.0 if fast else 0.0) - entry.success_rate)
+            if fast:
+                self._stats.fast += 1
+            else:
+                entry.fallbacks += 1
+                self._stats.fallbacks += 1
+
+    def bucket_stats(self, entity_id: str, resource: str) -> SpeculativeBucketStats | None:
+        """Snapshot of one bucket's statistics, or None if it is not tracked."""
+        with self._lock:
+            entry = self._entries.get((entity_id, resource))
+            if entry is None:
+                return None
+            return replace(entry.stats, failure_reasons=dict(entry.stats.failure_reasons))
+
+    @property
+    def stats(self) -> SpeculativePolicyStats:
+        """Snapshot of the policy's counters."""
+        with self._lock:
+            stats = SpeculativePolicyStats(**self._stats.as_dict())
+            stats.size = len(self._entries)
+            return stats
+
+    def _entry(self, key: tuple[str, str]) -> _PolicyEntry:
+        """Return the entry for ``key``, creating it and evicting as needed.
+
+        Caller must hold ``_lock``.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _PolicyEntry()
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+        self._entries.move_to_end(key)
+        return entry
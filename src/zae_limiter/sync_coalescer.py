@@ -0,0 +1,176 @@
+"""AUTO-GENERATED by scripts/generate_sync.py - DO NOT EDIT.
+
+Source: coalescer.py
+
+This module provides synchronous versions of the async classes.
+Changes should be made to the source file, then regenerated.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
+
+from .coalescer import CoalescingConfig as CoalescingConfig
+from .coalescer import CoalescingStats as CoalescingStats
+from .models import BucketState
+from .sync_repository_protocol import SpeculativeResult
+
+if TYPE_CHECKING:
+    from .sync_repository_protocol import SyncRepositoryProtocol
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Batch:
+    """Callers waiting on one merged write."""
+
+    consumes: list[dict[str, int]] = field(default_factory=list)
+    done: threading.Event = field(default_factory=threading.Event)
+    result: SpeculativeResult | None = None
+
+
+class SyncSpeculativeCoalescer:
+    """Merges concurrent speculative writes to the same bucket.
+
+    Args:
+        repository: SyncRepository issuing the speculative writes
+        config: Coalescing window and batch size
+    """
+
+    def __init__(
+        self, repository: "SyncRepositoryProtocol", config: CoalescingConfig | None = None
+    ) -> None:
+        self._repository = repository
+        self.config = config if config is not None else CoalescingConfig()
+        self.stats = CoalescingStats()
+        self._pending: dict[tuple[str, str], _Batch] = {}
+        self._sync_lock = threading.Lock()
+
+    def speculative_consume(
+        self, entity_id: str, resource: str, consume: dict[str, int]
+    ) -> SpeculativeResult:
+        """Speculatively consume, merged with concurrent callers for the bucket.
+
+        Args:
+            entity_id: Entity owning the bucket
+            resource: Resource name
+            consume: Amount per limit (tokens, not milli)
+
+        Returns:
+            This caller's SpeculativeResult. On a merged success, bucket
+            states are reconstructed as if callers had written in order.
+        """
+        key = (entity_id, resource)
+        with self._sync_lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if batch is None:
+                batch = _Batch()
+                self._pending[key] = batch
+            index = len(batch.consumes)
+            batch.consumes.append(consume)
+            if len(batch.consumes) >= self.config.max_batch:
+                del self._pending[key]
+        if leader:
+            single = self._lead(entity_id, resource, batch)
+            if single is not None:
+                return single
+        else:
+            batch.done.wait()
+        if batch.result is not None:
+            return _split_result(batch.result, batch.consumes, index)
+        with self._sync_lock:
+            self.stats.fallbacks += 1
+        return self._repository.speculative_consume(
+            entity_id=entity_id, resource=resource, consume=consume
+        )
+
+    def _lead(self, entity_id: str, resource: str, batch: _Batch) -> SpeculativeResult | None:
+        """Collect joiners, then issue the merged write for the batch.
+
+        Returns:
+            The leader's own result if nobody joined (no merge needed),
+            otherwise None with ``batch.result`` set for every caller.
+        """
+        key = (entity_id, resource)
+        try:
+            time.sleep(self.config.window_seconds)
+            with self._sync_lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+            if len(batch.consumes) == 1:
+                return self._repository.speculative_consume(
+                    entity_id=entity_id, resource=resource, consume=batch.consumes[0]
+                )
+            merged: dict[str, int] = {}
+            for consume in batch.consumes:
+                for name, amount in consume.items():
+                    merged[name] = merged.get(name, 0) + amount
+            try:
+                result = self._repository.speculative_consume(
+                    entity_id=entity_id, resource=resource, consume=merged
+                )
+            except Exception:
+                return None
+            parent = result.parent_result
+            if result.success and (parent is None or parent.success):
+                batch.result = result
+                with self._sync_lock:
+                    self.stats.batches += 1
+                    self.stats.coalesced += len(batch.consumes)
+                return None
+            if result.success:
+                self._compensate(entity_id, resource, merged, result.shard_id)
+            elif parent is not None and parent.success and (result.parent_id is not None):
+                self._compensate(result.parent_id, resource, merged, parent.shard_id)
+            return None
+        finally:
+            batch.done.set()
+
+    def _compensate(
+        self, entity_id: str, resource: str, consume: dict[str, int], shard_id: int
+    ) -> None:
+        """Return tokens taken by a merged write that is being abandoned."""
+        deltas = {name: -(amount * 1000) for name, amount in consume.items()}
+        item = self._repository.build_composite_adjust(
+            entity_id=entity_id, resource=resource, deltas=deltas, shard_id=shard_id
+        )
+        if not item:
+            return
+        try:
+            self._repository.write_each([item])
+        except Exception:
+            logger.warning(
+                "Failed to compensate merged speculative write for %s/%s",
+                entity_id,
+                resource,
+                exc_info=True,
+            )
+
+
+def _split_result(
+    result: SpeculativeResult, consumes: list[dict[str, int]], index: int
+) -> SpeculativeResult:
+    """Derive caller ``index``'s view of a merged speculative result.
+
+    Callers are ordered by arrival; each sees the bucket as it was right after
+    its own consumption, i.e. ALL_NEW plus whatever later callers consumed.
+    """
+    later = consumes[index + 1 :]
+
+    def rebuild(states: list[BucketState]) -> list[BucketState]:
+        rebuilt: list[BucketState] = []
+        for state in states:
+            add_back = sum(c.get(state.limit_name, 0) for c in later) * 1000
+            copy = replace(state, tokens_milli=state.tokens_milli + add_back)
+            if copy.total_consumed_milli is not None:
+                copy.total_consumed_milli -= add_back
+            rebuilt.append(copy)
+        return rebuilt
+
+    parent_result = result.parent_result
+    if parent_result is not None:
+        parent_result = replace(parent_result, buckets=rebuild(parent_result.buckets))
+    return replace(result, buckets=rebuild(result.buckets), parent_result=parent_result)
@@ -11,19 +11,29 @@ import time
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
-from .bucket import calculate_available, calculate_retry_after, force_consume, try_consume
-from .exceptions import LeaseExpiredError, RateLimitExceeded
+from .bucket import (
+    build_limit_status,
+    calculate_available,
+    calculate_retry_after,
+    force_consume,
+    try_consume,
+    try_consume_many,
+)
+from .exceptions import LeaseExpiredError, PartialWriteError, RateLimitExceeded
+from .instrumentation import current_trace
 from .models import BucketState, Limit, LimitStatus
 from .schema import calculate_bucket_ttl_seconds
 
 _CONFLICT_MAX_RETRIES = 3
 _CONFLICT_BASE_DELAY_S = 0.025
+_REFRESH_MAX_RETRIES = 3
 if TYPE_CHECKING:
     from .sync_repository_protocol import SyncRepositoryProtocol
+    from .sync_write_behind import SyncWriteBehindBuffer
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class LeaseEntry:
     """Tracks a single bucket within a lease."""
 
@@ -41,7 +51,7 @@ class LeaseEntry:
     _parent_id: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncLease:
     """
     Manages an active rate limit acquisition.
@@ -55,6 +65,8 @@ class SyncLease:
     _committed: bool = False
     _rolled_back: bool = False
     _initial_committed: bool = False
+    _write_behind: "SyncWriteBehindBuffer | None" = None
+    _transactional: bool = True
 
     @property
     def consumed(self) -> dict[str, int]:
@@ -82,49 +94,34 @@ class SyncLease:
         if self._committed or self._rolled_back:
             raise LeaseExpiredError()
         now_ms = int(time.time() * 1000)
-        statuses: list[LimitStatus] = []
-        updates: list[tuple[LeaseEntry, int, int]] = []
-        for entry in self.entries:
-            amount = amounts.get(entry.limit.name, 0)
-            if amount <= 0:
-                continue
-            result = try_consume(entry.state, amount, now_ms)
-            status = LimitStatus(
-                entity_id=entry.entity_id,
-                resource=entry.resource,
-                limit_name=entry.limit.name,
-                limit=entry.limit,
-                available=result.available,
-                requested=amount,
-                exceeded=not result.success,
-                retry_after_seconds=result.retry_after_seconds,
-            )
-            statuses.append(status)
-            if result.success:
-                updates.append((entry, result.new_tokens_milli, result.new_last_refill_ms))
-        consumed_names = set(amounts.keys())
-        for entry in self.entries:
-            if entry.limit.name not in consumed_names:
-                available = calculate_available(entry.state, now_ms)
-                statuses.append(
-                    LimitStatus(
-                        entity_id=entry.entity_id,
-                        resource=entry.resource,
-                        limit_name=entry.limit.name,
-                        limit=entry.limit,
-                        available=available,
-                        requested=0,
-                        exceeded=False,
-                        retry_after_seconds=0.0,
+        targets = [e for e in self.entries if amounts.get(e.limit.name, 0) > 0]
+        requested = [amounts[e.limit.name] for e in targets]
+        results = try_consume_many([e.state for e in targets], requested, now_ms)
+        if results is None:
+            statuses = [
+                build_limit_status(e.entity_id, e.resource, e.limit, e.state, amount, now_ms)
+                for e, amount in zip(targets, requested, strict=True)
+            ]
+            for entry in self.entries:
+                if entry.limit.name not in amounts:
+                    statuses.append(
+                        LimitStatus(
+                            entity_id=entry.entity_id,
+                            resource=entry.resource,
+                            limit_name=entry.limit.name,
+                            limit=entry.limit,
+                            available=calculate_available(entry.state, now_ms),
+                            requested=0,
+                            exceeded=False,
+                            retry_after_seconds=0.0,
+                        )
                     )
-                )
-        violations = [s for s in statuses if s.exceeded]
-        if violations:
             raise RateLimitExceeded(statuses)
-        for entry, new_tokens, new_refill in updates:
+        for entry, amount, (new_tokens, new_refill) in zip(
+            targets, requested, results, strict=True
+        ):
             entry.state.tokens_milli = new_tokens
             entry.state.last_refill_ms = new_refill
-            amount = amounts.get(entry.limit.name, 0)
             entry.consumed += amount
             if entry.state.total_consumed_milli is not None:
                 entry.state.total_consumed_milli += amount * 1000
@@ -171,19 +168,98 @@ class SyncLease:
         Persists bucket state using ADD-based writes (ADR-115). Groups entries
         by (entity_id, resource) to build one composite update per group. Uses
         Normal write path first (ADD with refill, CONDITION rf=expected). On
-        ConditionalCheckFailedException, falls back to Retry path.
+        ConditionalCheckFailedException, recomputes refill and consumption
+        from the state returned with the failure (ALL_OLD) and retries the
+        Normal path, up to _REFRESH_MAX_RETRIES times; if no state came back
+        or the retries run out, falls back to the Retry path.
 
         After successful write, records _initial_consumed on each entry so
         that _commit_adjustments() can compute deltas.
         """
         if self._initial_committed or self._committed or self._rolled_back:
             return
-        now_ms = int(time.time() * 1000)
         repo = self.repository
         groups: dict[tuple[str, str], list[LeaseEntry]] = {}
         for entry in self.entries:
             key = (entry.entity_id, entry.resource)
             groups.setdefault(key, []).append(entry)
+        items = self._build_initial_items(groups, int(time.time() * 1000))
+        if not items:
+            self._initial_committed = True
+            return
+        if not self._transactional and len(items) > 1:
+            self._write_independent(groups, items)
+            self._initial_committed = True
+            for entry in self.entries:
+                entry._initial_consumed = entry.consumed
+            return
+        condition_failed = False
+        conflicts = 0
+        refreshes = 0
+        trace = current_trace()
+        while True:
+            try:
+                repo.transact_write(items)
+                break
+            except Exception as exc:
+                if _is_condition_check_failure(exc):
+                    if refreshes < _REFRESH_MAX_RETRIES and self._refresh_entries(
+                        groups, _condition_failure_buckets(repo, exc)
+                    ):
+                        refreshes += 1
+                        if trace is not None:
+                            trace.commit_retries += 1
+                        logger.debug(
+                            "Normal write failed (optimistic lock), retrying with returned state (attempt %d/%d)",
+                            refreshes,
+                            _REFRESH_MAX_RETRIES,
+                        )
+                        items = self._build_initial_items(groups, int(time.time() * 1000))
+                        continue
+                    condition_failed = True
+                    break
+                if _is_transaction_conflict(exc):
+                    if conflicts < _CONFLICT_MAX_RETRIES:
+                        delay = _CONFLICT_BASE_DELAY_S * 2**conflicts
+                        conflicts += 1
+                        if trace is not None:
+                            trace.commit_retries += 1
+                        logger.debug(
+                            "TransactionConflict (attempt %d/%d), retrying in %.3fs",
+                            conflicts,
+                            _CONFLICT_MAX_RETRIES,
+                            delay,
+                        )
+                        time.sleep(delay)
+                        continue
+                    raise
+                raise
+        if condition_failed:
+            logger.debug("Normal write failed (optimistic lock), retrying consumption-only")
+            if trace is not None:
+                trace.commit_retries += 1
+            retry_items: list[dict[str, Any]] = []
+            for (entity_id, resource), group_entries in groups.items():
+                retry_item = _build_retry_item(repo, entity_id, resource, group_entries)
+                if retry_item:
+                    retry_items.append(retry_item)
+            if retry_items:
+                try:
+                    repo.transact_write(retry_items)
+                except Exception as retry_exc:
+                    if _is_condition_check_failure(retry_exc):
+                        statuses = _build_retry_failure_statuses(self.entries)
+                        raise RateLimitExceeded(statuses) from retry_exc
+                    raise
+        self._initial_committed = True
+        for entry in self.entries:
+            entry._initial_consumed = entry.consumed
+
+    def _build_initial_items(
+        self, groups: dict[tuple[str, str], list[LeaseEntry]], now_ms: int
+    ) -> list[dict[str, Any]]:
+        """Build one composite Create or Normal write per group, in ``groups`` order."""
+        repo = self.repository
         items: list[dict[str, Any]] = []
         for (entity_id, resource), group_entries in groups.items():
             is_new = group_entries[0]._is_new
@@ -231,71 +307,173 @@ class SyncLease:
                         ttl_seconds=ttl_seconds,
                     )
                 )
-        if not items:
-            self._initial_committed = True
-            return
-        condition_failed = False
-        for attempt in range(_CONFLICT_MAX_RETRIES + 1):
-            try:
-                repo.transact_write(items)
-                break
-            except Exception as exc:
+        return items
+
+    def _refresh_entries(
+        self,
+        groups: dict[tuple[str, str], list[LeaseEntry]],
+        failed: dict[int, list[BucketState] | None],
+    ) -> bool:
+        """Redo refill and consumption on the states returned by a failed write.
+
+        Entries of each failed group are rebased on the returned state, so the
+        next Normal write expects its ``rf`` and refills from its tokens. A
+        failed Create (another writer created the item first) becomes a
+        Normal write.
+
+        Args:
+            groups: SyncLease entries per (entity_id, resource), in write order
+            failed: Returned states per failed write index (None if missing)
+
+        Returns:
+            False if some failed write returned no usable state; the caller
+            falls back to the consumption-only Retry path.
+
+        Raises:
+            RateLimitExceeded: If the returned state cannot cover the
+                consumption even after refill
+        """
+        keys = list(groups)
+        if not failed or any(
+            (states is None or index >= len(keys) for index, states in failed.items())
+        ):
+            return False
+        for index, states in failed.items():
+            by_name = {s.limit_name: s for s in states or []}
+            if any(e.limit.name not in by_name for e in groups[keys[index]]):
+                return False
+        now_ms = int(time.time() * 1000)
+        exceeded = False
+        for index, states in failed.items():
+            by_name = {s.limit_name: s for s in states or []}
+            for entry in groups[keys[index]]:
+                state = by_name[entry.limit.name]
+                entry._original_tokens_milli = state.tokens_milli
+                entry._original_rf_ms = state.last_refill_ms
+                entry._is_new = False
+                result = try_consume(state, entry.consumed, now_ms)
+                state.tokens_milli = result.new_tokens_milli
+                state.last_refill_ms = result.new_last_refill_ms
+                if not result.success:
+                    exceeded = True
+                elif state.total_consumed_milli is not None and entry.consumed > 0:
+                    state.total_consumed_milli += entry.consumed * 1000
+                entry.state = state
+        if exceeded:
+            raise RateLimitExceeded(_build_retry_failure_statuses(self.entries))
+        return True
+
+    def _write_independent(
+        self, groups: dict[tuple[str, str], list[LeaseEntry]], items: list[dict[str, Any]]
+    ) -> None:
+        """Write the initial composite updates as independent single-item writes.
+
+        Alternative to one TransactWriteItems for multi-bucket leases (cascade
+        child + parent): each UpdateItem costs 1 WCU instead of 2. Buckets
+        whose optimistic lock failed are rebased on the state returned with
+        the failure (ALL_OLD) and rewritten, up to _REFRESH_MAX_RETRIES times,
+        then retried consumption-only, as in the transactional path. If a
+        bucket still cannot be written, the buckets that were written are
+        compensated with ADD adjustments, as for a failed speculative cascade,
+        and the error is raised.
+
+        Args:
+            groups: SyncLease entries per (entity_id, resource), in ``items`` order
+            items: One composite Normal or Create write per group
+
+        Raises:
+            RateLimitExceeded: If a retried bucket no longer has the tokens
+        """
+        repo = self.repository
+        keys = list(groups)
+        pending = dict(enumerate(items))
+        error: Exception | None = None
+        lost: dict[int, list[BucketState] | None] = {}
+        refreshes = 0
+        trace = current_trace()
+        while True:
+            indexes = list(pending)
+            outcomes = _write_each_failures(repo, list(pending.values()))
+            failures = {indexes[i]: exc for i, exc in outcomes.items()}
+            failed = {keys[index] for index in failures}
+            lost = {}
+            for index, exc in sorted(failures.items()):
                 if _is_condition_check_failure(exc):
-                    condition_failed = True
+                    lost[index] = _condition_failure_buckets(repo, exc).get(0)
+                else:
+                    error = error or exc
+            if error is not None or not lost or refreshes >= _REFRESH_MAX_RETRIES:
+                break
+            try:
+                if not self._refresh_entries(groups, lost):
                     break
-                if _is_transaction_conflict(exc):
-                    if attempt < _CONFLICT_MAX_RETRIES:
-                        delay = _CONFLICT_BASE_DELAY_S * 2**attempt
-                        logger.debug(
-                            "TransactionConflict (attempt %d/%d), retrying in %.3fs",
-                            attempt + 1,
-                            _CONFLICT_MAX_RETRIES,
-                            delay,
-                        )
-                        time.sleep(delay)
-                        continue
-                    raise
-                raise
-        if condition_failed:
+            except RateLimitExceeded as exceeded:
+                error = exceeded
+                break
+            refreshes += 1
+            if trace is not None:
+                trace.commit_retries += 1
+            logger.debug(
+                "Normal write failed (optimistic lock), retrying with returned state (attempt %d/%d)",
+                refreshes,
+                _REFRESH_MAX_RETRIES,
+            )
+            rebuilt = self._build_initial_items(
+                {keys[index]: groups[keys[index]] for index in lost}, int(time.time() * 1000)
+            )
+            pending = dict(zip(lost, rebuilt, strict=True))
+        retry: list[tuple[tuple[str, str], dict[str, Any]]] = []
+        for index in lost:
+            entity_id, resource = keys[index]
+            retry_item = _build_retry_item(repo, entity_id, resource, groups[keys[index]])
+            if retry_item:
+                retry.append((keys[index], retry_item))
+        if error is None and retry:
             logger.debug("Normal write failed (optimistic lock), retrying consumption-only")
-            retry_items: list[dict[str, Any]] = []
-            for (entity_id, resource), group_entries in groups.items():
-                if group_entries[0]._is_new:
-                    pass
-                consumed = {}
-                for entry in group_entries:
-                    if entry.consumed > 0:
-                        consumed[entry.limit.name] = entry.consumed * 1000
-                if consumed:
-                    retry_items.append(
-                        repo.build_composite_retry(
-                            entity_id=entity_id, resource=resource, consumed=consumed
-                        )
-                    )
-            if retry_items:
-                try:
-                    repo.transact_write(retry_items)
-                except Exception as retry_exc:
-                    if _is_condition_check_failure(retry_exc):
-                        statuses = _build_retry_failure_statuses(self.entries)
-                        raise RateLimitExceeded(statuses) from retry_exc
-                    raise
-        self._initial_committed = True
-        for entry in self.entries:
-            entry._initial_consumed = entry.consumed
+            if trace is not None:
+                trace.commit_retries += 1
+            retry_failures = _write_each_failures(repo, [item for _, item in retry])
+            failed = {retry[index][0] for index in retry_failures}
+            for exc in retry_failures.values():
+                if not _is_condition_check_failure(exc):
+                    error = error or exc
+            if error is None and retry_failures:
+                error = RateLimitExceeded(_build_retry_failure_statuses(self.entries))
+        if error is None:
+            return
+        compensate: list[dict[str, Any]] = []
+        for key, group_entries in groups.items():
+            deltas = {e.limit.name: -e.consumed * 1000 for e in group_entries if e.consumed}
+            if key not in failed and deltas:
+                compensate.append(repo.build_composite_adjust(*key, deltas=deltas))
+        try:
+            repo.write_each(compensate)
+        except Exception:
+            logger.warning(
+                "Failed to compensate partially committed lease %s",
+                [key for key in keys if key not in failed],
+                exc_info=True,
+            )
+        raise error
 
     def _commit_adjustments(self) -> None:
         """Write post-enter adjustment deltas to DynamoDB on context exit (Issue #309).
 
         No-op if no adjust/consume/release calls were made during the context.
         Uses build_composite_adjust() for unconditional ADD, dispatched via
-        write_each() (independent single-item writes, 1 WCU each).
+        write_each() (independent single-item writes, 1 WCU each). With a
+        write-behind buffer, deltas are handed to the buffer instead and
+        written later, merged with other leases' deltas for the same bucket.
+        Handing them over is the commit: the lease is marked committed first,
+        so a failed flush can never roll back the initial consumption.
         """
         if self._committed or self._rolled_back:
             return
         if not self._has_adjustments:
             self._committed = True
             return
+        if self._write_behind is not None:
+            self._committed = True
         repo = self.repository
         groups: dict[tuple[str, str], list[LeaseEntry]] = {}
         for entry in self.entries:
@@ -308,7 +486,9 @@ class SyncLease:
                 delta = entry.consumed - entry._initial_consumed
                 if delta != 0:
                     deltas[entry.limit.name] = delta * 1000
-            if deltas:
+            if deltas and self._write_behind is not None:
+                self._write_behind.add(entity_id, resource, deltas)
+            elif deltas:
                 item = repo.build_composite_adjust(
                     entity_id=entity_id, resource=resource, deltas=deltas
                 )
@@ -408,6 +588,21 @@ def _is_transaction_conflict(exc: Exception) -> bool:
     return False
 
 
+def _condition_failure_buckets(
+    repo: "SyncRepositoryProtocol", exc: Exception
+) -> dict[int, list[BucketState] | None]:
+    """Stored states returned with a condition failure, per failed item.
+
+    ``condition_failure_buckets()`` is optional for backends; without it no
+    state comes back and lost locks take the consumption-only Retry path.
+    """
+    get_buckets = getattr(repo, "condition_failure_buckets", None)
+    if get_buckets is None:
+        return {}
+    buckets: dict[int, list[BucketState] | None] = get_buckets(exc)
+    return buckets
+
+
 def _build_retry_failure_statuses(entries: list[LeaseEntry]) -> list[LimitStatus]:
     """Build LimitStatus list for a retry failure (rate limit exceeded)."""
     statuses: list[LimitStatus] = []
@@ -431,3 +626,31 @@ def _build_retry_failure_statuses(entries: list[LeaseEntry]) -> list[LimitStatus
             )
         )
     return statuses
+
+
+def _build_retry_item(
+    repo: "SyncRepositoryProtocol", entity_id: str, resource: str, entries: list[LeaseEntry]
+) -> dict[str, Any]:
+    """Build the consumption-only retry write for one composite bucket.
+
+    Returns an empty dict if nothing was consumed from the bucket.
+    """
+    consumed = {e.limit.name: e.consumed * 1000 for e in entries if e.consumed > 0}
+    if not consumed:
+        return {}
+    return repo.build_composite_retry(entity_id=entity_id, resource=resource, consumed=consumed)
+
+
+def _write_each_failures(
+    repo: "SyncRepositoryProtocol", items: list[dict[str, Any]]
+) -> dict[int, Exception]:
+    """Run ``write_each()`` and return each failed item's error instead of raising."""
+    try:
+        repo.write_each(items)
+    except PartialWriteError as e:
+        return dict(e.failures)
+    except Exception as e:
+        if len(items) > 1:
+            raise
+        return {0: e}
+    return {}
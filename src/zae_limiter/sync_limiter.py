@@ -7,14 +7,21 @@ Changes should be made to the source file, then regenerated.
 """
 
 import logging
+import random
+import threading
 import time
 import warnings
-from collections.abc import Iterator
+from collections.abc import Iterator, Sequence
 from contextlib import contextmanager
+from dataclasses import replace
 from datetime import datetime
 from typing import TYPE_CHECKING, Any, Literal
 
+from .coalescer import CoalescingConfig as CoalescingConfig
+from .coalescer import CoalescingStats as CoalescingStats
 from .limiter import OnUnavailable as OnUnavailable
+from .write_behind import WriteBehindConfig as WriteBehindConfig
+from .write_behind import WriteBehindStats as WriteBehindStats
 
 if TYPE_CHECKING:
     from .sync_repository_protocol import SpeculativeResult, SyncRepositoryProtocol
@@ -22,10 +29,22 @@ from .bucket import (
     build_limit_status,
     calculate_available,
     calculate_time_until_available,
-    try_consume,
+    try_consume_many,
     would_refill_satisfy,
 )
+from .bucket_array import available_tokens
 from .exceptions import RateLimiterUnavailable, RateLimitExceeded, ValidationError
+from .histogram import HistogramSnapshot, LatencyHistograms
+from .instrumentation import (
+    AcquireOutcome,
+    AcquirePath,
+    AcquirePhase,
+    AcquireTrace,
+    InstrumentationListener,
+    current_trace,
+    emit_acquire,
+)
+from .local_rejection import BucketMirror, LocalRejectionConfig, LocalRejectionStats
 from .models import (
     AuditEvent,
     BucketState,
@@ -33,7 +52,6 @@ from .models import (
     EntityCapacity,
     Limit,
     LimiterInfo,
-    LimitStatus,
     OnUnavailableAction,
     ResourceCapacity,
     StackOptions,
@@ -42,11 +60,26 @@ from .models import (
     validate_identifier,
     validate_resource,
 )
+from .reservation import (
+    ReservationBlock,
+    ReservationConfig,
+    ReservationPool,
+    ReservationStats,
+    ReservedBucket,
+)
 from .schema import DEFAULT_RESOURCE
+from .speculative_policy import (
+    SpeculativeBucketStats,
+    SpeculativePolicy,
+    SpeculativePolicyConfig,
+    SpeculativePolicyStats,
+)
+from .sync_coalescer import SyncSpeculativeCoalescer
 from .sync_config_cache import ConfigSource
 from .sync_lease import LeaseEntry, SyncLease
 from .sync_repository import SyncRepository
 from .sync_repository_protocol import SpeculativeFailureReason
+from .sync_write_behind import SyncWriteBehindBuffer
 
 _UNSET: Any = object()
 logger = logging.getLogger(__name__)
@@ -92,6 +125,14 @@ class SyncRateLimiter:
         auto_update: "bool | Any" = _UNSET,
         bucket_ttl_refill_multiplier: "int | Any" = _UNSET,
         speculative_writes: bool = True,
+        reservation: ReservationConfig | None = None,
+        local_rejection: LocalRejectionConfig | None = None,
+        coalescing: CoalescingConfig | None = None,
+        write_behind: WriteBehindConfig | None = None,
+        speculative_policy: SpeculativePolicyConfig | None = None,
+        transactional_commit: bool = True,
+        listeners: Sequence[InstrumentationListener] | None = None,
+        latency_histograms: bool = False,
     ) -> None:
         """
         Initialize the rate limiter.
@@ -112,6 +153,48 @@ class SyncRateLimiter:
             speculative_writes: Enable speculative UpdateItem fast path.
                 When True, acquire() tries a speculative write first, falling
                 back to the full read-write path only when needed.
+            reservation: Enable client-side token reservation blocks for hot
+                (entity, resource) keys. When set, acquire() reserves a block of
+                tokens in one write once a key's request rate is high enough and
+                serves later acquires from it locally. Unused tokens are returned
+                when the block expires or on close(). None (default) disables it.
+            local_rejection: Enable predictive local rejection. When set, the
+                bucket state returned by each speculative write is mirrored
+                in-process, and acquire() rejects requests that the mirrored
+                state (refilled to now) cannot satisfy without calling DynamoDB.
+                None (default) disables it.
+            coalescing: Enable request coalescing for the speculative path.
+                When set, concurrent acquires for the same (entity, resource)
+                are merged into a single UpdateItem with summed amounts.
+                None (default) disables it.
+            write_behind: Enable write-behind buffering of ``SyncLease.adjust()``
+                deltas. When set, adjustments made inside acquire() are summed
+                per bucket in-process and written in the background, one
+                update per bucket per flush interval. Buffered deltas are
+                flushed on close(). None (default) writes them on context exit.
+            speculative_policy: Enable the adaptive speculative-write policy.
+                When set, speculative outcomes are tracked per (entity,
+                resource), and buckets where the speculative write rarely
+                decides the request (usually near empty or waiting on refill)
+                use the read-modify-write path directly, with periodic probes.
+                None (default) always speculates when speculative_writes is on.
+            transactional_commit: Commit slow-path leases that span several
+                buckets (cascade child + parent) in one TransactWriteItems,
+                at 2 WCU per bucket. When False, each bucket is written with
+                its own concurrent UpdateItem at 1 WCU; if one write fails,
+                the others are compensated with ADD adjustments, as on the
+                speculative path. Other requests may briefly observe the
+                compensated tokens as consumed.
+            listeners: Instrumentation listeners. Each acquire() sends them an
+                ``AcquireTrace`` with per-phase timings, the path that decided
+                the request, and retry counts. When the repository is a
+                ``SyncRepository``, they are also added to it and receive the
+                duration of every DynamoDB call. None (default) disables
+                instrumentation.
+            latency_histograms: Record acquire, commit, adjustment and
+                rollback latencies, and DynamoDB call latencies, into
+                in-process histograms (read with ``get_latency_histograms()``).
+                Uses the same instrumentation as ``listeners``. Default False.
 
         Raises:
             ValueError: If both repository and name/region/endpoint_url/stack_options
@@ -175,6 +258,37 @@ class SyncRateLimiter:
                 repo._on_unavailable_cache = on_unavailable.value
         self._initialized = False
         self._speculative_writes = speculative_writes
+        self._reservations: ReservationPool | None = (
+            ReservationPool(config=reservation) if reservation is not None else None
+        )
+        self._bucket_mirror: BucketMirror | None = (
+            BucketMirror(config=local_rejection) if local_rejection is not None else None
+        )
+        self._coalescer: SyncSpeculativeCoalescer | None = (
+            SyncSpeculativeCoalescer(self._repository, coalescing)
+            if coalescing is not None
+            else None
+        )
+        self._write_behind: SyncWriteBehindBuffer | None = (
+            SyncWriteBehindBuffer(self._repository, write_behind)
+            if write_behind is not None
+            else None
+        )
+        self._transactional_commit = transactional_commit
+        self._speculative_policy: SpeculativePolicy | None = (
+            SpeculativePolicy(config=speculative_policy) if speculative_policy is not None else None
+        )
+        self._histograms: LatencyHistograms | None = (
+            LatencyHistograms() if latency_histograms else None
+        )
+        if self._histograms is not None:
+            listeners = [*(listeners or ()), self._histograms]
+        self._listeners: tuple[InstrumentationListener, ...] = tuple(listeners or ())
+        if isinstance(self._repository, SyncRepository):
+            for listener in self._listeners:
+                self._repository.add_listener(listener)
+        self._thread_pool: Any = None
+        self._thread_pool_lock = threading.Lock()
 
     @property
     def name(self) -> str:
@@ -275,8 +389,25 @@ class SyncRateLimiter:
         self._initialized = True
 
     def close(self) -> None:
-        """Close the underlying connections."""
-        self._repository.close()
+        """Close the underlying connections.
+
+        Returns unused reserved tokens to their buckets and flushes buffered
+        adjustment deltas first.
+        """
+        try:
+            if self._reservations is not None:
+                for block in self._reservations.drain():
+                    self._release_block(block)
+            try:
+                if self._write_behind is not None:
+                    self._write_behind.close()
+            finally:
+                if isinstance(self._repository, SyncRepository):
+                    for listener in self._listeners:
+                        self._repository.remove_listener(listener)
+                self._repository.close()
+        finally:
+            self._cleanup_thread_pool()
 
     def __enter__(self) -> "SyncRateLimiter":
         self._ensure_initialized()
@@ -565,39 +696,537 @@ class SyncRateLimiter:
                 DeprecationWarning,
                 stacklevel=2,
             )
-        mode = self._resolve_on_unavailable(on_unavailable)
+        trace = AcquireTrace(entity_id, resource) if self._listeners else None
         try:
+            mode = self._resolve_on_unavailable(on_unavailable)
             lease: SyncLease | None = None
-            if self._speculative_writes:
-                lease = self._try_speculative_acquire(
-                    entity_id=entity_id, resource=resource, consume=consume
-                )
-            if lease is None:
-                lease = self._do_acquire(
-                    entity_id=entity_id, resource=resource, limits_override=limits, consume=consume
+            try:
+                if trace is not None:
+                    trace.enter(AcquirePhase.FAST_PATH)
+                lease = self._try_fast_acquire(entity_id, resource, consume)
+                if lease is None:
+                    if trace is not None:
+                        trace.enter(AcquirePhase.SLOW_PATH)
+                        trace.path = AcquirePath.SLOW
+                    lease = self._do_acquire(
+                        entity_id=entity_id,
+                        resource=resource,
+                        limits_override=limits,
+                        consume=consume,
+                    )
+                elif trace is not None and trace.path is None:
+                    trace.path = AcquirePath.SPECULATIVE
+            except (RateLimitExceeded, ValidationError):
+                raise
+            except Exception as e:
+                if mode != OnUnavailable.ALLOW:
+                    raise RateLimiterUnavailable(
+                        str(e),
+                        cause=e,
+                        stack_name=self._repository.stack_name,
+                        entity_id=entity_id,
+                        resource=resource,
+                    ) from e
+            if lease is not None:
+                if trace is not None:
+                    trace.enter(AcquirePhase.COMMIT_INITIAL)
+                lease._commit_initial()
+        except BaseException as e:
+            if trace is not None:
+                self._finish_trace(trace, e)
+            raise
+        if lease is None:
+            if trace is not None:
+                trace.path = AcquirePath.UNAVAILABLE
+                self._finish_trace(trace)
+            yield SyncLease(repository=self._repository)
+            return
+        lease._write_behind = self._write_behind
+        if trace is not None:
+            trace.acquired()
+        try:
+            yield lease
+            if trace is not None:
+                trace.enter(AcquirePhase.COMMIT_ADJUSTMENTS)
+            lease._commit_adjustments()
+        except Exception:
+            if trace is not None:
+                trace.enter(AcquirePhase.ROLLBACK)
+            lease._rollback()
+            raise
+        finally:
+            if trace is not None:
+                self._finish_trace(trace)
+
+    def _finish_trace(self, trace: AcquireTrace, error: BaseException | None = None) -> None:
+        """Close an acquire trace and send it to the listeners."""
+        if error is None:
+            outcome = AcquireOutcome.GRANTED
+        elif isinstance(error, RateLimitExceeded):
+            outcome = AcquireOutcome.REJECTED
+            if trace.path is None:
+                trace.path = AcquirePath.FAST_REJECT
+        else:
+            outcome = AcquireOutcome.ERROR
+        trace.close(outcome)
+        emit_acquire(self._listeners, trace)
+
+    @contextmanager
+    def acquire_many(
+        self,
+        requests: Sequence[tuple[str, str, dict[str, int]]],
+        limits: list[Limit] | None = None,
+        on_unavailable: OnUnavailable | None = None,
+    ) -> Iterator[list[SyncLease | RateLimitExceeded]]:
+        """
+        Acquire rate limit capacity for many (entity, resource) pairs at once.
+
+        Each request is acquired independently: the yielded list holds, in
+        request order, either a ``SyncLease`` or the ``RateLimitExceeded`` that
+        rejected that request. A rejection never affects the other requests.
+
+        Compared to calling ``acquire()`` in a loop, round trips are shared:
+
+        1. Fast paths (reservation blocks, speculative writes) run
+           concurrently for every request.
+        2. Requests that need the slow path resolve limits through the config
+           cache, then read every entity META and bucket they touch with
+           chunked BatchGetItem calls (one pass for the requested entities,
+           one for cascade parents).
+        3. Slow-path leases are committed concurrently.
+
+        On context exit, every lease's adjustments are committed; if the
+        block raises, every lease is rolled back.
+
+        Args:
+            requests: ``(entity_id, resource, consume)`` tuples
+            limits: Override stored config with explicit limits for every
+                request (optional)
+            on_unavailable: Override default on_unavailable behavior
+
+        Yields:
+            One ``SyncLease`` or ``RateLimitExceeded`` per request, in order
+
+        Raises:
+            RateLimiterUnavailable: If DynamoDB unavailable and BLOCK
+            ValidationError: If an identifier is invalid or a request has no
+                limits configured at any level
+
+        Example:
+            async with limiter.acquire_many([
+                ("user-1", "gpt-4", {"rpm": 1}),
+                ("user-2", "gpt-4", {"rpm": 1}),
+            ]) as results:
+                for result in results:
+                    if isinstance(result, RateLimitExceeded):
+                        ...
+        """
+        self._ensure_initialized()
+        for entity_id, resource, _ in requests:
+            validate_identifier(entity_id, "entity_id")
+            validate_resource(resource)
+        mode = self._resolve_on_unavailable(on_unavailable)
+        results: list[SyncLease | RateLimitExceeded | None] = [None] * len(requests)
+        try:
+            if self._reservations is not None or self._speculative_writes:
+                outcomes = self._run_in_executor(
+                    *[
+                        lambda request=request: self._try_fast_acquire_item(request)
+                        for request in requests
+                    ]
                 )
-        except (RateLimitExceeded, ValidationError):
+                error: Exception | None = None
+                for i, outcome in enumerate(outcomes):
+                    if isinstance(outcome, SyncLease | RateLimitExceeded):
+                        results[i] = outcome
+                    elif outcome is not None and error is None:
+                        error = outcome
+                if error is not None:
+                    raise error
+            pending = [i for i, result in enumerate(results) if result is None]
+            if pending:
+                self._do_acquire_many(requests, pending, results, limits)
+        except ValidationError:
+            self._rollback_leases(results)
             raise
         except Exception as e:
-            if mode == OnUnavailable.ALLOW:
-                yield SyncLease(repository=self._repository)
-                return
-            else:
+            if mode == OnUnavailable.BLOCK:
+                self._rollback_leases(results)
                 raise RateLimiterUnavailable(
-                    str(e),
-                    cause=e,
-                    stack_name=self._repository.stack_name,
-                    entity_id=entity_id,
-                    resource=resource,
+                    str(e), cause=e, stack_name=self._repository.stack_name
                 ) from e
-        lease._commit_initial()
+        final: list[SyncLease | RateLimitExceeded] = [
+            result if result is not None else SyncLease(repository=self._repository)
+            for result in results
+        ]
+        leases = [result for result in final if isinstance(result, SyncLease)]
+        for lease in leases:
+            lease._write_behind = self._write_behind
         try:
-            yield lease
-            lease._commit_adjustments()
+            yield final
+            self._run_in_executor(
+                *[lambda lease=lease: lease._commit_adjustments() for lease in leases]
+            )
         except Exception:
-            lease._rollback()
+            self._rollback_leases(leases)
             raise
 
+    def _try_fast_acquire(
+        self, entity_id: str, resource: str, consume: dict[str, int]
+    ) -> SyncLease | None:
+        """Try the reservation block and speculative fast paths.
+
+        Returns:
+            A lease already committed to DynamoDB, or None if the slow path
+            is needed.
+
+        Raises:
+            RateLimitExceeded: If the fast path can reject without the slow path
+        """
+        lease: SyncLease | None = None
+        if self._reservations is not None:
+            lease = self._try_reserved_acquire(
+                entity_id=entity_id, resource=resource, consume=consume
+            )
+            if lease is not None:
+                trace = current_trace()
+                if trace is not None:
+                    trace.path = AcquirePath.RESERVED
+        if lease is None and self._speculative_writes:
+            policy = self._speculative_policy
+            if policy is not None and (not policy.should_speculate(entity_id, resource)):
+                return None
+            try:
+                lease = self._try_speculative_acquire(
+                    entity_id=entity_id, resource=resource, consume=consume
+                )
+            except RateLimitExceeded:
+                if policy is not None:
+                    policy.record_outcome(entity_id, resource, fast=True)
+                raise
+            if policy is not None:
+                policy.record_outcome(entity_id, resource, fast=lease is not None)
+        return lease
+
+    def _try_fast_acquire_item(
+        self, request: tuple[str, str, dict[str, int]]
+    ) -> SyncLease | Exception | None:
+        """Run ``_try_fast_acquire`` for one acquire_many() request.
+
+        Errors are returned rather than raised so one failing request does
+        not abandon leases that other concurrent requests already committed.
+        """
+        entity_id, resource, consume = request
+        try:
+            return self._try_fast_acquire(entity_id, resource, consume)
+        except Exception as e:
+            return e
+
+    def _do_acquire_many(
+        self,
+        requests: Sequence[tuple[str, str, dict[str, int]]],
+        pending: list[int],
+        results: list[SyncLease | RateLimitExceeded | None],
+        limits_override: list[Limit] | None,
+    ) -> None:
+        """Slow path for the ``pending`` indices of an acquire_many() batch.
+
+        Stores a committed SyncLease or a RateLimitExceeded in ``results`` for
+        each pending request. Requests sharing an existing bucket each consume
+        from their own copy of the fetched state; the commit's optimistic lock
+        and consumption-only retry reconcile them in DynamoDB. Requests sharing
+        a bucket that does not exist yet cannot both create it, so all but the
+        first are acquired one by one after the batch commits.
+        """
+        now_ms = int(time.time() * 1000)
+        child_keys = list(dict.fromkeys((requests[i][0], requests[i][1]) for i in pending))
+        resolved = self._resolve_limits_many(child_keys, limits_override)
+        entities, buckets = self._fetch_entities_and_buckets(
+            [entity_id for entity_id, _ in child_keys], child_keys
+        )
+        parent_keys: list[tuple[str, str]] = []
+        for entity_id, resource in child_keys:
+            entity = entities.get(entity_id)
+            if entity is None or not entity.cascade or (not entity.parent_id):
+                continue
+            key = (entity.parent_id, resource)
+            if key not in resolved and key not in parent_keys:
+                parent_keys.append(key)
+        if parent_keys:
+            resolved.update(self._resolve_limits_many(parent_keys, limits_override))
+            _, parent_buckets = self._fetch_entities_and_buckets([], parent_keys)
+            buckets.update(parent_buckets)
+        leases: dict[int, SyncLease] = {}
+        deferred: list[int] = []
+        claimed_new: set[tuple[str, str]] = set()
+        for i in pending:
+            entity_id, resource, consume = requests[i]
+            entity = entities.get(entity_id)
+            limits, config_source = resolved[entity_id, resource]
+            entity_limits: dict[str, list[Limit]] = {entity_id: limits}
+            entity_config_sources: dict[str, str] = {entity_id: config_source}
+            if entity is not None and entity.cascade and entity.parent_id:
+                parent_limits, parent_source = resolved[entity.parent_id, resource]
+                entity_limits[entity.parent_id] = parent_limits
+                entity_config_sources[entity.parent_id] = parent_source
+            existing_buckets: dict[tuple[str, str, str], BucketState] = {}
+            for eid, eid_limits in entity_limits.items():
+                for limit in eid_limits:
+                    bucket_key = (eid, resource, limit.name)
+                    if bucket_key in buckets:
+                        existing_buckets[bucket_key] = replace(buckets[bucket_key])
+            new_keys = {
+                (eid, resource)
+                for eid, eid_limits in entity_limits.items()
+                if not any((eid, resource, limit.name) in buckets for limit in eid_limits)
+            }
+            if new_keys & claimed_new:
+                deferred.append(i)
+                continue
+            claimed_new |= new_keys
+            try:
+                leases[i] = self._build_lease(
+                    entity_id=entity_id,
+                    resource=resource,
+                    consume=consume,
+                    entity=entity,
+                    entity_limits=entity_limits,
+                    entity_config_sources=entity_config_sources,
+                    existing_buckets=existing_buckets,
+                    now_ms=now_ms,
+                )
+            except RateLimitExceeded as e:
+                results[i] = e
+        indices = list(leases)
+        outcomes = self._run_in_executor(
+            *[lambda i=i: self._commit_initial_item(leases[i]) for i in indices]
+        )
+        error: Exception | None = None
+        for i, outcome in zip(indices, outcomes, strict=True):
+            if outcome is None:
+                results[i] = leases[i]
+            elif isinstance(outcome, RateLimitExceeded):
+                results[i] = outcome
+            elif error is None:
+                error = outcome
+        if error is not None:
+            raise error
+        for i in deferred:
+            entity_id, resource, consume = requests[i]
+            try:
+                lease = self._do_acquire(entity_id, resource, limits_override, consume)
+                lease._commit_initial()
+            except RateLimitExceeded as e:
+                results[i] = e
+            else:
+                results[i] = lease
+
+    def _resolve_limits_many(
+        self, keys: list[tuple[str, str]], limits_override: list[Limit] | None
+    ) -> dict[tuple[str, str], tuple[list[Limit], str]]:
+        """Resolve limits for every (entity, resource) key concurrently.
+
+        Config slots missing from the cache are first read in one batched
+        read when the repository supports it, so the resolutions below are
+        cache hits instead of one fetch per key.
+        """
+        prefetch = getattr(self._repository, "prefetch_configs", None)
+        if limits_override is None and prefetch is not None:
+            prefetch(keys)
+        resolutions = self._run_in_executor(
+            *[lambda key=key: self._resolve_limits(key[0], key[1], limits_override) for key in keys]
+        )
+        return dict(zip(keys, resolutions, strict=True))
+
+    def _commit_initial_item(self, lease: SyncLease) -> Exception | None:
+        """Commit one acquire_many() lease, returning the error if it fails."""
+        try:
+            lease._commit_initial()
+        except Exception as e:
+            return e
+        return None
+
+    def _rollback_leases(self, results: Sequence[SyncLease | RateLimitExceeded | None]) -> None:
+        """Roll back every lease in an acquire_many() result list."""
+        leases = [result for result in results if isinstance(result, SyncLease)]
+        self._run_in_executor(*[lambda lease=lease: lease._rollback() for lease in leases])
+
+    def _try_reserved_acquire(
+        self, entity_id: str, resource: str, consume: dict[str, int]
+    ) -> SyncLease | None:
+        """Try to serve an acquire from a client-side reservation block.
+
+        Serves the request from the live block for (entity_id, resource) when
+        it has enough tokens. Otherwise, if the key is hot enough, reserves a
+        new block sized from the observed request rate with one speculative
+        write (two for cascade) and serves the request from it.
+
+        Never raises RateLimitExceeded: any shortfall returns None so the
+        regular speculative/slow path decides.
+
+        Returns:
+            Pre-committed SyncLease if served from a block, None otherwise.
+        """
+        pool = self._reservations
+        assert pool is not None
+        if not any(amount > 0 for amount in consume.values()):
+            return None
+        for expired in pool.sweep():
+            self._release_block(expired)
+        key = (entity_id, resource)
+        pool.observe(key)
+        served = pool.take(key, consume)
+        if served is not None:
+            return self._build_reserved_lease(served, consume)
+        multiplier = pool.block_multiplier(key)
+        if multiplier == 0 or pool.backing_off(key):
+            return None
+        displaced = pool.pop(key)
+        if displaced is not None:
+            self._release_block(displaced)
+        amounts = pool.capped_amounts(key, consume, multiplier)
+        if amounts == consume:
+            return None
+        buckets = self._reserve_block(entity_id, resource, amounts)
+        if buckets is None:
+            return None
+        for bucket in buckets:
+            bucket.remaining = {
+                name: total - consume.get(name, 0) for name, total in amounts.items()
+            }
+        displaced = pool.put(key, buckets)
+        if displaced is not None:
+            self._release_block(displaced)
+        return self._build_reserved_lease(buckets, consume)
+
+    def _reserve_block(
+        self, entity_id: str, resource: str, amounts: dict[str, int]
+    ) -> list[ReservedBucket] | None:
+        """Reserve ``amounts`` from the entity's bucket (and parent's, for cascade).
+
+        All-or-nothing: if any bucket cannot cover the block, tokens already
+        taken from the other bucket are returned and None is returned. The
+        failure is recorded in the pool with the short bucket's ``ALL_OLD``
+        states, which size the next block for the key.
+        """
+        pool = self._reservations
+        assert pool is not None
+        key = (entity_id, resource)
+        result = self._repository.speculative_consume(
+            entity_id=entity_id, resource=resource, consume=amounts
+        )
+        if not result.success:
+            parent = result.parent_result
+            if parent is not None and parent.success and (result.parent_id is not None):
+                self._release_reserved(
+                    [self._reserved_bucket(result.parent_id, resource, parent, amounts)]
+                )
+            pool.record_failure(key, result.old_buckets)
+            return None
+        child = self._reserved_bucket(entity_id, resource, result, amounts)
+        child.cascade = result.cascade
+        child.parent_id = result.parent_id
+        parent_result = result.parent_result
+        if parent_result is None and result.cascade and result.parent_id:
+            parent_result = self._repository.speculative_consume(
+                entity_id=result.parent_id, resource=resource, consume=amounts
+            )
+        if parent_result is None:
+            return [child]
+        if not parent_result.success:
+            self._release_reserved([child])
+            pool.record_failure(key, parent_result.old_buckets)
+            return None
+        assert result.parent_id is not None
+        return [child, self._reserved_bucket(result.parent_id, resource, parent_result, amounts)]
+
+    @staticmethod
+    def _reserved_bucket(
+        entity_id: str, resource: str, result: "SpeculativeResult", amounts: dict[str, int]
+    ) -> ReservedBucket:
+        """Wrap a successful speculative result as a reserved bucket."""
+        return ReservedBucket(
+            entity_id=entity_id,
+            resource=resource,
+            shard_id=result.shard_id,
+            states=result.buckets,
+            remaining=dict(amounts),
+        )
+
+    def _build_reserved_lease(
+        self, buckets: list[ReservedBucket], consume: dict[str, int]
+    ) -> SyncLease:
+        """Build a pre-committed SyncLease for a request served from a block.
+
+        The tokens were already debited in DynamoDB when the block was
+        reserved, so the lease is marked as initially committed. Adjustments
+        and rollback write ADD deltas to the bucket as for any other lease.
+        Bucket states are copied so lease mutations never reach the block.
+        """
+        entries: list[LeaseEntry] = []
+        for bucket in buckets:
+            for state in bucket.states:
+                amount = consume.get(state.limit_name, 0)
+                if amount == 0:
+                    continue
+                entries.append(
+                    LeaseEntry(
+                        entity_id=bucket.entity_id,
+                        resource=bucket.resource,
+                        limit=Limit.from_bucket_state(state),
+                        state=replace(state),
+                        consumed=amount,
+                        _cascade=bucket.cascade,
+                        _parent_id=bucket.parent_id,
+                    )
+                )
+        lease = SyncLease(repository=self._repository, entries=entries)
+        lease._initial_committed = True
+        for entry in entries:
+            entry._initial_consumed = entry.consumed
+        return lease
+
+    def _release_block(self, block: ReservationBlock) -> None:
+        """Return a block's unused tokens to DynamoDB.
+
+        Failures are logged, not raised: unreturned tokens refill naturally,
+        so a failed release only under-grants until then.
+        """
+        try:
+            self._release_reserved(block.buckets)
+        except Exception:
+            logger.warning(
+                "Failed to release reserved tokens for %s",
+                [(b.entity_id, b.resource) for b in block.buckets],
+                exc_info=True,
+            )
+            return
+        assert self._reservations is not None
+        self._reservations.record_release(block)
+
+    def _release_reserved(self, buckets: list[ReservedBucket]) -> None:
+        """Write unconditional ADDs returning unserved tokens to each bucket."""
+        items: list[dict[str, Any]] = []
+        for bucket in buckets:
+            deltas = bucket.release_deltas()
+            if deltas:
+                items.append(
+                    self._repository.build_composite_adjust(
+                        entity_id=bucket.entity_id,
+                        resource=bucket.resource,
+                        deltas=deltas,
+                        shard_id=bucket.shard_id,
+                    )
+                )
+        if items:
+            self._repository.write_each(items)
+
+    def get_reservation_stats(self) -> ReservationStats | None:
+        """Get reservation block counters, or None if reservations are disabled."""
+        if self._reservations is None:
+            return None
+        return self._reservations.stats
+
     def _try_speculative_acquire(
         self, entity_id: str, resource: str, consume: dict[str, int]
     ) -> SyncLease | None:
@@ -616,10 +1245,20 @@ class SyncRateLimiter:
                 wouldn't help). Saves 1 RCU vs the slow path.
         """
         now_ms = int(time.time() * 1000)
-        result = self._repository.speculative_consume(
-            entity_id=entity_id, resource=resource, consume=consume
-        )
+        if self._bucket_mirror is not None:
+            statuses = self._bucket_mirror.check(entity_id, resource, consume, now_ms)
+            if statuses is not None:
+                trace = current_trace()
+                if trace is not None:
+                    trace.path = AcquirePath.LOCAL_REJECT
+                raise RateLimitExceeded(statuses)
+        result = self._speculative_consume(entity_id, resource, consume)
+        self._mirror_result(entity_id, resource, result)
+        if result.parent_result is not None and result.parent_id is not None:
+            self._mirror_result(result.parent_id, resource, result.parent_result)
         if not result.success:
+            if self._speculative_policy is not None:
+                self._speculative_policy.record_failure(entity_id, resource, result.failure_reason)
             if result.parent_result is not None and result.parent_result.success:
                 assert result.parent_id is not None
                 self._compensate_speculative(result.parent_id, resource, consume)
@@ -679,9 +1318,8 @@ class SyncRateLimiter:
                 )
         elif result.cascade and result.parent_id:
             parent_id = result.parent_id
-            parent_result = self._repository.speculative_consume(
-                entity_id=parent_id, resource=resource, consume=consume
-            )
+            parent_result = self._speculative_consume(parent_id, resource, consume)
+            self._mirror_result(parent_id, resource, parent_result)
             if parent_result.success:
                 for state in parent_result.buckets:
                     amount = consume.get(state.limit_name, 0)
@@ -706,7 +1344,7 @@ class SyncRateLimiter:
                     self._compensate_child(entity_id, resource, consume)
                     return None
                 would_help, parent_statuses = would_refill_satisfy(
-                    parent_result.old_buckets, consume, now_ms
+                    parent_result.old_buckets, consume, now_ms, with_statuses=False
                 )
                 if not would_help:
                     self._compensate_child(entity_id, resource, consume)
@@ -739,6 +1377,86 @@ class SyncRateLimiter:
             entry._initial_consumed = entry.consumed
         return lease
 
+    def _speculative_consume(
+        self, entity_id: str, resource: str, consume: dict[str, int]
+    ) -> "SpeculativeResult":
+        """Issue a speculative write, merged with concurrent callers when enabled."""
+        trace = current_trace()
+        started = time.perf_counter() if trace is not None else 0.0
+        if self._coalescer is not None:
+            result = self._coalescer.speculative_consume(entity_id, resource, consume)
+        else:
+            result = self._repository.speculative_consume(
+                entity_id=entity_id, resource=resource, consume=consume
+            )
+        if trace is not None:
+            trace.record(AcquirePhase.SPECULATIVE_WRITE, started)
+        return result
+
+    def get_coalescing_stats(self) -> CoalescingStats | None:
+        """Get request coalescing counters, or None if coalescing is disabled."""
+        if self._coalescer is None:
+            return None
+        return self._coalescer.stats
+
+    def get_speculative_policy_stats(self) -> SpeculativePolicyStats | None:
+        """Get speculative policy counters, or None if the policy is disabled."""
+        if self._speculative_policy is None:
+            return None
+        return self._speculative_policy.stats
+
+    def get_speculative_bucket_stats(
+        self, entity_id: str, resource: str
+    ) -> SpeculativeBucketStats | None:
+        """Get speculative statistics for one (entity, resource).
+
+        Returns:
+            The bucket's success rate and failure reasons, or None if the
+            policy is disabled or the bucket has not been tracked yet.
+        """
+        if self._speculative_policy is None:
+            return None
+        return self._speculative_policy.bucket_stats(entity_id, resource)
+
+    def get_write_behind_stats(self) -> WriteBehindStats | None:
+        """Get write-behind buffer counters, or None if write-behind is disabled."""
+        if self._write_behind is None:
+            return None
+        return self._write_behind.stats
+
+    def _mirror_result(self, entity_id: str, resource: str, result: "SpeculativeResult") -> None:
+        """Record a speculative result's bucket state for local rejection.
+
+        Mirrors ALL_NEW on success and ALL_OLD on failure. Missing buckets
+        are forgotten; multi-shard buckets are never mirrored.
+        """
+        mirror = self._bucket_mirror
+        if mirror is None or result.shard_count > 1:
+            return
+        states = result.buckets if result.success else result.old_buckets
+        if states is None:
+            mirror.invalidate(entity_id, resource)
+            return
+        parent_id = result.parent_id if result.cascade else None
+        mirror.record(entity_id, resource, states, parent_id=parent_id)
+
+    def get_local_rejection_stats(self) -> LocalRejectionStats | None:
+        """Get local rejection counters, or None if local rejection is disabled."""
+        if self._bucket_mirror is None:
+            return None
+        return self._bucket_mirror.stats
+
+    def get_latency_histograms(self) -> HistogramSnapshot | None:
+        """Get a snapshot of the latency histograms, or None if they are disabled."""
+        if self._histograms is None:
+            return None
+        return self._histograms.snapshot()
+
+    def reset_latency_histograms(self) -> None:
+        """Clear the latency histograms (no-op if disabled)."""
+        if self._histograms is not None:
+            self._histograms.reset()
+
     def _handle_nested_parent_failure(
         self,
         entity_id: str,
@@ -773,7 +1491,7 @@ class SyncRateLimiter:
             self._compensate_child(entity_id, resource, consume)
             return None
         would_help, parent_statuses = would_refill_satisfy(
-            parent_result.old_buckets, consume, now_ms
+            parent_result.old_buckets, consume, now_ms, with_statuses=False
         )
         if not would_help:
             self._compensate_child(entity_id, resource, consume)
@@ -824,11 +1542,16 @@ class SyncRateLimiter:
         self, entity_id: str, resource: str, consume: dict[str, int]
     ) -> None:
         """Compensate a speculative write by adding consumed tokens back."""
+        trace = current_trace()
+        started = time.perf_counter() if trace is not None else 0.0
         deltas = {name: -(amount * 1000) for name, amount in consume.items()}
         compensate_item = self._repository.build_composite_adjust(
             entity_id=entity_id, resource=resource, deltas=deltas
         )
         self._repository.write_each([compensate_item])
+        if trace is not None:
+            trace.compensations += 1
+            trace.record(AcquirePhase.COMPENSATION, started)
 
     @staticmethod
     def _check_speculative_failure(
@@ -844,7 +1567,9 @@ class SyncRateLimiter:
         bucket_names = {b.limit_name for b in result.old_buckets}
         if not all(name in bucket_names for name in consume):
             return
-        would_help, statuses = would_refill_satisfy(result.old_buckets, consume, now_ms)
+        would_help, statuses = would_refill_satisfy(
+            result.old_buckets, consume, now_ms, with_statuses=False
+        )
         if not would_help:
             raise RateLimitExceeded(statuses)
 
@@ -862,7 +1587,9 @@ class SyncRateLimiter:
 
         When application limits are exhausted on one shard, other shards may
         still have available tokens (since capacity is divided across shards).
-        This method picks random untried shards up to ``_MAX_SHARD_RETRIES``.
+        This method tries untried shards chosen by the repository's
+        ``choose_shard()`` (random untried shards for backends without it)
+        up to ``_MAX_SHARD_RETRIES``.
 
         Args:
             entity_id: Entity owning the bucket
@@ -875,20 +1602,32 @@ class SyncRateLimiter:
             SyncLease if a retry on another shard succeeded, None if all retries
             failed or no untried shards remain.
         """
-        import random
-
         tried_shards = {result.shard_id}
         shard_count = result.shard_count
+        trace = current_trace()
+        choose_shard = getattr(self._repository, "choose_shard", None)
         for _ in range(self._MAX_SHARD_RETRIES):
-            untried = [s for s in range(shard_count) if s not in tried_shards]
-            if not untried:
+            new_shard: int | None
+            if choose_shard is not None:
+                new_shard = choose_shard(
+                    entity_id, resource, shard_count, consume, exclude=tried_shards
+                )
+            else:
+                untried = [s for s in range(shard_count) if s not in tried_shards]
+                new_shard = random.choice(untried) if untried else None
+            if new_shard is None:
                 break
-            new_shard = random.choice(untried)
             tried_shards.add(new_shard)
+            started = time.perf_counter() if trace is not None else 0.0
             retry = self._repository.speculative_consume(
                 entity_id, resource, consume, ttl_seconds, shard_id=new_shard
             )
+            if trace is not None:
+                trace.shard_retries += 1
+                trace.record(AcquirePhase.SHARD_RETRY, started)
             if retry.success:
+                if trace is not None:
+                    trace.path = AcquirePath.SHARD_RETRY
                 return self._build_lease_from_speculative(entity_id, resource, consume, retry)
         return None
 
@@ -931,7 +1670,7 @@ class SyncRateLimiter:
     ) -> SyncLease | None:
         """Attempt parent-only slow path after child speculative succeeded.
 
-        Reads parent buckets, resolves limits, does refill + try_consume,
+        Reads parent buckets, resolves limits, does refill + consume,
         and writes parent via single-item UpdateItem. Returns a SyncLease combining
         child's speculative entries with parent's slow-path entries.
 
@@ -940,49 +1679,39 @@ class SyncRateLimiter:
         now_ms = int(time.time() * 1000)
         parent_limits, parent_config_source = self._resolve_limits(parent_id, resource, None)
         parent_buckets = self._fetch_buckets([parent_id], resource)
-        parent_entries: list[LeaseEntry] = []
-        statuses: list[LimitStatus] = []
-        has_custom_config = parent_config_source == "entity"
+        states: list[BucketState] = []
         for limit in parent_limits:
-            bucket_key = (parent_id, resource, limit.name)
-            existing = parent_buckets.get(bucket_key)
+            existing = parent_buckets.get((parent_id, resource, limit.name))
             if existing is None:
                 return None
-            original_tk = existing.tokens_milli
-            original_rf = existing.last_refill_ms
-            amount = consume.get(limit.name, 0)
-            result = try_consume(existing, amount, now_ms)
-            status = LimitStatus(
-                entity_id=parent_id,
-                resource=resource,
-                limit_name=limit.name,
-                limit=limit,
-                available=result.available,
-                requested=amount,
-                exceeded=not result.success,
-                retry_after_seconds=result.retry_after_seconds,
-            )
-            statuses.append(status)
-            if result.success:
-                existing.tokens_milli = result.new_tokens_milli
-                existing.last_refill_ms = result.new_last_refill_ms
-                if existing.total_consumed_milli is not None and amount > 0:
-                    existing.total_consumed_milli += amount * 1000
+            states.append(existing)
+        amounts = [consume.get(limit.name, 0) for limit in parent_limits]
+        results = try_consume_many(states, amounts, now_ms)
+        if results is None:
+            return None
+        parent_entries: list[LeaseEntry] = []
+        has_custom_config = parent_config_source == "entity"
+        for limit, state, amount, (new_tokens, new_refill) in zip(
+            parent_limits, states, amounts, results, strict=True
+        ):
+            original_tk = state.tokens_milli
+            original_rf = state.last_refill_ms
+            state.tokens_milli = new_tokens
+            state.last_refill_ms = new_refill
+            if state.total_consumed_milli is not None and amount > 0:
+                state.total_consumed_milli += amount * 1000
             parent_entries.append(
                 LeaseEntry(
                     entity_id=parent_id,
                     resource=resource,
                     limit=limit,
-                    state=existing,
-                    consumed=amount if result.success else 0,
+                    state=state,
+                    consumed=amount,
                     _original_tokens_milli=original_tk,
                     _original_rf_ms=original_rf,
                     _has_custom_config=has_custom_config,
                 )
             )
-        violations = [s for s in statuses if s.exceeded]
-        if violations:
-            return None
         all_entries = list(child_entries) + parent_entries
         lease = SyncLease(repository=self._repository, entries=all_entries)
         for entry in child_entries:
@@ -1008,82 +1737,123 @@ class SyncRateLimiter:
         validate_identifier(entity_id, "entity_id")
         validate_resource(resource)
         now_ms = int(time.time() * 1000)
-        child_limits, child_config_source = self._resolve_limits(
-            entity_id, resource, limits_override
+        get_cached_parent = getattr(self._repository, "get_cached_parent", None)
+        cached_parent_id: str | None = (
+            get_cached_parent(entity_id) if get_cached_parent is not None else None
         )
-        entity, child_buckets = self._fetch_entity_and_buckets(entity_id, resource)
-        entity_ids = [entity_id]
-        existing_buckets: dict[tuple[str, str, str], BucketState] = dict(child_buckets)
+        parent_resolution: tuple[list[Limit], str] | None = None
+        if cached_parent_id is None:
+            (child_limits, child_config_source), (entity, fetched_buckets) = self._run_in_executor(
+                lambda: self._resolve_limits(entity_id, resource, limits_override),
+                lambda: self._fetch_entity_and_buckets(entity_id, resource),
+            )
+        else:
+            (child_limits, child_config_source), parent_resolution, (entity, fetched_buckets) = (
+                self._run_in_executor(
+                    lambda: self._resolve_limits(entity_id, resource, limits_override),
+                    lambda: self._resolve_cached_parent_limits(
+                        cached_parent_id, resource, limits_override
+                    ),
+                    lambda: self._fetch_entity_and_buckets(entity_id, resource, cached_parent_id),
+                )
+            )
+        existing_buckets: dict[tuple[str, str, str], BucketState] = dict(fetched_buckets)
         entity_limits: dict[str, list[Limit]] = {entity_id: child_limits}
         entity_config_sources: dict[str, str] = {entity_id: child_config_source}
         if entity and entity.cascade and entity.parent_id:
             parent_id = entity.parent_id
-            entity_ids.append(parent_id)
-            parent_limits, parent_config_source = self._resolve_limits(
-                parent_id, resource, limits_override
-            )
+            if parent_id == cached_parent_id and parent_resolution is not None:
+                parent_limits, parent_config_source = parent_resolution
+            else:
+                (parent_limits, parent_config_source), parent_buckets = self._run_in_executor(
+                    lambda: self._resolve_limits(parent_id, resource, limits_override),
+                    lambda: self._fetch_buckets([parent_id], resource),
+                )
+                existing_buckets.update(parent_buckets)
             entity_limits[parent_id] = parent_limits
             entity_config_sources[parent_id] = parent_config_source
-            parent_buckets = self._fetch_buckets([parent_id], resource)
-            existing_buckets.update(parent_buckets)
-        entries: list[LeaseEntry] = []
-        statuses: list[LimitStatus] = []
-        for eid in entity_ids:
-            any_existing = any(
-                (eid, resource, limit.name) in existing_buckets for limit in entity_limits[eid]
-            )
-            for limit in entity_limits[eid]:
-                bucket_key = (eid, resource, limit.name)
-                existing = existing_buckets.get(bucket_key)
+        return self._build_lease(
+            entity_id=entity_id,
+            resource=resource,
+            consume=consume,
+            entity=entity,
+            entity_limits=entity_limits,
+            entity_config_sources=entity_config_sources,
+            existing_buckets=existing_buckets,
+            now_ms=now_ms,
+        )
+
+    def _build_lease(
+        self,
+        entity_id: str,
+        resource: str,
+        consume: dict[str, int],
+        entity: Entity | None,
+        entity_limits: dict[str, list[Limit]],
+        entity_config_sources: dict[str, str],
+        existing_buckets: dict[tuple[str, str, str], BucketState],
+        now_ms: int,
+    ) -> SyncLease:
+        """Consume from fetched buckets locally and build the slow-path lease.
+
+        ``entity_limits`` is ordered child first, then parent (for cascade).
+        Bucket states in ``existing_buckets`` are updated in place.
+
+        Raises:
+            RateLimitExceeded: If any limit would be exceeded
+        """
+        keys: list[tuple[str, Limit, bool]] = []
+        states: list[BucketState] = []
+        amounts: list[int] = []
+        for eid, limits in entity_limits.items():
+            for limit in limits:
+                existing = existing_buckets.get((eid, resource, limit.name))
                 if existing is None:
-                    is_new = True
-                    state = BucketState.from_limit(eid, resource, limit, now_ms)
+                    states.append(BucketState.from_limit(eid, resource, limit, now_ms))
                 else:
-                    is_new = False
-                    state = existing
-                original_tk = state.tokens_milli
-                original_rf = state.last_refill_ms
-                amount = consume.get(limit.name, 0)
-                result = try_consume(state, amount, now_ms)
-                status = LimitStatus(
+                    states.append(existing)
+                keys.append((eid, limit, existing is None))
+                amounts.append(consume.get(limit.name, 0))
+        results = try_consume_many(states, amounts, now_ms)
+        if results is None:
+            raise RateLimitExceeded(
+                [
+                    build_limit_status(eid, resource, limit, state, amount, now_ms)
+                    for (eid, limit, _), state, amount in zip(keys, states, amounts, strict=True)
+                ]
+            )
+        any_existing = {eid for eid, _, is_new in keys if not is_new}
+        entries: list[LeaseEntry] = []
+        for (eid, limit, is_new), state, amount, (new_tokens, new_refill) in zip(
+            keys, states, amounts, results, strict=True
+        ):
+            original_tk = state.tokens_milli
+            original_rf = state.last_refill_ms
+            state.tokens_milli = new_tokens
+            state.last_refill_ms = new_refill
+            if state.total_consumed_milli is not None and amount > 0:
+                state.total_consumed_milli += amount * 1000
+            entries.append(
+                LeaseEntry(
                     entity_id=eid,
                     resource=resource,
-                    limit_name=limit.name,
                     limit=limit,
-                    available=result.available,
-                    requested=amount,
-                    exceeded=not result.success,
-                    retry_after_seconds=result.retry_after_seconds,
-                )
-                statuses.append(status)
-                if result.success:
-                    state.tokens_milli = result.new_tokens_milli
-                    state.last_refill_ms = result.new_last_refill_ms
-                    if state.total_consumed_milli is not None and amount > 0:
-                        state.total_consumed_milli += amount * 1000
-                has_custom_config = entity_config_sources.get(eid) == "entity"
-                entries.append(
-                    LeaseEntry(
-                        entity_id=eid,
-                        resource=resource,
-                        limit=limit,
-                        state=state,
-                        consumed=amount if result.success else 0,
-                        _original_tokens_milli=original_tk,
-                        _original_rf_ms=original_rf,
-                        _is_new=is_new and (not any_existing),
-                        _has_custom_config=has_custom_config,
-                        _cascade=entity.cascade if entity and eid == entity_id else False,
-                        _parent_id=entity.parent_id if entity and eid == entity_id else None,
-                    )
+                    state=state,
+                    consumed=amount,
+                    _original_tokens_milli=original_tk,
+                    _original_rf_ms=original_rf,
+                    _is_new=is_new and eid not in any_existing,
+                    _has_custom_config=entity_config_sources.get(eid) == "entity",
+                    _cascade=entity.cascade if entity and eid == entity_id else False,
+                    _parent_id=entity.parent_id if entity and eid == entity_id else None,
                 )
-        violations = [s for s in statuses if s.exceeded]
-        if violations:
-            raise RateLimitExceeded(statuses)
-        return SyncLease(repository=self._repository, entries=entries)
+            )
+        return SyncLease(
+            repository=self._repository, entries=entries, _transactional=self._transactional_commit
+        )
 
     def _fetch_entity_and_buckets(
-        self, entity_id: str, resource: str
+        self, entity_id: str, resource: str, parent_id: str | None = None
     ) -> tuple[Entity | None, dict[tuple[str, str, str], BucketState]]:
         """
         Fetch entity metadata and its composite bucket in a single call.
@@ -1091,20 +1861,58 @@ class SyncRateLimiter:
         With composite items (ADR-114), one item per (entity_id, resource)
         contains all limits. Uses batch_get_entity_and_buckets if the backend
         supports batch operations, otherwise falls back to separate calls.
+
+        Args:
+            entity_id: Entity whose META and bucket to fetch
+            resource: Resource name
+            parent_id: Parent whose bucket to read in the same call, when
+                already known from the entity cache
         """
+        entity_ids = [entity_id] if parent_id is None else [entity_id, parent_id]
         if self._repository.capabilities.supports_batch_operations:
-            bucket_keys = [(entity_id, resource)]
+            bucket_keys = [(eid, resource) for eid in entity_ids]
             result: tuple[Entity | None, dict[tuple[str, str, str], BucketState]] = (
                 self._repository.batch_get_entity_and_buckets(entity_id, bucket_keys)
             )
             return result
         entity = self._repository.get_entity(entity_id)
-        buckets = self._repository.get_buckets(entity_id, resource)
-        bucket_dict: dict[tuple[str, str, str], BucketState] = {
-            (b.entity_id, b.resource, b.limit_name): b for b in buckets
-        }
+        bucket_dict: dict[tuple[str, str, str], BucketState] = {}
+        for eid in entity_ids:
+            for bucket in self._repository.get_buckets(eid, resource):
+                bucket_dict[bucket.entity_id, bucket.resource, bucket.limit_name] = bucket
         return (entity, bucket_dict)
 
+    def _fetch_entities_and_buckets(
+        self, entity_ids: list[str], bucket_keys: list[tuple[str, str]]
+    ) -> tuple[dict[str, Entity], dict[tuple[str, str, str], BucketState]]:
+        """
+        Fetch META for many entities and composite buckets for many keys.
+
+        Uses batch_get_entities_and_buckets (chunked BatchGetItem) if the
+        backend supports batch operations and defines it, otherwise falls back
+        to sequential calls.
+
+        Returns:
+            Tuple of (entities, bucket_dict). Entities without a META record
+            and missing buckets are omitted.
+        """
+        batch_get = getattr(self._repository, "batch_get_entities_and_buckets", None)
+        if batch_get is not None and self._repository.capabilities.supports_batch_operations:
+            result: tuple[dict[str, Entity], dict[tuple[str, str, str], BucketState]] = batch_get(
+                entity_ids, bucket_keys
+            )
+            return result
+        entities: dict[str, Entity] = {}
+        for eid in dict.fromkeys(entity_ids):
+            entity = self._repository.get_entity(eid)
+            if entity is not None:
+                entities[eid] = entity
+        bucket_dict: dict[tuple[str, str, str], BucketState] = {}
+        for eid, resource in dict.fromkeys(bucket_keys):
+            for bucket in self._repository.get_buckets(eid, resource):
+                bucket_dict[bucket.entity_id, bucket.resource, bucket.limit_name] = bucket
+        return (entities, bucket_dict)
+
     def _fetch_buckets(
         self, entity_ids: list[str], resource: str
     ) -> dict[tuple[str, str, str], BucketState]:
@@ -1165,7 +1973,11 @@ class SyncRateLimiter:
         """
         if limits_override is not None:
             return (limits_override, "override")
+        trace = current_trace()
+        started = time.perf_counter() if trace is not None else 0.0
         limits, _, config_source = self._repository.resolve_limits(entity_id, resource)
+        if trace is not None:
+            trace.record(AcquirePhase.RESOLVE_LIMITS, started)
         if limits is not None and config_source is not None:
             return (limits, config_source)
         raise ValidationError(
@@ -1174,6 +1986,20 @@ class SyncRateLimiter:
             reason=f"No limits configured for entity '{entity_id}' and resource '{resource}'. Configure limits at entity (resource-specific or _default_), resource, or system level, or provide limits parameter.",
         )
 
+    def _resolve_cached_parent_limits(
+        self, parent_id: str, resource: str, limits_override: list[Limit] | None
+    ) -> tuple[list[Limit], str] | None:
+        """Resolve limits for a parent known only from the entity cache.
+
+        The cached parent is speculative, so a missing config is not an error
+        yet: returns None and lets ``_do_acquire`` re-resolve (and raise) once
+        the fetched entity confirms the cascade.
+        """
+        try:
+            return self._resolve_limits(parent_id, resource, limits_override)
+        except ValidationError:
+            return None
+
     def _resolve_on_unavailable(self, on_unavailable_param: OnUnavailable | None) -> OnUnavailable:
         """
         Resolve on_unavailable behavior: Parameter > System Config (cached).
@@ -1518,15 +2344,18 @@ class SyncRateLimiter:
                     parent_ids.add(bucket.entity_id)
             buckets = [b for b in buckets if b.entity_id in parent_ids]
         entity_buckets: dict[str, list[BucketState]] = {}
-        for bucket in buckets:
+        entity_available: dict[str, int] = {}
+        for bucket, available in zip(buckets, available_tokens(buckets, now_ms), strict=True):
             entity_buckets.setdefault(bucket.entity_id, []).append(bucket)
+            entity_available[bucket.entity_id] = (
+                entity_available.get(bucket.entity_id, 0) + available
+            )
         entities: list[EntityCapacity] = []
         total_capacity = 0
         total_available = 0
         for entity_id, entity_bucket_list in entity_buckets.items():
             capacity = entity_bucket_list[0].capacity
-            available = sum(calculate_available(b, now_ms) for b in entity_bucket_list)
-            available = min(available, capacity)
+            available = min(entity_available[entity_id], capacity)
             total_capacity += capacity
             total_available += available
             entities.append(
@@ -1547,3 +2376,26 @@ class SyncRateLimiter:
             else 0,
             entities=entities,
         )
+
+    def _run_in_executor(self, *funcs: Any) -> Any:
+        executor_fn = getattr(self._repository, "_executor_fn", None)
+        if executor_fn is not None:
+            return executor_fn(funcs)
+        with self._thread_pool_lock:
+            if self._thread_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+
+                client_config = getattr(self._repository, "_client_config", None) or {}
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=client_config.get("max_pool_connections", 10),
+                    thread_name_prefix="zae-limiter-limiter",
+                )
+            pool = self._thread_pool
+        futures = [pool.submit(fn) for fn in funcs]
+        return tuple(f.result() for f in futures)
+
+    def _cleanup_thread_pool(self) -> None:
+        with self._thread_pool_lock:
+            pool, self._thread_pool = (self._thread_pool, None)
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -0,0 +1,194 @@
+"""AUTO-GENERATED by scripts/generate_sync.py - DO NOT EDIT.
+
+Source: write_behind.py
+
+This module provides synchronous versions of the async classes.
+Changes should be made to the source file, then regenerated.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import PartialWriteError
+from .write_behind import WriteBehindConfig as WriteBehindConfig
+from .write_behind import WriteBehindStats as WriteBehindStats
+
+if TYPE_CHECKING:
+    from .sync_repository_protocol import SyncRepositoryProtocol
+logger = logging.getLogger(__name__)
+
+
+class SyncWriteBehindBuffer:
+    """Coalesces adjustment deltas per bucket and writes them in the background.
+
+    Args:
+        repository: SyncRepository the merged adjustments are written to
+        config: Flush interval and buffer bound
+    """
+
+    def __init__(
+        self, repository: "SyncRepositoryProtocol", config: WriteBehindConfig | None = None
+    ) -> None:
+        self._repository = repository
+        self.config = config if config is not None else WriteBehindConfig()
+        self.stats = WriteBehindStats()
+        self._pending: dict[tuple[str, str], dict[str, int]] = {}
+        self._flush_scheduled = False
+        self._flush_tasks: set[Any] = set()
+        self._sync_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of buckets with buffered deltas."""
+        return len(self._pending)
+
+    def add(self, entity_id: str, resource: str, deltas: dict[str, int]) -> None:
+        """Buffer adjustment deltas for one composite bucket.
+
+        Never raises write errors: once handed to the buffer, the deltas count
+        as committed. If the buffer is full, it is flushed inline; if it is
+        still full afterwards (the flush failed), the deltas are written
+        directly. Failures are logged and counted in ``stats``.
+
+        Args:
+            entity_id: Entity owning the bucket
+            resource: Resource name
+            deltas: Delta per limit (millitokens, positive=consume, negative=release)
+        """
+        key = (entity_id, resource)
+        if not self._merge(key, deltas):
+            try:
+                self.flush()
+            except Exception:
+                logger.warning("Write-behind flush failed; deltas re-buffered", exc_info=True)
+            if not self._merge(key, deltas):
+                self._write_through(key, deltas)
+
+    def _merge(self, key: tuple[str, str], deltas: dict[str, int]) -> bool:
+        """Merge deltas into the buffer, returning False if it has no room for ``key``."""
+        with self._sync_lock:
+            if key not in self._pending and len(self._pending) >= self.config.max_pending:
+                return False
+            merged = self._pending.setdefault(key, {})
+            for name, delta in deltas.items():
+                merged[name] = merged.get(name, 0) + delta
+            self.stats.deltas += 1
+            schedule = not self._flush_scheduled
+            if schedule:
+                self._flush_scheduled = True
+        if schedule:
+            self._spawn_flush(self._flush_after_interval)
+        return True
+
+    def _write_through(self, key: tuple[str, str], deltas: dict[str, int]) -> None:
+        """Write one bucket's deltas directly, bypassing a full buffer."""
+        entity_id, resource = key
+        item = self._repository.build_composite_adjust(
+            entity_id=entity_id, resource=resource, deltas=deltas
+        )
+        if not item:
+            return
+        try:
+            self._repository.write_each([item])
+        except Exception:
+            logger.warning(
+                "Write-behind buffer full and direct write failed; delta dropped: %s",
+                key,
+                exc_info=True,
+            )
+            with self._sync_lock:
+                self.stats.deltas += 1
+                self.stats.failures += 1
+                self.stats.dropped += 1
+            return
+        with self._sync_lock:
+            self.stats.deltas += 1
+            self.stats.writes += 1
+
+    def flush(self) -> None:
+        """Write every buffered delta now, one update per bucket.
+
+        Raises:
+            PartialWriteError: If some bucket updates failed; their deltas are
+                merged back into the buffer for the next flush, as far as
+                ``max_pending`` allows
+        """
+        with self._sync_lock:
+            pending = self._pending
+            self._pending = {}
+            self._flush_scheduled = False
+        batch: list[tuple[tuple[str, str], dict[str, int]]] = []
+        items: list[dict[str, Any]] = []
+        for (entity_id, resource), deltas in pending.items():
+            nonzero = {name: delta for name, delta in deltas.items() if delta != 0}
+            if not nonzero:
+                continue
+            item = self._repository.build_composite_adjust(
+                entity_id=entity_id, resource=resource, deltas=nonzero
+            )
+            if item:
+                batch.append(((entity_id, resource), nonzero))
+                items.append(item)
+        if not items:
+            return
+        error: BaseException | None = None
+        try:
+            self._repository.write_each(items)
+            failed: list[int] = []
+        except PartialWriteError as e:
+            error = e
+            failed = sorted(e.failures)
+        except BaseException as e:
+            error = e
+            failed = list(range(len(items)))
+        with self._sync_lock:
+            self.stats.flushes += 1
+            self.stats.writes += len(items) - len(failed)
+            self.stats.failures += len(failed)
+            for index in failed:
+                key, deltas = batch[index]
+                if key not in self._pending and len(self._pending) >= self.config.max_pending:
+                    self.stats.dropped += 1
+                    continue
+                merged = self._pending.setdefault(key, {})
+                for name, delta in deltas.items():
+                    merged[name] = merged.get(name, 0) + delta
+        if error is None:
+            return
+        if isinstance(error, PartialWriteError) or not isinstance(error, Exception):
+            raise error
+        raise PartialWriteError(dict.fromkeys(failed, error), len(items)) from error
+
+    def close(self) -> None:
+        """Flush buffered deltas and stop pending background flushes.
+
+        Raises:
+            PartialWriteError: If the final flush failed; the failed deltas
+                stay buffered and can be retried with ``flush()``
+        """
+        self._cancel_flushes()
+        self.flush()
+
+    def _flush_after_interval(self) -> None:
+        """Flush once the interval elapses, logging rather than raising errors."""
+        time.sleep(self.config.flush_interval_seconds)
+        try:
+            self.flush()
+        except Exception:
+            logger.warning("Write-behind flush failed; deltas re-buffered", exc_info=True)
+            with self._sync_lock:
+                retry = bool(self._pending) and (not self._flush_scheduled)
+                if retry:
+                    self._flush_scheduled = True
+            if retry:
+                self._spawn_flush(self._flush_after_interval)
+
+    def _cancel_flushes(self) -> None:
+        """No-op: a delayed flush thread finds the buffer already flushed."""
+
+    def _spawn_flush(self, flush: Callable[[], None]) -> None:
+        """Run a delayed flush without blocking the caller."""
+        threading.Thread(target=flush, name="zae-limiter-write-behind", daemon=True).start()
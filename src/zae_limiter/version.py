@@ -10,7 +10,8 @@ from dataclasses import dataclass
 # 0.8.0: Composite limit config items (ADR-114 for configs)
 # 0.9.0: Bucket PK migration (GHSA-76rv) - per-(entity, resource, shard) partition keys
 # 0.10.0: Local Secondary Indexes (ADR-123) - 5 LSI slots, odd=ALL / even=KEYS_ONLY
-CURRENT_SCHEMA_VERSION = "0.10.0"
+# 0.11.0: GSI5 (KEYS_ONLY) bucket discovery by resource - buckets drop GSI2 keys
+CURRENT_SCHEMA_VERSION = "0.11.0"
 
 
 @dataclass(frozen=True, order=False)
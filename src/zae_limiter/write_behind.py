@@ -0,0 +1,277 @@
+"""Write-behind buffering for lease adjustment deltas.
+
+``Lease.adjust()`` deltas are written on context exit as unconditional
+``ADD`` updates (``build_composite_adjust``, ADR-115). ADDs commute, so
+adjustments to the same composite bucket can be summed client-side and
+written later as one update. ``WriteBehindBuffer`` collects those deltas per
+(entity, resource) and flushes them with a single ``write_each()`` once the
+flush interval elapses, once ``max_pending`` buckets are buffered, or when
+the limiter is closed.
+
+Flushing is at-least-once: deltas whose write fails are merged back into the
+buffer and retried on the next flush, so a write that failed after DynamoDB
+applied it may be applied twice. The buffer never holds more than
+``max_pending`` buckets: when it is still full after a flush, a new bucket's
+delta is written directly, and failed deltas that no longer fit are dropped
+and counted. Buffered deltas are lost if the process exits without
+``close()``.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .exceptions import PartialWriteError
+
+if TYPE_CHECKING:
+    from .repository_protocol import RepositoryProtocol
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WriteBehindConfig:
+    """Configuration for write-behind adjustment buffering.
+
+    Attributes:
+        flush_interval_seconds: How long the first buffered delta waits before
+            the buffer is flushed. Bounds how stale DynamoDB bucket state can
+            be relative to reported usage.
+        max_pending: Maximum number of buckets with buffered deltas. Adding a
+            delta for a new bucket beyond this flushes the buffer inline; if
+            the buffer is still full, the delta is written directly.
+    """
+
+    flush_interval_seconds: float = 1.0
+    max_pending: int = 1000
+
+    def __post_init__(self) -> None:
+        if self.flush_interval_seconds <= 0:
+            raise ValueError("flush_interval_seconds must be positive")
+        if self.max_pending < 1:
+            raise ValueError("max_pending must be positive")
+
+
+@dataclass
+class WriteBehindStats:
+    """Counters for write-behind adjustment buffering.
+
+    Attributes:
+        deltas: Adjustments accepted into the buffer (one per bucket per lease)
+        flushes: Flushes that issued at least one bucket update
+        writes: Bucket updates written (each may carry many deltas)
+        failures: Bucket updates that failed (re-buffered unless dropped)
+        dropped: Failed bucket updates discarded because the buffer was full
+    """
+
+    deltas: int = 0
+    flushes: int = 0
+    writes: int = 0
+    failures: int = 0
+    dropped: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        """Return stats as a dictionary."""
+        return {
+            "deltas": self.deltas,
+            "flushes": self.flushes,
+            "writes": self.writes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+        }
+
+
+class WriteBehindBuffer:
+    """Coalesces adjustment deltas per bucket and writes them in the background.
+
+    Args:
+        repository: Repository the merged adjustments are written to
+        config: Flush interval and buffer bound
+    """
+
+    def __init__(
+        self,
+        repository: "RepositoryProtocol",
+        config: WriteBehindConfig | None = None,
+    ) -> None:
+        self._repository = repository
+        self.config = config if config is not None else WriteBehindConfig()
+        self.stats = WriteBehindStats()
+        # (entity_id, resource) -> limit name -> summed delta (millitokens)
+        self._pending: dict[tuple[str, str], dict[str, int]] = {}
+        self._flush_scheduled = False
+        self._flush_tasks: set[Any] = set()
+        self._async_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of buckets with buffered deltas."""
+        return len(self._pending)
+
+    async def add(self, entity_id: str, resource: str, deltas: dict[str, int]) -> None:
+        """Buffer adjustment deltas for one composite bucket.
+
+        Never raises write errors: once handed to the buffer, the deltas count
+        as committed. If the buffer is full, it is flushed inline; if it is
+        still full afterwards (the flush failed), the deltas are written
+        directly. Failures are logged and counted in ``stats``.
+
+        Args:
+            entity_id: Entity owning the bucket
+            resource: Resource name
+            deltas: Delta per limit (millitokens, positive=consume, negative=release)
+        """
+        key = (entity_id, resource)
+        if not await self._merge(key, deltas):
+            try:
+                await self.flush()
+            except Exception:
+                logger.warning("Write-behind flush failed; deltas re-buffered", exc_info=True)
+            if not await self._merge(key, deltas):
+                await self._write_through(key, deltas)
+
+    async def _merge(self, key: tuple[str, str], deltas: dict[str, int]) -> bool:
+        """Merge deltas into the buffer, returning False if it has no room for ``key``."""
+        async with self._async_lock:
+            if key not in self._pending and len(self._pending) >= self.config.max_pending:
+                return False
+            merged = self._pending.setdefault(key, {})
+            for name, delta in deltas.items():
+                merged[name] = merged.get(name, 0) + delta
+            self.stats.deltas += 1
+            schedule = not self._flush_scheduled
+            if schedule:
+                self._flush_scheduled = True
+        if schedule:
+            self._spawn_flush(self._flush_after_interval)
+        return True
+
+    async def _write_through(self, key: tuple[str, str], deltas: dict[str, int]) -> None:
+        """Write one bucket's deltas directly, bypassing a full buffer."""
+        entity_id, resource = key
+        item = self._repository.build_composite_adjust(
+            entity_id=entity_id,
+            resource=resource,
+            deltas=deltas,
+        )
+        if not item:
+            return
+        try:
+            await self._repository.write_each([item])
+        except Exception:
+            logger.warning(
+                "Write-behind buffer full and direct write failed; delta dropped: %s",
+                key,
+                exc_info=True,
+            )
+            async with self._async_lock:
+                self.stats.deltas += 1
+                self.stats.failures += 1
+                self.stats.dropped += 1
+            return
+        async with self._async_lock:
+            self.stats.deltas += 1
+            self.stats.writes += 1
+
+    async def flush(self) -> None:
+        """Write every buffered delta now, one update per bucket.
+
+        Raises:
+            PartialWriteError: If some bucket updates failed; their deltas are
+                merged back into the buffer for the next flush, as far as
+                ``max_pending`` allows
+        """
+        async with self._async_lock:
+            pending = self._pending
+            self._pending = {}
+            self._flush_scheduled = False
+
+        batch: list[tuple[tuple[str, str], dict[str, int]]] = []
+        items: list[dict[str, Any]] = []
+        for (entity_id, resource), deltas in pending.items():
+            nonzero = {name: delta for name, delta in deltas.items() if delta != 0}
+            if not nonzero:
+                continue  # Adjustments cancelled out
+            item = self._repository.build_composite_adjust(
+                entity_id=entity_id,
+                resource=resource,
+                deltas=nonzero,
+            )
+            if item:
+                batch.append(((entity_id, resource), nonzero))
+                items.append(item)
+        if not items:
+            return
+
+        error: BaseException | None = None
+        try:
+            await self._repository.write_each(items)
+            failed: list[int] = []
+        except PartialWriteError as e:
+            error = e
+            failed = sorted(e.failures)
+        except BaseException as e:
+            # Includes cancellation: nothing is known to be written
+            error = e
+            failed = list(range(len(items)))
+
+        async with self._async_lock:
+            self.stats.flushes += 1
+            self.stats.writes += len(items) - len(failed)
+            self.stats.failures += len(failed)
+            for index in failed:
+                key, deltas = batch[index]
+                if key not in self._pending and len(self._pending) >= self.config.max_pending:
+                    self.stats.dropped += 1
+                    continue
+                merged = self._pending.setdefault(key, {})
+                for name, delta in deltas.items():
+                    merged[name] = merged.get(name, 0) + delta
+
+        if error is None:
+            return
+        if isinstance(error, PartialWriteError) or not isinstance(error, Exception):
+            raise error
+        raise PartialWriteError(dict.fromkeys(failed, error), len(items)) from error
+
+    async def close(self) -> None:
+        """Flush buffered deltas and stop pending background flushes.
+
+        Raises:
+            PartialWriteError: If the final flush failed; the failed deltas
+                stay buffered and can be retried with ``flush()``
+        """
+        await self._cancel_flushes()
+        await self.flush()
+
+    async def _flush_after_interval(self) -> None:
+        """Flush once the interval elapses, logging rather than raising errors."""
+        await asyncio.sleep(self.config.flush_interval_seconds)
+        try:
+            await self.flush()
+        except Exception:
+            logger.warning("Write-behind flush failed; deltas re-buffered", exc_info=True)
+            async with self._async_lock:
+                retry = bool(self._pending) and not self._flush_scheduled
+                if retry:
+                    self._flush_scheduled = True
+            if retry:
+                self._spawn_flush(self._flush_after_interval)
+
+    async def _cancel_flushes(self) -> None:
+        """Cancel delayed flushes; an interrupted flush re-buffers its deltas."""
+        tasks = list(self._flush_tasks)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    def _spawn_flush(self, flush: Callable[[], Coroutine[Any, Any, None]]) -> None:
+        """Run a delayed flush without blocking the caller."""
+        task: asyncio.Task[None] = asyncio.get_running_loop().create_task(flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
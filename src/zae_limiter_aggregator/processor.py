@@ -8,7 +8,7 @@ from datetime import UTC, datetime, timedelta
 from typing import Any
 
 import boto3
-from boto3.dynamodb.types import TypeDeserializer
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
 from botocore.exceptions import ClientError
 
 from zae_limiter.bucket import refill_bucket
@@ -17,6 +17,7 @@ from zae_limiter.schema import (
     BUCKET_FIELD_CP,
     BUCKET_FIELD_RA,
     BUCKET_FIELD_RP,
+    BUCKET_FIELD_SD,
     BUCKET_FIELD_TC,
     BUCKET_FIELD_TK,
     BUCKET_PREFIX,
@@ -25,10 +26,11 @@ from zae_limiter.schema import (
     WCU_SHARD_WARN_THRESHOLD,
     bucket_attr,
     gsi2_pk_resource,
-    gsi2_sk_bucket,
     gsi2_sk_usage,
     gsi3_sk_bucket,
     gsi4_sk_bucket,
+    gsi5_pk_resource,
+    gsi5_sk_bucket,
     parse_bucket_pk,
     parse_namespace,
     pk_bucket,
@@ -122,6 +124,9 @@ class BucketRefillState:
     limits: dict[str, LimitRefillInfo] = field(default_factory=dict)
     shard_id: int = 0
     shard_count: int = 1
+    # Stream record creation times (ms), for the observed write rate
+    first_event_ms: int = 0
+    last_event_ms: int = 0
 
 
 def process_stream_records(
@@ -251,6 +256,21 @@ def process_stream_records(
                 )
                 errors.append(error_msg)
 
+    # Shard merging (halve shard_count when the observed write rate is low)
+    for state in bucket_states.values():
+        if WCU_LIMIT_NAME in state.limits:
+            try:
+                try_shard_merge(table, state, now_ms)
+            except Exception as e:
+                error_msg = f"Error in shard merge: {e}"
+                logger.warning(
+                    error_msg,
+                    exc_info=True,
+                    entity_id=state.entity_id,
+                    resource=state.resource,
+                )
+                errors.append(error_msg)
+
     # Propagate shard_count changes to other shards
     for record in records:
         if record.get("eventName") != "MODIFY":
@@ -468,6 +488,7 @@ def aggregate_bucket_states(
     - Accumulates ``tc`` deltas across all events per limit
     - Keeps the last NewImage's bucket fields (tk, cp, ra, rp) per limit
     - Keeps the last shared ``rf`` timestamp (optimistic lock target)
+    - Keeps the first and last record creation times (observed write rate)
 
     Args:
         records: DynamoDB stream records
@@ -486,6 +507,8 @@ def aggregate_bucket_states(
             continue
 
         key = (parsed.namespace_id, parsed.entity_id, parsed.resource, parsed.shard_id)
+        # Epoch seconds, rounded down by DynamoDB Streams
+        event_ms = int(record.get("dynamodb", {}).get("ApproximateCreationDateTime", 0) * 1000)
 
         if key not in bucket_states:
             bucket_states[key] = BucketRefillState(
@@ -495,11 +518,13 @@ def aggregate_bucket_states(
                 rf_ms=parsed.rf_ms,
                 shard_id=parsed.shard_id,
                 shard_count=parsed.shard_count,
+                first_event_ms=event_ms,
             )
         else:
             bucket_states[key].rf_ms = parsed.rf_ms
 
         state = bucket_states[key]
+        state.last_event_ms = event_ms
 
         for limit_name, parsed_limit in parsed.limits.items():
             if limit_name in state.limits:
@@ -635,6 +660,9 @@ def try_refill_bucket(
 
 
 WCU_PROACTIVE_THRESHOLD_LOW = 0.2  # Shard when wcu tokens < 20% of capacity
+SHARD_MERGE_MAX_RATE_RATIO = 0.5  # Merge when 2x the shard 0 write rate < 50% of wcu refill rate
+SHARD_MERGE_MIN_AGE_MS = 300_000  # Do not merge within 5 minutes of a doubling
+SHARD_MERGE_MAX_COUNT = 64  # A merge writes every shard in one transaction (max 100 items)
 
 
 def try_proactive_shard(
@@ -650,7 +678,8 @@ def try_proactive_shard(
     pressure and should be split.
 
     Only acts on shard 0 (source of truth for shard_count).
-    Uses conditional write to prevent double-bumping.
+    Uses conditional write to prevent double-bumping. Records the time of
+    the doubling so :func:`try_shard_merge` does not undo it right away.
 
     Args:
         table: boto3 Table resource
@@ -679,11 +708,12 @@ def try_proactive_shard(
                 "PK": pk_bucket(state.namespace_id, state.entity_id, state.resource, 0),
                 "SK": sk_state(),
             },
-            UpdateExpression="SET shard_count = :new",
+            UpdateExpression=f"SET shard_count = :new, {BUCKET_FIELD_SD} = :now",
             ConditionExpression="shard_count = :old",
             ExpressionAttributeValues={
                 ":old": state.shard_count,
                 ":new": new_count,
+                ":now": int(time_module.time() * 1000),
             },
         )
         logger.info(
@@ -714,6 +744,246 @@ def try_proactive_shard(
         raise
 
 
+def try_shard_merge(
+    table: Any,
+    state: BucketRefillState,
+    now_ms: int,
+) -> bool:
+    """Halve shard_count when the observed write rate on shard 0 is low.
+
+    Counterpart of :func:`try_proactive_shard`. The wcu token level cannot
+    drive this decision: wcu refills to full capacity every second, so it is
+    near capacity whenever the last second was quiet. Instead the merge uses
+    shard 0's write rate over the stream batch (``wcu`` tc delta divided by
+    the span of the records' creation times, at least one refill period).
+    A merge doubles that rate, so it only runs if twice the rate is below
+    50% of the wcu refill rate. Doubling needs more than 80% of it within one
+    period, which keeps a bucket from oscillating between the two. No merge
+    runs within 5 minutes of a doubling (``sd`` on shard 0).
+
+    Shard ``s + new_count`` is folded into shard ``s`` for every
+    ``s < new_count``. All shards are read with one consistent BatchGetItem
+    and rewritten in one TransactWriteItems, so no reader sees a partial
+    merge:
+
+    - Retired shards are deleted, conditioned on every limit's tokens still
+      matching the values read. A concurrent consume, refill or adjustment
+      cancels the merge; a later batch retries it.
+    - Their application-limit tokens are ADDed to the partner shard, capped at
+      the partner's new effective capacity (``cp // new_count``) and
+      conditioned on the partner's tokens not having grown since the read.
+      Negative balances are carried over in full. ``wcu`` is per partition
+      and is not carried over.
+    - Remaining shards get the new shard_count, conditioned on the old one.
+
+    Tokens above the partner's capacity are forfeited, so a merge never grants
+    more than the retired shard held. Clients still routing to a retired shard
+    get BUCKET_MISSING, fall back to shard 0, and learn the new shard_count
+    from its ``ALL_NEW``. Adjustments to a retired shard follow its balance to
+    the partner shard.
+
+    Args:
+        table: boto3 Table resource
+        state: Aggregated bucket state
+        now_ms: Current time (epoch milliseconds)
+
+    Returns:
+        True if the shards were merged, False otherwise
+    """
+    if state.shard_id != 0 or state.shard_count <= 1:
+        return False
+
+    wcu_info = state.limits.get(WCU_LIMIT_NAME)
+    if wcu_info is None or wcu_info.ra_milli <= 0 or wcu_info.rp_ms <= 0:
+        return False
+
+    # Creation times have 1s resolution: a short batch counts as one period
+    span_ms = max(state.last_event_ms - state.first_event_ms, wcu_info.rp_ms)
+    write_rate = max(0, wcu_info.tc_delta) / span_ms
+    rate_ratio = 2 * write_rate / (wcu_info.ra_milli / wcu_info.rp_ms)
+    if rate_ratio >= SHARD_MERGE_MAX_RATE_RATIO:
+        return False
+
+    old_count = state.shard_count
+    if old_count > SHARD_MERGE_MAX_COUNT:
+        logger.debug(
+            "Shard merge skipped - too many shards for one transaction",
+            entity_id=state.entity_id,
+            resource=state.resource,
+            shard_count=old_count,
+        )
+        return False
+    new_count = old_count // 2
+
+    # The Table's client (de)serializes attribute values like the Table itself
+    client = table.meta.client
+    pks = [
+        pk_bucket(state.namespace_id, state.entity_id, state.resource, shard)
+        for shard in range(old_count)
+    ]
+    response = client.batch_get_item(
+        RequestItems={
+            table.name: {
+                "Keys": [{"PK": pk, "SK": sk_state()} for pk in pks],
+                "ConsistentRead": True,
+            }
+        }
+    )
+    found = {item["PK"]: item for item in response["Responses"].get(table.name, [])}
+    if response.get("UnprocessedKeys") or len(found) < old_count:
+        logger.debug(
+            "Shard merge skipped - shards not all readable",
+            entity_id=state.entity_id,
+            resource=state.resource,
+            shard_count=old_count,
+        )
+        return False
+    if found[pks[0]].get("shard_count") != old_count:
+        return False  # shard_count changed since the stream record
+    if now_ms - int(found[pks[0]].get(BUCKET_FIELD_SD, 0)) < SHARD_MERGE_MIN_AGE_MS:
+        logger.debug(
+            "Shard merge skipped - shard_count doubled recently",
+            entity_id=state.entity_id,
+            resource=state.resource,
+            shard_count=old_count,
+        )
+        return False
+
+    # Wire format, as in stream images, for _extract_limit_attrs()
+    serializer = TypeSerializer()
+    limits = [
+        _extract_limit_attrs({k: serializer.serialize(v) for k, v in found[pk].items()})
+        for pk in pks
+    ]
+
+    transact_items: list[dict[str, Any]] = []
+    for shard in range(new_count):
+        retired = shard + new_count
+        transact_items.append(
+            _build_merge_update(
+                table.name, pks[shard], limits[shard], limits[retired], old_count, new_count
+            )
+        )
+        transact_items.append(_build_retire_delete(table.name, pks[retired], limits[retired]))
+
+    try:
+        client.transact_write_items(TransactItems=transact_items)
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "TransactionCanceledException":
+            logger.debug(
+                "Shard merge skipped - concurrent write",
+                entity_id=state.entity_id,
+                resource=state.resource,
+            )
+            return False
+        raise
+
+    logger.info(
+        "Shard merge",
+        entity_id=state.entity_id,
+        resource=state.resource,
+        old_count=old_count,
+        new_count=new_count,
+        rate_ratio=round(rate_ratio, 2),
+    )
+    return True
+
+
+def _build_merge_update(
+    table_name: str,
+    pk: str,
+    partner_limits: dict[str, dict[str, int]],
+    retired_limits: dict[str, dict[str, int]],
+    old_count: int,
+    new_count: int,
+) -> dict[str, Any]:
+    """Build the transaction item folding a retired shard into its partner.
+
+    Args:
+        table_name: Table name
+        pk: Partition key of the surviving shard
+        partner_limits: Surviving shard's limits (from ``_extract_limit_attrs``)
+        retired_limits: Retired shard's limits (from ``_extract_limit_attrs``)
+        old_count: shard_count before the merge
+        new_count: shard_count after the merge
+
+    Returns:
+        An ``Update`` TransactWriteItems entry
+    """
+    add_parts: list[str] = []
+    condition_parts = ["shard_count = :old"]
+    attr_names: dict[str, str] = {}
+    attr_values: dict[str, Any] = {":old": old_count, ":new": new_count}
+    for limit_name, info in retired_limits.items():
+        if limit_name == WCU_LIMIT_NAME or limit_name not in partner_limits:
+            continue  # wcu is per partition; a removed limit has nothing to receive
+        target = partner_limits[limit_name]
+        headroom = max(0, target["cp_milli"] // new_count - target["tk_milli"])
+        fold = min(info["tk_milli"], headroom)
+        if fold == 0:
+            continue
+        attr_names[f"#tk_{limit_name}"] = bucket_attr(limit_name, BUCKET_FIELD_TK)
+        attr_values[f":fold_{limit_name}"] = fold
+        add_parts.append(f"#tk_{limit_name} :fold_{limit_name}")
+        if fold > 0:
+            # Headroom was computed from the tokens read; a refill or release
+            # since then would push the partner past capacity
+            attr_values[f":seen_{limit_name}"] = target["tk_milli"]
+            condition_parts.append(f"#tk_{limit_name} <= :seen_{limit_name}")
+
+    update_expr = "SET shard_count = :new"
+    if add_parts:
+        update_expr += f" ADD {', '.join(add_parts)}"
+    update: dict[str, Any] = {
+        "TableName": table_name,
+        "Key": {"PK": pk, "SK": sk_state()},
+        "UpdateExpression": update_expr,
+        "ConditionExpression": " AND ".join(condition_parts),
+        "ExpressionAttributeValues": attr_values,
+    }
+    if attr_names:
+        update["ExpressionAttributeNames"] = attr_names
+    return {"Update": update}
+
+
+def _build_retire_delete(
+    table_name: str,
+    pk: str,
+    retired_limits: dict[str, dict[str, int]],
+) -> dict[str, Any]:
+    """Build the transaction item deleting a retired shard.
+
+    The delete is conditioned on every limit's tokens matching the values
+    read, so tokens consumed, refilled or returned after the read are never
+    lost or counted twice.
+
+    Args:
+        table_name: Table name
+        pk: Partition key of the retired shard
+        retired_limits: Retired shard's limits (from ``_extract_limit_attrs``)
+
+    Returns:
+        A ``Delete`` TransactWriteItems entry
+    """
+    condition_parts = ["attribute_exists(PK)"]
+    attr_names: dict[str, str] = {}
+    attr_values: dict[str, Any] = {}
+    for limit_name, info in retired_limits.items():
+        attr_names[f"#tk_{limit_name}"] = bucket_attr(limit_name, BUCKET_FIELD_TK)
+        attr_values[f":seen_{limit_name}"] = info["tk_milli"]
+        condition_parts.append(f"#tk_{limit_name} = :seen_{limit_name}")
+
+    delete: dict[str, Any] = {
+        "TableName": table_name,
+        "Key": {"PK": pk, "SK": sk_state()},
+        "ConditionExpression": " AND ".join(condition_parts),
+    }
+    if attr_names:
+        delete["ExpressionAttributeNames"] = attr_names
+        delete["ExpressionAttributeValues"] = attr_values
+    return {"Delete": delete}
+
+
 def _extract_limit_attrs(
     image: dict[str, Any],
 ) -> dict[str, dict[str, int]]:
@@ -760,6 +1030,9 @@ def propagate_shard_count(
       NewImage with adjusted PK/GSI keys and effective token capacity.
       Uses attribute_not_exists(PK) to avoid overwriting client-created items.
 
+    Decreases need no propagation: :func:`try_shard_merge` updates every
+    remaining shard in the same transaction.
+
     Args:
         table: boto3 Table resource
         record: DynamoDB stream record
@@ -822,9 +1095,13 @@ def propagate_shard_count(
         try:
             item = dict(base_item)
             item["PK"] = pk_bucket(namespace_id, entity_id, resource, target_shard)
-            item["GSI2SK"] = gsi2_sk_bucket(entity_id, target_shard)
+            # Pre-0.11.0 buckets carry GSI2 keys; new shards use GSI5 instead
+            item.pop("GSI2PK", None)
+            item.pop("GSI2SK", None)
             item["GSI3SK"] = gsi3_sk_bucket(resource, target_shard)
             item["GSI4SK"] = gsi4_sk_bucket(entity_id, resource, target_shard)
+            item["GSI5PK"] = gsi5_pk_resource(namespace_id, resource)
+            item["GSI5SK"] = gsi5_sk_bucket(entity_id, target_shard)
             item["shard_count"] = new_count
             # Reset tokens to effective per-shard capacity (full bucket)
             for limit_name, info in limit_attrs.items():
@@ -0,0 +1,74 @@
+"""Benchmark for fleet-wide available-token computation on 1M buckets.
+
+Computes the available tokens of 1M buckets, as ``get_resource_capacity``
+does for every bucket of a resource, with the scalar ``calculate_available``
+loop and with the NumPy engine in ``bucket_array``. The vectorized run is
+measured twice: including the conversion from ``BucketState`` objects, and
+on prebuilt arrays. No DynamoDB access is needed.
+
+Requires numpy (``pip install 'zae-limiter[numpy]'``).
+
+Run with:
+    pytest tests/benchmark/test_bucket_array.py -v --benchmark-enable
+"""
+
+import random
+
+import pytest
+
+from zae_limiter.bucket import calculate_available
+from zae_limiter.bucket_array import BucketArrays, calculate_available_many
+from zae_limiter.models import BucketState
+
+pytest.importorskip("numpy")
+
+pytestmark = pytest.mark.benchmark
+
+BUCKET_COUNT = 1_000_000
+NOW_MS = 1_700_000_000_000
+
+
+@pytest.fixture(scope="module")
+def states() -> list[BucketState]:
+    rng = random.Random(0)
+    return [
+        BucketState(
+            entity_id=f"entity-{i:07d}",
+            resource="gpt-4",
+            limit_name="tpm",
+            tokens_milli=rng.randint(-1_000_000, 100_000_000),
+            last_refill_ms=NOW_MS - rng.randint(0, 120_000),
+            capacity_milli=100_000_000,
+            refill_amount_milli=100_000_000,
+            refill_period_ms=60_000,
+        )
+        for i in range(BUCKET_COUNT)
+    ]
+
+
+class TestBucketArray:
+    """Available tokens for 1M buckets, scalar vs vectorized."""
+
+    def test_scalar(self, benchmark, states):
+        """calculate_available per bucket."""
+        available = benchmark.pedantic(
+            lambda: [calculate_available(s, NOW_MS) for s in states], rounds=1, iterations=1
+        )
+        assert len(available) == BUCKET_COUNT
+
+    def test_vectorized_from_states(self, benchmark, states):
+        """Array conversion plus calculate_available_many."""
+        available = benchmark.pedantic(
+            lambda: calculate_available_many(BucketArrays.from_states(states), NOW_MS),
+            rounds=1,
+            iterations=1,
+        )
+        assert available[:1_000].tolist() == [
+            calculate_available(s, NOW_MS) for s in states[:1_000]
+        ]
+
+    def test_vectorized_arrays(self, benchmark, states):
+        """calculate_available_many on prebuilt arrays."""
+        arrays = BucketArrays.from_states(states)
+        available = benchmark(calculate_available_many, arrays, NOW_MS)
+        assert len(available) == BUCKET_COUNT
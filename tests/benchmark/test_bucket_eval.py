@@ -0,0 +1,75 @@
+"""Microbenchmarks for evaluating the limits of a composite bucket.
+
+Compares a per-limit ``try_consume`` loop that builds a ``LimitStatus`` for
+every limit (the acquire path before ``try_consume_many``) against the
+single-pass ``try_consume_many``, and ``would_refill_satisfy`` with and
+without statuses on success. Buckets hold three limits and every request
+succeeds, as on the common path. No DynamoDB access is needed.
+
+Run with:
+    pytest tests/benchmark/test_bucket_eval.py -v
+"""
+
+import pytest
+
+from zae_limiter.bucket import try_consume, try_consume_many, would_refill_satisfy
+from zae_limiter.models import BucketState, Limit, LimitStatus
+
+pytestmark = pytest.mark.benchmark
+
+NOW_MS = 1_700_000_000_000
+LIMITS = [
+    Limit.per_minute("rpm", 1_000),
+    Limit.per_minute("tpm", 100_000),
+    Limit.per_day("tpd", 10_000_000),
+]
+CONSUME = {"rpm": 1, "tpm": 500, "tpd": 500}
+
+
+def _states() -> list[BucketState]:
+    return [BucketState.from_limit("entity-1", "gpt-4", limit, NOW_MS - 1_500) for limit in LIMITS]
+
+
+def _per_limit(states: list[BucketState], amounts: list[int]) -> bool:
+    """Per-limit evaluation with a status per limit, as before try_consume_many."""
+    statuses = []
+    for limit, state, amount in zip(LIMITS, states, amounts, strict=True):
+        result = try_consume(state, amount, NOW_MS)
+        statuses.append(
+            LimitStatus(
+                entity_id=state.entity_id,
+                resource=state.resource,
+                limit_name=limit.name,
+                limit=limit,
+                available=result.available,
+                requested=amount,
+                exceeded=not result.success,
+                retry_after_seconds=result.retry_after_seconds,
+            )
+        )
+    return not any(s.exceeded for s in statuses)
+
+
+class TestBucketEvaluation:
+    """Cost of checking all limits of one composite bucket."""
+
+    def test_per_limit_try_consume(self, benchmark):
+        """try_consume and a LimitStatus per limit."""
+        states = _states()
+        amounts = [CONSUME[limit.name] for limit in LIMITS]
+        assert benchmark(_per_limit, states, amounts)
+
+    def test_try_consume_many(self, benchmark):
+        """One pass over all limits, no result objects."""
+        states = _states()
+        amounts = [CONSUME[limit.name] for limit in LIMITS]
+        assert benchmark(try_consume_many, states, amounts, NOW_MS) is not None
+
+    @pytest.mark.parametrize("with_statuses", [True, False], ids=["statuses", "no-statuses"])
+    def test_would_refill_satisfy(self, benchmark, with_statuses):
+        """Refill check after a failed speculative write that refill would fix."""
+        states = _states()
+        would_help, _ = benchmark(
+            would_refill_satisfy, states, CONSUME, NOW_MS, with_statuses=with_statuses
+        )
+        assert would_help
@@ -0,0 +1,97 @@
+"""Memory benchmarks for the per-entity client-side caches.
+
+Populates ``Repository._entity_cache`` and ``ConfigCache._entity_limits``
+with 1M distinct entities and records the traced allocation size, once
+unbounded and once capped with an LRU. No DynamoDB access is needed; the
+caches are filled directly with the values the repository would store.
+
+Run with:
+    pytest tests/benchmark/test_cache_memory.py -v -s
+"""
+
+import time
+import tracemalloc
+
+import pytest
+
+from zae_limiter import Limit
+from zae_limiter.config_cache import CacheEntry
+from zae_limiter.lru import LRUCache
+
+pytestmark = pytest.mark.benchmark
+
+ENTITY_COUNT = 1_000_000
+MAX_ENTRIES = 10_000
+
+
+def _populate_entity_cache(cache: LRUCache) -> None:
+    """Fill the cache the way the speculative path does, one entry per entity."""
+    shards = {"gpt-4": 1}
+    for i in range(ENTITY_COUNT):
+        cache[("ns-1", f"entity-{i:07d}")] = (False, None, shards)
+
+
+def _populate_config_cache(cache: LRUCache) -> None:
+    """Fill the cache with one negative-cached config entry per entity."""
+    from zae_limiter.config_cache import _NO_CONFIG
+
+    expires_at = time.time() + 60
+    for i in range(ENTITY_COUNT):
+        cache[("ns-1", f"entity-{i:07d}", "gpt-4")] = CacheEntry(_NO_CONFIG, expires_at)
+
+
+def _traced_bytes(populate, cache: LRUCache) -> int:
+    """Return the bytes still allocated after populating the cache."""
+    tracemalloc.start()
+    try:
+        populate(cache)
+        current, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return current
+
+
+class TestCacheMemory:
+    """Retained memory with 1M entities, unbounded vs LRU-capped."""
+
+    @pytest.mark.parametrize("max_entries", [None, MAX_ENTRIES], ids=["unbounded", "capped"])
+    def test_entity_cache_memory(self, benchmark, max_entries):
+        """Entity metadata cache memory after 1M entities."""
+        cache: LRUCache = LRUCache(max_entries=max_entries)
+        retained = benchmark.pedantic(
+            _traced_bytes, args=(_populate_entity_cache, cache), rounds=1, iterations=1
+        )
+        benchmark.extra_info["entities"] = ENTITY_COUNT
+        benchmark.extra_info["retained_bytes"] = retained
+        benchmark.extra_info["evictions"] = cache.evictions
+        print(f"\nentity cache ({max_entries or 'unbounded'}): {retained / 2**20:.1f} MiB")
+
+        if max_entries is not None:
+            assert len(cache) == max_entries
+            assert cache.evictions == ENTITY_COUNT - max_entries
+            assert retained < 20 * 2**20
+        else:
+            assert len(cache) == ENTITY_COUNT
+
+    @pytest.mark.parametrize("max_entries", [None, MAX_ENTRIES], ids=["unbounded", "capped"])
+    def test_config_cache_memory(self, benchmark, max_entries):
+        """Entity config cache memory after 1M entities."""
+        cache: LRUCache = LRUCache(max_entries=max_entries)
+        retained = benchmark.pedantic(
+            _traced_bytes, args=(_populate_config_cache, cache), rounds=1, iterations=1
+        )
+        benchmark.extra_info["entities"] = ENTITY_COUNT
+        benchmark.extra_info["retained_bytes"] = retained
+        benchmark.extra_info["evictions"] = cache.evictions
+        print(f"\nconfig cache ({max_entries or 'unbounded'}): {retained / 2**20:.1f} MiB")
+
+        if max_entries is not None:
+            assert len(cache) == max_entries
+            assert retained < 20 * 2**20
+        else:
+            assert len(cache) == ENTITY_COUNT
+
+    def test_cache_entry_is_compact(self):
+        """CacheEntry is a tuple, with no per-instance __dict__."""
+        entry = CacheEntry([Limit.per_minute("rpm", 100)], 0.0)
+        assert not hasattr(entry, "__dict__")
@@ -61,6 +61,28 @@ class TestCapacityConsumption:
             "Should not use TransactWriteItems for single-item write"
         )
 
+    def test_acquire_reported_capacity(self, sync_limiter, capacity_counter):
+        """Verify: consumed-capacity accounting sees the same calls as the wrappers.
+
+        ``capacity_counter.consumed`` comes from the repository's
+        ReturnConsumedCapacity accounting (``get_io_stats()``), which also
+        reports per-index units against real DynamoDB.
+        """
+        limits = [Limit.per_minute("rpm", 1_000_000)]
+
+        with capacity_counter.counting():
+            with sync_limiter.acquire(
+                entity_id="cap-reported",
+                resource="api",
+                limits=limits,
+                consume={"rpm": 1},
+            ):
+                pass
+
+        operations = capacity_counter.consumed.operations
+        assert operations["PutItem"].calls == capacity_counter.put_item
+        assert operations["BatchGetItem"].calls == len(capacity_counter.batch_get_item)
+
     @pytest.mark.parametrize("num_limits", [2, 3, 5])
     def test_acquire_multiple_limits_capacity(self, sync_limiter, capacity_counter, num_limits):
         """Verify: acquire() with N limits uses single BatchGetItem for composite bucket.
@@ -147,6 +169,88 @@ class TestCapacityConsumption:
             "Transaction should write 2 items (child + parent)"
         )
 
+    def test_acquire_with_cascade_warm_metadata_capacity(self, sync_limiter, capacity_counter):
+        """Verify: cascade with a cached parent uses 1 BatchGetItem call.
+
+        Once the child's META is in the entity cache, the parent bucket is
+        read in the same BatchGetItem as the child META and bucket, and limit
+        resolution runs concurrently with it.
+
+        Expected calls:
+        - 1 BatchGetItem with 3 keys (child META + child bucket + parent bucket)
+        - 1 TransactWriteItems with 2 items (child + parent buckets)
+        """
+        sync_limiter.create_entity("cap-warm-parent", name="Parent")
+        sync_limiter.create_entity(
+            "cap-warm-child", name="Child", parent_id="cap-warm-parent", cascade=True
+        )
+        limits = [Limit.per_minute("rpm", 1_000_000)]
+
+        # First acquire discovers the parent and caches the child's META
+        with sync_limiter.acquire(
+            entity_id="cap-warm-child", resource="api", limits=limits, consume={"rpm": 1}
+        ):
+            pass
+
+        # Measure the slow path (speculative writes would skip the read)
+        sync_limiter._speculative_writes = False
+        capacity_counter.reset()
+
+        with capacity_counter.counting():
+            with sync_limiter.acquire(
+                entity_id="cap-warm-child",
+                resource="api",
+                limits=limits,
+                consume={"rpm": 1},
+            ):
+                pass
+
+        assert capacity_counter.batch_get_item == [3], (
+            "Should have 1 BatchGetItem (child META + child bucket + parent bucket)"
+        )
+        assert capacity_counter.transact_write_items == [2], (
+            "Transaction should write 2 items (child + parent)"
+        )
+
+    @pytest.mark.parametrize("transactional", [True, False], ids=["transaction", "independent"])
+    def test_cascade_commit_mode_capacity(self, sync_limiter, capacity_counter, transactional):
+        """Verify: cascade slow-path commit costs 4 WCU in a transaction, 2 without.
+
+        TransactWriteItems bills 2 WCU per item; with transactional_commit=False
+        child and parent are written with two independent UpdateItem calls
+        (1 WCU each).
+        """
+        sync_limiter.create_entity("cap-mode-parent", name="Parent")
+        sync_limiter.create_entity(
+            "cap-mode-child", name="Child", parent_id="cap-mode-parent", cascade=True
+        )
+        limits = [Limit.per_minute("rpm", 1_000_000)]
+        with sync_limiter.acquire(
+            entity_id="cap-mode-child", resource="api", limits=limits, consume={"rpm": 1}
+        ):
+            pass
+
+        sync_limiter._speculative_writes = False
+        sync_limiter._transactional_commit = transactional
+        capacity_counter.reset()
+
+        with capacity_counter.counting():
+            with sync_limiter.acquire(
+                entity_id="cap-mode-child", resource="api", limits=limits, consume={"rpm": 1}
+            ):
+                pass
+
+        if transactional:
+            assert capacity_counter.transact_write_items == [2], (
+                "Transaction should write 2 items (child + parent) = 4 WCU"
+            )
+            assert capacity_counter.update_item == 0
+        else:
+            assert capacity_counter.transact_write_items == []
+            assert capacity_counter.update_item == 2, (
+                "Should have 2 UpdateItem calls (child + parent) = 2 WCU"
+            )
+
     def test_acquire_with_stored_limits_capacity(self, sync_limiter, capacity_counter):
         """Verify: acquire(use_stored_limits=True) uses single-item API (issue #313).
 
@@ -658,3 +762,90 @@ class TestSpeculativeCapacity:
         assert capacity_counter.update_item == 1, "Should have 1 UpdateItem call (condition failed)"
         assert capacity_counter.put_item == 0, "Should not use PutItem"
         assert len(capacity_counter.transact_write_items) == 0, "Should not use TransactWriteItems"
+
+
+def _index_writes_per_token_update(item: dict, table_definition: dict) -> list[str]:
+    """Return the indexes DynamoDB also writes when a bucket's tokens change.
+
+    An index is written only when the item carries its key attributes and the
+    index projects the updated token attributes (ALL, or INCLUDE covering them).
+    KEYS_ONLY indexes are untouched because token updates never change keys.
+    """
+    indexes = table_definition.get("GlobalSecondaryIndexes", []) + table_definition.get(
+        "LocalSecondaryIndexes", []
+    )
+    written = []
+    for index in indexes:
+        key_attrs = [k["AttributeName"] for k in index["KeySchema"]]
+        if not all(attr in item for attr in key_attrs):
+            continue
+        projection = index["Projection"]
+        if projection["ProjectionType"] == "ALL":
+            written.append(index["IndexName"])
+        elif projection["ProjectionType"] == "INCLUDE":
+            included = projection.get("NonKeyAttributes", [])
+            if any(attr.endswith("_tk") or attr == "rf" for attr in included):
+                written.append(index["IndexName"])
+    return written
+
+
+class TestBucketIndexWriteAmplification:
+    """Verify hot bucket token updates do not fan out to ALL-projection indexes.
+
+    Buckets are discovered by resource through the KEYS_ONLY GSI5, so bucket
+    items carry no GSI2 keys and each token update costs only the base-table
+    write (schema 0.11.0).
+    """
+
+    def _bucket_item(self, sync_limiter) -> dict:
+        from zae_limiter import schema
+
+        repo = sync_limiter._repository
+        client = repo._get_client()
+        response = client.get_item(
+            TableName=repo.table_name,
+            Key={
+                "PK": {"S": schema.pk_bucket(repo._namespace_id, "amp-user", "api", 0)},
+                "SK": {"S": schema.sk_state()},
+            },
+        )
+        return response["Item"]
+
+    def test_token_update_writes_no_index(self, sync_limiter):
+        """Verify: a bucket token update costs 0 extra index writes."""
+        from zae_limiter import schema
+
+        with sync_limiter.acquire(
+            entity_id="amp-user",
+            resource="api",
+            limits=[Limit.per_minute("rpm", 1_000)],
+            consume={"rpm": 1},
+        ):
+            pass
+
+        item = self._bucket_item(sync_limiter)
+        definition = schema.get_table_definition(sync_limiter._repository.table_name)
+
+        assert _index_writes_per_token_update(item, definition) == []
+
+        # A pre-0.11.0 bucket item (GSI2 keyed) paid one extra index write per update
+        legacy = dict(item, GSI2PK={"S": "legacy"}, GSI2SK={"S": "legacy"})
+        assert _index_writes_per_token_update(legacy, definition) == [schema.GSI2_NAME]
+
+    def test_resource_discovery_capacity(self, sync_limiter, capacity_counter):
+        """Verify: resource bucket discovery uses 1 Query (KEYS_ONLY) + 1 BatchGetItem."""
+        for i in range(3):
+            with sync_limiter.acquire(
+                entity_id=f"amp-{i}",
+                resource="api",
+                limits=[Limit.per_minute("rpm", 1_000)],
+                consume={"rpm": 1},
+            ):
+                pass
+
+        with capacity_counter.counting():
+            buckets = sync_limiter._repository.get_resource_buckets("api")
+
+        assert {b.entity_id for b in buckets} == {"amp-0", "amp-1", "amp-2"}
+        assert capacity_counter.query == 1, "Should have 1 GSI5 Query"
+        assert capacity_counter.batch_get_item == [3], "Should fetch 3 buckets in 1 batch"
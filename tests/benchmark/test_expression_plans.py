@@ -0,0 +1,93 @@
+"""Microbenchmark for cached expression templates in the acquire write path.
+
+Builds the items of one acquire (a Normal write for a new lease, then an
+Adjust write on exit) for a bucket with three limits, with cached
+``ExpressionPlans`` and with plans rebuilt on every call, as before the
+cache. Records CPU time per acquire and the bytes allocated per acquire
+(``tracemalloc`` peak). No DynamoDB access is needed; only the request
+dicts are built.
+
+Run with:
+    pytest tests/benchmark/test_expression_plans.py -v -s
+"""
+
+import time
+import tracemalloc
+from typing import Any
+
+import pytest
+
+from zae_limiter.expression_plans import ExpressionPlans, WritePlan
+from zae_limiter.repository import Repository
+
+pytestmark = pytest.mark.benchmark
+
+ACQUIRES = 20_000
+CONSUMED = {"rpm": 1_000, "tpm": 500_000, "tpd": 500_000}
+REFILLS = {"rpm": 250, "tpm": 0, "tpd": 0}
+DELTAS = {"tpm": -120_000, "tpd": -120_000}
+
+
+class _UncachedPlans(ExpressionPlans):
+    """Rebuilds every plan, like the builders did before plans were cached."""
+
+    def _get(self, key: tuple[Any, ...], build: Any, *args: Any) -> WritePlan:
+        return build(*args)
+
+
+def _repo(cached: bool) -> Repository:
+    repo = Repository(name="bench", region="us-east-1", _skip_deprecation_warning=True)
+    if not cached:
+        repo._expression_plans = _UncachedPlans()
+    return repo
+
+
+def _acquire_items(repo: Repository, now_ms: int) -> None:
+    repo.build_composite_normal(
+        entity_id="entity-1",
+        resource="gpt-4",
+        consumed=CONSUMED,
+        refill_amounts=REFILLS,
+        now_ms=now_ms,
+        expected_rf=now_ms - 1_000,
+    )
+    repo.build_composite_adjust(entity_id="entity-1", resource="gpt-4", deltas=DELTAS)
+
+
+def _measure(cached: bool) -> dict[str, float]:
+    """Return CPU microseconds and allocated bytes per acquire."""
+    repo = _repo(cached)
+    _acquire_items(repo, 1_000_000)  # warm the cache
+
+    start = time.process_time()
+    for i in range(ACQUIRES):
+        _acquire_items(repo, 1_000_000 + i)
+    cpu_us = (time.process_time() - start) / ACQUIRES * 1e6
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        _acquire_items(repo, 2_000_000)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"cpu_us": cpu_us, "alloc_bytes": peak - before}
+
+
+class TestExpressionPlans:
+    """Per-acquire request building cost, cached vs rebuilt plans."""
+
+    @pytest.mark.parametrize("cached", [False, True], ids=["rebuilt", "cached"])
+    def test_acquire_request_building(self, benchmark, cached):
+        """CPU and allocations to build one acquire's Normal and Adjust items."""
+        result = benchmark.pedantic(_measure, args=(cached,), rounds=1, iterations=1)
+        benchmark.extra_info.update(result)
+        print(
+            f"\n{'cached' if cached else 'rebuilt'}: {result['cpu_us']:.1f} us, "
+            f"{result['alloc_bytes']} bytes per acquire"
+        )
+
+    def test_cached_plans_allocate_less(self):
+        """Cached plans allocate less per acquire than rebuilding them."""
+        assert _measure(cached=True)["alloc_bytes"] < _measure(cached=False)["alloc_bytes"]
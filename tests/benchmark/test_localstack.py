@@ -706,3 +706,70 @@ class TestLocalStackRefillRecoveryStress:
                 entity_id=entity_id, resource="api", limits=limits, consume={"rpm": 50}
             ) as lease:
                 assert lease.consumed == {"rpm": 50}, f"iteration {i}: recovery acquire failed"
+
+
+class TestConnectionPoolScaling:
+    """Throughput of concurrent acquires by DynamoDB client pool size on LocalStack.
+
+    botocore's default pool holds 10 connections, so more than 10 concurrent
+    acquires queue for a connection. Throughput (printed, and stored in extra_info)
+    should rise with the pool size until it reaches the number of threads.
+    """
+
+    THREADS = 32
+    ACQUIRES_PER_THREAD = 5
+
+    @pytest.fixture(params=[4, 10, 32])
+    def pooled_limiter(self, request, shared_minimal_stack, unique_namespace):
+        """SyncRateLimiter whose client pool holds ``request.param`` connections."""
+        from zae_limiter import SyncRateLimiter
+        from zae_limiter.sync_repository import SyncRepository
+
+        parent = (
+            SyncRepository.builder()
+            .stack(shared_minimal_stack.name)
+            .region(shared_minimal_stack.region)
+            .endpoint_url(shared_minimal_stack.endpoint_url)
+            .connection_pool(request.param, tcp_keepalive=True)
+            .build()
+        )
+        parent.register_namespace(unique_namespace)
+        limiter = SyncRateLimiter(repository=parent.namespace(unique_namespace))
+        with limiter:
+            yield limiter, request.param
+        parent.close()
+
+    @pytest.mark.benchmark(group="localstack-pool-size")
+    def test_concurrent_acquire_by_pool_size(self, benchmark, pooled_limiter):
+        """Measure one round of concurrent acquires on distinct, pre-warmed entities."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        limiter, pool_size = pooled_limiter
+        limits = [Limit.per_minute("rpm", 1_000_000)]
+        entities = [f"ls-pool-{i}" for i in range(self.THREADS)]
+
+        def acquire_many(entity_id: str) -> None:
+            for _ in range(self.ACQUIRES_PER_THREAD):
+                with limiter.acquire(
+                    entity_id=entity_id, resource="api", limits=limits, consume={"rpm": 1}
+                ):
+                    pass
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            # Create buckets so rounds measure the warm (speculative) path
+            list(executor.map(acquire_many, entities))
+
+            round_times: list[float] = []
+
+            def operation() -> None:
+                start = time.perf_counter()
+                list(executor.map(acquire_many, entities))
+                round_times.append(time.perf_counter() - start)
+
+            benchmark.pedantic(operation, rounds=3, iterations=1)
+
+        acquires = self.THREADS * self.ACQUIRES_PER_THREAD
+        throughput = acquires * len(round_times) / sum(round_times)
+        benchmark.extra_info["pool_size"] = pool_size
+        benchmark.extra_info["acquires_per_second"] = throughput
+        print(f"\npool_size={pool_size}: {throughput:.0f} acquires/sec")
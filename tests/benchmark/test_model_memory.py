@@ -0,0 +1,162 @@
+"""Memory and allocation benchmarks for the hot-path models.
+
+``BucketState``, ``LimitStatus``, ``LeaseEntry``, ``Lease`` and
+``SpeculativeResult`` are slotted dataclasses. Each is compared against an
+otherwise identical dataclass with a per-instance ``__dict__``:
+
+- residency: bytes retained by 100k instances, as held by long-lived
+  leases and caches
+- acquire: time and peak allocation to build the objects of one slow-path
+  acquire with three limits (bucket states, lease entries, lease)
+
+No DynamoDB access is needed.
+
+Run with:
+    pytest tests/benchmark/test_model_memory.py -v -s --benchmark-enable
+"""
+
+import dataclasses
+import tracemalloc
+from typing import Any
+
+import pytest
+
+from zae_limiter import Limit
+from zae_limiter.lease import Lease, LeaseEntry
+from zae_limiter.models import BucketState, LimitStatus
+from zae_limiter.repository_protocol import SpeculativeResult
+
+pytestmark = pytest.mark.benchmark
+
+INSTANCES = 100_000
+NOW_MS = 1_700_000_000_000
+LIMITS = [
+    Limit.per_minute("rpm", 1_000),
+    Limit.per_minute("tpm", 100_000),
+    Limit.per_day("tpd", 10_000_000),
+]
+
+
+def _with_dict(cls: type) -> type:
+    """Same fields and defaults as ``cls``, with a per-instance ``__dict__``."""
+    specs = []
+    for f in dataclasses.fields(cls):
+        if f.default is not dataclasses.MISSING:
+            specs.append((f.name, f.type, dataclasses.field(default=f.default)))
+        elif f.default_factory is not dataclasses.MISSING:
+            specs.append((f.name, f.type, dataclasses.field(default_factory=f.default_factory)))
+        else:
+            specs.append((f.name, f.type))
+    return dataclasses.make_dataclass(f"{cls.__name__}WithDict", specs)
+
+
+MODELS = {
+    cls.__name__: (cls, _with_dict(cls))
+    for cls in (BucketState, LimitStatus, LeaseEntry, Lease, SpeculativeResult)
+}
+
+
+def _bucket_kwargs(i: int) -> dict[str, Any]:
+    return {
+        "entity_id": f"entity-{i}",
+        "resource": "gpt-4",
+        "limit_name": "tpm",
+        "tokens_milli": 1_000_000,
+        "last_refill_ms": NOW_MS,
+        "capacity_milli": 1_000_000,
+        "refill_amount_milli": 1_000_000,
+        "refill_period_ms": 60_000,
+    }
+
+
+def _kwargs(name: str, i: int, state: Any) -> dict[str, Any]:
+    """Constructor arguments for one instance of the named model."""
+    if name == "BucketState":
+        return _bucket_kwargs(i)
+    if name == "LimitStatus":
+        return {
+            "entity_id": f"entity-{i}",
+            "resource": "gpt-4",
+            "limit_name": "tpm",
+            "limit": LIMITS[1],
+            "available": 10,
+            "requested": 1,
+            "exceeded": False,
+            "retry_after_seconds": 0.0,
+        }
+    if name == "LeaseEntry":
+        return {"entity_id": f"entity-{i}", "resource": "gpt-4", "limit": LIMITS[1], "state": state}
+    if name == "Lease":
+        return {"repository": None}
+    return {"success": True}
+
+
+def _retained_bytes(name: str, cls: type) -> int:
+    """Bytes retained by INSTANCES instances, excluding shared argument objects."""
+    states = [BucketState(**_bucket_kwargs(i)) for i in range(INSTANCES)]
+    args = [_kwargs(name, i, states[i]) for i in range(INSTANCES)]
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        instances = [cls(**kwargs) for kwargs in args]
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(instances) == INSTANCES
+    return after - before
+
+
+def _acquire(bucket_cls: type, entry_cls: type, lease_cls: type) -> Any:
+    """Objects built by one slow-path acquire over three limits."""
+    entries = []
+    for limit in LIMITS:
+        state = bucket_cls(
+            entity_id="entity-1",
+            resource="gpt-4",
+            limit_name=limit.name,
+            tokens_milli=limit.capacity * 1000,
+            last_refill_ms=NOW_MS,
+            capacity_milli=limit.capacity * 1000,
+            refill_amount_milli=limit.refill_amount * 1000,
+            refill_period_ms=limit.refill_period_seconds * 1000,
+            total_consumed_milli=0,
+        )
+        entries.append(
+            entry_cls(entity_id="entity-1", resource="gpt-4", limit=limit, state=state, consumed=1)
+        )
+    return lease_cls(repository=None, entries=entries)
+
+
+class TestModelMemory:
+    """Slotted models vs the same dataclasses with a __dict__."""
+
+    @pytest.mark.parametrize("name", list(MODELS))
+    @pytest.mark.parametrize("slotted", [False, True], ids=["dict", "slots"])
+    def test_residency(self, benchmark, name, slotted):
+        """Bytes retained by 100k instances."""
+        cls = MODELS[name][0 if slotted else 1]
+        retained = benchmark.pedantic(_retained_bytes, args=(name, cls), rounds=1, iterations=1)
+        benchmark.extra_info["bytes_per_instance"] = retained / INSTANCES
+        print(f"\n{name} ({'slots' if slotted else 'dict'}): {retained / INSTANCES:.0f} B")
+
+        if slotted:
+            assert not hasattr(cls(**_kwargs(name, 0, None)), "__dict__")
+            assert retained < _retained_bytes(name, MODELS[name][1])
+
+    @pytest.mark.parametrize("slotted", [False, True], ids=["dict", "slots"])
+    def test_acquire_objects(self, benchmark, slotted):
+        """Time to build the bucket states, entries and lease of one acquire."""
+        index = 0 if slotted else 1
+        classes = (MODELS["BucketState"][index], MODELS["LeaseEntry"][index])
+        lease = benchmark(_acquire, *classes, MODELS["Lease"][index])
+
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            _acquire(*classes, MODELS["Lease"][index])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info["peak_bytes"] = peak
+        print(f"\nacquire ({'slots' if slotted else 'dict'}): {peak} B peak")
+        assert len(lease.entries) == len(LIMITS)
@@ -25,7 +25,8 @@ from dataclasses import replace
 import pytest
 
 from tests.benchmark.conftest import BenchmarkEntities
-from zae_limiter import Limit
+from zae_limiter import Limit, SpeculativePolicyConfig
+from zae_limiter.speculative_policy import SpeculativePolicy
 
 pytestmark = pytest.mark.benchmark
 
@@ -371,6 +372,8 @@ class TestOptimizationComparison:
     Optimizations compared:
     - Config cache (issue #135): Reduces config lookups from DynamoDB
     - BatchGetItem (issue #133): Reduces cascade bucket fetches to single call
+    - Adaptive speculative-write policy: Skips speculative writes that keep
+      failing on refill-bound buckets
     """
 
     @pytest.mark.benchmark(group="config-cache-comparison")
@@ -664,3 +667,64 @@ class TestOptimizationComparison:
                 pass
 
         benchmark(operation)
+
+    @staticmethod
+    def _mixed_refill_workload(limiter):
+        """Acquire operation alternating healthy and refill-bound buckets.
+
+        Healthy buckets hold far more tokens than the benchmark consumes, so
+        the speculative write always succeeds. Refill-bound buckets hold 10
+        tokens that every acquire drains, but refill 100 per millisecond: the
+        stored tokens never cover the next request, so the speculative write
+        always fails and the slow path (read + refill + write) succeeds.
+        """
+        healthy = [Limit.per_minute("rpm", 1_000_000)]
+        refill_bound = [Limit.per_second("rpm", 100_000, burst=10)]
+        workload = [(f"mixed-entity-{i}", "healthy", healthy, 1) for i in range(4)] + [
+            (f"mixed-entity-{i}", "refill-bound", refill_bound, 10) for i in range(4)
+        ]
+
+        # Create every bucket so only refill pressure drives speculative failures
+        for entity_id, resource, limits, amount in workload:
+            with limiter.acquire(
+                entity_id=entity_id,
+                resource=resource,
+                limits=limits,
+                consume={"rpm": amount},
+            ):
+                pass
+
+        counter = [0]
+
+        def operation():
+            entity_id, resource, limits, amount = workload[counter[0] % len(workload)]
+            counter[0] += 1
+            with limiter.acquire(
+                entity_id=entity_id,
+                resource=resource,
+                limits=limits,
+                consume={"rpm": amount},
+            ):
+                pass
+
+        return operation
+
+    @pytest.mark.benchmark(group="speculative-policy-comparison")
+    def test_mixed_refill_always_speculate(self, benchmark, sync_limiter):
+        """Baseline: every acquire tries the speculative write first.
+
+        Refill-bound buckets pay a failed UpdateItem before the slow path.
+        """
+        benchmark(self._mixed_refill_workload(sync_limiter))
+
+    @pytest.mark.benchmark(group="speculative-policy-comparison")
+    def test_mixed_refill_adaptive_policy(self, benchmark, sync_limiter):
+        """Optimized: adaptive speculative-write policy.
+
+        Refill-bound buckets go straight to the slow path after a few
+        failures (with periodic probes); healthy buckets keep speculating.
+        """
+        operation = self._mixed_refill_workload(sync_limiter)
+        sync_limiter._speculative_policy = SpeculativePolicy(config=SpeculativePolicyConfig())
+
+        benchmark(operation)
@@ -0,0 +1,91 @@
+"""Simulation benchmark for shard selection with skewed shard balances.
+
+Eight shards of one bucket start with very different balances: six are
+nearly drained, two are full. Four clients, each with its own
+``ShardBalance`` (its own view, updated only by its own writes), take turns
+consuming one token per request. A write to a shard that cannot cover the
+request fails and is retried on up to two other shards, as in
+``RateLimiter._retry_on_other_shard``.
+
+Uniform selection never records shard states, so every pick is random. No
+DynamoDB access is needed; shard items are plain ``BucketState`` lists.
+
+Run with:
+    pytest tests/benchmark/test_shard_selection.py -v -s
+"""
+
+from dataclasses import replace
+
+import pytest
+
+from zae_limiter.models import BucketState, Limit
+from zae_limiter.shard_balance import ShardBalance
+
+pytestmark = pytest.mark.benchmark
+
+KEY = ("ns-1", "entity-1", "gpt-4")
+NOW_MS = 1_700_000_000_000
+SHARD_TOKENS = [2, 0, 5, 1, 0, 3, 1_000, 1_000]
+CLIENTS = 4
+REQUESTS = 1_500
+MAX_RETRIES = 2
+
+
+def _simulate(load_aware: bool) -> dict[str, int]:
+    """Run the workload and count speculative writes."""
+    limit = Limit.per_hour("rpm", 1_000)
+    shards: list[list[BucketState]] = []
+    for tokens in SHARD_TOKENS:
+        state = BucketState.from_limit(KEY[1], KEY[2], limit, NOW_MS)
+        state.tokens_milli = tokens * 1000
+        shards.append([state])
+    clients = [ShardBalance() for _ in range(CLIENTS)]
+
+    def write(client: ShardBalance, shard_id: int) -> bool:
+        state = shards[shard_id][0]
+        success = state.tokens_milli >= 1000
+        if success:
+            state.tokens_milli -= 1000
+        if load_aware:
+            client.record(KEY, shard_id, [replace(state)])
+        return success
+
+    writes = failed_writes = rejected = 0
+    for i in range(REQUESTS):
+        client = clients[i % CLIENTS]
+        tried: set[int] = set()
+        for _ in range(1 + MAX_RETRIES):
+            shard_id = client.choose(KEY, len(shards), {"rpm": 1}, NOW_MS, exclude=tried)
+            if shard_id is None:
+                break
+            tried.add(shard_id)
+            writes += 1
+            if write(client, shard_id):
+                break
+            failed_writes += 1
+        else:
+            rejected += 1
+    return {"writes": writes, "failed_writes": failed_writes, "rejected": rejected}
+
+
+class TestShardSelection:
+    """Speculative writes per request, uniform vs load-aware shard selection."""
+
+    @pytest.mark.parametrize("load_aware", [False, True], ids=["uniform", "load-aware"])
+    def test_skewed_shards(self, benchmark, load_aware):
+        """Failed writes on skewed shards with four independent clients."""
+        result = benchmark.pedantic(_simulate, args=(load_aware,), rounds=1, iterations=1)
+        benchmark.extra_info.update(result)
+        print(
+            f"\n{'load-aware' if load_aware else 'uniform'}: "
+            f"{result['writes']} writes, {result['failed_writes']} failed, "
+            f"{result['rejected']} rejected for {REQUESTS} requests"
+        )
+
+        if load_aware:
+            # Without refill a shard seen drained stays drained: each client
+            # fails at most once per shard
+            assert result["failed_writes"] <= CLIENTS * len(SHARD_TOKENS)
+            assert result["rejected"] == 0
+        else:
+            assert result["failed_writes"] > REQUESTS // 2
@@ -14,13 +14,15 @@ Moto doesn't simulate true contention, so retry rates will be 0.
 For realistic contention behavior, use LocalStack or real AWS.
 """
 
+import asyncio
 import time
 from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
 from tests.benchmark.conftest import BenchmarkEntities
-from zae_limiter import Limit
+from zae_limiter import Limit, schema
+from zae_limiter.config_cache import ConfigCache
 
 pytestmark = pytest.mark.benchmark
 
@@ -351,3 +353,108 @@ class TestThroughputWithHierarchy:
         assert total_successes >= total_iterations // 2, (
             f"At least half should succeed ({total_successes}/{total_iterations})"
         )
+
+
+class TestAcquireManyThroughput:
+    """Compare acquire_many() against a serial acquire() loop.
+
+    Both variants acquire the same batch of (entity, resource) pairs. The
+    serial loop pays one round trip chain per request; acquire_many() runs
+    speculative writes concurrently and batches slow-path reads.
+
+    Moto runs in-process, so concurrent calls compete for the GIL and the
+    speedup here understates what network-bound DynamoDB calls would see.
+    """
+
+    @staticmethod
+    def _serial(limiter, requests, limits) -> float:
+        start = time.perf_counter()
+        for entity_id, resource, consume in requests:
+            with limiter.acquire(entity_id, resource, consume, limits=limits):
+                pass
+        return time.perf_counter() - start
+
+    @staticmethod
+    def _batched(limiter, requests, limits) -> float:
+        start = time.perf_counter()
+        with limiter.acquire_many(requests, limits=limits) as results:
+            assert all(not isinstance(r, Exception) for r in results)
+        return time.perf_counter() - start
+
+    @pytest.mark.parametrize("speculative", [True, False], ids=["speculative", "slow-path"])
+    def test_acquire_many_vs_serial(self, benchmark_entities: BenchmarkEntities, speculative):
+        """Measure batch TPS for acquire_many() and a serial loop.
+
+        The slow-path variant disables speculative writes so every request
+        goes through the read-then-commit path, where batching replaces one
+        BatchGetItem per request with one per 100 keys.
+        """
+        limiter = benchmark_entities.limiter
+        limits = [Limit.per_minute("rpm", 1_000_000)]
+        requests = [
+            (entity_id, "benchmark", {"rpm": 1}) for entity_id in benchmark_entities.flat[:10]
+        ]
+        rounds = 5
+        saved = limiter._speculative_writes
+        limiter._speculative_writes = speculative
+        try:
+            serial = sum(self._serial(limiter, requests, limits) for _ in range(rounds))
+            batched = sum(self._batched(limiter, requests, limits) for _ in range(rounds))
+        finally:
+            limiter._speculative_writes = saved
+
+        total = rounds * len(requests)
+        print(f"\nSerial acquire() TPS: {total / serial:.2f} ops/sec")
+        print(f"acquire_many() TPS: {total / batched:.2f} ops/sec")
+        print(f"Speedup: {serial / batched:.2f}x")
+
+        assert batched < 60, "acquire_many() took too long"
+
+
+class TestConfigCacheContention:
+    """Config cache misses under concurrency.
+
+    A simulated BatchGetItem latency stands in for DynamoDB so the numbers
+    show lock behavior rather than moto overhead. Before per-key single-flight,
+    every miss waited behind one global lock held across the fetch, so N
+    distinct misses took roughly N round trips.
+    """
+
+    FETCH_LATENCY_S = 0.005
+
+    async def _resolve_all(self, cache: ConfigCache, entity_ids: list[str]) -> int:
+        calls = 0
+
+        async def batch_fn(keys):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(self.FETCH_LATENCY_S)
+            return {(schema.pk_system("default"), schema.sk_config()): ([], None)}
+
+        await asyncio.gather(
+            *[cache.resolve_limits(entity_id, "api", batch_fn) for entity_id in entity_ids]
+        )
+        return calls
+
+    @pytest.mark.parametrize("distinct", [1, 200], ids=["same-key", "distinct-keys"])
+    def test_concurrent_misses(self, distinct: int):
+        """Resolve 200 concurrent misses over 1 or 200 distinct keys.
+
+        Same-key misses should cost one fetch; distinct-key misses should
+        overlap, finishing in a few fetch latencies rather than 200.
+        """
+        requests = 200
+        entity_ids = [f"entity-{i % distinct}" for i in range(requests)]
+        cache = ConfigCache(ttl_seconds=60)
+
+        start = time.perf_counter()
+        calls = asyncio.run(self._resolve_all(cache, entity_ids))
+        elapsed = time.perf_counter() - start
+
+        serialized = calls * self.FETCH_LATENCY_S
+        print(f"\n{requests} misses over {distinct} keys: {elapsed * 1000:.1f} ms, {calls} fetches")
+        print(f"Serialized estimate: {serialized * 1000:.1f} ms")
+
+        assert calls == distinct
+        if distinct > 1:
+            assert elapsed < serialized / 2, "Distinct-key misses should not serialize"
@@ -7,6 +7,8 @@ from typing import Any
 
 import pytest
 
+from zae_limiter.io_stats import IOStats
+
 
 @dataclass
 class CapacityCounter:
@@ -21,6 +23,8 @@ class CapacityCounter:
         delete_item: Number of DeleteItem calls (1 WCU each, issue #313)
         transact_write_items: List of item counts per TransactWriteItems call
         batch_write_item: List of item counts per BatchWriteItem call
+        consumed: Capacity reported by DynamoDB (ReturnConsumedCapacity) for
+            the last ``counting()`` block, per operation and per index
     """
 
     get_item: int = 0
@@ -31,6 +35,7 @@ class CapacityCounter:
     delete_item: int = 0
     transact_write_items: list[int] = field(default_factory=list)
     batch_write_item: list[int] = field(default_factory=list)
+    consumed: IOStats = field(default_factory=IOStats)
 
     @property
     def total_rcus(self) -> int:
@@ -62,6 +67,7 @@ class CapacityCounter:
         self.delete_item = 0
         self.transact_write_items.clear()
         self.batch_write_item.clear()
+        self.consumed = IOStats()
 
 
 @contextmanager
@@ -69,7 +75,8 @@ def _counting_client(counter: CapacityCounter, limiter: Any) -> Generator[None,
     """Context manager that wraps DynamoDB boto3 client to count API calls.
 
     This wraps the sync DynamoDB client methods to count calls without
-    interfering with the actual operations.
+    interfering with the actual operations. Consumed capacity is collected
+    with the repository's own accounting (``enable_io_stats()``).
 
     Args:
         counter: The CapacityCounter to update
@@ -82,6 +89,10 @@ def _counting_client(counter: CapacityCounter, limiter: Any) -> Generator[None,
         yield
         return
 
+    # Collect reported capacity for this block only
+    repo.enable_io_stats()
+    repo.reset_io_stats()
+
     # Store original methods
     original_get_item = client.get_item
     original_batch_get = client.batch_get_item
@@ -152,6 +163,7 @@ def _counting_client(counter: CapacityCounter, limiter: Any) -> Generator[None,
         client.delete_item = original_delete_item
         client.transact_write_items = original_transact
         client.batch_write_item = original_batch
+        counter.consumed = repo.get_io_stats()
 
 
 @pytest.fixture
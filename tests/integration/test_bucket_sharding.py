@@ -6,17 +6,21 @@ and associated sharding behaviors work correctly with actual DynamoDB, including
 - Shard count propagation
 - WCU infrastructure limit presence
 - GSI3-based bucket discovery
+- Shard merging under concurrent consumption
 
 See: GHSA-76rv-2r9v-c5m6
 """
 
 import os
+import random
+import threading
 import time
 import uuid
 from decimal import Decimal
 
 import boto3
 import pytest
+from botocore.exceptions import ClientError
 
 from zae_limiter.schema import (
     BUCKET_FIELD_CP,
@@ -35,6 +39,7 @@ from zae_limiter_aggregator.processor import (
     LimitRefillInfo,
     propagate_shard_count,
     try_proactive_shard,
+    try_shard_merge,
 )
 
 
@@ -345,3 +350,99 @@ class TestShardCountPropagationIntegration:
         assert shard_1 is not None
         assert len(shard_1) > 0, "Shard 1 should have been created by propagation"
         assert shard_1["shard_count"] == Decimal("2")
+
+
+@pytest.mark.integration
+class TestShardMergeIntegration:
+    """Integration tests for aggregator shard merging."""
+
+    def test_concurrent_merge_and_consume(self, dynamodb_table) -> None:
+        """Merging while clients consume never grants more tokens than existed."""
+        entity_id = f"entity-{uuid.uuid4().hex[:8]}"
+        resource = "gpt-4"
+        now_ms = int(time.time() * 1000)
+        initial = [20_000, 5_000, 15_000, 10_000]  # rpm millitokens per shard
+
+        for shard_id, tk in enumerate(initial):
+            _seed_sharded_bucket(
+                dynamodb_table,
+                entity_id,
+                resource,
+                shard_id=shard_id,
+                limits={
+                    "rpm": {"tk": tk, "cp": 100_000, "ra": 100_000, "rp": 60_000, "tc": 0},
+                    WCU_LIMIT_NAME: {
+                        "tk": 1_000_000,
+                        "cp": 1_000_000,
+                        "ra": 1_000_000,
+                        "rp": 60_000,
+                        "tc": 0,
+                    },
+                },
+                rf_ms=now_ms,
+                shard_count=4,
+            )
+
+        consumed: list[int] = []
+        stop = threading.Event()
+
+        def consume() -> None:
+            # Speculative-style write: 1 rpm token from a random shard
+            while not stop.is_set():
+                shard_id = random.randrange(4)
+                try:
+                    dynamodb_table.update_item(
+                        Key={
+                            "PK": pk_bucket("default", entity_id, resource, shard_id),
+                            "SK": sk_state(),
+                        },
+                        UpdateExpression="ADD b_rpm_tk :neg",
+                        ConditionExpression="attribute_exists(PK) AND b_rpm_tk >= :amt",
+                        ExpressionAttributeValues={":neg": -1_000, ":amt": 1_000},
+                    )
+                    consumed.append(1_000)
+                except ClientError as e:
+                    if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                        raise
+
+        state = BucketRefillState(
+            namespace_id="default",
+            entity_id=entity_id,
+            resource=resource,
+            shard_id=0,
+            shard_count=4,
+            rf_ms=now_ms,
+            limits={
+                WCU_LIMIT_NAME: LimitRefillInfo(
+                    tc_delta=1_000,
+                    tk_milli=999_000,
+                    cp_milli=1_000_000,
+                    ra_milli=1_000_000,
+                    rp_ms=1_000,
+                )
+            },
+        )
+        workers = [threading.Thread(target=consume) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        try:
+            merged = False
+            for _ in range(50):
+                if try_shard_merge(dynamodb_table, state, now_ms):
+                    merged = True
+                    break
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+        assert merged, "merge never won against concurrent consumers"
+        assert _get_sharded_bucket(dynamodb_table, entity_id, resource, 2) == {}
+        assert _get_sharded_bucket(dynamodb_table, entity_id, resource, 3) == {}
+        remaining = 0
+        for shard_id in range(2):
+            item = _get_sharded_bucket(dynamodb_table, entity_id, resource, shard_id)
+            assert item["shard_count"] == Decimal("2")
+            assert item[bucket_attr("rpm", BUCKET_FIELD_TK)] <= 50_000
+            remaining += int(item[bucket_attr("rpm", BUCKET_FIELD_TK)])
+        assert remaining + sum(consumed) <= sum(initial)
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import click
 import pytest
 from click.testing import CliRunner
 
+from zae_limiter.histogram import LatencyHistograms
 from zae_limiter.loadtest.cli import loadtest
 
 
@@ -2015,6 +2017,53 @@ class TestRunCommand:
             assert "Lambda Run" in result.output
             assert "p50" in result.output
 
+    def test_run_output_saves_results(self, runner, tmp_path):
+        """--output writes the Lambda results, including histograms, as JSON."""
+        histograms = LatencyHistograms()
+        histograms.on_dynamodb_call("UpdateItem", 0.004, None)
+        output = tmp_path / "results.json"
+        with (
+            patch("zae_limiter.loadtest.cli._get_lambda_client_and_config") as mock_get_config,
+            patch("zae_limiter.loadtest.cli._invoke_lambda_headless") as mock_invoke,
+        ):
+            mock_get_config.return_value = (MagicMock(), "test-load-worker", 1769, 300)
+            mock_invoke.return_value = {
+                "total_requests": 10,
+                "latency_histograms": histograms.snapshot().to_dict(),
+            }
+
+            result = runner.invoke(
+                loadtest,
+                ["run", "--name", "test", "-f", "locustfiles/max_rps.py", "-o", str(output)],
+            )
+
+        assert result.exit_code == 0, result.output
+        assert "In-process latency" in result.output
+        assert "DynamoDB UpdateItem" in result.output
+        saved = json.loads(output.read_text())
+        assert saved["latency_histograms"]["dynamodb_calls"]["UpdateItem"]["count"] == 1
+
+    def test_run_output_requires_lambda_mode(self, runner, tmp_path):
+        """--output is rejected in distributed mode."""
+        with patch("zae_limiter.loadtest.cli._benchmark_distributed") as mock_dist:
+            result = runner.invoke(
+                loadtest,
+                [
+                    "run",
+                    "--name",
+                    "test",
+                    "-f",
+                    "locustfiles/max_rps.py",
+                    "--workers",
+                    "4",
+                    "-o",
+                    str(tmp_path / "results.json"),
+                ],
+            )
+        assert result.exit_code != 0
+        assert "only supported in Lambda mode" in result.output
+        mock_dist.assert_not_called()
+
     def test_benchmark_command_no_longer_exists(self, runner):
         """The old 'benchmark' subcommand is removed."""
         result = runner.invoke(loadtest, ["benchmark", "--help"])
@@ -2070,6 +2119,58 @@ class TestRunCommand:
         assert "--mode" not in result.output
 
 
+# ---------------------------------------------------------------------------
+# Histograms command
+# ---------------------------------------------------------------------------
+
+
+class TestHistogramsCommand:
+    """Tests for the histograms command."""
+
+    @pytest.fixture
+    def results_file(self, tmp_path):
+        histograms = LatencyHistograms()
+        for ms in range(1, 101):
+            histograms.on_dynamodb_call("UpdateItem", ms / 1000, None)
+        path = tmp_path / "results.json"
+        results = {"total_requests": 100, "latency_histograms": histograms.snapshot().to_dict()}
+        path.write_text(json.dumps(results))
+        return path
+
+    def test_table(self, runner, results_file):
+        """The default format is a percentile table in milliseconds."""
+        result = runner.invoke(loadtest, ["histograms", str(results_file)])
+        assert result.exit_code == 0, result.output
+        assert "p99.9" in result.output
+        assert "DynamoDB UpdateItem" in result.output
+
+    def test_json(self, runner, results_file):
+        """--format json prints percentiles in seconds."""
+        result = runner.invoke(loadtest, ["histograms", str(results_file), "--format", "json"])
+        assert result.exit_code == 0, result.output
+        summary = json.loads(result.output)["dynamodb_calls"]["UpdateItem"]
+        assert summary["count"] == 100
+        assert summary["p50_s"] == pytest.approx(0.050, rel=0.05)
+
+    def test_prometheus(self, runner, results_file):
+        """--format prometheus prints a summary family."""
+        result = runner.invoke(
+            loadtest, ["histograms", str(results_file), "--format", "prometheus"]
+        )
+        assert result.exit_code == 0, result.output
+        assert "# TYPE zae_limiter_dynamodb_call_latency_seconds summary" in result.output
+        count_line = 'zae_limiter_dynamodb_call_latency_seconds_count{operation="UpdateItem"} 100'
+        assert count_line in result.output
+
+    def test_missing_histograms(self, runner, tmp_path):
+        """Results without histograms are reported as an error."""
+        path = tmp_path / "results.json"
+        path.write_text(json.dumps({"total_requests": 100}))
+        result = runner.invoke(loadtest, ["histograms", str(path)])
+        assert result.exit_code != 0
+        assert "latency_histograms = True" in result.output
+
+
 # ---------------------------------------------------------------------------
 # Push command
 # ---------------------------------------------------------------------------
@@ -722,6 +722,38 @@ class TestRateLimiterUser:
         assert user.stack_name == "my-app"
         mock_sync.assert_called_once_with(name="my-app", region="us-east-1")
 
+    def test_phase_stats_adds_listener(self):
+        mod = _load_locust_module()
+
+        class PhaseUser(mod.RateLimiterUser):
+            abstract = False
+            stack_name = "my-app"
+            phase_stats = True
+
+        mock_env = MagicMock(host=None)
+
+        with patch.object(mod, "SyncRateLimiter") as mock_sync:
+            PhaseUser(mock_env)
+
+        (listener,) = mock_sync.call_args.kwargs["listeners"]
+        assert isinstance(listener, mod.PhaseStatsListener)
+        assert listener.request_event is mock_env.events.request
+
+    def test_latency_histograms_option(self):
+        mod = _load_locust_module()
+
+        class HistogramUser(mod.RateLimiterUser):
+            abstract = False
+            stack_name = "my-app"
+            latency_histograms = True
+
+        with patch.object(mod, "SyncRateLimiter") as mock_sync:
+            HistogramUser(MagicMock(host=None))
+
+        mock_sync.assert_called_once_with(
+            name="my-app", region="us-east-1", latency_histograms=True
+        )
+
     def test_falls_back_to_host(self):
         mod = _load_locust_module()
 
@@ -778,3 +810,62 @@ class TestRateLimiterUser:
             RegionUser(mock_env)
 
         mock_sync.assert_called_once_with(name="my-app", region="eu-west-1")
+
+
+# ---------------------------------------------------------------------------
+# Phase-level stats
+# ---------------------------------------------------------------------------
+
+
+class TestPhaseStatsListener:
+    """Tests for PhaseStatsListener."""
+
+    @pytest.fixture()
+    def listener(self, mock_event):
+        with patch.dict("sys.modules", {"locust": MagicMock(), "locust.exception": MagicMock()}):
+            from zae_limiter.locust import PhaseStatsListener
+
+            return PhaseStatsListener(mock_event)
+
+    def _fired(self, mock_event) -> list[tuple[str, str]]:
+        return [
+            (call.kwargs["request_type"], call.kwargs["name"])
+            for call in mock_event.fire.call_args_list
+        ]
+
+    def test_acquire_fires_phases_and_path(self, listener, mock_event):
+        from zae_limiter.instrumentation import (
+            AcquireOutcome,
+            AcquirePath,
+            AcquirePhase,
+            AcquireTrace,
+        )
+
+        trace = AcquireTrace("entity-1", "gpt-4")
+        trace.enter(AcquirePhase.FAST_PATH)
+        trace.path = AcquirePath.SPECULATIVE
+        trace.acquired()
+        trace.enter(AcquirePhase.COMMIT_ADJUSTMENTS)
+        trace.close(AcquireOutcome.GRANTED)
+
+        listener.on_acquire(trace)
+
+        assert self._fired(mock_event) == [
+            ("PHASE", "on_unavailable"),
+            ("PHASE", "fast_path"),
+            ("PHASE", "commit_adjustments"),
+            ("PATH", "speculative"),
+        ]
+        path_call = mock_event.fire.call_args_list[-1]
+        assert path_call.kwargs["response_time"] == trace.acquire_s * 1000
+        assert path_call.kwargs["exception"] is None
+
+    def test_dynamodb_calls(self, listener, mock_event):
+        listener.on_dynamodb_call("UpdateItem", 0.004, None)
+        listener.on_dynamodb_call("UpdateItem", 0.002, "ConditionalCheckFailedException")
+
+        assert self._fired(mock_event) == [
+            ("DYNAMODB", "UpdateItem"),
+            ("DYNAMODB", "UpdateItem (ConditionalCheckFailedException)"),
+        ]
+        assert mock_event.fire.call_args_list[0].kwargs["response_time"] == 4.0
@@ -289,3 +289,28 @@ class TestLoadUserClasses:
         ) as mock_import:
             _load_user_classes({})
             mock_import.assert_called_once_with("my_locustfiles.api")
+
+
+class TestLatencyHistograms:
+    """Tests for returning in-process latency histograms with headless results."""
+
+    def _locust_module(self, limiter):
+        module = types.ModuleType("zae_limiter.locust")
+        module.RateLimiterUser = type("RateLimiterUser", (), {"_limiter": limiter})
+        return module
+
+    def test_serializes_snapshot(self):
+        """The shared limiter's snapshot is serialized."""
+        limiter = MagicMock()
+        limiter.get_latency_histograms.return_value.to_dict.return_value = {"operations": {}}
+        with patch.dict("sys.modules", {"zae_limiter.locust": self._locust_module(limiter)}):
+            assert worker_mod._latency_histograms() == {"operations": {}}
+
+    def test_none_when_disabled(self):
+        """No histograms without a limiter or with histograms disabled."""
+        with patch.dict("sys.modules", {"zae_limiter.locust": self._locust_module(None)}):
+            assert worker_mod._latency_histograms() is None
+        limiter = MagicMock()
+        limiter.get_latency_histograms.return_value = None
+        with patch.dict("sys.modules", {"zae_limiter.locust": self._locust_module(limiter)}):
+            assert worker_mod._latency_histograms() is None
@@ -8,6 +8,7 @@ from zae_limiter.bucket import (
     force_consume,
     refill_bucket,
     try_consume,
+    try_consume_many,
     would_refill_satisfy,
 )
 from zae_limiter.models import BucketState
@@ -119,6 +120,59 @@ class TestTryConsume:
         assert result.available == 50_000
 
 
+class TestTryConsumeMany:
+    """Tests for try_consume_many function."""
+
+    def _make_bucket(self, limit_name: str, tokens_milli: int, last_refill_ms: int = 0):
+        return BucketState(
+            entity_id="test",
+            resource="gpt-4",
+            limit_name=limit_name,
+            tokens_milli=tokens_milli,
+            last_refill_ms=last_refill_ms,
+            capacity_milli=100_000,
+            refill_amount_milli=100_000,
+            refill_period_ms=60_000,
+        )
+
+    @pytest.mark.parametrize(
+        ("tokens_milli", "last_refill_ms", "amount", "now_ms"),
+        [
+            (100_000, 0, 50, 0),  # no refill
+            (0, 0, 30, 30_000),  # partial refill
+            (50_000, 0, 10, 7_777),  # refill with rounding
+            (90_000, 0, 100, 600_000),  # refill capped at capacity
+            (0, 0, 101, 600_000),  # more than capacity
+            (-20_000, 0, 0, 1_000),  # debt, nothing requested
+        ],
+    )
+    def test_matches_try_consume(self, tokens_milli, last_refill_ms, amount, now_ms):
+        """Each result matches try_consume on the same bucket."""
+        bucket = self._make_bucket("rpm", tokens_milli, last_refill_ms)
+        expected = try_consume(bucket, amount, now_ms)
+
+        results = try_consume_many([bucket], [amount], now_ms)
+
+        if expected.success:
+            assert results == [(expected.new_tokens_milli, expected.new_last_refill_ms)]
+        else:
+            assert results is None
+
+    def test_all_or_nothing(self):
+        """One short limit fails the whole request; no state is modified."""
+        rpm = self._make_bucket("rpm", 100_000)
+        tpm = self._make_bucket("tpm", 5_000)
+
+        assert try_consume_many([rpm, tpm], [1, 10], now_ms=0) is None
+        assert try_consume_many([rpm, tpm], [1, 5], now_ms=0) == [(99_000, 0), (0, 0)]
+        assert rpm.tokens_milli == 100_000
+        assert tpm.tokens_milli == 5_000
+
+    def test_empty(self):
+        """No limits trivially succeed."""
+        assert try_consume_many([], [], now_ms=0) == []
+
+
 class TestCalculateRetryAfter:
     """Tests for calculate_retry_after function."""
 
@@ -314,3 +368,17 @@ class TestWouldRefillSatisfy:
         assert would_help is False
         assert statuses[0].retry_after_seconds > 0
         assert statuses[0].limit.name == "rpm"
+
+    def test_statuses_skipped_on_success(self):
+        """Without with_statuses, statuses are only built for a violation."""
+        bucket = self._make_bucket(tokens_milli=0, last_refill_ms=0)
+
+        assert would_refill_satisfy([bucket], {"rpm": 10}, now_ms=30_000, with_statuses=False) == (
+            True,
+            [],
+        )
+        would_help, statuses = would_refill_satisfy(
+            [bucket], {"rpm": 100}, now_ms=1_000, with_statuses=False
+        )
+        assert would_help is False
+        assert statuses[0].exceeded
@@ -0,0 +1,127 @@
+"""Tests for the vectorized bucket engine."""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from zae_limiter import bucket_array
+from zae_limiter.bucket import calculate_available, calculate_retry_after, refill_bucket
+from zae_limiter.models import BucketState
+
+NOW_MS = 1_700_000_000_000
+INT64_MAX = 2**63 - 1
+
+
+def _state(tk: int, rf: int, cp: int, ra: int, rp: int) -> BucketState:
+    return BucketState(
+        entity_id="entity-1",
+        resource="gpt-4",
+        limit_name="rpm",
+        tokens_milli=tk,
+        last_refill_ms=rf,
+        capacity_milli=cp,
+        refill_amount_milli=ra,
+        refill_period_ms=rp,
+    )
+
+
+def _random_states(count: int) -> list[BucketState]:
+    rng = random.Random(42)
+    states = []
+    for _ in range(count):
+        cp = rng.choice([1_000, 100_000, 10**9, 10**13])
+        states.append(
+            _state(
+                tk=rng.randint(-cp, cp + 5_000),  # debt and above capacity
+                rf=NOW_MS - rng.choice([0, 1, 7, 999, 60_001, 86_400_000]) + rng.randint(-5, 5),
+                cp=cp,
+                ra=rng.choice([0, 1, 7, cp, cp * 3]),
+                rp=rng.choice([1, 1_000, 60_000, 3_600_000, 86_400_000]),
+            )
+        )
+    return states
+
+
+EDGE_STATES = [
+    _state(0, 0, 10**15, 10**15, 1),  # elapsed * ra overflows int64
+    _state(5_000, NOW_MS + 100, 10_000, 1_000, 1_000),  # rf in the future
+    _state(INT64_MAX - 10, NOW_MS - 1_000, INT64_MAX, INT64_MAX // 2, 1),  # tk + added overflows
+    _state(1_000, NOW_MS - 1_000, 10_000, -1_000, 1_000),  # negative refill amount
+]
+
+
+class TestVectorizedParity:
+    """Vectorized results are bit-exact with bucket.py."""
+
+    @pytest.fixture(autouse=True)
+    def _numpy(self):
+        pytest.importorskip("numpy")
+
+    def test_refill_matches_scalar(self):
+        """refill_buckets matches refill_bucket, including overflow-prone rows."""
+        states = _random_states(5_000) + EDGE_STATES
+        tokens, refill = bucket_array.refill_buckets(
+            bucket_array.BucketArrays.from_states(states), NOW_MS
+        )
+
+        for i, s in enumerate(states):
+            expected = refill_bucket(
+                s.tokens_milli,
+                s.last_refill_ms,
+                NOW_MS,
+                s.capacity_milli,
+                s.refill_amount_milli,
+                s.refill_period_ms,
+            )
+            assert (int(tokens[i]), int(refill[i])) == (
+                expected.new_tokens_milli,
+                expected.new_last_refill_ms,
+            ), s
+
+    def test_available_matches_scalar(self):
+        """available_tokens matches calculate_available."""
+        states = _random_states(1_000)
+        assert bucket_array.available_tokens(states, NOW_MS) == [
+            calculate_available(s, NOW_MS) for s in states
+        ]
+
+    def test_retry_after_matches_scalar(self):
+        """calculate_retry_after_many matches calculate_retry_after."""
+        import numpy as np
+
+        rng = random.Random(7)
+        rows = [
+            (rng.randint(-1_000, 10**12), rng.choice([1, 7, 10**9]), rng.choice([1, 60_000]))
+            for _ in range(2_000)
+        ] + [(10**15, 1, 10**6)]  # deficit * rp overflows int64
+        deficit, ra, rp = (np.array(col, dtype=np.int64) for col in zip(*rows, strict=True))
+
+        retry = bucket_array.calculate_retry_after_many(deficit, ra, rp)
+
+        assert retry.tolist() == [calculate_retry_after(d, a, p) for d, a, p in rows]
+
+    def test_zero_period_raises_like_scalar(self):
+        """Rows that raise in bucket.py raise in the vectorized engine too."""
+        states = [_state(0, 0, 1_000, 1_000, 0)]
+        with pytest.raises(ZeroDivisionError):
+            bucket_array.refill_buckets(bucket_array.BucketArrays.from_states(states), NOW_MS)
+
+
+class TestWithoutNumpy:
+    """Behavior when numpy is not installed."""
+
+    def test_available_tokens_falls_back(self):
+        """available_tokens uses the scalar loop."""
+        states = _random_states(100)
+        with patch.object(bucket_array, "np", None):
+            assert not bucket_array.numpy_available()
+            assert bucket_array.available_tokens(states, NOW_MS) == [
+                calculate_available(s, NOW_MS) for s in states
+            ]
+
+    def test_arrays_require_numpy(self):
+        """Building arrays explains how to install numpy."""
+        with patch.object(bucket_array, "np", None):
+            with pytest.raises(ImportError, match=r"zae-limiter\[numpy\]"):
+                bucket_array.BucketArrays.from_states([])
@@ -0,0 +1,263 @@
+"""Tests for speculative write coalescing."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from zae_limiter import CoalescingConfig, Limit, RateLimiter, SyncRateLimiter
+from zae_limiter.coalescer import SpeculativeCoalescer
+from zae_limiter.models import BucketState
+from zae_limiter.repository_protocol import SpeculativeResult
+from zae_limiter.sync_coalescer import SyncSpeculativeCoalescer
+
+
+def _success(tokens: int, entity_id: str = "entity-1") -> SpeculativeResult:
+    state = BucketState.from_limit(entity_id, "gpt-4", Limit.per_minute("rpm", 100), 0)
+    state.tokens_milli = tokens * 1000
+    state.total_consumed_milli = (100 - tokens) * 1000
+    return SpeculativeResult(success=True, buckets=[state])
+
+
+def _mock_repo(*results: SpeculativeResult) -> MagicMock:
+    repo = MagicMock()
+    repo.speculative_consume = AsyncMock(side_effect=list(results))
+    repo.write_each = AsyncMock()
+    return repo
+
+
+class TestCoalescingConfig:
+    """Tests for CoalescingConfig validation."""
+
+    @pytest.mark.parametrize("kwargs", [{"window_seconds": -1}, {"max_batch": 1}])
+    def test_invalid(self, kwargs):
+        """Invalid values raise ValueError."""
+        with pytest.raises(ValueError):
+            CoalescingConfig(**kwargs)
+
+
+class TestSpeculativeCoalescer:
+    """Tests for merging concurrent speculative writes."""
+
+    async def test_single_caller_not_merged(self):
+        """A lone caller issues its own write unchanged."""
+        repo = _mock_repo(_success(99))
+        coalescer = SpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0))
+
+        result = await coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1})
+
+        assert result.success
+        repo.speculative_consume.assert_awaited_once_with(
+            entity_id="entity-1", resource="gpt-4", consume={"rpm": 1}
+        )
+        assert coalescer.stats.batches == 0
+
+    async def test_concurrent_callers_merged(self):
+        """Concurrent callers share one write with summed amounts."""
+        repo = _mock_repo(_success(94))
+        coalescer = SpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0.01))
+
+        results = await asyncio.gather(
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1}),
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 2}),
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 3}),
+        )
+
+        repo.speculative_consume.assert_awaited_once_with(
+            entity_id="entity-1", resource="gpt-4", consume={"rpm": 6}
+        )
+        assert all(r.success for r in results)
+        # Each caller sees the bucket right after its own consumption
+        assert [r.buckets[0].tokens_milli for r in results] == [99_000, 97_000, 94_000]
+        assert [r.buckets[0].total_consumed_milli for r in results] == [1_000, 3_000, 6_000]
+        assert coalescer.stats.as_dict() == {"batches": 1, "coalesced": 3, "fallbacks": 0}
+
+    async def test_different_buckets_not_merged(self):
+        """Callers for different buckets are never merged."""
+        repo = _mock_repo(_success(99), _success(99, "entity-2"))
+        coalescer = SpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0.01))
+
+        await asyncio.gather(
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1}),
+            coalescer.speculative_consume("entity-2", "gpt-4", {"rpm": 1}),
+        )
+
+        assert repo.speculative_consume.await_count == 2
+
+    async def test_merged_failure_falls_back(self):
+        """If the merged write fails, every caller retries individually."""
+        failed = SpeculativeResult(success=False, old_buckets=None)
+        repo = _mock_repo(failed, _success(99), _success(97))
+        coalescer = SpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0.01))
+
+        results = await asyncio.gather(
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1}),
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 2}),
+        )
+
+        assert repo.speculative_consume.await_count == 3
+        individual = [c.kwargs["consume"] for c in repo.speculative_consume.await_args_list[1:]]
+        assert sorted(individual, key=lambda c: c["rpm"]) == [{"rpm": 1}, {"rpm": 2}]
+        assert all(r.success for r in results)
+        assert coalescer.stats.fallbacks == 2
+
+    async def test_merged_exception_falls_back(self):
+        """An exception from the merged write falls back to individual writes."""
+        repo = _mock_repo()
+        repo.speculative_consume.side_effect = [RuntimeError("boom"), _success(99), _success(97)]
+        coalescer = SpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0.01))
+
+        results = await asyncio.gather(
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1}),
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 2}),
+        )
+
+        assert all(r.success for r in results)
+
+    async def test_partial_cascade_success_compensated(self):
+        """Child success with parent failure returns the child's merged tokens."""
+        merged = _success(97)
+        merged.cascade = True
+        merged.parent_id = "parent-1"
+        merged.shard_id = 1
+        merged.parent_result = SpeculativeResult(success=False, old_buckets=None)
+        repo = _mock_repo(merged, _success(99), _success(98))
+        repo.build_composite_adjust = MagicMock(return_value={"Update": {}})
+        coalescer = SpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0.01))
+
+        await asyncio.gather(
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1}),
+            coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 2}),
+        )
+
+        repo.build_composite_adjust.assert_called_once_with(
+            entity_id="entity-1", resource="gpt-4", deltas={"rpm": -3000}, shard_id=1
+        )
+        repo.write_each.assert_awaited_once()
+        assert coalescer.stats.fallbacks == 2
+
+    async def test_full_batch_starts_new_batch(self):
+        """Callers beyond max_batch join a new batch."""
+        repo = _mock_repo(_success(98), _success(97))
+        coalescer = SpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0.01, max_batch=2))
+
+        await asyncio.gather(
+            *[coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1}) for _ in range(3)]
+        )
+
+        consumes = [c.kwargs["consume"] for c in repo.speculative_consume.await_args_list]
+        assert sorted(c["rpm"] for c in consumes) == [1, 2]
+
+
+class TestSyncSpeculativeCoalescer:
+    """Tests for the thread-based sync coalescer."""
+
+    def test_concurrent_threads_merged(self):
+        """Threads acquiring the same bucket share one write."""
+        calls: list[dict[str, int]] = []
+        lock = threading.Lock()
+
+        def speculative_consume(entity_id, resource, consume):
+            with lock:
+                calls.append(consume)
+            return _success(100 - consume["rpm"])
+
+        repo = MagicMock()
+        repo.speculative_consume = MagicMock(side_effect=speculative_consume)
+        coalescer = SyncSpeculativeCoalescer(repo, CoalescingConfig(window_seconds=0.05))
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda _: coalescer.speculative_consume("entity-1", "gpt-4", {"rpm": 1}),
+                    range(4),
+                )
+            )
+
+        assert all(r.success for r in results)
+        assert sum(c["rpm"] for c in calls) == 4
+        assert len(calls) < 4
+
+
+class TestLimiterCoalescing:
+    """Tests for coalescing through RateLimiter.acquire()."""
+
+    async def test_disabled_by_default(self, limiter):
+        """Coalescing is opt-in."""
+        assert limiter._coalescer is None
+        assert limiter.get_coalescing_stats() is None
+
+    async def test_concurrent_acquires_share_one_write(self, limiter):
+        """Concurrent acquires produce per-caller leases from one UpdateItem."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        coalescing = RateLimiter(
+            repository=limiter._repository,
+            coalescing=CoalescingConfig(window_seconds=0.01),
+        )
+
+        async def acquire(amount: int) -> dict[str, int]:
+            async with coalescing.acquire("entity-1", "gpt-4", {"rpm": amount}) as lease:
+                return lease.consumed
+
+        consumed = await asyncio.gather(acquire(1), acquire(2), acquire(3))
+
+        assert consumed == [{"rpm": 1}, {"rpm": 2}, {"rpm": 3}]
+        assert coalescing.get_coalescing_stats().batches == 1
+        buckets = await limiter._repository.get_buckets("entity-1", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "rpm") == 93
+
+    async def test_rollback_of_coalesced_lease(self, limiter):
+        """A coalesced lease rolls back only its own consumption."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        coalescing = RateLimiter(
+            repository=limiter._repository,
+            coalescing=CoalescingConfig(window_seconds=0.01),
+        )
+
+        async def ok() -> None:
+            async with coalescing.acquire("entity-1", "gpt-4", {"rpm": 2}):
+                pass
+
+        async def fail() -> None:
+            async with coalescing.acquire("entity-1", "gpt-4", {"rpm": 5}):
+                raise RuntimeError("boom")
+
+        results = await asyncio.gather(ok(), fail(), return_exceptions=True)
+
+        assert isinstance(results[1], RuntimeError)
+        buckets = await limiter._repository.get_buckets("entity-1", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "rpm") == 97
+
+
+class TestSyncLimiterCoalescing:
+    """Tests for coalescing through SyncRateLimiter.acquire()."""
+
+    def test_threads_share_writes(self, sync_limiter):
+        """Concurrent threads consume the summed amount exactly once."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        coalescing = SyncRateLimiter(
+            repository=sync_limiter._repository,
+            coalescing=CoalescingConfig(window_seconds=0.05),
+        )
+
+        def acquire(_: int) -> None:
+            with coalescing.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                time.sleep(0)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(acquire, range(4)))
+
+        buckets = sync_limiter._repository.get_buckets("entity-1", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "rpm") == 95
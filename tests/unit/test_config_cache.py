@@ -27,7 +27,19 @@ class TestCacheStats:
         stats = CacheStats(hits=100, misses=10, size=5, ttl_seconds=60)
         result = stats.as_dict()
 
-        assert result == {"hits": 100, "misses": 10, "size": 5, "ttl": 60}
+        assert result == {
+            "hits": 100,
+            "misses": 10,
+            "size": 5,
+            "ttl": 60,
+            "stale_hits": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "evictions": 0,
+            "entity_cache_size": 0,
+            "entity_cache_evictions": 0,
+            "entity_cache_expirations": 0,
+        }
 
 
 class TestConfigCacheBasics:
@@ -418,6 +430,23 @@ class TestConfigCacheStats:
         await cache.get_entity_limits("user-1", "gpt-4", entity_fetch)
         assert cache.get_stats().size == 3
 
+    @pytest.mark.asyncio
+    async def test_max_entries_evicts_least_recently_used(self) -> None:
+        """Entity configs beyond max_entries are evicted in LRU order and counted."""
+        cache = ConfigCache(ttl_seconds=60, max_entries=2)
+        entity_fetch = AsyncMock(return_value=[Limit.per_minute("tpm", 1000)])
+
+        await cache.get_entity_limits("user-1", "gpt-4", entity_fetch)
+        await cache.get_entity_limits("user-2", "gpt-4", entity_fetch)
+        await cache.get_entity_limits("user-1", "gpt-4", entity_fetch)  # hit, now most recent
+        await cache.get_entity_limits("user-3", "gpt-4", entity_fetch)
+
+        assert ("default", "user-1", "gpt-4") in cache._entity_limits
+        assert ("default", "user-2", "gpt-4") not in cache._entity_limits
+        stats = cache.get_stats()
+        assert stats.size == 2
+        assert stats.evictions == 1
+
 
 class TestConfigCacheThreadSafety:
     """Tests for thread safety."""
@@ -813,3 +842,396 @@ class TestConfigCacheResolveLimits:
 
         assert limits is None
         assert source is None
+
+
+class TestConfigCacheSingleFlight:
+    """Tests for per-key single-flight config resolution."""
+
+    @staticmethod
+    def _system_items(keys):
+        from zae_limiter import schema
+
+        system_key = (schema.pk_system("default"), schema.sk_config())
+        return {system_key: ([Limit.per_minute("rpm", 100)], None)} if system_key in keys else {}
+
+    @pytest.mark.asyncio
+    async def test_duplicate_misses_share_one_fetch(self) -> None:
+        """Concurrent misses for the same key share one batch call."""
+        cache = ConfigCache(ttl_seconds=60)
+        calls = 0
+
+        async def batch_fn(keys):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return self._system_items(keys)
+
+        results = await asyncio.gather(
+            *[cache.resolve_limits("user-1", "gpt-4", batch_fn) for _ in range(5)]
+        )
+
+        assert calls == 1
+        assert all(r[2] == "system" for r in results)
+        assert cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_unrelated_misses_fetch_concurrently(self) -> None:
+        """A slow fetch for one key does not block a fetch for another."""
+        cache = ConfigCache(ttl_seconds=60)
+        both_started = asyncio.Event()
+        started = 0
+
+        async def batch_fn(keys):
+            nonlocal started
+            started += 1
+            if started == 2:
+                both_started.set()
+            # Under a global lock the second fetch never starts
+            await asyncio.wait_for(both_started.wait(), timeout=1.0)
+            return self._system_items(keys)
+
+        await asyncio.gather(
+            cache.resolve_limits("user-1", "gpt-4", batch_fn),
+            cache.resolve_limits("user-2", "gpt-4", batch_fn),
+        )
+
+        assert started == 2
+
+    @pytest.mark.asyncio
+    async def test_fetch_error_shared_then_retried(self) -> None:
+        """Waiters see the leader's error; the next call fetches again."""
+        cache = ConfigCache(ttl_seconds=60)
+        batch_fn = AsyncMock(side_effect=[RuntimeError("boom"), {}])
+
+        async def slow_fail(keys):
+            await asyncio.sleep(0.01)
+            return await batch_fn(keys)
+
+        results = await asyncio.gather(
+            cache.resolve_limits("user-1", "gpt-4", slow_fail),
+            cache.resolve_limits("user-1", "gpt-4", slow_fail),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert batch_fn.await_count == 1
+        assert await cache.resolve_limits("user-1", "gpt-4", slow_fail) == (None, None, None)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_followers_refetch(self) -> None:
+        """Followers of a cancelled leader fetch again instead of failing."""
+        cache = ConfigCache(ttl_seconds=60)
+        leader_started = asyncio.Event()
+        calls = 0
+
+        async def batch_fn(keys):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                leader_started.set()
+                await asyncio.sleep(10)
+            return self._system_items(keys)
+
+        leader = asyncio.create_task(cache.resolve_limits("user-1", "gpt-4", batch_fn))
+        await leader_started.wait()
+        follower = asyncio.create_task(cache.resolve_limits("user-1", "gpt-4", batch_fn))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        limits, _, source = await follower
+        assert source == "system"
+        assert calls == 2
+        assert cache._inflight == {}
+
+    def test_sync_threads_share_one_fetch(self) -> None:
+        """Threads missing on the same key share one batch call."""
+        from zae_limiter import SyncConfigCache
+
+        cache = SyncConfigCache(ttl_seconds=60)
+        calls = 0
+        lock = threading.Lock()
+        barrier = threading.Barrier(4)
+
+        def batch_fn(keys):
+            nonlocal calls
+            with lock:
+                calls += 1
+            time.sleep(0.05)
+            return self._system_items(keys)
+
+        def worker() -> None:
+            barrier.wait()
+            cache.resolve_limits("user-1", "gpt-4", batch_fn)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert calls == 1
+
+
+def _age_entries(cache, seconds: float) -> None:
+    """Move every cached entry's expiry `seconds` into the past."""
+    for store in (cache._resource_defaults, cache._entity_limits):
+        for key in list(store):
+            entry = store[key]
+            store[key] = entry._replace(expires_at=entry.expires_at - seconds)
+    if cache._system_defaults is not None:
+        entry = cache._system_defaults
+        cache._system_defaults = entry._replace(expires_at=entry.expires_at - seconds)
+
+
+class TestConfigCacheRefreshAhead:
+    """Tests for background refresh-ahead in resolve_limits()."""
+
+    @staticmethod
+    def _system_items(keys, capacity: int = 100):
+        from zae_limiter import schema
+
+        system_key = (schema.pk_system("default"), schema.sk_config())
+        if system_key not in keys:
+            return {}
+        return {system_key: ([Limit.per_minute("rpm", capacity)], None)}
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"refresh_ahead_seconds": -1},
+            {"max_staleness_seconds": -1},
+            {"refresh_ahead_seconds": 60},
+        ],
+    )
+    def test_invalid_settings(self, kwargs) -> None:
+        """Negative windows or a refresh window >= TTL are rejected."""
+        with pytest.raises(ValueError):
+            ConfigCache(ttl_seconds=60, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self) -> None:
+        """Without refresh-ahead, an expired entry is fetched inline."""
+        cache = ConfigCache(ttl_seconds=60)
+        batch_fn = AsyncMock(side_effect=lambda keys: self._system_items(keys))
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+
+        _age_entries(cache, 61)
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+
+        assert batch_fn.call_count == 2
+        assert cache.get_stats().refreshes == 0
+
+    @pytest.mark.asyncio
+    async def test_entry_near_expiry_refreshed_in_background(self) -> None:
+        """A hit inside the refresh window returns cached data and refreshes it."""
+        cache = ConfigCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        capacity = 100
+
+        async def batch_fn(keys):
+            return self._system_items(keys, capacity)
+
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 55)
+        capacity = 200
+
+        limits, _, _ = await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        assert limits is not None and limits[0].capacity == 100
+        await asyncio.gather(*cache._refresh_tasks)
+
+        limits, _, _ = await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        assert limits is not None and limits[0].capacity == 200
+        stats = cache.get_stats()
+        assert stats.refreshes == 1
+        assert stats.stale_hits == 0  # due for refresh, but not yet expired
+        assert cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_one_refresh_per_key(self) -> None:
+        """Hits while a refresh is running do not start another one."""
+        cache = ConfigCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        release = asyncio.Event()
+        calls = 0
+
+        async def batch_fn(keys):
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                await release.wait()
+            return self._system_items(keys)
+
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 55)
+        for _ in range(5):
+            await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*cache._refresh_tasks)
+
+        assert calls == 2
+        assert cache.get_stats().refreshes == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_within_max_staleness(self) -> None:
+        """An expired entry is still served inside the staleness window."""
+        cache = ConfigCache(ttl_seconds=60, max_staleness_seconds=30)
+        batch_fn = AsyncMock(side_effect=lambda keys: self._system_items(keys))
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 70)
+
+        limits, _, source = await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+
+        assert source == "system" and limits is not None
+        assert cache.get_stats().refreshes == 1
+        assert cache.get_stats().stale_hits == 4  # all four slots served past expiry
+        await asyncio.gather(*cache._refresh_tasks)
+        assert batch_fn.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_max_staleness_is_hard_cutoff(self) -> None:
+        """Past the staleness window the caller fetches inline."""
+        cache = ConfigCache(ttl_seconds=60, max_staleness_seconds=30)
+        batch_fn = AsyncMock(side_effect=lambda keys: self._system_items(keys))
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 100)
+
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+
+        assert batch_fn.call_count == 2
+        assert cache.get_stats().refreshes == 0
+
+    @pytest.mark.asyncio
+    async def test_refresh_failure_keeps_entries(self) -> None:
+        """A failed refresh is counted and the old entries stay usable."""
+        cache = ConfigCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        batch_fn = AsyncMock(side_effect=lambda keys: self._system_items(keys))
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 55)
+        batch_fn.side_effect = RuntimeError("boom")
+
+        await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        await asyncio.gather(*cache._refresh_tasks)
+
+        stats = cache.get_stats()
+        assert stats.refresh_failures == 1
+        assert cache._inflight == {}
+        assert cache._check_cache_slot("system")[0]
+
+    def test_sync_refresh_runs_in_thread(self) -> None:
+        """The sync cache refreshes on a background thread."""
+        from zae_limiter import SyncConfigCache
+
+        cache = SyncConfigCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        refreshed = threading.Event()
+        calls = 0
+
+        def batch_fn(keys):
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                assert threading.current_thread().name.startswith("zae-limiter-config-refresh")
+                refreshed.set()
+            return self._system_items(keys)
+
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 55)
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+
+        assert refreshed.wait(timeout=5)
+        deadline = time.monotonic() + 5
+        while cache._inflight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.get_stats().refreshes == 1
+        assert cache._inflight == {}
+
+    def test_sync_refresh_pool_is_bounded(self) -> None:
+        """Many keys due at once share a small pool, which close() shuts down."""
+        from zae_limiter import SyncConfigCache
+
+        cache = SyncConfigCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        release = threading.Event()
+        refresh_threads: set[str] = set()
+
+        def batch_fn(keys):
+            if cache._refresh_pool is not None:
+                refresh_threads.add(threading.current_thread().name)
+                release.wait(timeout=5)
+            return self._system_items(keys)
+
+        for i in range(20):
+            cache.resolve_limits(f"user-{i}", "gpt-4", batch_fn)
+        _age_entries(cache, 55)
+        for i in range(20):
+            cache.resolve_limits(f"user-{i}", "gpt-4", batch_fn)
+        pool = cache._refresh_pool
+        release.set()
+        cache.close()
+        pool.shutdown(wait=True)
+
+        assert cache.get_stats().refreshes == 20
+        assert 1 <= len(refresh_threads) <= 4
+        assert cache._refresh_pool is None
+
+
+class TestConfigCachePrefetch:
+    """Tests for prefetch_keys() and prime() (Repository.warm())."""
+
+    def test_prefetch_keys(self) -> None:
+        """Keys cover system, resource and entity configs."""
+        from zae_limiter import schema
+
+        cache = ConfigCache(ttl_seconds=60)
+
+        keys = cache.prefetch_keys(["user-1", "user-2"], ["gpt-4", "gpt-3.5"])
+
+        assert len(keys) == 1 + 2 + 2 * 3
+        assert (schema.pk_system("default"), schema.sk_config()) in keys
+        assert (schema.pk_resource("default", "gpt-4"), schema.sk_config()) in keys
+        assert (schema.pk_entity("default", "user-2"), schema.sk_config("_default_")) in keys
+        assert ConfigCache(ttl_seconds=0).prefetch_keys(["user-1"], ["gpt-4"]) == []
+
+    @pytest.mark.asyncio
+    async def test_prime_fills_cache(self) -> None:
+        """Primed slots are served without a fetch, including negative entries."""
+        from zae_limiter import schema
+
+        cache = ConfigCache(ttl_seconds=60)
+        resource_limits = [Limit.per_minute("rpm", 500)]
+        items = {
+            (schema.pk_resource("default", "gpt-4"), schema.sk_config()): (resource_limits, None),
+        }
+
+        filled = await cache.prime(["user-1"], ["gpt-4"], items)
+
+        assert filled == 4
+        batch_fn = AsyncMock(return_value={})
+        limits, _, source = await cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        assert limits == resource_limits
+        assert source == "resource"
+        batch_fn.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_prime_disabled(self) -> None:
+        """prime() does nothing when caching is disabled."""
+        cache = ConfigCache(ttl_seconds=0)
+        assert await cache.prime(["user-1"], ["gpt-4"], {}) == 0
+        assert cache.get_stats().size == 0
+
+    @pytest.mark.asyncio
+    async def test_missing_keys_skips_cached_slots(self) -> None:
+        """missing_keys() lists only the slots resolve_limits() would fetch."""
+        from zae_limiter import schema
+
+        cache = ConfigCache(ttl_seconds=60)
+        system_key = (schema.pk_system("default"), schema.sk_config())
+        await cache.prime(["user-1"], ["gpt-4"], {system_key: ([Limit.per_minute("rpm", 1)], None)})
+
+        missing = await cache.missing_keys([("user-1", "gpt-4"), ("user-2", "gpt-4")])
+
+        assert missing == [
+            (schema.pk_entity("default", "user-2"), schema.sk_config("gpt-4")),
+            (schema.pk_entity("default", "user-2"), schema.sk_config("_default_")),
+        ]
+        assert cache.get_stats().misses == 0
+        assert await ConfigCache(ttl_seconds=0).missing_keys([("user-1", "gpt-4")]) == []
@@ -0,0 +1,109 @@
+"""Tests for cached expression templates."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from zae_limiter.expression_plans import TTL_REMOVE, TTL_SET, TTL_UNCHANGED, ExpressionPlans
+from zae_limiter.repository import Repository
+
+
+class TestExpressionPlans:
+    """Tests for ExpressionPlans caching and plan shapes."""
+
+    def test_same_shape_reuses_plan(self):
+        """Equal keys return the same plan object; other flags build a new one."""
+        plans = ExpressionPlans()
+
+        first = plans.normal(("rpm", "tpm"), (True, False), TTL_UNCHANGED)
+        assert plans.normal(("rpm", "tpm"), (True, False), TTL_UNCHANGED) is first
+        assert plans.normal(("rpm", "tpm"), (False, False), TTL_UNCHANGED) is not first
+        assert plans.retry(("rpm", "tpm")) is plans.retry(("rpm", "tpm"))
+        assert len(plans) == 3
+
+    def test_floors_only_for_flagged_limits(self):
+        """Only limits flagged with a floor get a tk condition."""
+        plan = ExpressionPlans().normal(("rpm", "tpm"), (False, True), TTL_UNCHANGED)
+
+        assert plan.condition_expression == "#rf = :expected_rf AND #b_tpm_tk >= :b_tpm_tk_floor"
+        assert plan.limits == (
+            ("rpm", (":b_rpm_tk_delta", ":b_rpm_tc_delta", "")),
+            ("tpm", (":b_tpm_tk_delta", ":b_tpm_tc_delta", ":b_tpm_tk_floor")),
+        )
+
+    def test_ttl_modes(self):
+        """TTL is set, removed, or left out of the expression entirely."""
+        plans = ExpressionPlans()
+        names = ("rpm",)
+
+        unchanged = plans.normal(names, (False,), TTL_UNCHANGED)
+        assert "#ttl" not in unchanged.names
+        assert "#ttl" not in unchanged.update_expression
+        assert "#ttl = :ttl_val" in plans.normal(names, (False,), TTL_SET).update_expression
+        assert plans.normal(names, (False,), TTL_REMOVE).update_expression.endswith(" REMOVE #ttl")
+
+    def test_speculative_includes_wcu(self):
+        """Speculative plans carry the fixed wcu values and the TTL guard."""
+        plan = ExpressionPlans().speculative(("rpm",), with_ttl=True)
+
+        assert plan.update_expression.startswith("SET #ttl = :ttl ADD ")
+        assert "#wcu_tk >= :thresh_wcu" in plan.condition_expression
+        assert plan.values[":neg_wcu"] == {"N": "-1000"}
+        assert plan.limits == (("rpm", (":neg_rpm", ":pos_rpm", ":thresh_rpm")),)
+
+    def test_adjust_condition(self):
+        """Adjust writes only require the item for non-zero shards."""
+        plans = ExpressionPlans()
+
+        assert plans.adjust(("rpm",), require_exists=False).condition_expression is None
+        assert (
+            plans.adjust(("rpm",), require_exists=True).condition_expression
+            == "attribute_exists(PK)"
+        )
+
+    def test_bounded(self):
+        """Least recently used plans are evicted beyond max_entries."""
+        plans = ExpressionPlans(max_entries=2)
+
+        for name in ("a", "b", "c"):
+            plans.retry((name,))
+
+        assert len(plans) == 2
+
+
+class TestRepositoryPlans:
+    """Tests for plan reuse by the repository item builders."""
+
+    def test_builders_do_not_share_mutable_dicts(self):
+        """Each built item gets its own names dict; the cached plan is untouched."""
+        repo = Repository(name="test", region="us-east-1", _skip_deprecation_warning=True)
+        kwargs = {
+            "entity_id": "entity-1",
+            "resource": "gpt-4",
+            "consumed": {"rpm": 1000},
+            "refill_amounts": {"rpm": 0},
+            "now_ms": 1_000,
+            "expected_rf": 500,
+        }
+
+        first = repo.build_composite_normal(**kwargs)["Update"]
+        first["ExpressionAttributeNames"]["#extra"] = "x"
+        second = repo.build_composite_normal(**kwargs)["Update"]
+
+        assert "#extra" not in second["ExpressionAttributeNames"]
+        assert second["UpdateExpression"] is first["UpdateExpression"]
+
+    async def test_speculative_write_copies_names(self):
+        """The speculative UpdateItem gets a copy of the cached plan's names."""
+        repo = Repository(name="test", region="us-east-1", _skip_deprecation_warning=True)
+        client = AsyncMock()
+        client.update_item.side_effect = RuntimeError("stop")
+        repo._get_client = AsyncMock(return_value=client)
+
+        with pytest.raises(RuntimeError):
+            await repo._speculative_consume_single("entity-1", "gpt-4", {"rpm": 1})
+
+        plan = repo._expression_plans.speculative(("rpm",), False)
+        names = client.update_item.call_args.kwargs["ExpressionAttributeNames"]
+        assert names == plan.names
+        assert names is not plan.names
@@ -0,0 +1,183 @@
+"""Tests for in-process latency histograms."""
+
+import threading
+
+import pytest
+
+from zae_limiter.histogram import (
+    _BUCKETS,
+    HistogramSnapshot,
+    LatencyHistogram,
+    LatencyHistograms,
+    _bucket_index,
+    _bucket_upper,
+)
+from zae_limiter.instrumentation import AcquireOutcome, AcquirePath, AcquirePhase, AcquireTrace
+
+
+def _histogram(*seconds: float) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    for value in seconds:
+        histogram.record(value)
+    return histogram
+
+
+class TestBuckets:
+    """Tests for the log-linear bucket layout."""
+
+    def test_buckets_are_contiguous(self):
+        """Every value maps to a bucket whose upper bound is at least the value."""
+        previous = -1
+        for micros in [*range(0, 5000), 1 << 20, (1 << 27) - 1]:
+            index = _bucket_index(micros)
+            assert index >= previous
+            assert _bucket_upper(index) >= micros
+            previous = index
+        assert _bucket_index((1 << 27) - 1) == _BUCKETS - 1
+
+    def test_relative_error(self):
+        """Bucket width stays within about 3% of the value."""
+        for micros in (100, 1_000, 12_345, 1_000_000, 60_000_000):
+            assert (_bucket_upper(_bucket_index(micros)) - micros) / micros <= 1 / 32
+
+
+class TestLatencyHistogram:
+    """Tests for LatencyHistogram."""
+
+    def test_percentiles(self):
+        """Percentiles are within bucket precision of the exact values."""
+        histogram = _histogram(*(ms / 1000 for ms in range(1, 1001)))
+
+        assert histogram.count == 1000
+        assert histogram.value_at(50) == pytest.approx(0.500, rel=0.04)
+        assert histogram.value_at(99) == pytest.approx(0.990, rel=0.04)
+        assert histogram.value_at(100) == histogram.max_s == 1.0
+        assert histogram.mean_s == pytest.approx(0.5005)
+
+    def test_empty(self):
+        """An empty histogram reports zeros."""
+        summary = LatencyHistogram().summary()
+        assert summary == {
+            "count": 0,
+            "mean_s": 0.0,
+            "max_s": 0.0,
+            "p50_s": 0.0,
+            "p90_s": 0.0,
+            "p99_s": 0.0,
+            "p999_s": 0.0,
+        }
+
+    def test_clamps_out_of_range(self):
+        """Negative and very large values are clamped into the bucket range."""
+        histogram = _histogram(-1.0, 1000.0)
+        assert histogram.count == 2
+        assert histogram.counts[0] == 1
+        assert histogram.counts[-1] == 1
+
+    def test_merge(self):
+        """Merging adds counts and keeps the larger max."""
+        merged = _histogram(0.001, 0.002)
+        merged.merge(_histogram(0.5))
+        assert merged.count == 3
+        assert merged.max_s == 0.5
+        assert merged.total_s == pytest.approx(0.503)
+
+    def test_round_trip(self):
+        """to_dict()/from_dict() preserve all values."""
+        histogram = _histogram(0.001, 0.01, 0.1)
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+        assert restored.counts == histogram.counts
+        assert restored.summary() == histogram.summary()
+
+
+class TestHistogramSnapshot:
+    """Tests for HistogramSnapshot export."""
+
+    def test_as_dict(self):
+        """as_dict() reports percentiles per histogram."""
+        snapshot = HistogramSnapshot(
+            operations={"acquire": _histogram(0.002)},
+            dynamodb_calls={"UpdateItem": _histogram(0.004)},
+        )
+        result = snapshot.as_dict()
+        assert result["operations"]["acquire"]["count"] == 1
+        assert result["dynamodb_calls"]["UpdateItem"]["p50_s"] == pytest.approx(0.004, rel=0.04)
+
+    def test_to_prometheus(self):
+        """to_prometheus() renders one summary family per kind."""
+        snapshot = HistogramSnapshot(operations={"acquire": _histogram(0.002, 0.004)})
+        text = snapshot.to_prometheus()
+        assert "# TYPE zae_limiter_operation_latency_seconds summary" in text
+        assert 'zae_limiter_operation_latency_seconds{operation="acquire",quantile="0.999"}' in text
+        assert 'zae_limiter_operation_latency_seconds_count{operation="acquire"} 2' in text
+        assert "dynamodb" not in text
+        assert HistogramSnapshot().to_prometheus() == ""
+
+    def test_merge_and_round_trip(self):
+        """Snapshots from different processes merge after serialization."""
+        first = HistogramSnapshot(operations={"acquire": _histogram(0.001)})
+        second = HistogramSnapshot.from_dict(
+            HistogramSnapshot(
+                operations={"acquire": _histogram(0.002)},
+                dynamodb_calls={"GetItem": _histogram(0.003)},
+            ).to_dict()
+        )
+        first.merge(second)
+        assert first.operations["acquire"].count == 2
+        assert first.dynamodb_calls["GetItem"].count == 1
+
+
+def _trace(path: AcquirePath, *phases: AcquirePhase) -> AcquireTrace:
+    trace = AcquireTrace("entity-1", "gpt-4")
+    trace.enter(AcquirePhase.FAST_PATH)
+    trace.path = path
+    trace.enter(AcquirePhase.COMMIT_INITIAL)
+    trace.acquired()
+    for phase in phases:
+        trace.enter(phase)
+    trace.close(AcquireOutcome.GRANTED)
+    return trace
+
+
+class TestLatencyHistograms:
+    """Tests for the LatencyHistograms listener."""
+
+    def test_records_operations(self):
+        """Acquire, slow-path commit, adjust and rollback are recorded."""
+        histograms = LatencyHistograms()
+        histograms.on_acquire(_trace(AcquirePath.SLOW, AcquirePhase.COMMIT_ADJUSTMENTS))
+        histograms.on_acquire(_trace(AcquirePath.SPECULATIVE, AcquirePhase.ROLLBACK))
+        histograms.on_dynamodb_call("UpdateItem", 0.003, None)
+
+        snapshot = histograms.snapshot()
+        counts = {name: h.count for name, h in snapshot.operations.items()}
+        # The speculative path's no-op initial commit is not recorded
+        assert counts == {"acquire": 2, "commit": 1, "adjust": 1, "rollback": 1}
+        assert snapshot.dynamodb_calls["UpdateItem"].count == 1
+
+    def test_threads_merge(self):
+        """Values recorded by several threads are merged in snapshots."""
+        histograms = LatencyHistograms()
+
+        def record() -> None:
+            for _ in range(100):
+                histograms.on_dynamodb_call("GetItem", 0.001, None)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert histograms.snapshot().dynamodb_calls["GetItem"].count == 400
+
+    def test_snapshot_is_a_copy(self):
+        """Snapshots are not changed by later records or resets."""
+        histograms = LatencyHistograms()
+        histograms.on_dynamodb_call("GetItem", 0.001, None)
+        snapshot = histograms.snapshot()
+        histograms.on_dynamodb_call("GetItem", 0.001, None)
+        histograms.reset()
+
+        assert snapshot.dynamodb_calls["GetItem"].count == 1
+        assert histograms.snapshot().dynamodb_calls["GetItem"].count == 0
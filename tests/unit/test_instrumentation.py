@@ -0,0 +1,271 @@
+"""Tests for hot-path instrumentation."""
+
+import logging
+from types import SimpleNamespace
+from typing import Any
+
+from botocore.hooks import HierarchicalEmitter
+
+from zae_limiter.instrumentation import (
+    AcquireOutcome,
+    AcquirePath,
+    AcquirePhase,
+    AcquireTrace,
+    InMemoryAggregator,
+    InstrumentationListener,
+    SpanEmitter,
+    current_trace,
+    emit_acquire,
+    register_call_hooks,
+)
+
+
+def _trace(path: AcquirePath = AcquirePath.SPECULATIVE) -> AcquireTrace:
+    """A closed trace for a granted acquire with one nested phase."""
+    trace = AcquireTrace("entity-1", "gpt-4")
+    trace.enter(AcquirePhase.FAST_PATH)
+    trace.record(AcquirePhase.SPECULATIVE_WRITE, trace._phase_start)
+    trace.path = path
+    trace.acquired()
+    trace.enter(AcquirePhase.COMMIT_ADJUSTMENTS)
+    trace.close(AcquireOutcome.GRANTED)
+    return trace
+
+
+class TestAcquireTrace:
+    """Tests for AcquireTrace."""
+
+    def test_current_until_acquired(self):
+        """A trace is current from creation until the lease is yielded."""
+        trace = AcquireTrace("entity-1", "gpt-4")
+        assert current_trace() is trace
+        trace.acquired()
+        assert current_trace() is None
+        trace.close(AcquireOutcome.GRANTED)
+
+    def test_phases_in_order(self):
+        """Top-level phases are recorded as they end, nested phases as recorded."""
+        trace = _trace()
+
+        assert [phase for phase, _, _ in trace.phases] == [
+            AcquirePhase.ON_UNAVAILABLE,
+            AcquirePhase.SPECULATIVE_WRITE,
+            AcquirePhase.FAST_PATH,
+            AcquirePhase.HOLD,
+            AcquirePhase.COMMIT_ADJUSTMENTS,
+        ]
+        assert trace.outcome == AcquireOutcome.GRANTED
+        assert 0 < trace.acquire_s <= trace.duration_s
+        top_level = [d for p, _, d in trace.phases if p != AcquirePhase.SPECULATIVE_WRITE]
+        assert abs(sum(top_level) - trace.duration_s) < 1e-9
+
+    def test_rejected_before_yield(self):
+        """Closing a trace that never yielded detaches it; acquire_s is the whole duration."""
+        trace = AcquireTrace("entity-1", "gpt-4")
+        trace.enter(AcquirePhase.FAST_PATH)
+        trace.close(AcquireOutcome.REJECTED)
+
+        assert current_trace() is None
+        assert trace.acquire_s == trace.duration_s
+        assert set(trace.phase_totals()) == {"on_unavailable", "fast_path"}
+
+    def test_phase_totals_sum_repeats(self):
+        """A phase that runs more than once is summed."""
+        trace = AcquireTrace("entity-1", "gpt-4")
+        trace.phases = [
+            (AcquirePhase.SHARD_RETRY, 0.0, 0.25),
+            (AcquirePhase.SHARD_RETRY, 0.25, 0.5),
+        ]
+        trace.close(AcquireOutcome.GRANTED)
+        assert trace.phase_totals()["shard_retry"] == 0.75
+
+
+class TestInMemoryAggregator:
+    """Tests for InMemoryAggregator."""
+
+    def test_aggregates_traces(self):
+        """Paths, outcomes, retries and phase timings are accumulated."""
+        stats = InMemoryAggregator()
+        slow = _trace(AcquirePath.SLOW)
+        slow.commit_retries = 2
+        stats.on_acquire(_trace())
+        stats.on_acquire(slow)
+
+        result = stats.get_stats()
+        assert result.acquires == 2
+        assert result.paths == {"speculative": 1, "slow": 1}
+        assert result.outcomes == {"granted": 2}
+        assert result.commit_retries == 2
+        assert result.phases["fast_path"].count == 2
+        assert result.acquire.max_s >= result.acquire.mean_s > 0
+
+    def test_dynamodb_calls(self):
+        """Calls are timed per operation, with errors counted."""
+        stats = InMemoryAggregator()
+        stats.on_dynamodb_call("UpdateItem", 0.002, None)
+        stats.on_dynamodb_call("UpdateItem", 0.004, "ConditionalCheckFailedException")
+
+        call = stats.get_stats().dynamodb_calls["UpdateItem"]
+        assert (call.count, call.errors) == (2, 1)
+        assert call.as_dict()["mean_s"] == 0.003
+        assert call.max_s == 0.004
+
+    def test_get_stats_is_a_copy(self):
+        """Returned stats do not change as more events arrive."""
+        stats = InMemoryAggregator()
+        stats.on_acquire(_trace())
+        snapshot = stats.get_stats()
+        stats.on_acquire(_trace())
+
+        assert snapshot.acquires == 1
+        assert snapshot.phases["fast_path"].count == 1
+        assert snapshot.as_dict()["paths"] == {"speculative": 1}
+
+    def test_reset(self):
+        """reset() clears all statistics."""
+        stats = InMemoryAggregator()
+        stats.on_acquire(_trace())
+        stats.reset()
+        assert stats.get_stats().as_dict()["acquires"] == 0
+
+
+class _Span:
+    def __init__(self, name: str, start_time: int, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.start_time = start_time
+        self.attributes = attributes
+        self.events: list[tuple[str, dict[str, Any], int]] = []
+        self.end_time: int | None = None
+
+    def add_event(self, name: str, attributes: dict[str, Any], timestamp: int) -> None:
+        self.events.append((name, attributes, timestamp))
+
+    def end(self, end_time: int) -> None:
+        self.end_time = end_time
+
+
+class _Tracer:
+    def __init__(self) -> None:
+        self.spans: list[_Span] = []
+
+    def start_span(self, name: str, start_time: int, attributes: dict[str, Any]) -> _Span:
+        span = _Span(name, start_time, attributes)
+        self.spans.append(span)
+        return span
+
+
+class TestSpanEmitter:
+    """Tests for SpanEmitter."""
+
+    def test_acquire_span(self):
+        """One span per acquire, with one event per phase."""
+        tracer = _Tracer()
+        trace = _trace()
+        SpanEmitter(tracer).on_acquire(trace)
+
+        (span,) = tracer.spans
+        assert span.name == "zae_limiter.acquire"
+        assert span.start_time == trace.started_ns
+        assert span.end_time is not None and span.end_time >= span.start_time
+        assert span.attributes["zae_limiter.path"] == "speculative"
+        assert span.attributes["zae_limiter.outcome"] == "granted"
+        assert [name for name, _, _ in span.events] == [p.value for p, _, _ in trace.phases]
+
+    def test_dynamodb_call_span(self):
+        """Failed calls carry their error code."""
+        tracer = _Tracer()
+        SpanEmitter(tracer).on_dynamodb_call("TransactWriteItems", 0.01, "TransactionCanceled")
+
+        (span,) = tracer.spans
+        assert span.name == "DynamoDB.TransactWriteItems"
+        assert span.attributes["error.type"] == "TransactionCanceled"
+        assert span.end_time - span.start_time == 10_000_000
+
+
+class _Failing(InstrumentationListener):
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        raise RuntimeError("listener bug")
+
+
+class TestEmit:
+    """Tests for listener dispatch."""
+
+    def test_listener_errors_are_logged(self, caplog):
+        """A failing listener does not stop the others."""
+        stats = InMemoryAggregator()
+        with caplog.at_level(logging.ERROR, logger="zae_limiter.instrumentation"):
+            emit_acquire([_Failing(), stats], _trace())
+
+        assert stats.get_stats().acquires == 1
+        assert "failed in on_acquire" in caplog.text
+
+    def test_protocol_defaults_are_noops(self):
+        """Subclasses inherit no-op handlers for events they do not implement."""
+        assert _Failing().on_dynamodb_call("GetItem", 0.001, None) is None
+
+
+class TestCallHooks:
+    """Tests for register_call_hooks."""
+
+    def _client(self) -> Any:
+        return SimpleNamespace(meta=SimpleNamespace(events=HierarchicalEmitter()))
+
+    def _call(self, client: Any, operation: str, status: int, parsed: dict[str, Any]) -> None:
+        context: dict[str, Any] = {}
+        events = client.meta.events
+        events.emit(
+            f"before-call.dynamodb.{operation}",
+            model=SimpleNamespace(name=operation),
+            context=context,
+        )
+        events.emit(
+            f"after-call.dynamodb.{operation}",
+            http_response=SimpleNamespace(status_code=status),
+            parsed=parsed,
+            context=context,
+        )
+
+    def test_times_calls(self):
+        """Successful and failed responses are reported."""
+        stats = InMemoryAggregator()
+        client = self._client()
+        register_call_hooks(client, [stats])
+
+        self._call(client, "GetItem", 200, {})
+        self._call(
+            client, "UpdateItem", 400, {"Error": {"Code": "ConditionalCheckFailedException"}}
+        )
+
+        calls = stats.get_stats().dynamodb_calls
+        assert (calls["GetItem"].count, calls["GetItem"].errors) == (1, 0)
+        assert (calls["UpdateItem"].count, calls["UpdateItem"].errors) == (1, 1)
+
+    def test_connection_errors(self):
+        """Calls that raise before a response are reported with the exception name."""
+        errors: list[str | None] = []
+
+        class Recorder(InstrumentationListener):
+            def on_dynamodb_call(self, operation, duration_s, error):
+                errors.append(error)
+
+        client = self._client()
+        register_call_hooks(client, [Recorder()])
+        context: dict[str, Any] = {}
+        client.meta.events.emit(
+            "before-call.dynamodb.GetItem", model=SimpleNamespace(name="GetItem"), context=context
+        )
+        client.meta.events.emit(
+            "after-call-error.dynamodb.GetItem", exception=TimeoutError(), context=context
+        )
+
+        assert errors == ["TimeoutError"]
+
+    def test_register_twice(self):
+        """Registering twice on one client reports each call once."""
+        stats = InMemoryAggregator()
+        client = self._client()
+        register_call_hooks(client, [stats])
+        register_call_hooks(client, [stats])
+
+        self._call(client, "GetItem", 200, {})
+        assert stats.get_stats().dynamodb_calls["GetItem"].count == 1
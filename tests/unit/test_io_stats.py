@@ -0,0 +1,155 @@
+"""Tests for consumed-capacity accounting."""
+
+from types import SimpleNamespace
+from typing import Any
+
+from botocore.hooks import HierarchicalEmitter
+
+from zae_limiter.io_stats import IOStatsCollector, register_capacity_hooks
+
+
+class TestIOStatsCollector:
+    """Tests for IOStatsCollector."""
+
+    def test_provisioned_units_by_index(self):
+        """Read/write units are totalled per operation, table and index."""
+        collector = IOStatsCollector()
+        collector.record(
+            "UpdateItem",
+            {
+                "ConsumedCapacity": {
+                    "TableName": "t",
+                    "CapacityUnits": 3.0,
+                    "WriteCapacityUnits": 3.0,
+                    "Table": {"WriteCapacityUnits": 1.0},
+                    "GlobalSecondaryIndexes": {"GSI2": {"WriteCapacityUnits": 2.0}},
+                }
+            },
+            failed=False,
+        )
+
+        stats = collector.get_stats()
+        assert stats.operations["UpdateItem"].calls == 1
+        assert stats.operations["UpdateItem"].write_units == 3.0
+        assert stats.indexes["table"].write_units == 1.0
+        assert stats.indexes["GSI2"].write_units == 2.0
+        assert stats.write_units == 3.0
+        assert stats.read_units == 0.0
+
+    def test_on_demand_units_follow_operation(self):
+        """CapacityUnits without a read/write split count by operation kind."""
+        collector = IOStatsCollector()
+        collector.record(
+            "BatchGetItem",
+            {"ConsumedCapacity": [{"TableName": "t", "CapacityUnits": 1.5}]},
+            failed=False,
+        )
+        collector.record(
+            "TransactWriteItems",
+            {"ConsumedCapacity": [{"TableName": "t", "CapacityUnits": 4.0}]},
+            failed=False,
+        )
+
+        stats = collector.get_stats()
+        assert stats.operations["BatchGetItem"].read_units == 1.5
+        assert stats.operations["TransactWriteItems"].write_units == 4.0
+        assert (stats.read_units, stats.write_units) == (1.5, 4.0)
+
+    def test_failed_calls(self):
+        """Failed calls are counted as errors without capacity."""
+        collector = IOStatsCollector()
+        collector.record(
+            "UpdateItem", {"Error": {"Code": "ConditionalCheckFailedException"}}, failed=True
+        )
+
+        op = collector.get_stats().operations["UpdateItem"]
+        assert (op.calls, op.errors, op.capacity_units) == (1, 1, 0.0)
+
+    def test_get_stats_is_a_copy(self):
+        """Snapshots are not changed by later calls."""
+        collector = IOStatsCollector()
+        collector.record("GetItem", {"ConsumedCapacity": {"CapacityUnits": 0.5}}, failed=False)
+        snapshot = collector.get_stats()
+        collector.record("GetItem", {"ConsumedCapacity": {"CapacityUnits": 0.5}}, failed=False)
+
+        assert snapshot.operations["GetItem"].calls == 1
+        assert collector.get_stats().operations["GetItem"].calls == 2
+
+    def test_reset(self):
+        """reset() clears all totals."""
+        collector = IOStatsCollector()
+        collector.record("GetItem", {"ConsumedCapacity": {"CapacityUnits": 0.5}}, failed=False)
+        collector.reset()
+
+        assert collector.get_stats().as_dict() == {
+            "read_units": 0,
+            "write_units": 0,
+            "operations": {},
+            "indexes": {},
+        }
+
+
+class TestCapacityHooks:
+    """Tests for register_capacity_hooks."""
+
+    def _client(self) -> Any:
+        return SimpleNamespace(meta=SimpleNamespace(events=HierarchicalEmitter()))
+
+    def _params(self, client: Any, operation: str, params: dict[str, Any]) -> dict[str, Any]:
+        client.meta.events.emit(
+            f"provide-client-params.dynamodb.{operation}",
+            params=params,
+            model=SimpleNamespace(name=operation),
+            context={},
+        )
+        return params
+
+    def _respond(self, client: Any, operation: str, status: int, parsed: dict[str, Any]) -> None:
+        client.meta.events.emit(
+            f"after-call.dynamodb.{operation}",
+            http_response=SimpleNamespace(status_code=status),
+            parsed=parsed,
+            model=SimpleNamespace(name=operation),
+            context={},
+        )
+
+    def test_requests_capacity(self):
+        """Supported operations are sent with ReturnConsumedCapacity=INDEXES."""
+        client = self._client()
+        register_capacity_hooks(client, IOStatsCollector())
+
+        assert self._params(client, "UpdateItem", {})["ReturnConsumedCapacity"] == "INDEXES"
+        assert "ReturnConsumedCapacity" not in self._params(client, "DescribeTable", {})
+
+    def test_explicit_setting_kept(self):
+        """A caller's own ReturnConsumedCapacity is not overridden."""
+        client = self._client()
+        register_capacity_hooks(client, IOStatsCollector())
+
+        params = self._params(client, "Query", {"ReturnConsumedCapacity": "TOTAL"})
+        assert params["ReturnConsumedCapacity"] == "TOTAL"
+
+    def test_records_responses(self):
+        """Responses of supported operations are recorded, others ignored."""
+        collector = IOStatsCollector()
+        client = self._client()
+        register_capacity_hooks(client, collector)
+
+        self._respond(client, "GetItem", 200, {"ConsumedCapacity": {"CapacityUnits": 0.5}})
+        self._respond(client, "UpdateItem", 400, {"Error": {"Code": "ValidationException"}})
+        self._respond(client, "DescribeTable", 200, {})
+
+        stats = collector.get_stats()
+        assert set(stats.operations) == {"GetItem", "UpdateItem"}
+        assert stats.operations["GetItem"].read_units == 0.5
+        assert stats.operations["UpdateItem"].errors == 1
+
+    def test_register_twice(self):
+        """Registering twice on one client records each call once."""
+        collector = IOStatsCollector()
+        client = self._client()
+        register_capacity_hooks(client, collector)
+        register_capacity_hooks(client, collector)
+
+        self._respond(client, "GetItem", 200, {"ConsumedCapacity": {"CapacityUnits": 0.5}})
+        assert collector.get_stats().operations["GetItem"].calls == 1
@@ -2,6 +2,7 @@
 
 import asyncio
 import time
+from dataclasses import replace
 from datetime import UTC, datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -24,8 +25,19 @@ from zae_limiter.exceptions import (
     LeaseExpiredError,
 )
 from zae_limiter.infra.discovery import InfrastructureDiscovery
+from zae_limiter.instrumentation import (
+    AcquireOutcome,
+    AcquirePath,
+    AcquireTrace,
+    InMemoryAggregator,
+    InstrumentationListener,
+    current_trace,
+)
+from zae_limiter.local_rejection import BucketMirror, LocalRejectionConfig
 from zae_limiter.models import BucketState
 from zae_limiter.repository_protocol import SpeculativeResult
+from zae_limiter.reservation import ReservationConfig, ReservationPool
+from zae_limiter.speculative_policy import SpeculativePolicy, SpeculativePolicyConfig
 
 
 class TestRateLimiterEntities:
@@ -594,6 +606,7 @@ class TestLeaseRetryPath:
             "CancellationReasons": [{"Code": "ConditionalCheckFailed"}],
         }
         mock_repo.transact_write.side_effect = condition_exc
+        mock_repo.condition_failure_buckets = MagicMock(return_value={0: None})
         mock_repo.build_composite_normal.return_value = {"Update": {}}
         mock_repo.build_composite_retry.return_value = {"Update": {}}
         mock_repo._bucket_ttl_refill_multiplier = 7
@@ -637,6 +650,7 @@ class TestWriteOnEnter:
         repo.build_composite_create.return_value = {"Put": {}}
         repo.build_composite_retry.return_value = {"Update": {}}
         repo.build_composite_adjust.return_value = {"Update": {}}
+        repo.condition_failure_buckets = MagicMock(return_value={})
         repo._bucket_ttl_refill_multiplier = 7
         return repo
 
@@ -1419,6 +1433,87 @@ class TestRateLimiterCascade:
         )
         assert available["rpm"] == 99
 
+    async def test_cascade_warm_metadata_reads_parent_in_one_batch(self, limiter):
+        """Test that a cached cascade parent is read in the child's BatchGetItem."""
+        await limiter.create_entity(entity_id="proj-1")
+        await limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+
+        # First acquire populates the entity cache
+        async with limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+            pass
+        assert limiter._repository.get_cached_parent("key-1") == "proj-1"
+
+        # Force the slow path (speculative writes would skip the read)
+        limiter._speculative_writes = False
+        repo = limiter._repository
+        with (
+            patch.object(
+                repo, "batch_get_entity_and_buckets", wraps=repo.batch_get_entity_and_buckets
+            ) as mock_batch,
+            patch.object(repo, "batch_get_buckets", wraps=repo.batch_get_buckets) as mock_parent,
+        ):
+            async with limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+                pass
+
+        mock_batch.assert_called_once_with("key-1", [("key-1", "gpt-4"), ("proj-1", "gpt-4")])
+        mock_parent.assert_not_called()
+        parent_available = await limiter.available("proj-1", "gpt-4", limits=limits)
+        assert parent_available["rph"] == 98
+
+    async def test_cascade_without_get_cached_parent(self, limiter, monkeypatch):
+        """Test that backends without get_cached_parent() still cascade."""
+        await limiter.create_entity(entity_id="proj-1")
+        await limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+        limiter._speculative_writes = False
+        monkeypatch.delattr(type(limiter._repository), "get_cached_parent")
+
+        for _ in range(2):
+            async with limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+                pass
+
+        assert (await limiter.available("proj-1", "gpt-4", limits=limits))["rph"] == 98
+
+    async def test_cascade_stale_cached_parent_uses_fetched_parent(self, limiter):
+        """Test that a stale cached parent is ignored in favor of the fetched entity."""
+        await limiter.create_entity(entity_id="proj-1")
+        await limiter.create_entity(entity_id="proj-old")
+        await limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+
+        repo = limiter._repository
+        repo._entity_cache[(repo._namespace_id, "key-1")] = (True, "proj-old", {})
+
+        async with limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+            pass
+
+        assert (await limiter.available("proj-1", "gpt-4", limits=limits))["rph"] == 99
+        assert (await limiter.available("proj-old", "gpt-4", limits=limits))["rph"] == 100
+        assert repo.get_cached_parent("key-1") == "proj-1"
+
+    async def test_cascade_stale_cached_parent_without_limits(self, limiter):
+        """Test that a stale cached parent with no limits does not fail the acquire."""
+        await limiter.create_entity(entity_id="key-1")
+        await limiter.set_limits("key-1", [Limit.per_minute("rpm", 100)], resource="gpt-4")
+
+        repo = limiter._repository
+        repo._entity_cache[(repo._namespace_id, "key-1")] = (True, "gone", {})
+
+        async with limiter.acquire("key-1", "gpt-4", {"rpm": 1}) as lease:
+            assert {entry.entity_id for entry in lease.entries} == {"key-1"}
+
+    async def test_cascade_cached_parent_without_limits_raises(self, limiter):
+        """Test that a confirmed cached parent with no limits still raises."""
+        await limiter.create_entity(entity_id="proj-1")
+        await limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        await limiter.set_limits("key-1", [Limit.per_minute("rpm", 100)], resource="gpt-4")
+        await limiter.get_entity("key-1")  # warm the entity cache
+
+        with pytest.raises(ValidationError, match="proj-1"):
+            async with limiter.acquire("key-1", "gpt-4", {"rpm": 1}):
+                pass
+
     async def test_backward_compat_missing_cascade_field(self, limiter):
         """Test that entities without cascade field default to False."""
         # Create entity normally (cascade defaults to False)
@@ -2190,7 +2285,7 @@ class TestRateLimiterResourceCapacity:
 
         shard1_item = dict(shard0_item)
         shard1_item["PK"] = {"S": schema.pk_bucket(repo._namespace_id, "sharded-user", "gpt-4", 1)}
-        shard1_item["GSI2SK"] = {"S": schema.gsi2_sk_bucket("sharded-user", 1)}
+        shard1_item["GSI5SK"] = {"S": schema.gsi5_sk_bucket("sharded-user", 1)}
         shard1_item["GSI3SK"] = {"S": schema.gsi3_sk_bucket("gpt-4", 1)}
         shard1_item["shard_count"] = {"N": "2"}
         await client.update_item(
@@ -6429,12 +6524,46 @@ class TestShardRetry:
         for _ in range(100):
             await repo._speculative_consume_single("user-1", "gpt-4", {"rpm": 1}, shard_id=0)
 
-        # Force shard_id=0 first, then let retry find shard 1
+        # Forget shard estimates and force shard_id=0 first, then let retry find shard 1
+        repo._shard_balance.forget((ns, "user-1", "gpt-4"))
         limiter._speculative_writes = True
-        with patch("zae_limiter.repository.random.randrange", return_value=0):
+        with patch("zae_limiter.shard_balance.random.choice", side_effect=lambda s: s[0]):
             async with limiter.acquire("user-1", "gpt-4", {"rpm": 1}) as lease:
                 rpm_entry = next(e for e in lease.entries if e.limit.name == "rpm")
                 assert rpm_entry is not None
+                assert lease.entries[0].state.tokens_milli == 99_000  # served by shard 1
+
+    async def test_acquire_routes_away_from_exhausted_shard(self, limiter):
+        """A shard seen exhausted is skipped without a failed write."""
+        repo = limiter._repository
+        ns = repo._namespace_id
+
+        await limiter.create_entity("user-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+
+        now_ms = int(time.time() * 1000)
+        for shard_id in range(2):
+            states = [
+                BucketState.from_limit("user-1", "gpt-4", Limit.per_minute("rpm", 100), now_ms),
+            ]
+            put_item = repo.build_composite_create(
+                "user-1", "gpt-4", states, now_ms, shard_id=shard_id, shard_count=2
+            )
+            await repo.transact_write([put_item])
+        repo._entity_cache[(ns, "user-1")] = (False, None, {"gpt-4": 2})
+
+        # Drain shard 0; its ALL_NEW responses record the exhausted balance
+        await repo._speculative_consume_single("user-1", "gpt-4", {"rpm": 100}, shard_id=0)
+
+        limiter._speculative_writes = True
+        with patch.object(
+            repo, "_speculative_consume_single", side_effect=repo._speculative_consume_single
+        ) as spy:
+            for _ in range(5):
+                async with limiter.acquire("user-1", "gpt-4", {"rpm": 1}):
+                    pass
+
+        assert [c.kwargs["shard_id"] for c in spy.call_args_list] == [1] * 5
 
     async def test_acquire_doubles_shards_on_wcu_exhaustion(self, limiter):
         """When wcu is exhausted, shard_count doubles and acquire falls to slow path."""
@@ -6511,6 +6640,29 @@ class TestShardRetry:
             async with limiter.acquire("user-1", "gpt-4", {"rpm": 1}):
                 pass
 
+    async def test_retry_on_other_shard_without_choose_shard(self, limiter, monkeypatch):
+        """Backends without choose_shard() retry on a random untried shard."""
+        repo = limiter._repository
+        await limiter.create_entity("user-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        now_ms = int(time.time() * 1000)
+        for shard_id in range(2):
+            states = [
+                BucketState.from_limit("user-1", "gpt-4", Limit.per_minute("rpm", 10), now_ms),
+            ]
+            put_item = repo.build_composite_create(
+                "user-1", "gpt-4", states, now_ms, shard_id=shard_id, shard_count=2
+            )
+            await repo.transact_write([put_item])
+        monkeypatch.delattr(type(repo), "choose_shard")
+
+        failed = SpeculativeResult(success=False, shard_id=0, shard_count=2)
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            lease = await limiter._retry_on_other_shard("user-1", "gpt-4", {"rpm": 1}, None, failed)
+
+        assert lease is not None
+        assert spy.call_args.kwargs["shard_id"] == 1
+
 
 class TestWcuHiddenFromUser:
     """Tests that wcu infrastructure limit is hidden from user-facing output."""
@@ -6568,3 +6720,1100 @@ class TestWcuHiddenFromUser:
         limit_names = {b.limit_name for b in buckets}
         assert "wcu" not in limit_names
         assert "rpm" in limit_names
+
+
+class TestReservationAcquire:
+    """Tests for client-side token reservation blocks."""
+
+    @staticmethod
+    async def _stored_tokens(limiter, entity_id: str) -> int:
+        buckets = await limiter._repository.get_buckets(entity_id, resource="gpt-4")
+        return next(b.tokens_milli for b in buckets if b.limit_name == "rpm") // 1000
+
+    @staticmethod
+    def _enable(limiter, multiplier: int = 10) -> ReservationPool:
+        pool = ReservationPool(config=ReservationConfig(window_seconds=60.0, max_block=100))
+        limiter._reservations = pool
+        pool.block_multiplier = MagicMock(return_value=multiplier)
+        return pool
+
+    async def test_disabled_by_default(self, limiter):
+        """Reservations are opt-in."""
+        assert limiter._reservations is None
+        assert limiter.get_reservation_stats() is None
+
+    async def test_constructor_enables_pool(self, limiter):
+        """Passing a ReservationConfig enables the pool."""
+        config = ReservationConfig(window_seconds=2.0)
+        lim = RateLimiter(repository=limiter._repository, reservation=config)
+        assert lim._reservations is not None
+        assert lim._reservations.config is config
+
+    async def test_serves_from_block_without_writes(self, limiter):
+        """Later acquires are served from the local block with no DynamoDB writes."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(limiter)
+
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}) as lease:
+            assert lease._initial_committed is True
+            assert lease.consumed == {"rpm": 1}
+        assert await self._stored_tokens(limiter, "entity-1") == 89  # 100 - 1 - block of 10
+
+        for _ in range(3):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+
+        assert await self._stored_tokens(limiter, "entity-1") == 89
+        assert pool.stats.reserved == 1
+        assert pool.stats.served == 3
+
+    async def test_close_returns_unused_tokens(self, limiter):
+        """close() returns unserved block tokens to the bucket."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(limiter)
+        for _ in range(4):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+
+        await limiter.close()
+
+        assert await self._stored_tokens(limiter, "entity-1") == 95  # 100 - 1 - 4
+        assert pool.stats.released == 1
+        assert pool.stats.released_tokens == 6
+
+    async def test_expired_block_released(self, limiter):
+        """Expired blocks are released on a later acquire."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(limiter)
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        pool._blocks[("entity-1", "gpt-4")].expires_at = 0.0
+        pool._last_sweep = 0.0
+        pool.block_multiplier.return_value = 0
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        assert pool.stats.released == 1
+        assert await self._stored_tokens(limiter, "entity-1") == 97  # 100 - 3
+
+    async def test_rollback_returns_served_tokens(self, limiter):
+        """Rolling back a lease served from a block returns its tokens to the bucket."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        self._enable(limiter)
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        with pytest.raises(RuntimeError):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 2}):
+                raise RuntimeError("boom")
+
+        assert await self._stored_tokens(limiter, "entity-1") == 91  # 89 + 2 rolled back
+
+    async def test_adjust_writes_delta_to_bucket(self, limiter):
+        """Adjustments on a served lease are written to the bucket on exit."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        self._enable(limiter)
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}) as lease:
+            await lease.adjust(rpm=5)
+
+        assert await self._stored_tokens(limiter, "entity-1") == 84
+
+    async def test_replaces_block_that_cannot_cover(self, limiter):
+        """A request larger than the block's remainder releases it and reserves anew."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 1000)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(limiter, multiplier=4)
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 5}):
+            pass
+
+        assert pool.stats.reserved == 2
+        assert pool.stats.released == 1
+        # 1000 - 1 (prime) - 1 (served) - 20 (second block)
+        assert await self._stored_tokens(limiter, "entity-1") == 978
+
+    async def test_falls_back_when_block_unavailable(self, limiter):
+        """If the bucket cannot cover a block, the regular path serves the request."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(limiter, multiplier=50)
+
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}) as lease:
+            assert lease.consumed == {"rpm": 1}
+
+        assert pool.stats.reserve_failures == 1
+        assert pool.stats.reserved == 0
+        assert await self._stored_tokens(limiter, "entity-1") == 8
+
+    async def test_failed_reservation_backs_off(self, limiter):
+        """After a failed reservation, later acquires skip the reservation write."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(limiter, multiplier=50)
+        consume = limiter._repository.speculative_consume
+        amounts: list[int] = []
+
+        async def spy(*args, **kwargs):
+            amounts.append(kwargs["consume"]["rpm"])
+            return await consume(*args, **kwargs)
+
+        with patch.object(limiter._repository, "speculative_consume", side_effect=spy):
+            for _ in range(5):
+                async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                    pass
+
+        assert amounts == [50, 1, 1, 1, 1, 1]  # one failed block, then regular writes
+        assert pool.stats.reserve_failures == 1
+        assert pool.stats.backed_off == 4
+        # The failed write's ALL_OLD sizes the next block: 25% of 10, within 9 tokens
+        assert pool.capped_amounts(("entity-1", "gpt-4"), {"rpm": 1}, 50) == {"rpm": 2}
+
+    async def test_cascade_reserves_parent_block(self, limiter):
+        """Cascade entities reserve from both child and parent buckets."""
+        await limiter.create_entity("parent-1")
+        await limiter.create_entity("child-1", parent_id="parent-1", cascade=True)
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("child-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(limiter, multiplier=5)
+
+        async with limiter.acquire("child-1", "gpt-4", {"rpm": 1}) as lease:
+            assert {e.entity_id for e in lease.entries} == {"child-1", "parent-1"}
+        async with limiter.acquire("child-1", "gpt-4", {"rpm": 1}) as lease:
+            assert {e.entity_id for e in lease.entries} == {"child-1", "parent-1"}
+
+        assert pool.stats.served == 1
+        assert await self._stored_tokens(limiter, "child-1") == 94
+        assert await self._stored_tokens(limiter, "parent-1") == 94
+
+        await limiter.close()
+        assert await self._stored_tokens(limiter, "child-1") == 97
+        assert await self._stored_tokens(limiter, "parent-1") == 97
+
+
+class TestLocalRejection:
+    """Tests for predictive local rejection from last-seen bucket state."""
+
+    async def test_disabled_by_default(self, limiter):
+        """Local rejection is opt-in."""
+        assert limiter._bucket_mirror is None
+        assert limiter.get_local_rejection_stats() is None
+
+    async def test_rejects_without_dynamodb_call(self, limiter):
+        """After a fast rejection, the next request is rejected locally."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+
+        with pytest.raises(RateLimitExceeded):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+
+        repo = limiter._repository
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            with pytest.raises(RateLimitExceeded) as exc_info:
+                async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                    pass
+
+        assert spy.call_count == 0
+        assert exc_info.value.retry_after_seconds > 0
+        assert limiter.get_local_rejection_stats().rejections == 1
+
+    async def test_success_state_is_mirrored(self, limiter):
+        """ALL_NEW from a successful speculative write drives later rejections."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 2)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        with pytest.raises(RateLimitExceeded):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        assert limiter.get_local_rejection_stats().rejections == 1
+
+    async def test_stale_state_goes_to_dynamodb(self, limiter):
+        """Stale mirrored state never rejects; DynamoDB decides."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        mirror = BucketMirror(config=LocalRejectionConfig(max_staleness_seconds=0.001))
+        limiter._bucket_mirror = mirror
+        with pytest.raises(RateLimitExceeded):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+
+        await asyncio.sleep(0.01)
+        with pytest.raises(RateLimitExceeded):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+
+        assert mirror.stats.rejections == 0
+        assert mirror.stats.stale == 1
+
+    async def test_missing_bucket_not_mirrored(self, limiter):
+        """A first acquire (bucket missing) leaves no mirrored state."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        assert limiter.get_local_rejection_stats().size == 0
+
+
+class TestSpeculativePolicy:
+    """Tests for the adaptive speculative-write policy."""
+
+    # Holds 10 tokens but refills 100 per millisecond: a drained bucket
+    # always fails the speculative write and always succeeds after refill.
+    REFILL_BOUND = Limit.per_second("rps", 100_000, burst=10)
+
+    async def _drained(self, limiter, **config) -> SpeculativePolicy:
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([self.REFILL_BOUND])
+        async with limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+        policy = SpeculativePolicy(config=SpeculativePolicyConfig(smoothing=1.0, **config))
+        limiter._speculative_policy = policy
+        return policy
+
+    async def test_disabled_by_default(self, limiter):
+        """The adaptive policy is opt-in."""
+        assert limiter._speculative_policy is None
+        assert limiter.get_speculative_policy_stats() is None
+        assert limiter.get_speculative_bucket_stats("entity-1", "gpt-4") is None
+
+    async def test_refill_bound_bucket_skips_speculation(self, limiter):
+        """After a wasted speculative write, the bucket uses the slow path directly."""
+        await self._drained(limiter)
+        async with limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+
+        repo = limiter._repository
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            async with limiter.acquire("entity-1", "gpt-4", {"rps": 10}) as lease:
+                assert lease.consumed == {"rps": 10}
+
+        assert spy.call_count == 0
+        bucket = limiter.get_speculative_bucket_stats("entity-1", "gpt-4")
+        assert bucket.success_rate == 0.0
+        assert bucket.failure_reasons == {"app_limit_exhausted": 1}
+        stats = limiter.get_speculative_policy_stats()
+        assert (stats.speculated, stats.fallbacks, stats.skipped) == (1, 1, 1)
+        assert stats.app_limit_exhausted == 1
+
+    async def test_bypassed_bucket_is_probed(self, limiter):
+        """Every probe_every-th acquire of a bypassed bucket speculates again."""
+        await self._drained(limiter, probe_every=3)
+        async with limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+
+        repo = limiter._repository
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            for _ in range(3):
+                async with limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+                    pass
+
+        assert spy.call_count == 1
+        assert limiter.get_speculative_policy_stats().probes == 1
+
+    async def test_fast_rejection_counts_as_success(self, limiter):
+        """A speculative write that proves the request must be rejected was not wasted."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        limiter._speculative_policy = SpeculativePolicy(
+            config=SpeculativePolicyConfig(smoothing=1.0)
+        )
+
+        with pytest.raises(RateLimitExceeded):
+            async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+
+        bucket = limiter.get_speculative_bucket_stats("entity-1", "gpt-4")
+        assert bucket.success_rate == 1.0
+        assert bucket.failure_reasons == {"app_limit_exhausted": 1}
+        assert limiter.get_speculative_policy_stats().fast == 1
+
+
+class TestIndependentCommit:
+    """Tests for non-transactional slow-path commits (transactional_commit=False)."""
+
+    def _condition_failure(self) -> Exception:
+        return ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}}, "UpdateItem"
+        )
+
+    def _make_lease(self, repo):
+        """Lease with one rpm entry on each of two entities."""
+        from zae_limiter.lease import Lease, LeaseEntry
+
+        entries = []
+        for entity_id in ("e1", "e2"):
+            state = MagicMock()
+            state.tokens_milli = 90_000
+            state.last_refill_ms = 1000
+            state.total_consumed_milli = None
+            entries.append(
+                LeaseEntry(
+                    entity_id=entity_id,
+                    resource="gpt-4",
+                    limit=Limit.per_minute("rpm", 100),
+                    state=state,
+                    consumed=10,
+                    _original_tokens_milli=100_000,
+                    _original_rf_ms=1000,
+                )
+            )
+        return Lease(repository=repo, entries=entries, _transactional=False)
+
+    def _make_mock_repo(self):
+        repo = AsyncMock()
+        repo.build_composite_normal = MagicMock(
+            side_effect=lambda entity_id, **kw: {"normal": entity_id}
+        )
+        repo.build_composite_retry = MagicMock(
+            side_effect=lambda entity_id, **kw: {"retry": entity_id}
+        )
+        repo.build_composite_adjust = MagicMock(
+            side_effect=lambda entity_id, resource, deltas: {"adjust": entity_id, **deltas}
+        )
+        repo.condition_failure_buckets = MagicMock(return_value={})
+        repo._bucket_ttl_refill_multiplier = 7
+        return repo
+
+    async def test_disabled_by_default(self, limiter):
+        """Multi-bucket commits are transactional unless opted out."""
+        assert limiter._transactional_commit is True
+
+    async def test_cascade_written_without_transaction(self, limiter):
+        """Child and parent buckets are written with independent UpdateItems."""
+        await limiter.create_entity("proj-1")
+        await limiter.create_entity("key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+        async with limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+            pass
+
+        limiter._speculative_writes = False
+        limiter._transactional_commit = False
+        repo = limiter._repository
+        with (
+            patch.object(repo, "transact_write", side_effect=repo.transact_write) as tx,
+            patch.object(repo, "write_each", side_effect=repo.write_each) as each,
+        ):
+            async with limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+                pass
+
+        tx.assert_not_called()
+        assert len(each.call_args_list[0].args[0]) == 2
+        for entity_id in ("key-1", "proj-1"):
+            available = await limiter.available(entity_id, "gpt-4", limits=limits)
+            assert available["rph"] == 98
+
+    async def test_condition_failure_retries_failed_bucket_only(self):
+        """A bucket whose optimistic lock failed is retried consumption-only."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        repo.write_each.side_effect = [
+            PartialWriteError({1: self._condition_failure()}, 2),
+            None,
+        ]
+        lease = self._make_lease(repo)
+
+        await lease._commit_initial()
+
+        assert lease._initial_committed is True
+        assert repo.write_each.call_args_list[1].args[0] == [{"retry": "e2"}]
+        repo.transact_write.assert_not_called()
+        repo.build_composite_adjust.assert_not_called()
+
+    async def test_condition_failure_rebases_on_returned_state(self):
+        """A lost lock that returned ALL_OLD is rewritten on the Normal path."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        stored = BucketState.from_limit("e2", "gpt-4", Limit.per_minute("rpm", 100), 0)
+        stored.tokens_milli = 50_000
+        stored.last_refill_ms = stored_rf = int(time.time() * 1000)
+        repo.condition_failure_buckets = MagicMock(return_value={0: [stored]})
+        repo.write_each.side_effect = [
+            PartialWriteError({1: self._condition_failure()}, 2),
+            None,
+        ]
+        lease = self._make_lease(repo)
+
+        await lease._commit_initial()
+
+        assert lease._initial_committed is True
+        assert repo.write_each.call_args_list[1].args[0] == [{"normal": "e2"}]
+        assert repo.build_composite_normal.call_args.kwargs["expected_rf"] == stored_rf
+        assert lease.entries[1]._original_tokens_milli == 50_000
+        repo.build_composite_retry.assert_not_called()
+        repo.build_composite_adjust.assert_not_called()
+
+    async def test_rebased_bucket_exhausted_compensates_written_bucket(self):
+        """If the returned state cannot cover the consumption, the written bucket is undone."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        stored = BucketState.from_limit("e2", "gpt-4", Limit.per_minute("rpm", 100), 0)
+        stored.tokens_milli = 0
+        stored.last_refill_ms = int(time.time() * 1000)
+        repo.condition_failure_buckets = MagicMock(return_value={0: [stored]})
+        repo.write_each.side_effect = [
+            PartialWriteError({1: self._condition_failure()}, 2),
+            None,
+        ]
+        lease = self._make_lease(repo)
+
+        with pytest.raises(RateLimitExceeded):
+            await lease._commit_initial()
+
+        assert repo.write_each.call_args_list[1].args[0] == [{"adjust": "e1", "rpm": -10_000}]
+
+    async def test_retry_failure_compensates_written_bucket(self):
+        """If the retry fails its condition, the written bucket is compensated."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        repo.write_each.side_effect = [
+            PartialWriteError({1: self._condition_failure()}, 2),
+            self._condition_failure(),
+            None,
+        ]
+        lease = self._make_lease(repo)
+
+        with pytest.raises(RateLimitExceeded):
+            await lease._commit_initial()
+
+        assert lease._initial_committed is False
+        assert repo.write_each.call_args_list[2].args[0] == [{"adjust": "e1", "rpm": -10_000}]
+
+    async def test_other_error_compensates_and_reraises(self):
+        """A non-condition error compensates the other buckets and propagates."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        repo.write_each.side_effect = [
+            PartialWriteError({0: RuntimeError("throttled")}, 2),
+            RuntimeError("still throttled"),
+        ]
+        lease = self._make_lease(repo)
+
+        with pytest.raises(RuntimeError, match="^throttled$"):
+            await lease._commit_initial()
+
+        assert repo.write_each.call_args_list[1].args[0] == [{"adjust": "e2", "rpm": -10_000}]
+
+    async def test_contended_parent_never_oversubscribed(self, limiter):
+        """Concurrent children draining one parent grant at most its capacity."""
+        limits = [Limit.per_hour("rph", 5)]
+        await limiter.create_entity("proj-1")
+        children = [f"key-{i}" for i in range(12)]
+        for child in children:
+            await limiter.create_entity(child, parent_id="proj-1", cascade=True)
+        async with limiter.acquire("proj-1", "gpt-4", {"rph": 0}, limits=limits):
+            pass
+        limiter._speculative_writes = False
+        limiter._transactional_commit = False
+
+        async def consume(entity_id: str) -> bool:
+            try:
+                async with limiter.acquire(entity_id, "gpt-4", {"rph": 1}, limits=limits):
+                    pass
+            except RateLimitExceeded:
+                return False
+            return True
+
+        granted = await asyncio.gather(*[consume(child) for child in children])
+
+        assert sum(granted) == 5
+        parent = await limiter.available("proj-1", "gpt-4", limits=limits)
+        assert parent["rph"] == 0
+        for child, ok in zip(children, granted, strict=True):
+            available = await limiter.available(child, "gpt-4", limits=limits)
+            assert available["rph"] == (4 if ok else 5)
+
+
+class TestRefreshedRetry:
+    """Tests for Normal-path retries rebased on the ALL_OLD state of a lost lock."""
+
+    # Holds 10 tokens but refills 100 per millisecond: a stored balance of
+    # zero is full again a millisecond later.
+    REFILL_BOUND = Limit.per_second("rps", 100_000, burst=10)
+
+    def _condition_failure(self) -> Exception:
+        return ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}}, "UpdateItem"
+        )
+
+    def _make_entry(self, consumed=10, is_new=False):
+        from zae_limiter.lease import LeaseEntry
+
+        limit = Limit.per_minute("rpm", 100)
+        return LeaseEntry(
+            entity_id="e1",
+            resource="gpt-4",
+            limit=limit,
+            state=BucketState.from_limit("e1", "gpt-4", limit, 1000),
+            consumed=consumed,
+            _original_tokens_milli=100_000,
+            _original_rf_ms=1000,
+            _is_new=is_new,
+        )
+
+    def _make_mock_repo(self, stored_tokens_milli: int):
+        repo = AsyncMock()
+        stored = BucketState.from_limit("e1", "gpt-4", Limit.per_minute("rpm", 100), 5000)
+        stored.tokens_milli = stored_tokens_milli
+        stored.last_refill_ms = int(time.time() * 1000)
+        repo.condition_failure_buckets = MagicMock(side_effect=lambda exc: {0: [replace(stored)]})
+        repo.build_composite_normal = MagicMock(return_value={"Update": {}})
+        repo.build_composite_create = MagicMock(return_value={"Put": {}})
+        repo.build_composite_retry = MagicMock(return_value={"Update": {}})
+        repo._bucket_ttl_refill_multiplier = 7
+        return repo, stored
+
+    async def test_lost_lock_retries_normal_path(self):
+        """The retry expects the returned rf instead of dropping the refill."""
+        from zae_limiter.lease import Lease
+
+        repo, stored = self._make_mock_repo(50_000)
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        entry = self._make_entry()
+        lease = Lease(repository=repo, entries=[entry])
+
+        await lease._commit_initial()
+
+        assert lease._initial_committed is True
+        repo.build_composite_retry.assert_not_called()
+        retry = repo.build_composite_normal.call_args_list[-1].kwargs
+        assert retry["expected_rf"] == stored.last_refill_ms
+        assert retry["consumed"] == {"rpm": 10_000}
+        assert entry._original_tokens_milli == 50_000
+        assert entry.state.tokens_milli < 41_000  # rebased on 50_000, not the local state
+
+    async def test_create_race_becomes_normal_write(self):
+        """A create that lost the race is retried as a Normal write on the winner's item."""
+        from zae_limiter.lease import Lease
+
+        repo, stored = self._make_mock_repo(100_000)
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        entry = self._make_entry(is_new=True)
+        lease = Lease(repository=repo, entries=[entry])
+
+        await lease._commit_initial()
+
+        repo.build_composite_create.assert_called_once()
+        assert repo.build_composite_normal.call_args.kwargs["expected_rf"] == stored.last_refill_ms
+        assert entry._is_new is False
+
+    async def test_returned_state_rejects_without_another_write(self):
+        """If the returned state cannot cover the request, it is rejected right away."""
+        from zae_limiter.lease import Lease
+
+        repo, _ = self._make_mock_repo(2_000)
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        lease = Lease(repository=repo, entries=[self._make_entry()])
+
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            await lease._commit_initial()
+
+        assert repo.transact_write.call_count == 1
+        assert exc_info.value.violations[0].available == 2
+
+    async def test_refreshes_bounded(self):
+        """After the bounded refreshes, the consumption-only retry takes over."""
+        from zae_limiter.lease import _REFRESH_MAX_RETRIES, Lease
+
+        repo, _ = self._make_mock_repo(100_000)
+        repo.transact_write.side_effect = [self._condition_failure()] * (
+            _REFRESH_MAX_RETRIES + 1
+        ) + [None]
+        lease = Lease(repository=repo, entries=[self._make_entry()])
+
+        await lease._commit_initial()
+
+        assert repo.transact_write.call_count == _REFRESH_MAX_RETRIES + 2
+        repo.build_composite_retry.assert_called_once()
+
+    async def test_backend_without_returned_state_retries_consumption_only(self):
+        """Backends without condition_failure_buckets() take the consumption-only retry."""
+        from zae_limiter.lease import Lease
+
+        repo, _ = self._make_mock_repo(100_000)
+        del repo.condition_failure_buckets
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        lease = Lease(repository=repo, entries=[self._make_entry()])
+
+        await lease._commit_initial()
+
+        assert repo.transact_write.call_count == 2
+        repo.build_composite_retry.assert_called_once()
+
+    async def test_contended_refill_bound_bucket_not_rejected(self, limiter):
+        """A lost lock on a bucket that refills in time no longer rejects the request."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([self.REFILL_BOUND])
+        async with limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+        limiter._speculative_writes = False
+
+        repo = limiter._repository
+        competitor = RateLimiter(repository=repo)
+        competitor._speculative_writes = False
+        transact_write = repo.transact_write
+        writes: list[list[dict]] = []
+
+        async def contended(items):
+            writes.append(items)
+            if len(writes) == 1:
+                # Another client drains the bucket between our read and write
+                async with competitor.acquire("entity-1", "gpt-4", {"rps": 10}):
+                    pass
+                await asyncio.sleep(0.005)
+            await transact_write(items)
+
+        with (
+            patch.object(repo, "transact_write", side_effect=contended),
+            patch.object(
+                repo, "build_composite_retry", side_effect=repo.build_composite_retry
+            ) as retry,
+        ):
+            async with limiter.acquire("entity-1", "gpt-4", {"rps": 10}) as lease:
+                assert lease.consumed == {"rps": 10}
+
+        retry.assert_not_called()
+        assert len(writes) == 3  # ours, the competitor's, our refreshed retry
+
+
+class TestAcquireMany:
+    """Tests for acquire_many() batched acquisition."""
+
+    @staticmethod
+    async def _stored_tokens(limiter, entity_id: str) -> int:
+        buckets = await limiter._repository.get_buckets(entity_id, resource="gpt-4")
+        return next(b.tokens_milli for b in buckets if b.limit_name == "rpm") // 1000
+
+    async def test_acquires_every_request(self, limiter):
+        """Every request gets its own committed lease."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": i + 1}) for i in range(3)]
+
+        async with limiter.acquire_many(requests) as results:
+            assert [r.consumed for r in results] == [{"rpm": 1}, {"rpm": 2}, {"rpm": 3}]
+
+        assert [await self._stored_tokens(limiter, f"entity-{i}") for i in range(3)] == [
+            99,
+            98,
+            97,
+        ]
+
+    async def test_rejection_is_per_request(self, limiter):
+        """A rejected request does not affect the others."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+
+        requests = [("entity-1", "gpt-4", {"rpm": 1}), ("entity-2", "gpt-4", {"rpm": 1})]
+        async with limiter.acquire_many(requests) as results:
+            assert isinstance(results[0], RateLimitExceeded)
+            assert results[0].violations[0].entity_id == "entity-1"
+            assert results[1].consumed == {"rpm": 1}
+
+        assert await self._stored_tokens(limiter, "entity-2") == 0
+
+    async def test_slow_path_reads_in_one_batch(self, limiter):
+        """Slow-path requests share one BatchGetItem pass."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        limiter._speculative_writes = False
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": 1}) for i in range(5)]
+        repo = limiter._repository
+
+        with (
+            patch.object(
+                repo,
+                "batch_get_entities_and_buckets",
+                side_effect=repo.batch_get_entities_and_buckets,
+            ) as spy,
+            patch.object(repo, "batch_get_entity_and_buckets") as single,
+        ):
+            async with limiter.acquire_many(requests) as results:
+                assert all(r.consumed == {"rpm": 1} for r in results)
+
+        assert spy.call_count == 1
+        assert single.call_count == 0
+        assert await self._stored_tokens(limiter, "entity-4") == 99
+
+    async def test_slow_path_resolves_limits_concurrently(self, limiter):
+        """Limits for every (entity, resource) resolve together, not one by one."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        limiter._speculative_writes = False
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": 1}) for i in range(5)]
+        resolve = limiter._resolve_limits
+        running = 0
+        peak = 0
+
+        async def slow_resolve(*args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return await resolve(*args)
+
+        with patch.object(limiter, "_resolve_limits", side_effect=slow_resolve):
+            async with limiter.acquire_many(requests) as results:
+                assert all(r.consumed == {"rpm": 1} for r in results)
+
+        assert peak == 5
+
+    async def test_slow_path_without_batch_entity_reads(self, limiter, monkeypatch):
+        """Backends without batch_get_entities_and_buckets() read entity by entity."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        limiter._speculative_writes = False
+        monkeypatch.delattr(type(limiter._repository), "batch_get_entities_and_buckets")
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": 1}) for i in range(3)]
+
+        async with limiter.acquire_many(requests) as results:
+            assert all(r.consumed == {"rpm": 1} for r in results)
+
+        assert await self._stored_tokens(limiter, "entity-2") == 99
+
+    async def test_slow_path_fetches_configs_in_one_read(self, limiter):
+        """Config slots missing for every entity are read in one batched read."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        limiter._speculative_writes = False
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": 1}) for i in range(5)]
+        repo = limiter._repository
+        await repo.invalidate_config_cache()
+
+        with patch.object(
+            repo, "batch_get_configs", side_effect=repo.batch_get_configs
+        ) as batch_get:
+            async with limiter.acquire_many(requests) as results:
+                assert all(r.consumed == {"rpm": 1} for r in results)
+
+        assert batch_get.call_count == 1
+        fetched = batch_get.call_args.args[0]
+        assert sum(1 for pk, _ in fetched if "ENTITY#" in pk) == 10  # gpt-4 + _default_ each
+
+    async def test_slow_path_shared_bucket(self, limiter):
+        """Requests for the same bucket in one batch each consume once."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        limiter._speculative_writes = False
+
+        requests = [("entity-1", "gpt-4", {"rpm": 2}), ("entity-1", "gpt-4", {"rpm": 3})]
+        async with limiter.acquire_many(requests) as results:
+            assert all(isinstance(r, type(results[0])) for r in results)
+
+        assert await self._stored_tokens(limiter, "entity-1") == 94
+
+    async def test_cascade_consumes_parent(self, limiter):
+        """Cascade children in a batch both consume from a new shared parent."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        await limiter.create_entity("parent-1")
+        await limiter.create_entity("child-1", parent_id="parent-1", cascade=True)
+        await limiter.create_entity("child-2", parent_id="parent-1", cascade=True)
+        limiter._speculative_writes = False
+
+        requests = [("child-1", "gpt-4", {"rpm": 1}), ("child-2", "gpt-4", {"rpm": 1})]
+        async with limiter.acquire_many(requests):
+            pass
+
+        assert await self._stored_tokens(limiter, "child-1") == 99
+        assert await self._stored_tokens(limiter, "parent-1") == 98
+
+    async def test_adjustments_committed_on_exit(self, limiter):
+        """Lease adjustments inside the block are written on exit."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+
+        async with limiter.acquire_many([("entity-1", "gpt-4", {"rpm": 1})]) as results:
+            await results[0].consume(rpm=4)
+
+        assert await self._stored_tokens(limiter, "entity-1") == 95
+
+    async def test_rollback_on_exception(self, limiter):
+        """An exception in the block rolls back every lease."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        async with limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        requests = [("entity-1", "gpt-4", {"rpm": 5}), ("entity-2", "gpt-4", {"rpm": 5})]
+
+        with pytest.raises(RuntimeError):
+            async with limiter.acquire_many(requests):
+                raise RuntimeError("boom")
+
+        assert await self._stored_tokens(limiter, "entity-1") == 99
+        assert await self._stored_tokens(limiter, "entity-2") == 100
+
+    async def test_invalid_identifier_raises(self, limiter):
+        """Identifiers are validated before any write."""
+        with pytest.raises(ValidationError):
+            async with limiter.acquire_many([("bad#id", "gpt-4", {"rpm": 1})]):
+                pass
+
+    async def test_block_raises_unavailable(self, limiter, monkeypatch):
+        """BLOCK raises RateLimiterUnavailable when the batch read fails."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        limiter._speculative_writes = False
+
+        async def mock_error(*args, **kwargs):
+            raise ClientError({"Error": {"Code": "ServiceUnavailable"}}, "BatchGetItem")
+
+        monkeypatch.setattr(limiter._repository, "batch_get_entities_and_buckets", mock_error)
+
+        with pytest.raises(RateLimiterUnavailable):
+            async with limiter.acquire_many([("entity-1", "gpt-4", {"rpm": 1})]):
+                pass
+
+    async def test_allow_returns_noop_leases(self, limiter, monkeypatch):
+        """ALLOW yields no-op leases for requests that could not be acquired."""
+        await limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        limiter._speculative_writes = False
+
+        async def mock_error(*args, **kwargs):
+            raise ClientError({"Error": {"Code": "ServiceUnavailable"}}, "BatchGetItem")
+
+        monkeypatch.setattr(limiter._repository, "batch_get_entities_and_buckets", mock_error)
+
+        requests = [("entity-1", "gpt-4", {"rpm": 1})]
+        async with limiter.acquire_many(requests, on_unavailable=OnUnavailable.ALLOW) as results:
+            assert len(results[0].entries) == 0
+
+
+class _TraceCollector(InstrumentationListener):
+    """Keeps every acquire trace."""
+
+    def __init__(self) -> None:
+        self.traces: list[AcquireTrace] = []
+
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        self.traces.append(trace)
+
+
+class TestInstrumentation:
+    """Tests for hot-path instrumentation listeners."""
+
+    async def _collector(self, limiter, capacity: int = 100) -> _TraceCollector:
+        await limiter.set_system_defaults([Limit.per_hour("rph", capacity)])
+        collector = _TraceCollector()
+        limiter._listeners = (collector,)
+        return collector
+
+    async def test_disabled_by_default(self, limiter):
+        """Without listeners, no trace is created."""
+        await limiter.set_system_defaults([Limit.per_hour("rph", 100)])
+        assert limiter._listeners == ()
+
+        async with limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+            assert current_trace() is None
+
+    async def test_slow_then_speculative(self, limiter):
+        """A new bucket takes the slow path; the next acquire is a speculative hit."""
+        collector = await self._collector(limiter)
+
+        for _ in range(2):
+            async with limiter.acquire("entity-1", "gpt-4", {"rph": 1}) as lease:
+                assert current_trace() is None
+                await lease.consume(rph=1)
+
+        slow, fast = collector.traces
+        assert (slow.path, fast.path) == (AcquirePath.SLOW, AcquirePath.SPECULATIVE)
+        assert slow.outcome == fast.outcome == AcquireOutcome.GRANTED
+        assert set(slow.phase_totals()) == {
+            "on_unavailable",
+            "fast_path",
+            "speculative_write",
+            "slow_path",
+            "resolve_limits",
+            "commit_initial",
+            "hold",
+            "commit_adjustments",
+        }
+        assert "slow_path" not in fast.phase_totals()
+        assert 0 < fast.acquire_s < fast.duration_s
+
+    async def test_fast_rejection(self, limiter):
+        """A speculative write that proves exhaustion is reported as a fast reject."""
+        collector = await self._collector(limiter, capacity=1)
+        async with limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+            pass
+
+        with pytest.raises(RateLimitExceeded):
+            async with limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+                pass
+
+        rejected = collector.traces[-1]
+        assert rejected.path == AcquirePath.FAST_REJECT
+        assert rejected.outcome == AcquireOutcome.REJECTED
+        assert rejected.acquire_s == rejected.duration_s
+        assert current_trace() is None
+
+    async def test_local_rejection(self, limiter):
+        """Rejections by the bucket mirror are reported as local rejects."""
+        collector = await self._collector(limiter, capacity=1)
+        limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+        async with limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+            pass
+
+        for _ in range(2):
+            with pytest.raises(RateLimitExceeded):
+                async with limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+                    pass
+
+        assert collector.traces[-1].path == AcquirePath.LOCAL_REJECT
+        assert "speculative_write" not in collector.traces[-1].phase_totals()
+
+    async def test_rollback(self, limiter):
+        """An exception in the block records the rollback phase."""
+        collector = await self._collector(limiter)
+
+        with pytest.raises(RuntimeError):
+            async with limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+                raise RuntimeError("boom")
+
+        (trace,) = collector.traces
+        assert trace.outcome == AcquireOutcome.GRANTED
+        assert "rollback" in trace.phase_totals()
+        assert "commit_adjustments" not in trace.phase_totals()
+
+    async def test_unavailable_allow(self, limiter):
+        """A no-op lease under ALLOW is reported as the unavailable path."""
+        collector = await self._collector(limiter)
+        limiter._speculative_writes = False
+
+        with patch.object(limiter, "_do_acquire", side_effect=RuntimeError("down")):
+            async with limiter.acquire(
+                "entity-1", "gpt-4", {"rph": 1}, on_unavailable=OnUnavailable.ALLOW
+            ):
+                assert current_trace() is None
+
+        (trace,) = collector.traces
+        assert trace.path == AcquirePath.UNAVAILABLE
+        assert trace.outcome == AcquireOutcome.GRANTED
+
+    async def test_error_outcome(self, limiter):
+        """Infrastructure errors under BLOCK are reported as errors."""
+        collector = await self._collector(limiter)
+        limiter._speculative_writes = False
+
+        with patch.object(limiter, "_do_acquire", side_effect=RuntimeError("down")):
+            with pytest.raises(RateLimiterUnavailable):
+                async with limiter.acquire(
+                    "entity-1", "gpt-4", {"rph": 1}, on_unavailable=OnUnavailable.BLOCK
+                ):
+                    pass
+
+        (trace,) = collector.traces
+        assert trace.outcome == AcquireOutcome.ERROR
+        assert trace.path == AcquirePath.SLOW
+
+    async def test_listeners_receive_dynamodb_calls(self, limiter):
+        """Listeners passed to the constructor are added to the repository."""
+        await limiter.set_system_defaults([Limit.per_hour("rph", 100)])
+        stats = InMemoryAggregator()
+        instrumented = RateLimiter(repository=limiter._repository, listeners=[stats])
+
+        for _ in range(2):
+            async with instrumented.acquire("entity-1", "gpt-4", {"rph": 1}):
+                pass
+
+        result = stats.get_stats()
+        assert result.paths == {"slow": 1, "speculative": 1}
+        assert result.dynamodb_calls["UpdateItem"].count >= 2
+        # The first speculative write finds no bucket
+        assert result.dynamodb_calls["UpdateItem"].errors >= 1
+
+    async def test_shared_repository_listeners_not_duplicated(self, limiter):
+        """Limiters sharing a repository and a listener report each call once."""
+        repo = limiter._repository
+        stats = InMemoryAggregator()
+        first = RateLimiter(repository=repo, listeners=[stats])
+        RateLimiter(repository=repo, listeners=[stats])
+
+        await repo.get_entity("entity-1")
+
+        assert repo._listeners.count(stats) == 1
+        assert stats.get_stats().dynamodb_calls["GetItem"].count == 1
+        await first.close()
+        assert stats in repo._listeners
+
+    async def test_close_removes_listeners(self, limiter):
+        """close() removes the limiter's listeners from the repository."""
+        repo = limiter._repository
+        stats = InMemoryAggregator()
+        instrumented = RateLimiter(repository=repo, listeners=[stats])
+
+        await instrumented.close()
+
+        assert stats not in repo._listeners
+
+
+class TestLatencyHistograms:
+    """Tests for in-process latency histograms."""
+
+    async def test_disabled_by_default(self, limiter):
+        """Without latency_histograms, no snapshot is available."""
+        assert limiter.get_latency_histograms() is None
+        limiter.reset_latency_histograms()  # no-op
+
+    async def test_records_acquires_and_calls(self, limiter):
+        """Acquires, commits and DynamoDB calls are recorded."""
+        await limiter.set_system_defaults([Limit.per_hour("rph", 100)])
+        instrumented = RateLimiter(repository=limiter._repository, latency_histograms=True)
+
+        for _ in range(2):
+            async with instrumented.acquire("entity-1", "gpt-4", {"rph": 1}):
+                pass
+
+        snapshot = instrumented.get_latency_histograms()
+        assert snapshot is not None
+        assert snapshot.operations["acquire"].count == 2
+        # Only the first (slow-path) acquire writes in its initial commit
+        assert snapshot.operations["commit"].count == 1
+        assert snapshot.operations["adjust"].count == 2
+        assert snapshot.dynamodb_calls["UpdateItem"].count >= 2
+        assert "zae_limiter_operation_latency_seconds" in snapshot.to_prometheus()
+
+        instrumented.reset_latency_histograms()
+        assert instrumented.get_latency_histograms().operations["acquire"].count == 0
@@ -0,0 +1,102 @@
+"""Tests for the last-seen bucket state mirror."""
+
+import pytest
+
+from zae_limiter import Limit
+from zae_limiter.local_rejection import BucketMirror, LocalRejectionConfig
+from zae_limiter.models import BucketState
+
+
+def _states(entity_id: str, tokens: int, capacity: int = 60, now_ms: int = 0) -> list[BucketState]:
+    state = BucketState.from_limit(entity_id, "gpt-4", Limit.per_minute("rpm", capacity), now_ms)
+    state.tokens_milli = tokens * 1000
+    return [state]
+
+
+class TestLocalRejectionConfig:
+    """Tests for LocalRejectionConfig validation."""
+
+    @pytest.mark.parametrize("kwargs", [{"max_staleness_seconds": 0}, {"max_entries": 0}])
+    def test_invalid(self, kwargs):
+        """Invalid values raise ValueError."""
+        with pytest.raises(ValueError):
+            LocalRejectionConfig(**kwargs)
+
+
+class TestBucketMirror:
+    """Tests for BucketMirror.check()."""
+
+    def test_unknown_key_passes(self):
+        """No mirrored state means no prediction."""
+        mirror = BucketMirror()
+        assert mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=0, now=0.0) is None
+
+    def test_rejects_exhausted_bucket(self):
+        """An exhausted bucket is rejected with statuses and a retry_after."""
+        mirror = BucketMirror()
+        mirror.record("entity-1", "gpt-4", _states("entity-1", 0), now=0.0)
+
+        statuses = mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=0, now=0.0)
+
+        assert statuses is not None
+        assert statuses[0].exceeded is True
+        assert statuses[0].retry_after_seconds == pytest.approx(1.0, abs=0.01)
+        assert mirror.stats.rejections == 1
+
+    def test_refill_lifts_rejection(self):
+        """Once refill covers the request, the check passes."""
+        mirror = BucketMirror(config=LocalRejectionConfig(max_staleness_seconds=10.0))
+        mirror.record("entity-1", "gpt-4", _states("entity-1", 0), now=0.0)
+
+        assert mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=500, now=0.5) is not None
+        assert mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=1000, now=1.0) is None
+        assert mirror.stats.passes == 1
+
+    def test_stale_state_ignored(self):
+        """States older than max_staleness_seconds are dropped."""
+        mirror = BucketMirror(config=LocalRejectionConfig(max_staleness_seconds=0.1))
+        mirror.record("entity-1", "gpt-4", _states("entity-1", 0), now=0.0)
+
+        assert mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=0, now=0.2) is None
+        assert mirror.stats.stale == 1
+        assert mirror.stats.size == 0
+
+    def test_unknown_limit_passes(self):
+        """A limit missing from the mirrored state defers to DynamoDB."""
+        mirror = BucketMirror()
+        mirror.record("entity-1", "gpt-4", _states("entity-1", 0), now=0.0)
+
+        assert mirror.check("entity-1", "gpt-4", {"tpm": 1}, now_ms=0, now=0.0) is None
+
+    def test_cascade_checks_parent(self):
+        """An exhausted parent rejects a cascade child with both statuses."""
+        mirror = BucketMirror()
+        mirror.record("parent-1", "gpt-4", _states("parent-1", 0), now=0.0)
+        mirror.record("child-1", "gpt-4", _states("child-1", 50), parent_id="parent-1", now=0.0)
+
+        statuses = mirror.check("child-1", "gpt-4", {"rpm": 1}, now_ms=0, now=0.0)
+
+        assert statuses is not None
+        assert [s.entity_id for s in statuses] == ["child-1", "parent-1"]
+        assert [s.exceeded for s in statuses] == [False, True]
+
+    def test_invalidate(self):
+        """invalidate() forgets the mirrored state."""
+        mirror = BucketMirror()
+        mirror.record("entity-1", "gpt-4", _states("entity-1", 0), now=0.0)
+        mirror.invalidate("entity-1", "gpt-4")
+
+        assert mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=0, now=0.0) is None
+
+    def test_bounded_lru(self):
+        """The mirror evicts least recently used entries beyond max_entries."""
+        mirror = BucketMirror(config=LocalRejectionConfig(max_entries=2))
+        mirror.record("entity-1", "gpt-4", _states("entity-1", 0), now=0.0)
+        mirror.record("entity-2", "gpt-4", _states("entity-2", 0), now=0.0)
+        mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=0, now=0.0)  # touch entity-1
+        mirror.record("entity-3", "gpt-4", _states("entity-3", 0), now=0.0)
+
+        assert mirror.stats.as_dict()["evictions"] == 1
+        assert mirror.stats.size == 2
+        assert mirror.check("entity-2", "gpt-4", {"rpm": 1}, now_ms=0, now=0.0) is None
+        assert mirror.check("entity-1", "gpt-4", {"rpm": 1}, now_ms=0, now=0.0) is not None
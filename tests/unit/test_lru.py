@@ -0,0 +1,95 @@
+"""Tests for the bounded LRU map."""
+
+import pytest
+
+from zae_limiter.lru import LRUCache
+
+
+class TestLRUCacheValidation:
+    """Tests for LRUCache argument validation."""
+
+    @pytest.mark.parametrize("kwargs", [{"max_entries": 0}, {"ttl_seconds": 0}])
+    def test_invalid(self, kwargs):
+        """Non-positive bounds raise ValueError."""
+        with pytest.raises(ValueError):
+            LRUCache(**kwargs)
+
+
+class TestLRUCache:
+    """Tests for LRUCache behavior."""
+
+    def test_unbounded_behaves_like_dict(self):
+        """Without bounds, entries are never evicted."""
+        cache: LRUCache[str, int] = LRUCache()
+        for i in range(100):
+            cache[f"k{i}"] = i
+
+        assert len(cache) == 100
+        assert cache["k0"] == 0
+        assert cache.get("missing") is None
+        assert cache.get("missing", -1) == -1
+        assert cache.evictions == 0
+
+    def test_evicts_least_recently_used(self):
+        """Reads refresh recency; the oldest unread entry is evicted."""
+        cache: LRUCache[str, int] = LRUCache(max_entries=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        assert cache.get("a") == 1
+        cache["c"] = 3
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.evictions == 1
+
+    def test_overwrite_does_not_evict(self):
+        """Replacing an existing key keeps the size unchanged."""
+        cache: LRUCache[str, int] = LRUCache(max_entries=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache["a"] = 3
+
+        assert len(cache) == 2
+        assert cache["a"] == 3
+        assert cache.evictions == 0
+
+    def test_ttl_expires_entries(self, monkeypatch):
+        """Entries older than ttl_seconds are dropped on read and counted."""
+        now = [1000.0]
+        monkeypatch.setattr("zae_limiter.lru.time.time", lambda: now[0])
+        cache: LRUCache[str, int] = LRUCache(ttl_seconds=10)
+        cache["a"] = 1
+        assert cache["a"] == 1
+
+        now[0] += 11
+        assert cache.get("a") is None
+        with pytest.raises(KeyError):
+            cache["a"]
+        assert len(cache) == 0
+        assert cache.expirations == 1
+
+    def test_pop_values_clear(self):
+        """pop, values and clear mirror dict semantics."""
+        cache: LRUCache[str, int] = LRUCache(max_entries=10, ttl_seconds=60)
+        cache["a"] = 1
+        cache["b"] = 2
+
+        assert sorted(cache.values()) == [1, 2]
+        assert cache.pop("a") == 1
+        assert cache.pop("a", -1) == -1
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_get_stats(self):
+        """get_stats reports size, capacity and counters."""
+        cache: LRUCache[str, int] = LRUCache(max_entries=1)
+        cache["a"] = 1
+        cache["b"] = 2
+
+        assert cache.get_stats().as_dict() == {
+            "size": 1,
+            "max_entries": 1,
+            "evictions": 1,
+            "expirations": 0,
+        }
@@ -4,7 +4,7 @@ from unittest.mock import patch
 
 import pytest
 
-from zae_limiter import schema
+from zae_limiter import Limit, schema
 from zae_limiter.migrations import (
     Migration,
     apply_migrations,
@@ -18,6 +18,7 @@ from zae_limiter.migrations.m_0_8_0_composite_limits import (
     _migrate_system_limits,
     migrate_to_0_8_0,
 )
+from zae_limiter.migrations.m_0_11_0_gsi5 import migrate_to_0_11_0
 
 
 class TestMigrationRegistry:
@@ -68,10 +69,9 @@ class TestGetMigrationsBetween:
         assert result == []
 
     def test_migrations_for_upgrade(self):
-        """Test that 0.10.0 LSI migration returned for 0.9.0 → 1.0.0 upgrade."""
+        """Test that 0.10.0 and 0.11.0 migrations returned for 0.9.0 → 1.0.0 upgrade."""
         result = get_migrations_between("0.9.0", "1.0.0")
-        assert len(result) == 1
-        assert result[0].version == "0.10.0"
+        assert [m.version for m in result] == ["0.10.0", "0.11.0"]
 
 
 class TestApplyMigrations:
@@ -821,3 +821,46 @@ class TestMigration080CompositeLimits:
         )
         assert "Item" in result
         assert result["Item"].get("l_rpm_cp", {}).get("N") == "120"
+
+
+class TestMigration0110Gsi5:
+    """Tests for the 0.11.0 GSI5 bucket re-keying migration."""
+
+    @pytest.mark.asyncio
+    async def test_rekeys_legacy_bucket_items(self, limiter):
+        """Buckets with GSI2 keys are moved to GSI5 and found by get_resource_buckets."""
+        repository = limiter._repository
+        client = await repository._get_client()
+        table = repository.table_name
+        ns = repository._namespace_id
+
+        async with limiter.acquire(
+            "user-1", "gpt-4", {"rpm": 1}, limits=[Limit.per_minute("rpm", 100)]
+        ):
+            pass
+
+        # Rewrite the bucket as a pre-0.11.0 item (GSI2 keys, no GSI5 keys)
+        key = {
+            "PK": {"S": schema.pk_bucket(ns, "user-1", "gpt-4", 0)},
+            "SK": {"S": schema.sk_state()},
+        }
+        await client.update_item(
+            TableName=table,
+            Key=key,
+            UpdateExpression="SET GSI2PK = :pk, GSI2SK = :sk REMOVE GSI5PK, GSI5SK",
+            ExpressionAttributeValues={
+                ":pk": {"S": schema.gsi2_pk_resource(ns, "gpt-4")},
+                ":sk": {"S": schema.gsi2_sk_bucket("user-1", 0)},
+            },
+        )
+        assert await repository.get_resource_buckets("gpt-4") == []
+
+        await migrate_to_0_11_0(repository)
+
+        item = (await client.get_item(TableName=table, Key=key))["Item"]
+        assert "GSI2PK" not in item
+        assert "GSI2SK" not in item
+        assert item["GSI5PK"]["S"] == schema.gsi5_pk_resource(ns, "gpt-4")
+        assert item["GSI5SK"]["S"] == schema.gsi5_sk_bucket("user-1", 0)
+        buckets = await repository.get_resource_buckets("gpt-4", "rpm")
+        assert [b.entity_id for b in buckets] == ["user-1"]
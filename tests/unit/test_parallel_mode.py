@@ -1,9 +1,11 @@
 """Tests for SyncRepository parallel_mode parameter."""
 
+import threading
 from unittest.mock import patch
 
 import pytest
 
+from zae_limiter.sync_limiter import SyncRateLimiter
 from zae_limiter.sync_repository import SyncRepository
 
 
@@ -124,3 +126,59 @@ class TestParallelModeConstructor:
             SyncRepository(
                 name="test", region="us-east-1", _skip_deprecation_warning=True, parallel_mode="bad"
             )
+
+
+class TestLimiterRunInExecutor:
+    """Tests for SyncRateLimiter's own thread pool."""
+
+    def _limiter(self, **client_config):
+        with patch("os.cpu_count", return_value=4):
+            repo = SyncRepository(
+                name="test",
+                region="us-east-1",
+                _skip_deprecation_warning=True,
+                parallel_mode="threadpool",
+            )
+        repo._client_config = client_config
+        return SyncRateLimiter(repository=repo)
+
+    def test_pool_sized_from_connection_pool(self):
+        limiter = self._limiter(max_pool_connections=32)
+
+        assert limiter._run_in_executor(lambda: 1, lambda: 2) == (1, 2)
+        assert limiter._thread_pool._max_workers == 32
+        limiter._cleanup_thread_pool()
+
+    def test_pool_defaults_to_botocore_pool_size(self):
+        limiter = self._limiter()
+
+        limiter._run_in_executor(lambda: 1)
+        assert limiter._thread_pool._max_workers == 10
+        limiter._cleanup_thread_pool()
+
+    def test_concurrent_first_calls_share_one_pool(self):
+        limiter = self._limiter()
+        pools = set()
+
+        def call() -> None:
+            limiter._run_in_executor(lambda: None)
+            pools.add(id(limiter._thread_pool))
+
+        threads = [threading.Thread(target=call) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(pools) == 1
+        limiter._cleanup_thread_pool()
+
+    def test_close_shuts_pool_down(self):
+        limiter = self._limiter()
+        limiter._run_in_executor(lambda: 1)
+        pool = limiter._thread_pool
+
+        limiter.close()
+
+        assert limiter._thread_pool is None
+        assert pool._shutdown
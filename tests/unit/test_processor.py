@@ -5,10 +5,13 @@ import time
 from datetime import UTC, datetime
 from unittest.mock import MagicMock, patch
 
+import boto3
 import pytest
 from botocore.exceptions import ClientError
 
+from zae_limiter.schema import WCU_LIMIT_NAME, pk_bucket, sk_state
 from zae_limiter_aggregator.processor import (
+    SHARD_MERGE_MIN_AGE_MS,
     BucketRefillState,
     ConsumptionDelta,
     LimitRefillInfo,
@@ -24,6 +27,7 @@ from zae_limiter_aggregator.processor import (
     propagate_shard_count,
     try_proactive_shard,
     try_refill_bucket,
+    try_shard_merge,
     update_snapshot,
 )
 
@@ -2075,7 +2079,10 @@ class TestPropagateShardsCount:
         for put_call in put_calls:
             item = put_call.kwargs["Item"]
             assert "GSI3PK" in item
-            assert "GSI2PK" in item
+            assert "GSI2PK" not in item
+            assert "GSI2SK" not in item
+            assert item["GSI5PK"] == "ns1/RESOURCE#gpt-4"
+            assert item["GSI5SK"].startswith("BUCKET#user-1#")
             assert "b_rpm_tk" in item
             assert "b_wcu_tk" in item
 
@@ -2199,3 +2206,331 @@ class TestPropagateShardsCount:
         assert item["b_wcu_tk"] == 1000000
         # wcu tc reset to 0
         assert item["b_wcu_tc"] == 0
+
+
+_MERGE_NOW_MS = 1704067200000
+
+
+def _seed_shard(
+    table,
+    namespace_id: str,
+    shard_id: int,
+    shard_count: int,
+    rpm_tk: int,
+    wcu_tk: int = 1_000_000,
+) -> None:
+    """Seed one shard of a user-1/gpt-4 composite bucket (rpm cp 100 tokens)."""
+    item = {
+        "PK": pk_bucket(namespace_id, "user-1", "gpt-4", shard_id),
+        "SK": sk_state(),
+        "entity_id": "user-1",
+        "resource": "gpt-4",
+        "rf": 1704067200000,
+        "shard_count": shard_count,
+        "cascade": False,
+    }
+    for name, tk, cp in (("rpm", rpm_tk, 100_000), ("wcu", wcu_tk, 1_000_000)):
+        item[f"b_{name}_tk"] = tk
+        item[f"b_{name}_cp"] = cp
+        item[f"b_{name}_ra"] = cp
+        item[f"b_{name}_rp"] = 60_000
+        item[f"b_{name}_tc"] = 0
+    table.put_item(Item=item)
+
+
+def _shard(table, namespace_id: str, shard_id: int) -> dict:
+    key = {"PK": pk_bucket(namespace_id, "user-1", "gpt-4", shard_id), "SK": sk_state()}
+    return table.get_item(Key=key, ConsistentRead=True).get("Item", {})
+
+
+class TestTryShardMerge:
+    """Tests for try_shard_merge against a moto table.
+
+    Shards hold rpm with 100 tokens capacity, so after halving 4 shards to 2
+    each remaining shard can hold 50 tokens (50_000 millitokens).
+    """
+
+    @pytest.fixture
+    def table(self, sync_repository):
+        return boto3.resource("dynamodb", region_name="us-east-1").Table(sync_repository.table_name)
+
+    @pytest.fixture
+    def ns(self, sync_repository) -> str:
+        return sync_repository._namespace_id
+
+    def _make_state(
+        self,
+        ns: str = "ns1",
+        shard_id: int = 0,
+        shard_count: int = 4,
+        writes: int | None = 1,
+        span_ms: int = 0,
+    ):
+        """State for a batch of ``writes`` shard 0 records spanning ``span_ms``."""
+        state = BucketRefillState(
+            namespace_id=ns,
+            entity_id="user-1",
+            resource="gpt-4",
+            shard_id=shard_id,
+            shard_count=shard_count,
+            rf_ms=_MERGE_NOW_MS,
+            first_event_ms=_MERGE_NOW_MS - span_ms,
+            last_event_ms=_MERGE_NOW_MS,
+        )
+        if writes is not None:
+            state.limits[WCU_LIMIT_NAME] = LimitRefillInfo(
+                tc_delta=writes * 1_000,
+                tk_milli=1_000_000 - writes * 1_000,
+                cp_milli=1_000_000,
+                ra_milli=1_000_000,
+                rp_ms=1_000,
+            )
+        return state
+
+    @pytest.mark.parametrize(
+        "state_kwargs",
+        [
+            {"shard_count": 1},
+            {"shard_id": 1},
+            {"writes": None},
+            {"writes": 250},
+            {"writes": 2_500, "span_ms": 10_000},
+            {"shard_count": 128},
+        ],
+        ids=["single-shard", "not-shard-0", "no-wcu", "busy", "busy-over-span", "too-many"],
+    )
+    def test_skips(self, state_kwargs) -> None:
+        """No reads or writes unless merging keeps shard 0 below half its write rate."""
+        mock_table = MagicMock()
+        state = self._make_state(**state_kwargs)
+
+        assert try_shard_merge(mock_table, state, _MERGE_NOW_MS) is False
+        mock_table.meta.client.batch_get_item.assert_not_called()
+
+    def test_full_wcu_tokens_do_not_imply_idle(self, table, ns) -> None:
+        """wcu refills every second, so a busy batch ending in a quiet second is not merged."""
+        for shard_id in range(2):
+            _seed_shard(table, ns, shard_id, 2, 10_000)
+        state = self._make_state(ns, shard_count=2, writes=600)
+        state.limits[WCU_LIMIT_NAME].tk_milli = 1_000_000
+
+        assert try_shard_merge(table, state, _MERGE_NOW_MS) is False
+        assert _shard(table, ns, 1)["b_rpm_tk"] == 10_000
+
+    def test_rate_measured_over_batch_span(self, table, ns) -> None:
+        """Writes spread over the batch are averaged over its span."""
+        for shard_id in range(2):
+            _seed_shard(table, ns, shard_id, 2, 10_000)
+
+        state = self._make_state(ns, shard_count=2, writes=2_400, span_ms=10_000)
+        assert try_shard_merge(table, state, _MERGE_NOW_MS) is True
+        assert _shard(table, ns, 1) == {}
+
+    def test_recent_doubling_delays_merge(self, table, ns) -> None:
+        """shard_count doubled less than SHARD_MERGE_MIN_AGE_MS ago is left alone."""
+        for shard_id in range(2):
+            _seed_shard(table, ns, shard_id, 2, 10_000)
+        key = {"PK": pk_bucket(ns, "user-1", "gpt-4", 0), "SK": sk_state()}
+        doubled_at = _MERGE_NOW_MS - SHARD_MERGE_MIN_AGE_MS + 1_000
+        table.update_item(
+            Key=key,
+            UpdateExpression="SET sd = :sd",
+            ExpressionAttributeValues={":sd": doubled_at},
+        )
+        state = self._make_state(ns, shard_count=2)
+
+        assert try_shard_merge(table, state, _MERGE_NOW_MS) is False
+        assert _shard(table, ns, 1)["shard_count"] == 2
+
+        assert try_shard_merge(table, state, _MERGE_NOW_MS + 1_000) is True
+        assert _shard(table, ns, 1) == {}
+
+    def test_folds_upper_half_into_lower_half(self, table, ns) -> None:
+        """Shard s + 2 is deleted and its tokens are added to shard s."""
+        for shard_id, rpm_tk in enumerate([10_000, 20_000, 15_000, 5_000]):
+            _seed_shard(table, ns, shard_id, 4, rpm_tk)
+
+        assert try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS) is True
+
+        assert _shard(table, ns, 2) == {}
+        assert _shard(table, ns, 3) == {}
+        shard_0, shard_1 = _shard(table, ns, 0), _shard(table, ns, 1)
+        assert (shard_0["shard_count"], shard_1["shard_count"]) == (2, 2)
+        assert (shard_0["b_rpm_tk"], shard_1["b_rpm_tk"]) == (25_000, 25_000)
+        # wcu is per partition: not carried over
+        assert (shard_0["b_wcu_tk"], shard_1["b_wcu_tk"]) == (1_000_000, 1_000_000)
+        # tc untouched, so usage snapshots do not count folded tokens as consumption
+        assert (shard_0["b_rpm_tc"], shard_1["b_rpm_tc"]) == (0, 0)
+
+    def test_caps_at_new_effective_capacity(self, table, ns) -> None:
+        """Tokens beyond cp // new_count are dropped rather than over-granted."""
+        for shard_id, rpm_tk in enumerate([40_000, 25_000]):
+            _seed_shard(table, ns, shard_id, 2, rpm_tk)
+
+        assert try_shard_merge(table, self._make_state(ns, shard_count=2), _MERGE_NOW_MS)
+
+        assert _shard(table, ns, 0)["b_rpm_tk"] == 65_000
+        assert _shard(table, ns, 1) == {}
+
+        for shard_id, rpm_tk in enumerate([30_000, 40_000, 25_000, 25_000]):
+            _seed_shard(table, ns, shard_id, 4, rpm_tk)
+
+        assert try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS)
+
+        assert _shard(table, ns, 0)["b_rpm_tk"] == 50_000  # 30 + min(25, 20)
+        assert _shard(table, ns, 1)["b_rpm_tk"] == 50_000  # 40 + min(25, 10)
+
+    def test_carries_negative_balance(self, table, ns) -> None:
+        """A retired shard's debt (negative tokens) is folded in full."""
+        for shard_id, rpm_tk in enumerate([50_000, -20_000]):
+            _seed_shard(table, ns, shard_id, 2, rpm_tk)
+
+        assert try_shard_merge(table, self._make_state(ns, shard_count=2), _MERGE_NOW_MS)
+
+        assert _shard(table, ns, 0)["b_rpm_tk"] == 30_000
+
+    def test_stale_shard_count_skips(self, table, ns) -> None:
+        """A stream record older than shard 0's current shard_count is ignored."""
+        for shard_id in range(2):
+            _seed_shard(table, ns, shard_id, 2, 10_000)
+
+        assert try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS) is False
+        assert _shard(table, ns, 1)["b_rpm_tk"] == 10_000
+
+    def test_missing_shard_skips(self, table, ns) -> None:
+        """A shard not yet created by propagation blocks the merge."""
+        for shard_id in range(3):
+            _seed_shard(table, ns, shard_id, 4, 10_000)
+
+        assert try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS) is False
+        assert _shard(table, ns, 0)["shard_count"] == 4
+
+    def test_concurrent_consume_cancels_merge(self, table, ns, sync_repository) -> None:
+        """A consume on a retired shard between read and write cancels the merge."""
+        for shard_id, rpm_tk in enumerate([10_000, 10_000, 30_000, 30_000]):
+            _seed_shard(table, ns, shard_id, 4, rpm_tk)
+
+        client = table.meta.client
+        transact = client.transact_write_items
+
+        def consume_then_transact(**kwargs):
+            result = sync_repository.speculative_consume("user-1", "gpt-4", {"rpm": 5}, shard_id=3)
+            assert result.success
+            return transact(**kwargs)
+
+        with patch.object(client, "transact_write_items", side_effect=consume_then_transact):
+            merged = try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS)
+
+        assert merged is False
+        assert [_shard(table, ns, s)["b_rpm_tk"] for s in range(4)] == [
+            10_000,
+            10_000,
+            30_000,
+            25_000,
+        ]
+
+        # The next batch folds the balance left after the consume
+        assert try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS) is True
+        assert [_shard(table, ns, s).get("b_rpm_tk") for s in range(4)] == [
+            40_000,
+            35_000,
+            None,
+            None,
+        ]
+
+    def test_concurrent_refill_on_partner_cancels_merge(self, table, ns) -> None:
+        """Tokens added to a partner after the read would exceed its capacity."""
+        for shard_id, rpm_tk in enumerate([45_000, 30_000]):
+            _seed_shard(table, ns, shard_id, 2, rpm_tk)
+
+        client = table.meta.client
+        transact = client.transact_write_items
+        key = {"PK": pk_bucket(ns, "user-1", "gpt-4", 0), "SK": sk_state()}
+
+        def refill_then_transact(**kwargs):
+            table.update_item(
+                Key=key,
+                UpdateExpression="ADD b_rpm_tk :delta",
+                ExpressionAttributeValues={":delta": 5_000},
+            )
+            return transact(**kwargs)
+
+        with patch.object(client, "transact_write_items", side_effect=refill_then_transact):
+            merged = try_shard_merge(table, self._make_state(ns, shard_count=2), _MERGE_NOW_MS)
+
+        assert merged is False
+        assert _shard(table, ns, 0)["b_rpm_tk"] == 50_000
+        assert _shard(table, ns, 1)["b_rpm_tk"] == 30_000
+
+    def test_stale_client_relearns_shard_count(self, table, ns, sync_repository) -> None:
+        """A client still routing to a retired shard falls back to shard 0 once."""
+        for shard_id in range(4):
+            _seed_shard(table, ns, shard_id, 4, 10_000)
+        sync_repository._entity_cache[(ns, "user-1")] = (False, None, {"gpt-4": 4})
+
+        assert try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS) is True
+
+        with patch.object(sync_repository, "choose_shard", return_value=3):
+            missing = sync_repository.speculative_consume("user-1", "gpt-4", {"rpm": 1})
+        assert missing.success is False
+        assert "gpt-4" not in sync_repository._entity_cache[(ns, "user-1")][2]
+        assert _shard(table, ns, 3) == {}  # not recreated
+
+        result = sync_repository.speculative_consume("user-1", "gpt-4", {"rpm": 1})
+        assert result.success
+        assert result.shard_id == 0
+        assert sync_repository._entity_cache[(ns, "user-1")][2]["gpt-4"] == 2
+
+    def test_release_to_retired_shard_follows_fold(self, table, ns, sync_repository) -> None:
+        """Adjustments to a retired shard go to its partner instead of recreating it."""
+        for shard_id in range(4):
+            _seed_shard(table, ns, shard_id, 4, 10_000)
+        assert try_shard_merge(table, self._make_state(ns), _MERGE_NOW_MS)
+
+        item = sync_repository.build_composite_adjust("user-1", "gpt-4", {"rpm": -1_000}, 3)
+        sync_repository.write_each([item])
+
+        assert _shard(table, ns, 3) == {}  # not recreated
+        assert _shard(table, ns, 1)["b_rpm_tk"] == 21_000  # 10 + 10 folded + 1 released
+
+        # After a second merge, shard 3's partner is gone too: the write ends on shard 0
+        assert try_shard_merge(table, self._make_state(ns, shard_count=2), _MERGE_NOW_MS)
+        sync_repository.write_each([item])
+
+        assert _shard(table, ns, 1) == {}
+        assert _shard(table, ns, 0)["b_rpm_tk"] == 42_000  # 20 + 21 folded + 1 released
+
+    def test_process_stream_records_merges(self, table, ns) -> None:
+        """A shard 0 record with high wcu tokens triggers the merge."""
+        for shard_id in range(2):
+            _seed_shard(table, ns, shard_id, 2, 10_000)
+        image = {
+            "PK": {"S": pk_bucket(ns, "user-1", "gpt-4", 0)},
+            "SK": {"S": sk_state()},
+            "entity_id": {"S": "user-1"},
+            "shard_count": {"N": "2"},
+            "rf": {"N": "1704067200000"},
+            "b_wcu_tk": {"N": "999000"},
+            "b_wcu_cp": {"N": "1000000"},
+            "b_wcu_ra": {"N": "1000000"},
+            "b_wcu_rp": {"N": "1000"},
+            "b_wcu_tc": {"N": "1000"},
+            "b_rpm_tk": {"N": "10000"},
+            "b_rpm_cp": {"N": "100000"},
+            "b_rpm_ra": {"N": "100000"},
+            "b_rpm_rp": {"N": "60000"},
+            "b_rpm_tc": {"N": "1000"},
+        }
+        old_image = {**image, "b_wcu_tc": {"N": "0"}, "b_rpm_tc": {"N": "0"}}
+        record = {"eventName": "MODIFY", "dynamodb": {"NewImage": image, "OldImage": old_image}}
+
+        with (
+            patch("zae_limiter_aggregator.processor.boto3.resource") as mock_resource,
+            patch("zae_limiter_aggregator.processor.update_snapshot"),
+        ):
+            mock_resource.return_value.Table.return_value = table
+            result = process_stream_records([record], table.name, ["hourly"])
+
+        assert result.errors == []
+        assert _shard(table, ns, 0)["shard_count"] == 1
+        assert _shard(table, ns, 1) == {}
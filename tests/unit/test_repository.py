@@ -1,12 +1,13 @@
 """Unit tests for Repository."""
 
+import asyncio
 import time
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from botocore.exceptions import ClientError
 
-from zae_limiter import AuditAction, Limit
+from zae_limiter import AuditAction, Limit, schema
 from zae_limiter.exceptions import EntityExistsError, InvalidIdentifierError
 from zae_limiter.models import BucketState
 from zae_limiter.repository import Repository
@@ -367,6 +368,35 @@ class TestRepositoryBucketOperations:
         assert entity is None  # never created via create_entity
         assert ("bare-1", "gpt-4", "rpm") in buckets  # bug returned {} here
 
+    @pytest.mark.asyncio
+    async def test_batch_get_entities_and_buckets(self, repo_with_buckets):
+        """META for several entities and their buckets come back from one call."""
+        entities, buckets = await repo_with_buckets.batch_get_entities_and_buckets(
+            ["entity-1", "entity-2", "missing"],
+            [("entity-1", "gpt-4"), ("entity-2", "gpt-4")],
+        )
+
+        assert set(entities) == {"entity-1", "entity-2"}
+        assert entities["entity-2"].parent_id == "entity-1"
+        assert ("entity-2", "gpt-4", "rpm") in buckets
+        cache = repo_with_buckets._entity_cache
+        assert cache[(repo_with_buckets._namespace_id, "entity-2")][:2] == (False, "entity-1")
+        assert cache[(repo_with_buckets._namespace_id, "missing")][:2] == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_get_cached_parent(self, repo):
+        """Only cached entities with cascade enabled report a parent."""
+        await repo.create_entity("parent-1")
+        await repo.create_entity("child-1", parent_id="parent-1", cascade=True)
+        await repo.create_entity("child-2", parent_id="parent-1")
+
+        assert repo.get_cached_parent("child-1") is None  # not cached yet
+
+        await repo.batch_get_entities_and_buckets(["child-1", "child-2"], [])
+
+        assert repo.get_cached_parent("child-1") == "parent-1"
+        assert repo.get_cached_parent("child-2") is None  # no cascade
+
     # -------------------------------------------------------------------------
     # batch_get_configs tests (issue #298)
     # -------------------------------------------------------------------------
@@ -473,11 +503,11 @@ class TestRepositoryBucketOperations:
 
 
 class TestRepositoryResourceAggregation:
-    """Tests for GSI2 resource queries."""
+    """Tests for GSI5 resource bucket queries."""
 
     @pytest.mark.asyncio
     async def test_get_resource_buckets_all_entities(self, repo_with_buckets):
-        """Should query all buckets for a resource via GSI2."""
+        """Should query all buckets for a resource via GSI5."""
         buckets = await repo_with_buckets.get_resource_buckets("gpt-4", "rpm")
 
         # Should get rpm buckets for both entities
@@ -504,6 +534,26 @@ class TestRepositoryResourceAggregation:
         assert all(b.limit_name == "rpm" for b in rpm_buckets)
         assert all(b.limit_name == "tpm" for b in tpm_buckets)
 
+    @pytest.mark.asyncio
+    async def test_bucket_items_keyed_for_keys_only_index(self, repo_with_buckets):
+        """Bucket items carry GSI5 keys and no GSI2 keys, so token writes skip GSI2."""
+        from zae_limiter import schema
+
+        client = await repo_with_buckets._get_client()
+        response = await client.get_item(
+            TableName=repo_with_buckets.table_name,
+            Key={
+                "PK": {
+                    "S": schema.pk_bucket(repo_with_buckets._namespace_id, "entity-1", "gpt-4", 0)
+                },
+                "SK": {"S": schema.sk_state()},
+            },
+        )
+        item = response["Item"]
+        assert "GSI2PK" not in item
+        assert "GSI2SK" not in item
+        assert item["GSI5SK"]["S"] == schema.gsi5_sk_bucket("entity-1", 0)
+
     @pytest.mark.asyncio
     async def test_get_resource_buckets_empty_result(self, repo):
         """Should return empty list when no buckets match."""
@@ -603,6 +653,76 @@ class TestRepositoryTransactions:
         entity = await repo.get_entity("we-test")
         assert entity is None
 
+    @pytest.mark.asyncio
+    async def test_write_each_dispatches_items_concurrently(self, repo):
+        """write_each overlaps independent writes instead of awaiting each in turn."""
+        client = await repo._get_client()
+        original_update = client.update_item
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_update(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            try:
+                return await original_update(**kwargs)
+            finally:
+                in_flight -= 1
+
+        items = [
+            repo.build_composite_adjust(entity_id=eid, resource="api", deltas={"rpm": 1000})
+            for eid in ("we-a", "we-b", "we-c")
+        ]
+        with patch.object(client, "update_item", side_effect=slow_update):
+            await repo.write_each(items)
+
+        assert max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_write_each_reports_partial_failures(self, repo):
+        """A failing item is reported by index while the other items are still written."""
+        from zae_limiter import PartialWriteError
+
+        adjust_item = repo.build_composite_adjust(
+            entity_id="we-ok", resource="api", deltas={"rpm": 1000}
+        )
+        failing_item = {
+            "Delete": {
+                "TableName": repo.table_name,
+                "Key": {"PK": {"S": "default/ENTITY#missing"}, "SK": {"S": "#META"}},
+                "ConditionExpression": "attribute_exists(PK)",
+            }
+        }
+
+        with pytest.raises(PartialWriteError) as exc_info:
+            await repo.write_each([failing_item, adjust_item])
+
+        assert set(exc_info.value.failures) == {0}
+        assert exc_info.value.item_count == 2
+        assert isinstance(exc_info.value.failures[0], ClientError)
+        # Item 1 was still written
+        client = await repo._get_client()
+        response = await client.get_item(
+            TableName=repo.table_name, Key=adjust_item["Update"]["Key"]
+        )
+        assert "Item" in response
+
+    @pytest.mark.asyncio
+    async def test_write_each_single_item_error_propagates(self, repo):
+        """A single item's error is raised unchanged, not wrapped."""
+        failing_item = {
+            "Delete": {
+                "TableName": repo.table_name,
+                "Key": {"PK": {"S": "default/ENTITY#missing"}, "SK": {"S": "#META"}},
+                "ConditionExpression": "attribute_exists(PK)",
+            }
+        }
+
+        with pytest.raises(ClientError):
+            await repo.write_each([failing_item])
+
     @pytest.mark.asyncio
     async def test_build_bucket_put_item_structure(self, repo):
         """build_bucket_put_item should create composite DynamoDB structure (ADR-114)."""
@@ -2743,6 +2863,182 @@ class TestRepositoryPing:
         assert result is False
 
 
+class TestRepositoryIOStats:
+    """Tests for consumed-capacity accounting."""
+
+    @pytest.mark.asyncio
+    async def test_disabled_by_default(self, repo):
+        """get_io_stats() returns None until enabled."""
+        assert repo.get_io_stats() is None
+        repo.reset_io_stats()  # no-op
+
+    @pytest.mark.asyncio
+    async def test_counts_calls(self, repo):
+        """Calls made after enable_io_stats() are counted per operation."""
+        repo.enable_io_stats()
+        await repo.create_entity("entity-1", name="Entity 1")
+        # create_entity() also reads the audit retention config
+        repo.reset_io_stats()
+        await repo.get_entity("entity-1")
+        await repo.get_entity("entity-1")
+
+        stats = repo.get_io_stats()
+        assert stats is not None
+        assert stats.operations["GetItem"].calls == 2
+
+        repo.reset_io_stats()
+        assert repo.get_io_stats().operations == {}
+
+    @pytest.mark.asyncio
+    async def test_shared_with_namespace(self, repo):
+        """Scoped repositories add to the parent's totals."""
+        repo.enable_io_stats()
+        await repo._register_namespace("tenant-a")
+        scoped = await repo.namespace("tenant-a")
+        repo.reset_io_stats()
+
+        await scoped.get_entity("entity-1")
+
+        assert repo.get_io_stats().operations["GetItem"].calls == 1
+
+
+class TestRepositoryClientConfig:
+    """Tests for DynamoDB client configuration."""
+
+    @pytest.mark.asyncio
+    async def test_default_client_config(self, repo):
+        """Without options the client uses botocore's default pool size."""
+        client = await repo._get_client()
+        assert client.meta.config.max_pool_connections == 10
+
+    @pytest.mark.asyncio
+    async def test_client_config_applied(self, mock_dynamodb):
+        """Client options are applied when the client is created."""
+        repo = Repository(name="test-repo", region="us-east-1", _skip_deprecation_warning=True)
+        repo._client_config = {"max_pool_connections": 64, "read_timeout": 3}
+        try:
+            config = (await repo._get_client()).meta.config
+            assert config.max_pool_connections == 64
+            assert config.read_timeout == 3
+        finally:
+            await repo.close()
+
+    @pytest.mark.asyncio
+    async def test_shared_with_namespace(self, repo):
+        """Scoped repositories use the parent's client options."""
+        repo._client_config = {"max_pool_connections": 64}
+        await repo._register_namespace("tenant-a")
+        scoped = await repo.namespace("tenant-a")
+        assert scoped._client_config == {"max_pool_connections": 64}
+
+
+class TestRepositoryWarm:
+    """Tests for warm() prefetching."""
+
+    @pytest.mark.asyncio
+    async def test_warm_fills_caches(self, repo_with_buckets):
+        """warm() fills the config and entity caches and reports what it loaded."""
+        repo = repo_with_buckets
+        await repo.set_resource_defaults("gpt-4", [Limit.per_minute("rpm", 500)])
+
+        result = await repo.warm(["entity-1", "entity-2"], ["gpt-4"], connections=2)
+
+        assert result.connections == 2
+        assert result.configs == 6  # system + resource + 2 entities x (gpt-4, _default_)
+        assert result.entities == 2
+        assert result.shard_counts == 2
+        assert result.requests == 3  # 2 pings + 1 batch of 10 keys
+        assert result.duration_s > 0
+        assert repo._entity_cache[(repo.namespace_id, "entity-2")] == (
+            False,
+            "entity-1",
+            {"gpt-4": 1},
+        )
+
+        misses = repo.get_cache_stats().misses
+        limits, _, source = await repo.resolve_limits("entity-2", "gpt-4")
+        assert source == "resource"
+        assert limits == [Limit.per_minute("rpm", 500)]
+        assert repo.get_cache_stats().misses == misses
+
+    @pytest.mark.asyncio
+    async def test_warm_unknown_entities(self, repo):
+        """Entities without META or buckets are cached as non-cascading."""
+        result = await repo.warm(["ghost"], ["gpt-4"], connections=0)
+
+        assert result.entities == 0
+        assert result.shard_counts == 0
+        assert repo._entity_cache[(repo.namespace_id, "ghost")] == (False, None, {})
+
+    @pytest.mark.asyncio
+    async def test_warm_chunks_batches(self, repo):
+        """Reads are split into BatchGetItem calls of 100 keys."""
+        entity_ids = [f"entity-{i}" for i in range(60)]
+
+        result = await repo.warm(entity_ids, ["gpt-4"], connections=0)
+
+        # 1 + 1 + 60 x 2 config keys and 60 x 2 entity keys -> 3 batches
+        assert result.requests == 3
+        assert len(repo._entity_cache) == 60
+
+    @pytest.mark.asyncio
+    async def test_warm_retries_unprocessed_keys(self, repo_with_buckets, monkeypatch):
+        """Keys returned in UnprocessedKeys are retried until read."""
+        repo = repo_with_buckets
+        monkeypatch.setattr("zae_limiter.repository._BATCH_GET_BACKOFF_S", 0)
+        client = await repo._get_client()
+        real_batch_get = client.batch_get_item
+        calls = []
+
+        async def throttled_once(**kwargs):
+            keys = kwargs["RequestItems"][repo.table_name]["Keys"]
+            calls.append(len(keys))
+            if len(calls) > 1:
+                return await real_batch_get(**kwargs)
+            return {"Responses": {}, "UnprocessedKeys": {repo.table_name: {"Keys": keys}}}
+
+        monkeypatch.setattr(client, "batch_get_item", throttled_once)
+
+        result = await repo.warm(["entity-1"], ["gpt-4"], connections=0)
+
+        assert calls == [6, 6]
+        assert result.requests == 2
+        assert result.unprocessed == 0
+        assert result.entities == 1
+        assert result.configs == 4
+
+    @pytest.mark.asyncio
+    async def test_warm_skips_keys_left_unprocessed(self, repo_with_buckets, monkeypatch):
+        """Keys still unprocessed after retries are neither primed nor cached."""
+        repo = repo_with_buckets
+        monkeypatch.setattr("zae_limiter.repository._BATCH_GET_BACKOFF_S", 0)
+        client = await repo._get_client()
+        real_batch_get = client.batch_get_item
+        meta_key = (schema.pk_entity(repo.namespace_id, "entity-1"), schema.sk_meta())
+        system_key = (schema.pk_system(repo.namespace_id), schema.sk_config())
+
+        async def drop_keys(**kwargs):
+            keys = kwargs["RequestItems"][repo.table_name]["Keys"]
+            dropped = [k for k in keys if (k["PK"]["S"], k["SK"]["S"]) in (meta_key, system_key)]
+            kept = [k for k in keys if k not in dropped]
+            response = {"Responses": {}}
+            if kept:
+                response = await real_batch_get(RequestItems={repo.table_name: {"Keys": kept}})
+            response["UnprocessedKeys"] = {repo.table_name: {"Keys": dropped}}
+            return response
+
+        monkeypatch.setattr(client, "batch_get_item", drop_keys)
+
+        result = await repo.warm(["entity-1"], ["gpt-4"], connections=0)
+
+        assert result.unprocessed == 2
+        assert result.requests == 5
+        assert result.configs == 3
+        assert result.entities == 0
+        assert (repo.namespace_id, "entity-1") not in repo._entity_cache
+        assert repo._config_cache._system_defaults is None
+
+
 class TestCompositeLimitConfigConvenience:
     """Tests for convenience methods on composite limit configs."""
 
@@ -3091,6 +3387,86 @@ class TestCompositeNormalGuard:
         assert rpm_bucket.tokens_milli == 60_000
 
 
+class TestConditionFailureBuckets:
+    """Tests for reading ALL_OLD states from failed conditional writes."""
+
+    async def _create(self, repo, entity_id: str, now_ms: int) -> None:
+        state = BucketState.from_limit(entity_id, "gpt-4", Limit.per_minute("rpm", 100), now_ms)
+        await repo.transact_write(
+            [repo.build_composite_create(entity_id, "gpt-4", [state], now_ms)]
+        )
+
+    def _normal(self, repo, entity_id: str, now_ms: int, expected_rf: int) -> dict:
+        return repo.build_composite_normal(
+            entity_id=entity_id,
+            resource="gpt-4",
+            consumed={"rpm": 1000},
+            refill_amounts={"rpm": 0},
+            now_ms=now_ms,
+            expected_rf=expected_rf,
+        )
+
+    async def test_single_item_lost_lock(self, repo):
+        """A single-item normal write returns the stored state on a lost lock."""
+        now_ms = int(time.time() * 1000)
+        await self._create(repo, "e1", now_ms)
+
+        with pytest.raises(ClientError) as exc_info:
+            await repo.transact_write([self._normal(repo, "e1", now_ms + 10, now_ms - 1)])
+
+        failed = repo.condition_failure_buckets(exc_info.value)
+        assert list(failed) == [0]
+        rpm = next(b for b in failed[0] if b.limit_name == "rpm")
+        assert (rpm.tokens_milli, rpm.last_refill_ms) == (100_000, now_ms)
+
+    async def test_transaction_reports_failed_item_index(self, repo):
+        """A cancelled transaction maps each failed item to its stored state."""
+        now_ms = int(time.time() * 1000)
+        await self._create(repo, "e1", now_ms)
+        await self._create(repo, "e2", now_ms)
+
+        with pytest.raises(ClientError) as exc_info:
+            await repo.transact_write(
+                [
+                    self._normal(repo, "e1", now_ms + 10, now_ms),
+                    self._normal(repo, "e2", now_ms + 10, now_ms - 1),
+                ]
+            )
+
+        failed = repo.condition_failure_buckets(exc_info.value)
+        assert list(failed) == [1]
+        assert {b.entity_id for b in failed[1]} == {"e2"}
+
+    async def test_create_race_returns_existing_item(self, repo):
+        """A create that lost the race returns the winner's item."""
+        now_ms = int(time.time() * 1000)
+        await self._create(repo, "e1", now_ms)
+
+        with pytest.raises(ClientError) as exc_info:
+            await self._create(repo, "e1", now_ms + 10)
+
+        failed = repo.condition_failure_buckets(exc_info.value)
+        rpm = next(b for b in failed[0] if b.limit_name == "rpm")
+        assert rpm.last_refill_ms == now_ms
+
+    async def test_missing_item_has_no_state(self, repo):
+        """A normal write to a missing item fails without a stored state."""
+        now_ms = int(time.time() * 1000)
+
+        with pytest.raises(ClientError) as exc_info:
+            await repo.transact_write([self._normal(repo, "e1", now_ms, now_ms)])
+
+        assert repo.condition_failure_buckets(exc_info.value) == {0: None}
+
+    async def test_other_errors(self, repo):
+        """Errors that are not condition failures carry no states."""
+        assert repo.condition_failure_buckets(RuntimeError("boom")) == {}
+        throttled = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "UpdateItem"
+        )
+        assert repo.condition_failure_buckets(throttled) == {}
+
+
 class TestGSI4Attributes:
     """Test GSI4PK/GSI4SK on all creation paths."""
 
@@ -225,6 +225,84 @@ class TestBuilderBuild:
             finally:
                 await repo.close()
 
+    @pytest.mark.asyncio
+    async def test_build_applies_config_cache_refresh(self, mock_dynamodb):
+        """build() and namespace() carry refresh-ahead into the config cache."""
+        await _create_table("test-refresh")
+
+        builder = RepositoryBuilder().stack("test-refresh").config_cache_refresh(10, 30)
+        repo = await builder.build()
+        try:
+            assert repo._config_cache.refresh_ahead_seconds == 10
+            assert repo._config_cache.max_staleness_seconds == 30
+            await repo._register_namespace("tenant-a")
+            scoped = await repo.namespace("tenant-a")
+            assert scoped._config_cache.refresh_ahead_seconds == 10
+            assert scoped._config_cache.max_staleness_seconds == 30
+        finally:
+            await repo.close()
+
+    @pytest.mark.asyncio
+    async def test_build_applies_cache_bounds(self, mock_dynamodb):
+        """build() bounds the entity cache and the config cache's entity map."""
+        await _create_table("test-bounds")
+
+        builder = (
+            RepositoryBuilder()
+            .stack("test-bounds")
+            .config_cache_max_entries(1000)
+            .entity_cache(max_entries=500, ttl=300)
+        )
+        repo = await builder.build()
+        try:
+            assert repo._config_cache._entity_limits.max_entries == 1000
+            assert repo._entity_cache.max_entries == 500
+            assert repo._entity_cache.ttl_seconds == 300
+            await repo._register_namespace("tenant-a")
+            scoped = await repo.namespace("tenant-a")
+            assert scoped._config_cache._entity_limits.max_entries == 1000
+            assert scoped._entity_cache is repo._entity_cache
+        finally:
+            await repo.close()
+
+    @pytest.mark.asyncio
+    async def test_build_enables_io_stats(self, mock_dynamodb):
+        """build() enables consumed-capacity accounting when requested."""
+        await _create_table("test-io-stats")
+
+        repo = await RepositoryBuilder().stack("test-io-stats").io_stats().build()
+        try:
+            stats = repo.get_io_stats()
+            assert stats is not None
+            # The namespace lookup during build is already counted
+            assert stats.operations
+        finally:
+            await repo.close()
+
+    @pytest.mark.asyncio
+    async def test_build_applies_client_config(self, mock_dynamodb):
+        """build() passes pool, timeout and retry options to the DynamoDB client."""
+        await _create_table("test-client-config")
+
+        repo = await (
+            RepositoryBuilder()
+            .stack("test-client-config")
+            .connection_pool(50, tcp_keepalive=True)
+            .timeouts(connect=2, read=5)
+            .retries(5, mode="adaptive")
+            .build()
+        )
+        try:
+            config = (await repo._get_client()).meta.config
+            assert config.max_pool_connections == 50
+            assert config.tcp_keepalive is True
+            assert config.connect_timeout == 2
+            assert config.read_timeout == 5
+            assert config.retries["mode"] == "adaptive"
+            assert config.retries["total_max_attempts"] == 5
+        finally:
+            await repo.close()
+
     @pytest.mark.asyncio
     async def test_build_registers_default_namespace(self, mock_dynamodb):
         """build() registers the 'default' namespace."""
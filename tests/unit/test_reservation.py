@@ -0,0 +1,232 @@
+"""Tests for client-side reservation block bookkeeping."""
+
+import pytest
+
+from zae_limiter import Limit
+from zae_limiter.models import BucketState
+from zae_limiter.reservation import ReservationConfig, ReservationPool, ReservedBucket
+
+KEY = ("entity-1", "gpt-4")
+
+
+def _bucket(remaining: dict[str, int], capacity: int = 100) -> ReservedBucket:
+    states = [
+        BucketState.from_limit("entity-1", "gpt-4", Limit.per_minute(name, capacity), 0)
+        for name in remaining
+    ]
+    return ReservedBucket(
+        entity_id="entity-1",
+        resource="gpt-4",
+        shard_id=0,
+        states=states,
+        remaining=dict(remaining),
+    )
+
+
+class TestReservationConfig:
+    """Tests for ReservationConfig validation."""
+
+    def test_defaults(self):
+        """Default config is valid."""
+        config = ReservationConfig()
+        assert config.window_seconds == 1.0
+        assert config.min_block <= config.max_block
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"window_seconds": 0},
+            {"min_block": 1},
+            {"min_block": 10, "max_block": 5},
+            {"max_capacity_fraction": 0},
+            {"max_capacity_fraction": 1.5},
+            {"max_keys": 0},
+        ],
+    )
+    def test_invalid(self, kwargs):
+        """Invalid values raise ValueError."""
+        with pytest.raises(ValueError):
+            ReservationConfig(**kwargs)
+
+
+class TestBlockSizing:
+    """Tests for rate-adaptive block sizing."""
+
+    def test_unknown_key_has_no_block(self):
+        """Keys never observed are not worth a block."""
+        pool = ReservationPool()
+        assert pool.block_multiplier(KEY, now=100.0) == 0
+
+    def test_cold_key_below_min_block(self):
+        """A key with a low rate keeps using the regular path."""
+        pool = ReservationPool(config=ReservationConfig(window_seconds=1.0, min_block=4))
+        pool.observe(KEY, now=0.0)
+        pool.observe(KEY, now=1.0)
+        assert pool.block_multiplier(KEY, now=1.0) == 0
+
+    def test_hot_key_scales_with_rate(self):
+        """Block size follows the observed request rate."""
+        pool = ReservationPool(config=ReservationConfig(window_seconds=1.0, max_block=100))
+        for i in range(21):
+            pool.observe(KEY, now=i * 0.05)  # 20 req/s over one window
+        assert 8 <= pool.block_multiplier(KEY, now=1.0) <= 20
+
+    def test_clamped_to_max_block(self):
+        """Block size never exceeds max_block."""
+        pool = ReservationPool(config=ReservationConfig(min_block=2, max_block=5))
+        for i in range(1001):
+            pool.observe(KEY, now=i * 0.001)
+        assert pool.block_multiplier(KEY, now=1.0) == 5
+
+    def test_capped_by_capacity_fraction(self):
+        """Reserved amounts are capped by the last known capacity."""
+        pool = ReservationPool(config=ReservationConfig(max_capacity_fraction=0.1))
+        pool.observe(KEY, now=0.0)
+        pool.put(KEY, [_bucket({"rpm": 0}, capacity=100)], now=0.0)
+
+        amounts = pool.capped_amounts(KEY, {"rpm": 2}, multiplier=50)
+
+        assert amounts == {"rpm": 10}
+
+    def test_capped_never_below_request(self):
+        """A capacity cap never reserves less than the request itself."""
+        pool = ReservationPool(config=ReservationConfig(max_capacity_fraction=0.1))
+        pool.observe(KEY, now=0.0)
+        pool.put(KEY, [_bucket({"rpm": 0}, capacity=10)], now=0.0)
+
+        assert pool.capped_amounts(KEY, {"rpm": 5}, multiplier=10) == {"rpm": 5}
+
+    def test_failure_sizes_next_block(self):
+        """A failed reservation's ALL_OLD caps the next block at capacity and tokens."""
+        pool = ReservationPool(config=ReservationConfig(max_capacity_fraction=0.5))
+        pool.observe(KEY, now=0.0)
+        old = _bucket({"rpm": 0}, capacity=100).states
+        old[0].tokens_milli = 30_000
+
+        pool.record_failure(KEY, old, now=0.0)
+
+        assert pool.capped_amounts(KEY, {"rpm": 2}, multiplier=50) == {"rpm": 30}
+        pool.put(KEY, [_bucket({"rpm": 0}, capacity=100)], now=0.0)
+        assert pool.capped_amounts(KEY, {"rpm": 2}, multiplier=50) == {"rpm": 50}
+
+    def test_failure_backoff_doubles(self):
+        """Consecutive failures back off for 1, 2, 4 windows; a block resets it."""
+        pool = ReservationPool(config=ReservationConfig(window_seconds=1.0))
+        pool.observe(KEY, now=0.0)
+
+        pool.record_failure(KEY, now=0.0)
+        assert pool.backing_off(KEY, now=0.5)
+        assert not pool.backing_off(KEY, now=1.0)
+        pool.record_failure(KEY, now=1.0)
+        assert pool.backing_off(KEY, now=2.5)
+        assert not pool.backing_off(KEY, now=3.0)
+        pool.record_failure(KEY, now=3.0)
+        assert pool.backing_off(KEY, now=6.5)
+
+        pool.put(KEY, [_bucket({"rpm": 5})], now=7.0)
+        assert not pool.backing_off(KEY, now=7.0)
+        assert pool.stats.reserve_failures == 3
+        assert pool.stats.backed_off == 3
+
+
+class TestServing:
+    """Tests for serving requests from a block."""
+
+    def test_take_debits_all_buckets(self):
+        """take() debits child and parent buckets."""
+        pool = ReservationPool()
+        child = _bucket({"rpm": 5})
+        parent = _bucket({"rpm": 5})
+        pool.put(KEY, [child, parent], now=0.0)
+
+        served = pool.take(KEY, {"rpm": 2}, now=0.1)
+
+        assert served is not None
+        assert child.remaining == {"rpm": 3}
+        assert parent.remaining == {"rpm": 3}
+        assert pool.stats.served == 1
+
+    def test_take_requires_every_limit(self):
+        """A block without enough tokens for any limit is not served."""
+        pool = ReservationPool()
+        pool.put(KEY, [_bucket({"rpm": 5, "tpm": 10})], now=0.0)
+
+        assert pool.take(KEY, {"rpm": 1, "tpm": 11}, now=0.1) is None
+        assert pool.take(KEY, {"other": 1}, now=0.1) is None
+
+    def test_expired_block_not_served(self):
+        """Blocks past their window are never served."""
+        pool = ReservationPool(config=ReservationConfig(window_seconds=1.0))
+        pool.put(KEY, [_bucket({"rpm": 5})], now=0.0)
+
+        assert pool.take(KEY, {"rpm": 1}, now=1.5) is None
+
+    def test_put_returns_displaced_block(self):
+        """Replacing a block hands back the old one for release."""
+        pool = ReservationPool()
+        first = [_bucket({"rpm": 5})]
+        pool.put(KEY, first, now=0.0)
+
+        displaced = pool.put(KEY, [_bucket({"rpm": 5})], now=0.1)
+
+        assert displaced is not None
+        assert displaced.buckets is first
+
+
+class TestRelease:
+    """Tests for expiry, draining, and release accounting."""
+
+    def test_release_deltas(self):
+        """Unserved tokens become negative (token-returning) millitoken deltas."""
+        bucket = _bucket({"rpm": 3, "tpm": 0})
+        assert bucket.release_deltas() == {"rpm": -3000}
+
+    def test_sweep_returns_expired_blocks(self):
+        """sweep() removes expired blocks and rate-limits itself to once per window."""
+        pool = ReservationPool(config=ReservationConfig(window_seconds=1.0))
+        pool.put(KEY, [_bucket({"rpm": 5})], now=0.0)
+        pool.put(("entity-2", "gpt-4"), [_bucket({"rpm": 5})], now=0.9)
+
+        expired = pool.sweep(now=1.5)
+
+        assert len(expired) == 1
+        assert pool.sweep(now=2.0) == []  # within one window of the last sweep
+        assert len(pool.sweep(now=2.6)) == 1
+
+    def test_sweep_prunes_idle_trackers(self):
+        """Trackers idle for many windows are dropped."""
+        pool = ReservationPool(config=ReservationConfig(window_seconds=1.0))
+        pool.observe(KEY, now=0.0)
+
+        pool.sweep(now=100.0)
+
+        assert pool._trackers == {}
+
+    def test_drain_returns_all_blocks(self):
+        """drain() empties the pool."""
+        pool = ReservationPool()
+        pool.put(KEY, [_bucket({"rpm": 5})], now=0.0)
+        pool.put(("entity-2", "gpt-4"), [_bucket({"rpm": 5})], now=0.0)
+
+        assert len(pool.drain()) == 2
+        assert pool.take(KEY, {"rpm": 1}, now=0.0) is None
+
+    def test_record_release(self):
+        """Release counters track blocks and returned tokens."""
+        pool = ReservationPool()
+        pool.put(KEY, [_bucket({"rpm": 5}), _bucket({"rpm": 5})], now=0.0)
+        block = pool.drain()[0]
+
+        pool.record_release(block)
+
+        assert pool.stats.as_dict()["released"] == 1
+        assert pool.stats.released_tokens == 10
+
+    def test_tracker_eviction(self):
+        """Tracker map is bounded by max_keys."""
+        pool = ReservationPool(config=ReservationConfig(max_keys=4))
+        for i in range(10):
+            pool.observe((f"entity-{i}", "gpt-4"), now=float(i))
+
+        assert len(pool._trackers) <= 4
+        assert ("entity-9", "gpt-4") in pool._trackers
@@ -356,6 +356,20 @@ class TestGetTableDefinitionGSI4:
         assert "GSI3" in gsi_names
 
 
+class TestGetTableDefinitionGSI5:
+    """Test that get_table_definition() includes the KEYS_ONLY GSI5."""
+
+    def test_gsi5_keys_only(self):
+        defn = get_table_definition("test-table")
+        attr_names = [a["AttributeName"] for a in defn["AttributeDefinitions"]]
+        assert "GSI5PK" in attr_names
+        assert "GSI5SK" in attr_names
+        gsi5 = next(g for g in defn["GlobalSecondaryIndexes"] if g["IndexName"] == "GSI5")
+        key_schema = {k["AttributeName"]: k["KeyType"] for k in gsi5["KeySchema"]}
+        assert key_schema == {"GSI5PK": "HASH", "GSI5SK": "RANGE"}
+        assert gsi5["Projection"]["ProjectionType"] == "KEYS_ONLY"
+
+
 # =============================================================================
 # Step 7: get_table_definition() includes LSIs (ADR-123)
 # =============================================================================
@@ -496,6 +510,11 @@ class TestBucketPKBuilders:
         assert gsi2_sk_bucket("user-1", 0) == "BUCKET#user-1#0"
         assert gsi2_sk_bucket("user-1", 3) == "BUCKET#user-1#3"
 
+    def test_gsi5_keys(self):
+        assert schema.gsi5_pk_resource("ns1", "gpt-4") == "ns1/RESOURCE#gpt-4"
+        assert schema.gsi5_sk_bucket("user-1", 0) == "BUCKET#user-1#0"
+        assert schema.gsi5_sk_bucket("user-1", 3) == "BUCKET#user-1#3"
+
 
 class TestWCULimitConstants:
     """Tests for WCU infrastructure limit constants."""
@@ -0,0 +1,90 @@
+"""Tests for load-aware shard selection."""
+
+from unittest.mock import patch
+
+from zae_limiter import schema
+from zae_limiter.models import BucketState, Limit
+from zae_limiter.shard_balance import ShardBalance
+
+KEY = ("ns", "entity-1", "gpt-4")
+NOW_MS = 1_700_000_000_000
+
+
+def _shard(rpm_tokens: int, wcu_tokens: int = 1000, last_refill_ms: int = NOW_MS) -> list:
+    rpm = BucketState.from_limit("entity-1", "gpt-4", Limit.per_minute("rpm", 100), NOW_MS)
+    rpm.tokens_milli = rpm_tokens * 1000
+    rpm.last_refill_ms = last_refill_ms
+    wcu = BucketState(
+        entity_id="entity-1",
+        resource="gpt-4",
+        limit_name=schema.WCU_LIMIT_NAME,
+        tokens_milli=wcu_tokens * 1000,
+        last_refill_ms=NOW_MS,
+        capacity_milli=schema.WCU_LIMIT_CAPACITY * 1000,
+        refill_amount_milli=schema.WCU_LIMIT_CAPACITY * 1000,
+        refill_period_ms=1000,
+    )
+    return [rpm, wcu]
+
+
+class TestShardBalance:
+    """Tests for ShardBalance.choose()."""
+
+    def test_unknown_bucket_picks_any_shard(self):
+        """Without estimates every shard is a candidate."""
+        balance = ShardBalance()
+
+        picks = {balance.choose(KEY, 4, {"rpm": 1}, NOW_MS) for _ in range(200)}
+
+        assert picks == {0, 1, 2, 3}
+
+    def test_exhausted_shard_never_picked(self):
+        """Shards whose stored tokens cannot cover the request are avoided."""
+        balance = ShardBalance()
+        balance.record(KEY, 0, _shard(rpm_tokens=0))
+        balance.record(KEY, 1, _shard(rpm_tokens=50))
+
+        picks = {balance.choose(KEY, 2, {"rpm": 1}, NOW_MS) for _ in range(50)}
+
+        assert picks == {1}
+
+    def test_wcu_exhausted_shard_avoided(self):
+        """A shard without WCU tokens fails the write even with app tokens."""
+        balance = ShardBalance()
+        balance.record(KEY, 0, _shard(rpm_tokens=100, wcu_tokens=0))
+
+        picks = {balance.choose(KEY, 2, {"rpm": 1}, NOW_MS) for _ in range(50)}
+
+        assert picks == {1}
+
+    def test_two_choices_prefer_headroom(self):
+        """Between two covering shards the one with more headroom wins."""
+        balance = ShardBalance()
+        balance.record(KEY, 0, _shard(rpm_tokens=10))
+        balance.record(KEY, 1, _shard(rpm_tokens=90))
+
+        assert balance.choose(KEY, 2, {"rpm": 1}, NOW_MS) == 1
+
+    def test_all_short_picks_most_refilled(self):
+        """When no shard covers the request, pick the one refill helps most."""
+        balance = ShardBalance()
+        balance.record(KEY, 0, _shard(rpm_tokens=0, last_refill_ms=NOW_MS))
+        balance.record(KEY, 1, _shard(rpm_tokens=0, last_refill_ms=NOW_MS - 30_000))
+
+        assert balance.choose(KEY, 2, {"rpm": 1}, NOW_MS) == 1
+
+    def test_excluded_shards_skipped(self):
+        """Already-tried shards are never picked again."""
+        balance = ShardBalance()
+
+        assert balance.choose(KEY, 3, {"rpm": 1}, NOW_MS, exclude={0, 2}) == 1
+        assert balance.choose(KEY, 2, {"rpm": 1}, NOW_MS, exclude={0, 1}) is None
+
+    def test_forget_drops_estimates(self):
+        """forget() returns the bucket to uniform selection."""
+        balance = ShardBalance()
+        balance.record(KEY, 0, _shard(rpm_tokens=0))
+        balance.forget(KEY)
+
+        with patch("zae_limiter.shard_balance.random.choice", side_effect=lambda s: s[0]):
+            assert balance.choose(KEY, 2, {"rpm": 1}, NOW_MS) == 0
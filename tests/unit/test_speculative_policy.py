@@ -0,0 +1,94 @@
+"""Tests for the adaptive speculative-write policy."""
+
+import pytest
+
+from zae_limiter import SpeculativePolicyConfig
+from zae_limiter.repository_protocol import SpeculativeFailureReason
+from zae_limiter.speculative_policy import SpeculativePolicy
+
+
+class TestSpeculativePolicyConfig:
+    """Tests for SpeculativePolicyConfig validation."""
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"min_success_rate": 1.5},
+            {"smoothing": 0},
+            {"probe_every": 0},
+            {"max_entries": 0},
+        ],
+    )
+    def test_invalid(self, kwargs):
+        """Invalid values raise ValueError."""
+        with pytest.raises(ValueError):
+            SpeculativePolicyConfig(**kwargs)
+
+
+class TestSpeculativePolicy:
+    """Tests for per-bucket success tracking."""
+
+    def test_unknown_bucket_speculates(self):
+        """Buckets without history always try the speculative write."""
+        policy = SpeculativePolicy()
+
+        assert policy.should_speculate("entity-1", "gpt-4")
+        assert policy.bucket_stats("entity-1", "gpt-4") is None
+
+    def test_success_rate_is_smoothed(self):
+        """One fallback among successes does not bypass the bucket."""
+        policy = SpeculativePolicy(config=SpeculativePolicyConfig(smoothing=0.2))
+        for _ in range(4):
+            policy.record_outcome("entity-1", "gpt-4", fast=True)
+        policy.record_outcome("entity-1", "gpt-4", fast=False)
+
+        assert policy.bucket_stats("entity-1", "gpt-4").success_rate == pytest.approx(0.8)
+        assert policy.should_speculate("entity-1", "gpt-4")
+
+    def test_failing_bucket_bypassed_then_probed(self):
+        """A bucket below min_success_rate is skipped except for probes."""
+        policy = SpeculativePolicy(config=SpeculativePolicyConfig(smoothing=0.5, probe_every=4))
+        for _ in range(3):
+            policy.record_outcome("entity-1", "gpt-4", fast=False)
+
+        decisions = [policy.should_speculate("entity-1", "gpt-4") for _ in range(8)]
+
+        assert decisions == [False, False, False, True] * 2
+        stats = policy.stats
+        assert (stats.skipped, stats.probes) == (6, 2)
+        assert policy.bucket_stats("entity-1", "gpt-4").skipped == 6
+
+    def test_recovered_probe_restores_fast_path(self):
+        """Successful probes lift the rate back above the threshold."""
+        policy = SpeculativePolicy(config=SpeculativePolicyConfig(smoothing=1.0))
+        policy.record_outcome("entity-1", "gpt-4", fast=False)
+        assert not policy.should_speculate("entity-1", "gpt-4")
+
+        policy.record_outcome("entity-1", "gpt-4", fast=True)
+
+        assert policy.should_speculate("entity-1", "gpt-4")
+
+    def test_failure_reasons_counted(self):
+        """Failure reasons are counted per bucket and in aggregate."""
+        policy = SpeculativePolicy()
+        policy.record_failure("entity-1", "gpt-4", SpeculativeFailureReason.BUCKET_MISSING)
+        policy.record_failure("entity-1", "gpt-4", SpeculativeFailureReason.WCU_EXHAUSTED)
+        policy.record_failure("entity-2", "gpt-4", SpeculativeFailureReason.WCU_EXHAUSTED)
+        policy.record_failure("entity-2", "gpt-4", None)
+
+        assert policy.bucket_stats("entity-1", "gpt-4").failure_reasons == {
+            "bucket_missing": 1,
+            "wcu_exhausted": 1,
+        }
+        stats = policy.stats
+        assert (stats.bucket_missing, stats.wcu_exhausted, stats.size) == (1, 2, 2)
+
+    def test_least_recently_used_evicted(self):
+        """Entries beyond max_entries are evicted oldest first."""
+        policy = SpeculativePolicy(config=SpeculativePolicyConfig(max_entries=2))
+        for entity_id in ("entity-1", "entity-2", "entity-3"):
+            policy.record_outcome(entity_id, "gpt-4", fast=True)
+
+        assert policy.bucket_stats("entity-1", "gpt-4") is None
+        assert policy.stats.evictions == 1
+        assert policy.stats.size == 2
@@ -10,6 +10,8 @@ import threading
 import time
 from unittest.mock import MagicMock, Mock
 
+import pytest
+
 from zae_limiter.models import Limit, OnUnavailableAction
 from zae_limiter.sync_config_cache import _NO_CONFIG, CacheStats, SyncConfigCache
 
@@ -29,7 +31,19 @@ class TestCacheStats:
         """Test CacheStats.as_dict() returns expected format."""
         stats = CacheStats(hits=100, misses=10, size=5, ttl_seconds=60)
         result = stats.as_dict()
-        assert result == {"hits": 100, "misses": 10, "size": 5, "ttl": 60}
+        assert result == {
+            "hits": 100,
+            "misses": 10,
+            "size": 5,
+            "ttl": 60,
+            "stale_hits": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "evictions": 0,
+            "entity_cache_size": 0,
+            "entity_cache_evictions": 0,
+            "entity_cache_expirations": 0,
+        }
 
 
 class TestConfigCacheBasics:
@@ -300,6 +314,20 @@ class TestConfigCacheStats:
         cache.get_entity_limits("user-1", "gpt-4", entity_fetch)
         assert cache.get_stats().size == 3
 
+    def test_max_entries_evicts_least_recently_used(self) -> None:
+        """Entity configs beyond max_entries are evicted in LRU order and counted."""
+        cache = SyncConfigCache(ttl_seconds=60, max_entries=2)
+        entity_fetch = MagicMock(return_value=[Limit.per_minute("tpm", 1000)])
+        cache.get_entity_limits("user-1", "gpt-4", entity_fetch)
+        cache.get_entity_limits("user-2", "gpt-4", entity_fetch)
+        cache.get_entity_limits("user-1", "gpt-4", entity_fetch)
+        cache.get_entity_limits("user-3", "gpt-4", entity_fetch)
+        assert ("default", "user-1", "gpt-4") in cache._entity_limits
+        assert ("default", "user-2", "gpt-4") not in cache._entity_limits
+        stats = cache.get_stats()
+        assert stats.size == 2
+        assert stats.evictions == 1
+
 
 class TestConfigCacheThreadSafety:
     """Tests for thread safety."""
@@ -594,3 +622,205 @@ class TestConfigCacheResolveLimits:
         limits, on_unavailable, source = cache.resolve_limits("user-1", "gpt-4", batch_fn)
         assert limits is None
         assert source is None
+
+
+class TestConfigCacheSingleFlight:
+    """Tests for per-key single-flight config resolution."""
+
+    @staticmethod
+    def _system_items(keys):
+        from zae_limiter import schema
+
+        system_key = (schema.pk_system("default"), schema.sk_config())
+        return {system_key: ([Limit.per_minute("rpm", 100)], None)} if system_key in keys else {}
+
+    def test_sync_threads_share_one_fetch(self) -> None:
+        """Threads missing on the same key share one batch call."""
+        from zae_limiter import SyncConfigCache
+
+        cache = SyncConfigCache(ttl_seconds=60)
+        calls = 0
+        lock = threading.Lock()
+        barrier = threading.Barrier(4)
+
+        def batch_fn(keys):
+            nonlocal calls
+            with lock:
+                calls += 1
+            time.sleep(0.05)
+            return self._system_items(keys)
+
+        def worker() -> None:
+            barrier.wait()
+            cache.resolve_limits("user-1", "gpt-4", batch_fn)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert calls == 1
+
+
+def _age_entries(cache, seconds: float) -> None:
+    """Move every cached entry's expiry `seconds` into the past."""
+    for store in (cache._resource_defaults, cache._entity_limits):
+        for key in list(store):
+            entry = store[key]
+            store[key] = entry._replace(expires_at=entry.expires_at - seconds)
+    if cache._system_defaults is not None:
+        entry = cache._system_defaults
+        cache._system_defaults = entry._replace(expires_at=entry.expires_at - seconds)
+
+
+class TestConfigCacheRefreshAhead:
+    """Tests for background refresh-ahead in resolve_limits()."""
+
+    @staticmethod
+    def _system_items(keys, capacity: int = 100):
+        from zae_limiter import schema
+
+        system_key = (schema.pk_system("default"), schema.sk_config())
+        if system_key not in keys:
+            return {}
+        return {system_key: ([Limit.per_minute("rpm", capacity)], None)}
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"refresh_ahead_seconds": -1},
+            {"max_staleness_seconds": -1},
+            {"refresh_ahead_seconds": 60},
+        ],
+    )
+    def test_invalid_settings(self, kwargs) -> None:
+        """Negative windows or a refresh window >= TTL are rejected."""
+        with pytest.raises(ValueError):
+            SyncConfigCache(ttl_seconds=60, **kwargs)
+
+    def test_disabled_by_default(self) -> None:
+        """Without refresh-ahead, an expired entry is fetched inline."""
+        cache = SyncConfigCache(ttl_seconds=60)
+        batch_fn = MagicMock(side_effect=lambda keys: self._system_items(keys))
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 61)
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        assert batch_fn.call_count == 2
+        assert cache.get_stats().refreshes == 0
+
+    def test_max_staleness_is_hard_cutoff(self) -> None:
+        """Past the staleness window the caller fetches inline."""
+        cache = SyncConfigCache(ttl_seconds=60, max_staleness_seconds=30)
+        batch_fn = MagicMock(side_effect=lambda keys: self._system_items(keys))
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 100)
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        assert batch_fn.call_count == 2
+        assert cache.get_stats().refreshes == 0
+
+    def test_sync_refresh_runs_in_thread(self) -> None:
+        """The sync cache refreshes on a background thread."""
+        from zae_limiter import SyncConfigCache
+
+        cache = SyncConfigCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        refreshed = threading.Event()
+        calls = 0
+
+        def batch_fn(keys):
+            nonlocal calls
+            calls += 1
+            if calls > 1:
+                assert threading.current_thread().name.startswith("zae-limiter-config-refresh")
+                refreshed.set()
+            return self._system_items(keys)
+
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        _age_entries(cache, 55)
+        cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        assert refreshed.wait(timeout=5)
+        deadline = time.monotonic() + 5
+        while cache._inflight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.get_stats().refreshes == 1
+        assert cache._inflight == {}
+
+    def test_sync_refresh_pool_is_bounded(self) -> None:
+        """Many keys due at once share a small pool, which close() shuts down."""
+        from zae_limiter import SyncConfigCache
+
+        cache = SyncConfigCache(ttl_seconds=60, refresh_ahead_seconds=10)
+        release = threading.Event()
+        refresh_threads: set[str] = set()
+
+        def batch_fn(keys):
+            if cache._refresh_pool is not None:
+                refresh_threads.add(threading.current_thread().name)
+                release.wait(timeout=5)
+            return self._system_items(keys)
+
+        for i in range(20):
+            cache.resolve_limits(f"user-{i}", "gpt-4", batch_fn)
+        _age_entries(cache, 55)
+        for i in range(20):
+            cache.resolve_limits(f"user-{i}", "gpt-4", batch_fn)
+        pool = cache._refresh_pool
+        release.set()
+        cache.close()
+        pool.shutdown(wait=True)
+        assert cache.get_stats().refreshes == 20
+        assert 1 <= len(refresh_threads) <= 4
+        assert cache._refresh_pool is None
+
+
+class TestConfigCachePrefetch:
+    """Tests for prefetch_keys() and prime() (SyncRepository.warm())."""
+
+    def test_prefetch_keys(self) -> None:
+        """Keys cover system, resource and entity configs."""
+        from zae_limiter import schema
+
+        cache = SyncConfigCache(ttl_seconds=60)
+        keys = cache.prefetch_keys(["user-1", "user-2"], ["gpt-4", "gpt-3.5"])
+        assert len(keys) == 1 + 2 + 2 * 3
+        assert (schema.pk_system("default"), schema.sk_config()) in keys
+        assert (schema.pk_resource("default", "gpt-4"), schema.sk_config()) in keys
+        assert (schema.pk_entity("default", "user-2"), schema.sk_config("_default_")) in keys
+        assert SyncConfigCache(ttl_seconds=0).prefetch_keys(["user-1"], ["gpt-4"]) == []
+
+    def test_prime_fills_cache(self) -> None:
+        """Primed slots are served without a fetch, including negative entries."""
+        from zae_limiter import schema
+
+        cache = SyncConfigCache(ttl_seconds=60)
+        resource_limits = [Limit.per_minute("rpm", 500)]
+        items = {
+            (schema.pk_resource("default", "gpt-4"), schema.sk_config()): (resource_limits, None)
+        }
+        filled = cache.prime(["user-1"], ["gpt-4"], items)
+        assert filled == 4
+        batch_fn = MagicMock(return_value={})
+        limits, _, source = cache.resolve_limits("user-1", "gpt-4", batch_fn)
+        assert limits == resource_limits
+        assert source == "resource"
+        batch_fn.assert_not_called()
+
+    def test_prime_disabled(self) -> None:
+        """prime() does nothing when caching is disabled."""
+        cache = SyncConfigCache(ttl_seconds=0)
+        assert cache.prime(["user-1"], ["gpt-4"], {}) == 0
+        assert cache.get_stats().size == 0
+
+    def test_missing_keys_skips_cached_slots(self) -> None:
+        """missing_keys() lists only the slots resolve_limits() would fetch."""
+        from zae_limiter import schema
+
+        cache = SyncConfigCache(ttl_seconds=60)
+        system_key = (schema.pk_system("default"), schema.sk_config())
+        cache.prime(["user-1"], ["gpt-4"], {system_key: ([Limit.per_minute("rpm", 1)], None)})
+        missing = cache.missing_keys([("user-1", "gpt-4"), ("user-2", "gpt-4")])
+        assert missing == [
+            (schema.pk_entity("default", "user-2"), schema.sk_config("gpt-4")),
+            (schema.pk_entity("default", "user-2"), schema.sk_config("_default_")),
+        ]
+        assert cache.get_stats().misses == 0
+        assert SyncConfigCache(ttl_seconds=0).missing_keys([("user-1", "gpt-4")]) == []
@@ -7,6 +7,7 @@ Changes should be made to the source file, then regenerated.
 """
 
 import time
+from dataclasses import replace
 from datetime import UTC, datetime
 from unittest.mock import MagicMock, patch
 
@@ -25,7 +26,18 @@ from zae_limiter import (
 )
 from zae_limiter.exceptions import InvalidIdentifierError, InvalidNameError, LeaseExpiredError
 from zae_limiter.infra.sync_discovery import SyncInfrastructureDiscovery
+from zae_limiter.instrumentation import (
+    AcquireOutcome,
+    AcquirePath,
+    AcquireTrace,
+    InMemoryAggregator,
+    InstrumentationListener,
+    current_trace,
+)
+from zae_limiter.local_rejection import BucketMirror, LocalRejectionConfig
 from zae_limiter.models import BucketState
+from zae_limiter.reservation import ReservationConfig, ReservationPool
+from zae_limiter.speculative_policy import SpeculativePolicy, SpeculativePolicyConfig
 from zae_limiter.sync_repository_protocol import SpeculativeResult
 
 
@@ -455,6 +467,7 @@ class TestLeaseRetryPath:
             "CancellationReasons": [{"Code": "ConditionalCheckFailed"}],
         }
         mock_repo.transact_write.side_effect = condition_exc
+        mock_repo.condition_failure_buckets = MagicMock(return_value={0: None})
         mock_repo.build_composite_normal.return_value = {"Update": {}}
         mock_repo.build_composite_retry.return_value = {"Update": {}}
         mock_repo._bucket_ttl_refill_multiplier = 7
@@ -497,6 +510,7 @@ class TestWriteOnEnter:
         repo.build_composite_create.return_value = {"Put": {}}
         repo.build_composite_retry.return_value = {"Update": {}}
         repo.build_composite_adjust.return_value = {"Update": {}}
+        repo.condition_failure_buckets = MagicMock(return_value={})
         repo._bucket_ttl_refill_multiplier = 7
         return repo
 
@@ -1021,6 +1035,74 @@ class TestRateLimiterCascade:
         available = sync_limiter.available(entity_id="orphan-1", resource="gpt-4", limits=limits)
         assert available["rpm"] == 99
 
+    def test_cascade_warm_metadata_reads_parent_in_one_batch(self, sync_limiter):
+        """Test that a cached cascade parent is read in the child's BatchGetItem."""
+        sync_limiter.create_entity(entity_id="proj-1")
+        sync_limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+        with sync_limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+            pass
+        assert sync_limiter._repository.get_cached_parent("key-1") == "proj-1"
+        sync_limiter._speculative_writes = False
+        repo = sync_limiter._repository
+        with (
+            patch.object(
+                repo, "batch_get_entity_and_buckets", wraps=repo.batch_get_entity_and_buckets
+            ) as mock_batch,
+            patch.object(repo, "batch_get_buckets", wraps=repo.batch_get_buckets) as mock_parent,
+        ):
+            with sync_limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+                pass
+        mock_batch.assert_called_once_with("key-1", [("key-1", "gpt-4"), ("proj-1", "gpt-4")])
+        mock_parent.assert_not_called()
+        parent_available = sync_limiter.available("proj-1", "gpt-4", limits=limits)
+        assert parent_available["rph"] == 98
+
+    def test_cascade_without_get_cached_parent(self, sync_limiter, monkeypatch):
+        """Test that backends without get_cached_parent() still cascade."""
+        sync_limiter.create_entity(entity_id="proj-1")
+        sync_limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+        sync_limiter._speculative_writes = False
+        monkeypatch.delattr(type(sync_limiter._repository), "get_cached_parent")
+        for _ in range(2):
+            with sync_limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+                pass
+        assert sync_limiter.available("proj-1", "gpt-4", limits=limits)["rph"] == 98
+
+    def test_cascade_stale_cached_parent_uses_fetched_parent(self, sync_limiter):
+        """Test that a stale cached parent is ignored in favor of the fetched entity."""
+        sync_limiter.create_entity(entity_id="proj-1")
+        sync_limiter.create_entity(entity_id="proj-old")
+        sync_limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+        repo = sync_limiter._repository
+        repo._entity_cache[repo._namespace_id, "key-1"] = (True, "proj-old", {})
+        with sync_limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+            pass
+        assert sync_limiter.available("proj-1", "gpt-4", limits=limits)["rph"] == 99
+        assert sync_limiter.available("proj-old", "gpt-4", limits=limits)["rph"] == 100
+        assert repo.get_cached_parent("key-1") == "proj-1"
+
+    def test_cascade_stale_cached_parent_without_limits(self, sync_limiter):
+        """Test that a stale cached parent with no limits does not fail the acquire."""
+        sync_limiter.create_entity(entity_id="key-1")
+        sync_limiter.set_limits("key-1", [Limit.per_minute("rpm", 100)], resource="gpt-4")
+        repo = sync_limiter._repository
+        repo._entity_cache[repo._namespace_id, "key-1"] = (True, "gone", {})
+        with sync_limiter.acquire("key-1", "gpt-4", {"rpm": 1}) as lease:
+            assert {entry.entity_id for entry in lease.entries} == {"key-1"}
+
+    def test_cascade_cached_parent_without_limits_raises(self, sync_limiter):
+        """Test that a confirmed cached parent with no limits still raises."""
+        sync_limiter.create_entity(entity_id="proj-1")
+        sync_limiter.create_entity(entity_id="key-1", parent_id="proj-1", cascade=True)
+        sync_limiter.set_limits("key-1", [Limit.per_minute("rpm", 100)], resource="gpt-4")
+        sync_limiter.get_entity("key-1")
+        with pytest.raises(ValidationError, match="proj-1"):
+            with sync_limiter.acquire("key-1", "gpt-4", {"rpm": 1}):
+                pass
+
     def test_backward_compat_missing_cascade_field(self, sync_limiter):
         """Test that entities without cascade field default to False."""
         entity = sync_limiter.create_entity(entity_id="legacy-1", parent_id=None)
@@ -1555,7 +1637,7 @@ class TestRateLimiterResourceCapacity:
         shard0_item = shard0_resp["Item"]
         shard1_item = dict(shard0_item)
         shard1_item["PK"] = {"S": schema.pk_bucket(repo._namespace_id, "sharded-user", "gpt-4", 1)}
-        shard1_item["GSI2SK"] = {"S": schema.gsi2_sk_bucket("sharded-user", 1)}
+        shard1_item["GSI5SK"] = {"S": schema.gsi5_sk_bucket("sharded-user", 1)}
         shard1_item["GSI3SK"] = {"S": schema.gsi3_sk_bucket("gpt-4", 1)}
         shard1_item["shard_count"] = {"N": "2"}
         client.update_item(
@@ -4930,11 +5012,39 @@ class TestShardRetry:
         repo._entity_cache[ns, "user-1"] = (False, None, {"gpt-4": 2})
         for _ in range(100):
             repo._speculative_consume_single("user-1", "gpt-4", {"rpm": 1}, shard_id=0)
+        repo._shard_balance.forget((ns, "user-1", "gpt-4"))
         sync_limiter._speculative_writes = True
-        with patch("zae_limiter.sync_repository.random.randrange", return_value=0):
+        with patch("zae_limiter.shard_balance.random.choice", side_effect=lambda s: s[0]):
             with sync_limiter.acquire("user-1", "gpt-4", {"rpm": 1}) as lease:
                 rpm_entry = next(e for e in lease.entries if e.limit.name == "rpm")
                 assert rpm_entry is not None
+                assert lease.entries[0].state.tokens_milli == 99000
+
+    def test_acquire_routes_away_from_exhausted_shard(self, sync_limiter):
+        """A shard seen exhausted is skipped without a failed write."""
+        repo = sync_limiter._repository
+        ns = repo._namespace_id
+        sync_limiter.create_entity("user-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        now_ms = int(time.time() * 1000)
+        for shard_id in range(2):
+            states = [
+                BucketState.from_limit("user-1", "gpt-4", Limit.per_minute("rpm", 100), now_ms)
+            ]
+            put_item = repo.build_composite_create(
+                "user-1", "gpt-4", states, now_ms, shard_id=shard_id, shard_count=2
+            )
+            repo.transact_write([put_item])
+        repo._entity_cache[ns, "user-1"] = (False, None, {"gpt-4": 2})
+        repo._speculative_consume_single("user-1", "gpt-4", {"rpm": 100}, shard_id=0)
+        sync_limiter._speculative_writes = True
+        with patch.object(
+            repo, "_speculative_consume_single", side_effect=repo._speculative_consume_single
+        ) as spy:
+            for _ in range(5):
+                with sync_limiter.acquire("user-1", "gpt-4", {"rpm": 1}):
+                    pass
+        assert [c.kwargs["shard_id"] for c in spy.call_args_list] == [1] * 5
 
     def test_acquire_doubles_shards_on_wcu_exhaustion(self, sync_limiter):
         """When wcu is exhausted, shard_count doubles and acquire falls to slow path."""
@@ -4985,6 +5095,27 @@ class TestShardRetry:
             with sync_limiter.acquire("user-1", "gpt-4", {"rpm": 1}):
                 pass
 
+    def test_retry_on_other_shard_without_choose_shard(self, sync_limiter, monkeypatch):
+        """Backends without choose_shard() retry on a random untried shard."""
+        repo = sync_limiter._repository
+        sync_limiter.create_entity("user-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        now_ms = int(time.time() * 1000)
+        for shard_id in range(2):
+            states = [
+                BucketState.from_limit("user-1", "gpt-4", Limit.per_minute("rpm", 10), now_ms)
+            ]
+            put_item = repo.build_composite_create(
+                "user-1", "gpt-4", states, now_ms, shard_id=shard_id, shard_count=2
+            )
+            repo.transact_write([put_item])
+        monkeypatch.delattr(type(repo), "choose_shard")
+        failed = SpeculativeResult(success=False, shard_id=0, shard_count=2)
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            lease = sync_limiter._retry_on_other_shard("user-1", "gpt-4", {"rpm": 1}, None, failed)
+        assert lease is not None
+        assert spy.call_args.kwargs["shard_id"] == 1
+
 
 class TestWcuHiddenFromUser:
     """Tests that wcu infrastructure limit is hidden from user-facing output."""
@@ -5027,3 +5158,926 @@ class TestWcuHiddenFromUser:
         limit_names = {b.limit_name for b in buckets}
         assert "wcu" not in limit_names
         assert "rpm" in limit_names
+
+
+class TestReservationAcquire:
+    """Tests for client-side token reservation blocks."""
+
+    @staticmethod
+    def _stored_tokens(sync_limiter, entity_id: str) -> int:
+        buckets = sync_limiter._repository.get_buckets(entity_id, resource="gpt-4")
+        return next(b.tokens_milli for b in buckets if b.limit_name == "rpm") // 1000
+
+    @staticmethod
+    def _enable(sync_limiter, multiplier: int = 10) -> ReservationPool:
+        pool = ReservationPool(config=ReservationConfig(window_seconds=60.0, max_block=100))
+        sync_limiter._reservations = pool
+        pool.block_multiplier = MagicMock(return_value=multiplier)
+        return pool
+
+    def test_disabled_by_default(self, sync_limiter):
+        """Reservations are opt-in."""
+        assert sync_limiter._reservations is None
+        assert sync_limiter.get_reservation_stats() is None
+
+    def test_constructor_enables_pool(self, sync_limiter):
+        """Passing a ReservationConfig enables the pool."""
+        config = ReservationConfig(window_seconds=2.0)
+        lim = SyncRateLimiter(repository=sync_limiter._repository, reservation=config)
+        assert lim._reservations is not None
+        assert lim._reservations.config is config
+
+    def test_serves_from_block_without_writes(self, sync_limiter):
+        """Later acquires are served from the local block with no DynamoDB writes."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(sync_limiter)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}) as lease:
+            assert lease._initial_committed is True
+            assert lease.consumed == {"rpm": 1}
+        assert self._stored_tokens(sync_limiter, "entity-1") == 89
+        for _ in range(3):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        assert self._stored_tokens(sync_limiter, "entity-1") == 89
+        assert pool.stats.reserved == 1
+        assert pool.stats.served == 3
+
+    def test_close_returns_unused_tokens(self, sync_limiter):
+        """close() returns unserved block tokens to the bucket."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(sync_limiter)
+        for _ in range(4):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        sync_limiter.close()
+        assert self._stored_tokens(sync_limiter, "entity-1") == 95
+        assert pool.stats.released == 1
+        assert pool.stats.released_tokens == 6
+
+    def test_expired_block_released(self, sync_limiter):
+        """Expired blocks are released on a later acquire."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(sync_limiter)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool._blocks["entity-1", "gpt-4"].expires_at = 0.0
+        pool._last_sweep = 0.0
+        pool.block_multiplier.return_value = 0
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        assert pool.stats.released == 1
+        assert self._stored_tokens(sync_limiter, "entity-1") == 97
+
+    def test_rollback_returns_served_tokens(self, sync_limiter):
+        """Rolling back a lease served from a block returns its tokens to the bucket."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        self._enable(sync_limiter)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        with pytest.raises(RuntimeError):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 2}):
+                raise RuntimeError("boom")
+        assert self._stored_tokens(sync_limiter, "entity-1") == 91
+
+    def test_adjust_writes_delta_to_bucket(self, sync_limiter):
+        """Adjustments on a served lease are written to the bucket on exit."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        self._enable(sync_limiter)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}) as lease:
+            lease.adjust(rpm=5)
+        assert self._stored_tokens(sync_limiter, "entity-1") == 84
+
+    def test_replaces_block_that_cannot_cover(self, sync_limiter):
+        """A request larger than the block's remainder releases it and reserves anew."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 1000)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(sync_limiter, multiplier=4)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 5}):
+            pass
+        assert pool.stats.reserved == 2
+        assert pool.stats.released == 1
+        assert self._stored_tokens(sync_limiter, "entity-1") == 978
+
+    def test_falls_back_when_block_unavailable(self, sync_limiter):
+        """If the bucket cannot cover a block, the regular path serves the request."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(sync_limiter, multiplier=50)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}) as lease:
+            assert lease.consumed == {"rpm": 1}
+        assert pool.stats.reserve_failures == 1
+        assert pool.stats.reserved == 0
+        assert self._stored_tokens(sync_limiter, "entity-1") == 8
+
+    def test_failed_reservation_backs_off(self, sync_limiter):
+        """After a failed reservation, later acquires skip the reservation write."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(sync_limiter, multiplier=50)
+        consume = sync_limiter._repository.speculative_consume
+        amounts: list[int] = []
+
+        def spy(*args, **kwargs):
+            amounts.append(kwargs["consume"]["rpm"])
+            return consume(*args, **kwargs)
+
+        with patch.object(sync_limiter._repository, "speculative_consume", side_effect=spy):
+            for _ in range(5):
+                with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                    pass
+        assert amounts == [50, 1, 1, 1, 1, 1]
+        assert pool.stats.reserve_failures == 1
+        assert pool.stats.backed_off == 4
+        assert pool.capped_amounts(("entity-1", "gpt-4"), {"rpm": 1}, 50) == {"rpm": 2}
+
+    def test_cascade_reserves_parent_block(self, sync_limiter):
+        """Cascade entities reserve from both child and parent buckets."""
+        sync_limiter.create_entity("parent-1")
+        sync_limiter.create_entity("child-1", parent_id="parent-1", cascade=True)
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("child-1", "gpt-4", {"rpm": 1}):
+            pass
+        pool = self._enable(sync_limiter, multiplier=5)
+        with sync_limiter.acquire("child-1", "gpt-4", {"rpm": 1}) as lease:
+            assert {e.entity_id for e in lease.entries} == {"child-1", "parent-1"}
+        with sync_limiter.acquire("child-1", "gpt-4", {"rpm": 1}) as lease:
+            assert {e.entity_id for e in lease.entries} == {"child-1", "parent-1"}
+        assert pool.stats.served == 1
+        assert self._stored_tokens(sync_limiter, "child-1") == 94
+        assert self._stored_tokens(sync_limiter, "parent-1") == 94
+        sync_limiter.close()
+        assert self._stored_tokens(sync_limiter, "child-1") == 97
+        assert self._stored_tokens(sync_limiter, "parent-1") == 97
+
+
+class TestLocalRejection:
+    """Tests for predictive local rejection from last-seen bucket state."""
+
+    def test_disabled_by_default(self, sync_limiter):
+        """Local rejection is opt-in."""
+        assert sync_limiter._bucket_mirror is None
+        assert sync_limiter.get_local_rejection_stats() is None
+
+    def test_rejects_without_dynamodb_call(self, sync_limiter):
+        """After a fast rejection, the next request is rejected locally."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        sync_limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+        with pytest.raises(RateLimitExceeded):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        repo = sync_limiter._repository
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            with pytest.raises(RateLimitExceeded) as exc_info:
+                with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                    pass
+        assert spy.call_count == 0
+        assert exc_info.value.retry_after_seconds > 0
+        assert sync_limiter.get_local_rejection_stats().rejections == 1
+
+    def test_success_state_is_mirrored(self, sync_limiter):
+        """ALL_NEW from a successful speculative write drives later rejections."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 2)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        sync_limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        with pytest.raises(RateLimitExceeded):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        assert sync_limiter.get_local_rejection_stats().rejections == 1
+
+    def test_stale_state_goes_to_dynamodb(self, sync_limiter):
+        """Stale mirrored state never rejects; DynamoDB decides."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        mirror = BucketMirror(config=LocalRejectionConfig(max_staleness_seconds=0.001))
+        sync_limiter._bucket_mirror = mirror
+        with pytest.raises(RateLimitExceeded):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        time.sleep(0.01)
+        with pytest.raises(RateLimitExceeded):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        assert mirror.stats.rejections == 0
+        assert mirror.stats.stale == 1
+
+    def test_missing_bucket_not_mirrored(self, sync_limiter):
+        """A first acquire (bucket missing) leaves no mirrored state."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 10)])
+        sync_limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        assert sync_limiter.get_local_rejection_stats().size == 0
+
+
+class TestSpeculativePolicy:
+    """Tests for the adaptive speculative-write policy."""
+
+    REFILL_BOUND = Limit.per_second("rps", 100000, burst=10)
+
+    def _drained(self, sync_limiter, **config) -> SpeculativePolicy:
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([self.REFILL_BOUND])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+        policy = SpeculativePolicy(config=SpeculativePolicyConfig(smoothing=1.0, **config))
+        sync_limiter._speculative_policy = policy
+        return policy
+
+    def test_disabled_by_default(self, sync_limiter):
+        """The adaptive policy is opt-in."""
+        assert sync_limiter._speculative_policy is None
+        assert sync_limiter.get_speculative_policy_stats() is None
+        assert sync_limiter.get_speculative_bucket_stats("entity-1", "gpt-4") is None
+
+    def test_refill_bound_bucket_skips_speculation(self, sync_limiter):
+        """After a wasted speculative write, the bucket uses the slow path directly."""
+        self._drained(sync_limiter)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+        repo = sync_limiter._repository
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rps": 10}) as lease:
+                assert lease.consumed == {"rps": 10}
+        assert spy.call_count == 0
+        bucket = sync_limiter.get_speculative_bucket_stats("entity-1", "gpt-4")
+        assert bucket.success_rate == 0.0
+        assert bucket.failure_reasons == {"app_limit_exhausted": 1}
+        stats = sync_limiter.get_speculative_policy_stats()
+        assert (stats.speculated, stats.fallbacks, stats.skipped) == (1, 1, 1)
+        assert stats.app_limit_exhausted == 1
+
+    def test_bypassed_bucket_is_probed(self, sync_limiter):
+        """Every probe_every-th acquire of a bypassed bucket speculates again."""
+        self._drained(sync_limiter, probe_every=3)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+        repo = sync_limiter._repository
+        with patch.object(repo, "speculative_consume", side_effect=repo.speculative_consume) as spy:
+            for _ in range(3):
+                with sync_limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+                    pass
+        assert spy.call_count == 1
+        assert sync_limiter.get_speculative_policy_stats().probes == 1
+
+    def test_fast_rejection_counts_as_success(self, sync_limiter):
+        """A speculative write that proves the request must be rejected was not wasted."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        sync_limiter._speculative_policy = SpeculativePolicy(
+            config=SpeculativePolicyConfig(smoothing=1.0)
+        )
+        with pytest.raises(RateLimitExceeded):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+                pass
+        bucket = sync_limiter.get_speculative_bucket_stats("entity-1", "gpt-4")
+        assert bucket.success_rate == 1.0
+        assert bucket.failure_reasons == {"app_limit_exhausted": 1}
+        assert sync_limiter.get_speculative_policy_stats().fast == 1
+
+
+class TestIndependentCommit:
+    """Tests for non-transactional slow-path commits (transactional_commit=False)."""
+
+    def _condition_failure(self) -> Exception:
+        return ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}}, "UpdateItem"
+        )
+
+    def _make_lease(self, repo):
+        """SyncLease with one rpm entry on each of two entities."""
+        from zae_limiter.sync_lease import LeaseEntry, SyncLease
+
+        entries = []
+        for entity_id in ("e1", "e2"):
+            state = MagicMock()
+            state.tokens_milli = 90000
+            state.last_refill_ms = 1000
+            state.total_consumed_milli = None
+            entries.append(
+                LeaseEntry(
+                    entity_id=entity_id,
+                    resource="gpt-4",
+                    limit=Limit.per_minute("rpm", 100),
+                    state=state,
+                    consumed=10,
+                    _original_tokens_milli=100000,
+                    _original_rf_ms=1000,
+                )
+            )
+        return SyncLease(repository=repo, entries=entries, _transactional=False)
+
+    def _make_mock_repo(self):
+        repo = MagicMock()
+        repo.build_composite_normal = MagicMock(
+            side_effect=lambda entity_id, **kw: {"normal": entity_id}
+        )
+        repo.build_composite_retry = MagicMock(
+            side_effect=lambda entity_id, **kw: {"retry": entity_id}
+        )
+        repo.build_composite_adjust = MagicMock(
+            side_effect=lambda entity_id, resource, deltas: {"adjust": entity_id, **deltas}
+        )
+        repo.condition_failure_buckets = MagicMock(return_value={})
+        repo._bucket_ttl_refill_multiplier = 7
+        return repo
+
+    def test_disabled_by_default(self, sync_limiter):
+        """Multi-bucket commits are transactional unless opted out."""
+        assert sync_limiter._transactional_commit is True
+
+    def test_cascade_written_without_transaction(self, sync_limiter):
+        """Child and parent buckets are written with independent UpdateItems."""
+        sync_limiter.create_entity("proj-1")
+        sync_limiter.create_entity("key-1", parent_id="proj-1", cascade=True)
+        limits = [Limit.per_hour("rph", 100)]
+        with sync_limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+            pass
+        sync_limiter._speculative_writes = False
+        sync_limiter._transactional_commit = False
+        repo = sync_limiter._repository
+        with (
+            patch.object(repo, "transact_write", side_effect=repo.transact_write) as tx,
+            patch.object(repo, "write_each", side_effect=repo.write_each) as each,
+        ):
+            with sync_limiter.acquire("key-1", "gpt-4", {"rph": 1}, limits=limits):
+                pass
+        tx.assert_not_called()
+        assert len(each.call_args_list[0].args[0]) == 2
+        for entity_id in ("key-1", "proj-1"):
+            available = sync_limiter.available(entity_id, "gpt-4", limits=limits)
+            assert available["rph"] == 98
+
+    def test_condition_failure_retries_failed_bucket_only(self):
+        """A bucket whose optimistic lock failed is retried consumption-only."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        repo.write_each.side_effect = [PartialWriteError({1: self._condition_failure()}, 2), None]
+        lease = self._make_lease(repo)
+        lease._commit_initial()
+        assert lease._initial_committed is True
+        assert repo.write_each.call_args_list[1].args[0] == [{"retry": "e2"}]
+        repo.transact_write.assert_not_called()
+        repo.build_composite_adjust.assert_not_called()
+
+    def test_condition_failure_rebases_on_returned_state(self):
+        """A lost lock that returned ALL_OLD is rewritten on the Normal path."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        stored = BucketState.from_limit("e2", "gpt-4", Limit.per_minute("rpm", 100), 0)
+        stored.tokens_milli = 50000
+        stored.last_refill_ms = stored_rf = int(time.time() * 1000)
+        repo.condition_failure_buckets = MagicMock(return_value={0: [stored]})
+        repo.write_each.side_effect = [PartialWriteError({1: self._condition_failure()}, 2), None]
+        lease = self._make_lease(repo)
+        lease._commit_initial()
+        assert lease._initial_committed is True
+        assert repo.write_each.call_args_list[1].args[0] == [{"normal": "e2"}]
+        assert repo.build_composite_normal.call_args.kwargs["expected_rf"] == stored_rf
+        assert lease.entries[1]._original_tokens_milli == 50000
+        repo.build_composite_retry.assert_not_called()
+        repo.build_composite_adjust.assert_not_called()
+
+    def test_rebased_bucket_exhausted_compensates_written_bucket(self):
+        """If the returned state cannot cover the consumption, the written bucket is undone."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        stored = BucketState.from_limit("e2", "gpt-4", Limit.per_minute("rpm", 100), 0)
+        stored.tokens_milli = 0
+        stored.last_refill_ms = int(time.time() * 1000)
+        repo.condition_failure_buckets = MagicMock(return_value={0: [stored]})
+        repo.write_each.side_effect = [PartialWriteError({1: self._condition_failure()}, 2), None]
+        lease = self._make_lease(repo)
+        with pytest.raises(RateLimitExceeded):
+            lease._commit_initial()
+        assert repo.write_each.call_args_list[1].args[0] == [{"adjust": "e1", "rpm": -10000}]
+
+    def test_retry_failure_compensates_written_bucket(self):
+        """If the retry fails its condition, the written bucket is compensated."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        repo.write_each.side_effect = [
+            PartialWriteError({1: self._condition_failure()}, 2),
+            self._condition_failure(),
+            None,
+        ]
+        lease = self._make_lease(repo)
+        with pytest.raises(RateLimitExceeded):
+            lease._commit_initial()
+        assert lease._initial_committed is False
+        assert repo.write_each.call_args_list[2].args[0] == [{"adjust": "e1", "rpm": -10000}]
+
+    def test_other_error_compensates_and_reraises(self):
+        """A non-condition error compensates the other buckets and propagates."""
+        from zae_limiter.exceptions import PartialWriteError
+
+        repo = self._make_mock_repo()
+        repo.write_each.side_effect = [
+            PartialWriteError({0: RuntimeError("throttled")}, 2),
+            RuntimeError("still throttled"),
+        ]
+        lease = self._make_lease(repo)
+        with pytest.raises(RuntimeError, match="^throttled$"):
+            lease._commit_initial()
+        assert repo.write_each.call_args_list[1].args[0] == [{"adjust": "e2", "rpm": -10000}]
+
+
+class TestRefreshedRetry:
+    """Tests for Normal-path retries rebased on the ALL_OLD state of a lost lock."""
+
+    REFILL_BOUND = Limit.per_second("rps", 100000, burst=10)
+
+    def _condition_failure(self) -> Exception:
+        return ClientError(
+            {"Error": {"Code": "ConditionalCheckFailedException", "Message": ""}}, "UpdateItem"
+        )
+
+    def _make_entry(self, consumed=10, is_new=False):
+        from zae_limiter.sync_lease import LeaseEntry
+
+        limit = Limit.per_minute("rpm", 100)
+        return LeaseEntry(
+            entity_id="e1",
+            resource="gpt-4",
+            limit=limit,
+            state=BucketState.from_limit("e1", "gpt-4", limit, 1000),
+            consumed=consumed,
+            _original_tokens_milli=100000,
+            _original_rf_ms=1000,
+            _is_new=is_new,
+        )
+
+    def _make_mock_repo(self, stored_tokens_milli: int):
+        repo = MagicMock()
+        stored = BucketState.from_limit("e1", "gpt-4", Limit.per_minute("rpm", 100), 5000)
+        stored.tokens_milli = stored_tokens_milli
+        stored.last_refill_ms = int(time.time() * 1000)
+        repo.condition_failure_buckets = MagicMock(side_effect=lambda exc: {0: [replace(stored)]})
+        repo.build_composite_normal = MagicMock(return_value={"Update": {}})
+        repo.build_composite_create = MagicMock(return_value={"Put": {}})
+        repo.build_composite_retry = MagicMock(return_value={"Update": {}})
+        repo._bucket_ttl_refill_multiplier = 7
+        return (repo, stored)
+
+    def test_lost_lock_retries_normal_path(self):
+        """The retry expects the returned rf instead of dropping the refill."""
+        from zae_limiter.sync_lease import SyncLease
+
+        repo, stored = self._make_mock_repo(50000)
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        entry = self._make_entry()
+        lease = SyncLease(repository=repo, entries=[entry])
+        lease._commit_initial()
+        assert lease._initial_committed is True
+        repo.build_composite_retry.assert_not_called()
+        retry = repo.build_composite_normal.call_args_list[-1].kwargs
+        assert retry["expected_rf"] == stored.last_refill_ms
+        assert retry["consumed"] == {"rpm": 10000}
+        assert entry._original_tokens_milli == 50000
+        assert entry.state.tokens_milli < 41000
+
+    def test_create_race_becomes_normal_write(self):
+        """A create that lost the race is retried as a Normal write on the winner's item."""
+        from zae_limiter.sync_lease import SyncLease
+
+        repo, stored = self._make_mock_repo(100000)
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        entry = self._make_entry(is_new=True)
+        lease = SyncLease(repository=repo, entries=[entry])
+        lease._commit_initial()
+        repo.build_composite_create.assert_called_once()
+        assert repo.build_composite_normal.call_args.kwargs["expected_rf"] == stored.last_refill_ms
+        assert entry._is_new is False
+
+    def test_returned_state_rejects_without_another_write(self):
+        """If the returned state cannot cover the request, it is rejected right away."""
+        from zae_limiter.sync_lease import SyncLease
+
+        repo, _ = self._make_mock_repo(2000)
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        lease = SyncLease(repository=repo, entries=[self._make_entry()])
+        with pytest.raises(RateLimitExceeded) as exc_info:
+            lease._commit_initial()
+        assert repo.transact_write.call_count == 1
+        assert exc_info.value.violations[0].available == 2
+
+    def test_refreshes_bounded(self):
+        """After the bounded refreshes, the consumption-only retry takes over."""
+        from zae_limiter.sync_lease import _REFRESH_MAX_RETRIES, SyncLease
+
+        repo, _ = self._make_mock_repo(100000)
+        repo.transact_write.side_effect = [self._condition_failure()] * (
+            _REFRESH_MAX_RETRIES + 1
+        ) + [None]
+        lease = SyncLease(repository=repo, entries=[self._make_entry()])
+        lease._commit_initial()
+        assert repo.transact_write.call_count == _REFRESH_MAX_RETRIES + 2
+        repo.build_composite_retry.assert_called_once()
+
+    def test_backend_without_returned_state_retries_consumption_only(self):
+        """Backends without condition_failure_buckets() take the consumption-only retry."""
+        from zae_limiter.sync_lease import SyncLease
+
+        repo, _ = self._make_mock_repo(100000)
+        del repo.condition_failure_buckets
+        repo.transact_write.side_effect = [self._condition_failure(), None]
+        lease = SyncLease(repository=repo, entries=[self._make_entry()])
+        lease._commit_initial()
+        assert repo.transact_write.call_count == 2
+        repo.build_composite_retry.assert_called_once()
+
+    def test_contended_refill_bound_bucket_not_rejected(self, sync_limiter):
+        """A lost lock on a bucket that refills in time no longer rejects the request."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([self.REFILL_BOUND])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rps": 10}):
+            pass
+        sync_limiter._speculative_writes = False
+        repo = sync_limiter._repository
+        competitor = SyncRateLimiter(repository=repo)
+        competitor._speculative_writes = False
+        transact_write = repo.transact_write
+        writes: list[list[dict]] = []
+
+        def contended(items):
+            writes.append(items)
+            if len(writes) == 1:
+                with competitor.acquire("entity-1", "gpt-4", {"rps": 10}):
+                    pass
+                time.sleep(0.005)
+            transact_write(items)
+
+        with (
+            patch.object(repo, "transact_write", side_effect=contended),
+            patch.object(
+                repo, "build_composite_retry", side_effect=repo.build_composite_retry
+            ) as retry,
+        ):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rps": 10}) as lease:
+                assert lease.consumed == {"rps": 10}
+        retry.assert_not_called()
+        assert len(writes) == 3
+
+
+class TestAcquireMany:
+    """Tests for acquire_many() batched acquisition."""
+
+    @staticmethod
+    def _stored_tokens(sync_limiter, entity_id: str) -> int:
+        buckets = sync_limiter._repository.get_buckets(entity_id, resource="gpt-4")
+        return next(b.tokens_milli for b in buckets if b.limit_name == "rpm") // 1000
+
+    def test_acquires_every_request(self, sync_limiter):
+        """Every request gets its own committed lease."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": i + 1}) for i in range(3)]
+        with sync_limiter.acquire_many(requests) as results:
+            assert [r.consumed for r in results] == [{"rpm": 1}, {"rpm": 2}, {"rpm": 3}]
+        assert [self._stored_tokens(sync_limiter, f"entity-{i}") for i in range(3)] == [99, 98, 97]
+
+    def test_rejection_is_per_request(self, sync_limiter):
+        """A rejected request does not affect the others."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 1)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        requests = [("entity-1", "gpt-4", {"rpm": 1}), ("entity-2", "gpt-4", {"rpm": 1})]
+        with sync_limiter.acquire_many(requests) as results:
+            assert isinstance(results[0], RateLimitExceeded)
+            assert results[0].violations[0].entity_id == "entity-1"
+            assert results[1].consumed == {"rpm": 1}
+        assert self._stored_tokens(sync_limiter, "entity-2") == 0
+
+    def test_slow_path_reads_in_one_batch(self, sync_limiter):
+        """Slow-path requests share one BatchGetItem pass."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        sync_limiter._speculative_writes = False
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": 1}) for i in range(5)]
+        repo = sync_limiter._repository
+        with (
+            patch.object(
+                repo,
+                "batch_get_entities_and_buckets",
+                side_effect=repo.batch_get_entities_and_buckets,
+            ) as spy,
+            patch.object(repo, "batch_get_entity_and_buckets") as single,
+        ):
+            with sync_limiter.acquire_many(requests) as results:
+                assert all(r.consumed == {"rpm": 1} for r in results)
+        assert spy.call_count == 1
+        assert single.call_count == 0
+        assert self._stored_tokens(sync_limiter, "entity-4") == 99
+
+    def test_slow_path_without_batch_entity_reads(self, sync_limiter, monkeypatch):
+        """Backends without batch_get_entities_and_buckets() read entity by entity."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        sync_limiter._speculative_writes = False
+        monkeypatch.delattr(type(sync_limiter._repository), "batch_get_entities_and_buckets")
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": 1}) for i in range(3)]
+        with sync_limiter.acquire_many(requests) as results:
+            assert all(r.consumed == {"rpm": 1} for r in results)
+        assert self._stored_tokens(sync_limiter, "entity-2") == 99
+
+    def test_slow_path_fetches_configs_in_one_read(self, sync_limiter):
+        """Config slots missing for every entity are read in one batched read."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        sync_limiter._speculative_writes = False
+        requests = [(f"entity-{i}", "gpt-4", {"rpm": 1}) for i in range(5)]
+        repo = sync_limiter._repository
+        repo.invalidate_config_cache()
+        with patch.object(
+            repo, "batch_get_configs", side_effect=repo.batch_get_configs
+        ) as batch_get:
+            with sync_limiter.acquire_many(requests) as results:
+                assert all(r.consumed == {"rpm": 1} for r in results)
+        assert batch_get.call_count == 1
+        fetched = batch_get.call_args.args[0]
+        assert sum((1 for pk, _ in fetched if "ENTITY#" in pk)) == 10
+
+    def test_slow_path_shared_bucket(self, sync_limiter):
+        """Requests for the same bucket in one batch each consume once."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        sync_limiter._speculative_writes = False
+        requests = [("entity-1", "gpt-4", {"rpm": 2}), ("entity-1", "gpt-4", {"rpm": 3})]
+        with sync_limiter.acquire_many(requests) as results:
+            assert all(isinstance(r, type(results[0])) for r in results)
+        assert self._stored_tokens(sync_limiter, "entity-1") == 94
+
+    def test_cascade_consumes_parent(self, sync_limiter):
+        """Cascade children in a batch both consume from a new shared parent."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        sync_limiter.create_entity("parent-1")
+        sync_limiter.create_entity("child-1", parent_id="parent-1", cascade=True)
+        sync_limiter.create_entity("child-2", parent_id="parent-1", cascade=True)
+        sync_limiter._speculative_writes = False
+        requests = [("child-1", "gpt-4", {"rpm": 1}), ("child-2", "gpt-4", {"rpm": 1})]
+        with sync_limiter.acquire_many(requests):
+            pass
+        assert self._stored_tokens(sync_limiter, "child-1") == 99
+        assert self._stored_tokens(sync_limiter, "parent-1") == 98
+
+    def test_adjustments_committed_on_exit(self, sync_limiter):
+        """SyncLease adjustments inside the block are written on exit."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire_many([("entity-1", "gpt-4", {"rpm": 1})]) as results:
+            results[0].consume(rpm=4)
+        assert self._stored_tokens(sync_limiter, "entity-1") == 95
+
+    def test_rollback_on_exception(self, sync_limiter):
+        """An exception in the block rolls back every lease."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rpm": 1}):
+            pass
+        requests = [("entity-1", "gpt-4", {"rpm": 5}), ("entity-2", "gpt-4", {"rpm": 5})]
+        with pytest.raises(RuntimeError):
+            with sync_limiter.acquire_many(requests):
+                raise RuntimeError("boom")
+        assert self._stored_tokens(sync_limiter, "entity-1") == 99
+        assert self._stored_tokens(sync_limiter, "entity-2") == 100
+
+    def test_invalid_identifier_raises(self, sync_limiter):
+        """Identifiers are validated before any write."""
+        with pytest.raises(ValidationError):
+            with sync_limiter.acquire_many([("bad#id", "gpt-4", {"rpm": 1})]):
+                pass
+
+    def test_block_raises_unavailable(self, sync_limiter, monkeypatch):
+        """BLOCK raises RateLimiterUnavailable when the batch read fails."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        sync_limiter._speculative_writes = False
+
+        def mock_error(*args, **kwargs):
+            raise ClientError({"Error": {"Code": "ServiceUnavailable"}}, "BatchGetItem")
+
+        monkeypatch.setattr(sync_limiter._repository, "batch_get_entities_and_buckets", mock_error)
+        with pytest.raises(RateLimiterUnavailable):
+            with sync_limiter.acquire_many([("entity-1", "gpt-4", {"rpm": 1})]):
+                pass
+
+    def test_allow_returns_noop_leases(self, sync_limiter, monkeypatch):
+        """ALLOW yields no-op leases for requests that could not be acquired."""
+        sync_limiter.set_system_defaults([Limit.per_minute("rpm", 100)])
+        sync_limiter._speculative_writes = False
+
+        def mock_error(*args, **kwargs):
+            raise ClientError({"Error": {"Code": "ServiceUnavailable"}}, "BatchGetItem")
+
+        monkeypatch.setattr(sync_limiter._repository, "batch_get_entities_and_buckets", mock_error)
+        requests = [("entity-1", "gpt-4", {"rpm": 1})]
+        with sync_limiter.acquire_many(requests, on_unavailable=OnUnavailable.ALLOW) as results:
+            assert len(results[0].entries) == 0
+
+
+class _TraceCollector(InstrumentationListener):
+    """Keeps every acquire trace."""
+
+    def __init__(self) -> None:
+        self.traces: list[AcquireTrace] = []
+
+    def on_acquire(self, trace: AcquireTrace) -> None:
+        self.traces.append(trace)
+
+
+class TestInstrumentation:
+    """Tests for hot-path instrumentation listeners."""
+
+    def _collector(self, sync_limiter, capacity: int = 100) -> _TraceCollector:
+        sync_limiter.set_system_defaults([Limit.per_hour("rph", capacity)])
+        collector = _TraceCollector()
+        sync_limiter._listeners = (collector,)
+        return collector
+
+    def test_disabled_by_default(self, sync_limiter):
+        """Without listeners, no trace is created."""
+        sync_limiter.set_system_defaults([Limit.per_hour("rph", 100)])
+        assert sync_limiter._listeners == ()
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+            assert current_trace() is None
+
+    def test_slow_then_speculative(self, sync_limiter):
+        """A new bucket takes the slow path; the next acquire is a speculative hit."""
+        collector = self._collector(sync_limiter)
+        for _ in range(2):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rph": 1}) as lease:
+                assert current_trace() is None
+                lease.consume(rph=1)
+        slow, fast = collector.traces
+        assert (slow.path, fast.path) == (AcquirePath.SLOW, AcquirePath.SPECULATIVE)
+        assert slow.outcome == fast.outcome == AcquireOutcome.GRANTED
+        assert set(slow.phase_totals()) == {
+            "on_unavailable",
+            "fast_path",
+            "speculative_write",
+            "slow_path",
+            "resolve_limits",
+            "commit_initial",
+            "hold",
+            "commit_adjustments",
+        }
+        assert "slow_path" not in fast.phase_totals()
+        assert 0 < fast.acquire_s < fast.duration_s
+
+    def test_fast_rejection(self, sync_limiter):
+        """A speculative write that proves exhaustion is reported as a fast reject."""
+        collector = self._collector(sync_limiter, capacity=1)
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+            pass
+        with pytest.raises(RateLimitExceeded):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+                pass
+        rejected = collector.traces[-1]
+        assert rejected.path == AcquirePath.FAST_REJECT
+        assert rejected.outcome == AcquireOutcome.REJECTED
+        assert rejected.acquire_s == rejected.duration_s
+        assert current_trace() is None
+
+    def test_local_rejection(self, sync_limiter):
+        """Rejections by the bucket mirror are reported as local rejects."""
+        collector = self._collector(sync_limiter, capacity=1)
+        sync_limiter._bucket_mirror = BucketMirror(config=LocalRejectionConfig())
+        with sync_limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+            pass
+        for _ in range(2):
+            with pytest.raises(RateLimitExceeded):
+                with sync_limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+                    pass
+        assert collector.traces[-1].path == AcquirePath.LOCAL_REJECT
+        assert "speculative_write" not in collector.traces[-1].phase_totals()
+
+    def test_rollback(self, sync_limiter):
+        """An exception in the block records the rollback phase."""
+        collector = self._collector(sync_limiter)
+        with pytest.raises(RuntimeError):
+            with sync_limiter.acquire("entity-1", "gpt-4", {"rph": 1}):
+                raise RuntimeError("boom")
+        (trace,) = collector.traces
+        assert trace.outcome == AcquireOutcome.GRANTED
+        assert "rollback" in trace.phase_totals()
+        assert "commit_adjustments" not in trace.phase_totals()
+
+    def test_unavailable_allow(self, sync_limiter):
+        """A no-op lease under ALLOW is reported as the unavailable path."""
+        collector = self._collector(sync_limiter)
+        sync_limiter._speculative_writes = False
+        with patch.object(sync_limiter, "_do_acquire", side_effect=RuntimeError("down")):
+            with sync_limiter.acquire(
+                "entity-1", "gpt-4", {"rph": 1}, on_unavailable=OnUnavailable.ALLOW
+            ):
+                assert current_trace() is None
+        (trace,) = collector.traces
+        assert trace.path == AcquirePath.UNAVAILABLE
+        assert trace.outcome == AcquireOutcome.GRANTED
+
+    def test_error_outcome(self, sync_limiter):
+        """Infrastructure errors under BLOCK are reported as errors."""
+        collector = self._collector(sync_limiter)
+        sync_limiter._speculative_writes = False
+        with patch.object(sync_limiter, "_do_acquire", side_effect=RuntimeError("down")):
+            with pytest.raises(RateLimiterUnavailable):
+                with sync_limiter.acquire(
+                    "entity-1", "gpt-4", {"rph": 1}, on_unavailable=OnUnavailable.BLOCK
+                ):
+                    pass
+        (trace,) = collector.traces
+        assert trace.outcome == AcquireOutcome.ERROR
+        assert trace.path == AcquirePath.SLOW
+
+    def test_listeners_receive_dynamodb_calls(self, sync_limiter):
+        """Listeners passed to the constructor are added to the repository."""
+        sync_limiter.set_system_defaults([Limit.per_hour("rph", 100)])
+        stats = InMemoryAggregator()
+        instrumented = SyncRateLimiter(repository=sync_limiter._repository, listeners=[stats])
+        for _ in range(2):
+            with instrumented.acquire("entity-1", "gpt-4", {"rph": 1}):
+                pass
+        result = stats.get_stats()
+        assert result.paths == {"slow": 1, "speculative": 1}
+        assert result.dynamodb_calls["UpdateItem"].count >= 2
+        assert result.dynamodb_calls["UpdateItem"].errors >= 1
+
+    def test_shared_repository_listeners_not_duplicated(self, sync_limiter):
+        """Limiters sharing a repository and a listener report each call once."""
+        repo = sync_limiter._repository
+        stats = InMemoryAggregator()
+        first = SyncRateLimiter(repository=repo, listeners=[stats])
+        SyncRateLimiter(repository=repo, listeners=[stats])
+        repo.get_entity("entity-1")
+        assert repo._listeners.count(stats) == 1
+        assert stats.get_stats().dynamodb_calls["GetItem"].count == 1
+        first.close()
+        assert stats in repo._listeners
+
+    def test_close_removes_listeners(self, sync_limiter):
+        """close() removes the limiter's listeners from the repository."""
+        repo = sync_limiter._repository
+        stats = InMemoryAggregator()
+        instrumented = SyncRateLimiter(repository=repo, listeners=[stats])
+        instrumented.close()
+        assert stats not in repo._listeners
+
+
+class TestLatencyHistograms:
+    """Tests for in-process latency histograms."""
+
+    def test_disabled_by_default(self, sync_limiter):
+        """Without latency_histograms, no snapshot is available."""
+        assert sync_limiter.get_latency_histograms() is None
+        sync_limiter.reset_latency_histograms()
+
+    def test_records_acquires_and_calls(self, sync_limiter):
+        """Acquires, commits and DynamoDB calls are recorded."""
+        sync_limiter.set_system_defaults([Limit.per_hour("rph", 100)])
+        instrumented = SyncRateLimiter(repository=sync_limiter._repository, latency_histograms=True)
+        for _ in range(2):
+            with instrumented.acquire("entity-1", "gpt-4", {"rph": 1}):
+                pass
+        snapshot = instrumented.get_latency_histograms()
+        assert snapshot is not None
+        assert snapshot.operations["acquire"].count == 2
+        assert snapshot.operations["commit"].count == 1
+        assert snapshot.operations["adjust"].count == 2
+        assert snapshot.dynamodb_calls["UpdateItem"].count >= 2
+        assert "zae_limiter_operation_latency_seconds" in snapshot.to_prometheus()
+        instrumented.reset_latency_histograms()
+        assert instrumented.get_latency_histograms().operations["acquire"].count == 0
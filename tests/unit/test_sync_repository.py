@@ -12,7 +12,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from botocore.exceptions import ClientError
 
-from zae_limiter import AuditAction, Limit
+from zae_limiter import AuditAction, Limit, schema
 from zae_limiter.exceptions import EntityExistsError, InvalidIdentifierError
 from zae_limiter.models import BucketState
 from zae_limiter.schema import (
@@ -298,6 +298,28 @@ class TestRepositoryBucketOperations:
         assert entity is None
         assert ("bare-1", "gpt-4", "rpm") in buckets
 
+    def test_batch_get_entities_and_buckets(self, repo_with_buckets):
+        """META for several entities and their buckets come back from one call."""
+        entities, buckets = repo_with_buckets.batch_get_entities_and_buckets(
+            ["entity-1", "entity-2", "missing"], [("entity-1", "gpt-4"), ("entity-2", "gpt-4")]
+        )
+        assert set(entities) == {"entity-1", "entity-2"}
+        assert entities["entity-2"].parent_id == "entity-1"
+        assert ("entity-2", "gpt-4", "rpm") in buckets
+        cache = repo_with_buckets._entity_cache
+        assert cache[repo_with_buckets._namespace_id, "entity-2"][:2] == (False, "entity-1")
+        assert cache[repo_with_buckets._namespace_id, "missing"][:2] == (False, None)
+
+    def test_get_cached_parent(self, repo):
+        """Only cached entities with cascade enabled report a parent."""
+        repo.create_entity("parent-1")
+        repo.create_entity("child-1", parent_id="parent-1", cascade=True)
+        repo.create_entity("child-2", parent_id="parent-1")
+        assert repo.get_cached_parent("child-1") is None
+        repo.batch_get_entities_and_buckets(["child-1", "child-2"], [])
+        assert repo.get_cached_parent("child-1") == "parent-1"
+        assert repo.get_cached_parent("child-2") is None
+
     def test_batch_get_configs_empty_keys(self, repo):
         """batch_get_configs should return empty dict for empty keys list."""
         result = repo.batch_get_configs([])
@@ -377,10 +399,10 @@ class TestRepositoryBucketOperations:
 
 
 class TestRepositoryResourceAggregation:
-    """Tests for GSI2 resource queries."""
+    """Tests for GSI5 resource bucket queries."""
 
     def test_get_resource_buckets_all_entities(self, repo_with_buckets):
-        """Should query all buckets for a resource via GSI2."""
+        """Should query all buckets for a resource via GSI5."""
         buckets = repo_with_buckets.get_resource_buckets("gpt-4", "rpm")
         assert len(buckets) == 2
         assert all(b.resource == "gpt-4" for b in buckets)
@@ -397,6 +419,25 @@ class TestRepositoryResourceAggregation:
         assert all(b.limit_name == "rpm" for b in rpm_buckets)
         assert all(b.limit_name == "tpm" for b in tpm_buckets)
 
+    def test_bucket_items_keyed_for_keys_only_index(self, repo_with_buckets):
+        """Bucket items carry GSI5 keys and no GSI2 keys, so token writes skip GSI2."""
+        from zae_limiter import schema
+
+        client = repo_with_buckets._get_client()
+        response = client.get_item(
+            TableName=repo_with_buckets.table_name,
+            Key={
+                "PK": {
+                    "S": schema.pk_bucket(repo_with_buckets._namespace_id, "entity-1", "gpt-4", 0)
+                },
+                "SK": {"S": schema.sk_state()},
+            },
+        )
+        item = response["Item"]
+        assert "GSI2PK" not in item
+        assert "GSI2SK" not in item
+        assert item["GSI5SK"]["S"] == schema.gsi5_sk_bucket("entity-1", 0)
+
     def test_get_resource_buckets_empty_result(self, repo):
         """Should return empty list when no buckets match."""
         buckets = repo.get_resource_buckets("nonexistent-resource", "rpm")
@@ -463,6 +504,41 @@ class TestRepositoryTransactions:
         entity = repo.get_entity("we-test")
         assert entity is None
 
+    def test_write_each_reports_partial_failures(self, repo):
+        """A failing item is reported by index while the other items are still written."""
+        from zae_limiter import PartialWriteError
+
+        adjust_item = repo.build_composite_adjust(
+            entity_id="we-ok", resource="api", deltas={"rpm": 1000}
+        )
+        failing_item = {
+            "Delete": {
+                "TableName": repo.table_name,
+                "Key": {"PK": {"S": "default/ENTITY#missing"}, "SK": {"S": "#META"}},
+                "ConditionExpression": "attribute_exists(PK)",
+            }
+        }
+        with pytest.raises(PartialWriteError) as exc_info:
+            repo.write_each([failing_item, adjust_item])
+        assert set(exc_info.value.failures) == {0}
+        assert exc_info.value.item_count == 2
+        assert isinstance(exc_info.value.failures[0], ClientError)
+        client = repo._get_client()
+        response = client.get_item(TableName=repo.table_name, Key=adjust_item["Update"]["Key"])
+        assert "Item" in response
+
+    def test_write_each_single_item_error_propagates(self, repo):
+        """A single item's error is raised unchanged, not wrapped."""
+        failing_item = {
+            "Delete": {
+                "TableName": repo.table_name,
+                "Key": {"PK": {"S": "default/ENTITY#missing"}, "SK": {"S": "#META"}},
+                "ConditionExpression": "attribute_exists(PK)",
+            }
+        }
+        with pytest.raises(ClientError):
+            repo.write_each([failing_item])
+
     def test_build_bucket_put_item_structure(self, repo):
         """build_bucket_put_item should create composite DynamoDB structure (ADR-114)."""
         limit = Limit.per_minute("rpm", 100)
@@ -2002,6 +2078,155 @@ class TestRepositoryPing:
         assert result is False
 
 
+class TestRepositoryIOStats:
+    """Tests for consumed-capacity accounting."""
+
+    def test_disabled_by_default(self, repo):
+        """get_io_stats() returns None until enabled."""
+        assert repo.get_io_stats() is None
+        repo.reset_io_stats()
+
+    def test_counts_calls(self, repo):
+        """Calls made after enable_io_stats() are counted per operation."""
+        repo.enable_io_stats()
+        repo.create_entity("entity-1", name="Entity 1")
+        repo.reset_io_stats()
+        repo.get_entity("entity-1")
+        repo.get_entity("entity-1")
+        stats = repo.get_io_stats()
+        assert stats is not None
+        assert stats.operations["GetItem"].calls == 2
+        repo.reset_io_stats()
+        assert repo.get_io_stats().operations == {}
+
+    def test_shared_with_namespace(self, repo):
+        """Scoped repositories add to the parent's totals."""
+        repo.enable_io_stats()
+        repo._register_namespace("tenant-a")
+        scoped = repo.namespace("tenant-a")
+        repo.reset_io_stats()
+        scoped.get_entity("entity-1")
+        assert repo.get_io_stats().operations["GetItem"].calls == 1
+
+
+class TestRepositoryClientConfig:
+    """Tests for DynamoDB client configuration."""
+
+    def test_default_client_config(self, repo):
+        """Without options the client uses botocore's default pool size."""
+        client = repo._get_client()
+        assert client.meta.config.max_pool_connections == 10
+
+    def test_client_config_applied(self, mock_dynamodb):
+        """Client options are applied when the client is created."""
+        repo = SyncRepository(name="test-repo", region="us-east-1", _skip_deprecation_warning=True)
+        repo._client_config = {"max_pool_connections": 64, "read_timeout": 3}
+        try:
+            config = repo._get_client().meta.config
+            assert config.max_pool_connections == 64
+            assert config.read_timeout == 3
+        finally:
+            repo.close()
+
+    def test_shared_with_namespace(self, repo):
+        """Scoped repositories use the parent's client options."""
+        repo._client_config = {"max_pool_connections": 64}
+        repo._register_namespace("tenant-a")
+        scoped = repo.namespace("tenant-a")
+        assert scoped._client_config == {"max_pool_connections": 64}
+
+
+class TestRepositoryWarm:
+    """Tests for warm() prefetching."""
+
+    def test_warm_fills_caches(self, repo_with_buckets):
+        """warm() fills the config and entity caches and reports what it loaded."""
+        repo = repo_with_buckets
+        repo.set_resource_defaults("gpt-4", [Limit.per_minute("rpm", 500)])
+        result = repo.warm(["entity-1", "entity-2"], ["gpt-4"], connections=2)
+        assert result.connections == 2
+        assert result.configs == 6
+        assert result.entities == 2
+        assert result.shard_counts == 2
+        assert result.requests == 3
+        assert result.duration_s > 0
+        assert repo._entity_cache[repo.namespace_id, "entity-2"] == (
+            False,
+            "entity-1",
+            {"gpt-4": 1},
+        )
+        misses = repo.get_cache_stats().misses
+        limits, _, source = repo.resolve_limits("entity-2", "gpt-4")
+        assert source == "resource"
+        assert limits == [Limit.per_minute("rpm", 500)]
+        assert repo.get_cache_stats().misses == misses
+
+    def test_warm_unknown_entities(self, repo):
+        """Entities without META or buckets are cached as non-cascading."""
+        result = repo.warm(["ghost"], ["gpt-4"], connections=0)
+        assert result.entities == 0
+        assert result.shard_counts == 0
+        assert repo._entity_cache[repo.namespace_id, "ghost"] == (False, None, {})
+
+    def test_warm_chunks_batches(self, repo):
+        """Reads are split into BatchGetItem calls of 100 keys."""
+        entity_ids = [f"entity-{i}" for i in range(60)]
+        result = repo.warm(entity_ids, ["gpt-4"], connections=0)
+        assert result.requests == 3
+        assert len(repo._entity_cache) == 60
+
+    def test_warm_retries_unprocessed_keys(self, repo_with_buckets, monkeypatch):
+        """Keys returned in UnprocessedKeys are retried until read."""
+        repo = repo_with_buckets
+        monkeypatch.setattr("zae_limiter.sync_repository._BATCH_GET_BACKOFF_S", 0)
+        client = repo._get_client()
+        real_batch_get = client.batch_get_item
+        calls = []
+
+        def throttled_once(**kwargs):
+            keys = kwargs["RequestItems"][repo.table_name]["Keys"]
+            calls.append(len(keys))
+            if len(calls) > 1:
+                return real_batch_get(**kwargs)
+            return {"Responses": {}, "UnprocessedKeys": {repo.table_name: {"Keys": keys}}}
+
+        monkeypatch.setattr(client, "batch_get_item", throttled_once)
+        result = repo.warm(["entity-1"], ["gpt-4"], connections=0)
+        assert calls == [6, 6]
+        assert result.requests == 2
+        assert result.unprocessed == 0
+        assert result.entities == 1
+        assert result.configs == 4
+
+    def test_warm_skips_keys_left_unprocessed(self, repo_with_buckets, monkeypatch):
+        """Keys still unprocessed after retries are neither primed nor cached."""
+        repo = repo_with_buckets
+        monkeypatch.setattr("zae_limiter.sync_repository._BATCH_GET_BACKOFF_S", 0)
+        client = repo._get_client()
+        real_batch_get = client.batch_get_item
+        meta_key = (schema.pk_entity(repo.namespace_id, "entity-1"), schema.sk_meta())
+        system_key = (schema.pk_system(repo.namespace_id), schema.sk_config())
+
+        def drop_keys(**kwargs):
+            keys = kwargs["RequestItems"][repo.table_name]["Keys"]
+            dropped = [k for k in keys if (k["PK"]["S"], k["SK"]["S"]) in (meta_key, system_key)]
+            kept = [k for k in keys if k not in dropped]
+            response = {"Responses": {}}
+            if kept:
+                response = real_batch_get(RequestItems={repo.table_name: {"Keys": kept}})
+            response["UnprocessedKeys"] = {repo.table_name: {"Keys": dropped}}
+            return response
+
+        monkeypatch.setattr(client, "batch_get_item", drop_keys)
+        result = repo.warm(["entity-1"], ["gpt-4"], connections=0)
+        assert result.unprocessed == 2
+        assert result.requests == 5
+        assert result.configs == 3
+        assert result.entities == 0
+        assert (repo.namespace_id, "entity-1") not in repo._entity_cache
+        assert repo._config_cache._system_defaults is None
+
+
 class TestCompositeLimitConfigConvenience:
     """Tests for convenience methods on composite limit configs."""
 
@@ -2257,6 +2482,76 @@ class TestCompositeNormalGuard:
         assert rpm_bucket.tokens_milli == 60000
 
 
+class TestConditionFailureBuckets:
+    """Tests for reading ALL_OLD states from failed conditional writes."""
+
+    def _create(self, repo, entity_id: str, now_ms: int) -> None:
+        state = BucketState.from_limit(entity_id, "gpt-4", Limit.per_minute("rpm", 100), now_ms)
+        repo.transact_write([repo.build_composite_create(entity_id, "gpt-4", [state], now_ms)])
+
+    def _normal(self, repo, entity_id: str, now_ms: int, expected_rf: int) -> dict:
+        return repo.build_composite_normal(
+            entity_id=entity_id,
+            resource="gpt-4",
+            consumed={"rpm": 1000},
+            refill_amounts={"rpm": 0},
+            now_ms=now_ms,
+            expected_rf=expected_rf,
+        )
+
+    def test_single_item_lost_lock(self, repo):
+        """A single-item normal write returns the stored state on a lost lock."""
+        now_ms = int(time.time() * 1000)
+        self._create(repo, "e1", now_ms)
+        with pytest.raises(ClientError) as exc_info:
+            repo.transact_write([self._normal(repo, "e1", now_ms + 10, now_ms - 1)])
+        failed = repo.condition_failure_buckets(exc_info.value)
+        assert list(failed) == [0]
+        rpm = next(b for b in failed[0] if b.limit_name == "rpm")
+        assert (rpm.tokens_milli, rpm.last_refill_ms) == (100000, now_ms)
+
+    def test_transaction_reports_failed_item_index(self, repo):
+        """A cancelled transaction maps each failed item to its stored state."""
+        now_ms = int(time.time() * 1000)
+        self._create(repo, "e1", now_ms)
+        self._create(repo, "e2", now_ms)
+        with pytest.raises(ClientError) as exc_info:
+            repo.transact_write(
+                [
+                    self._normal(repo, "e1", now_ms + 10, now_ms),
+                    self._normal(repo, "e2", now_ms + 10, now_ms - 1),
+                ]
+            )
+        failed = repo.condition_failure_buckets(exc_info.value)
+        assert list(failed) == [1]
+        assert {b.entity_id for b in failed[1]} == {"e2"}
+
+    def test_create_race_returns_existing_item(self, repo):
+        """A create that lost the race returns the winner's item."""
+        now_ms = int(time.time() * 1000)
+        self._create(repo, "e1", now_ms)
+        with pytest.raises(ClientError) as exc_info:
+            self._create(repo, "e1", now_ms + 10)
+        failed = repo.condition_failure_buckets(exc_info.value)
+        rpm = next(b for b in failed[0] if b.limit_name == "rpm")
+        assert rpm.last_refill_ms == now_ms
+
+    def test_missing_item_has_no_state(self, repo):
+        """A normal write to a missing item fails without a stored state."""
+        now_ms = int(time.time() * 1000)
+        with pytest.raises(ClientError) as exc_info:
+            repo.transact_write([self._normal(repo, "e1", now_ms, now_ms)])
+        assert repo.condition_failure_buckets(exc_info.value) == {0: None}
+
+    def test_other_errors(self, repo):
+        """Errors that are not condition failures carry no states."""
+        assert repo.condition_failure_buckets(RuntimeError("boom")) == {}
+        throttled = ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException"}}, "UpdateItem"
+        )
+        assert repo.condition_failure_buckets(throttled) == {}
+
+
 class TestGSI4Attributes:
     """Test GSI4PK/GSI4SK on all creation paths."""
 
@@ -0,0 +1,322 @@
+"""Tests for write-behind buffering of lease adjustment deltas."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from zae_limiter import (
+    Limit,
+    PartialWriteError,
+    RateLimiter,
+    SyncRateLimiter,
+    WriteBehindConfig,
+)
+from zae_limiter.sync_write_behind import SyncWriteBehindBuffer
+from zae_limiter.write_behind import WriteBehindBuffer
+
+
+def _build_adjust(entity_id: str, resource: str, deltas: dict[str, int]) -> dict:
+    return {"entity_id": entity_id, "resource": resource, "deltas": deltas}
+
+
+def _mock_repo(write_each: AsyncMock | MagicMock | None = None) -> MagicMock:
+    repo = MagicMock()
+    repo.build_composite_adjust = MagicMock(side_effect=_build_adjust)
+    repo.write_each = write_each if write_each is not None else AsyncMock()
+    return repo
+
+
+def _written(repo: MagicMock) -> list[dict]:
+    return [item for call in repo.write_each.call_args_list for item in call.args[0]]
+
+
+class TestWriteBehindConfig:
+    """Tests for WriteBehindConfig validation."""
+
+    @pytest.mark.parametrize("kwargs", [{"flush_interval_seconds": 0}, {"max_pending": 0}])
+    def test_invalid(self, kwargs):
+        """Invalid values raise ValueError."""
+        with pytest.raises(ValueError):
+            WriteBehindConfig(**kwargs)
+
+
+class TestWriteBehindBuffer:
+    """Tests for merging and flushing buffered deltas."""
+
+    async def test_deltas_merged_per_bucket(self):
+        """Deltas for the same bucket are summed into one update."""
+        repo = _mock_repo()
+        buffer = WriteBehindBuffer(repo, WriteBehindConfig(flush_interval_seconds=60))
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 5_000})
+        await buffer.add("entity-1", "gpt-4", {"tpm": -2_000, "rpm": 1_000})
+        await buffer.add("entity-2", "gpt-4", {"tpm": 1_000})
+        assert buffer.pending == 2
+        repo.write_each.assert_not_awaited()
+
+        await buffer.close()
+
+        assert _written(repo) == [
+            _build_adjust("entity-1", "gpt-4", {"tpm": 3_000, "rpm": 1_000}),
+            _build_adjust("entity-2", "gpt-4", {"tpm": 1_000}),
+        ]
+        assert buffer.pending == 0
+        assert buffer.stats.as_dict() == {
+            "deltas": 3,
+            "flushes": 1,
+            "writes": 2,
+            "failures": 0,
+            "dropped": 0,
+        }
+
+    async def test_cancelled_out_deltas_not_written(self):
+        """A bucket whose deltas sum to zero issues no write."""
+        repo = _mock_repo()
+        buffer = WriteBehindBuffer(repo, WriteBehindConfig(flush_interval_seconds=60))
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 5_000})
+        await buffer.add("entity-1", "gpt-4", {"tpm": -5_000})
+        await buffer.close()
+
+        repo.write_each.assert_not_awaited()
+        assert buffer.stats.flushes == 0
+
+    async def test_flushed_after_interval(self):
+        """The first buffered delta schedules a background flush."""
+        repo = _mock_repo()
+        buffer = WriteBehindBuffer(repo, WriteBehindConfig(flush_interval_seconds=0.01))
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        await asyncio.sleep(0.05)
+
+        repo.write_each.assert_awaited_once()
+        assert _written(repo) == [_build_adjust("entity-1", "gpt-4", {"tpm": 2_000})]
+        assert buffer.pending == 0
+
+    async def test_full_buffer_flushed_inline(self):
+        """A new bucket beyond max_pending flushes the buffer, then is buffered."""
+        repo = _mock_repo()
+        buffer = WriteBehindBuffer(
+            repo, WriteBehindConfig(flush_interval_seconds=60, max_pending=2)
+        )
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        await buffer.add("entity-2", "gpt-4", {"tpm": 1_000})
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})  # existing bucket
+        repo.write_each.assert_not_awaited()
+        await buffer.add("entity-3", "gpt-4", {"tpm": 1_000})
+
+        repo.write_each.assert_awaited_once()
+        assert len(_written(repo)) == 2
+        assert buffer.pending == 1
+        await buffer.close()
+
+    async def test_failed_inline_flush_not_raised(self):
+        """A failed inline flush is logged; the new delta is written directly."""
+        error = RuntimeError("throttled")
+        repo = _mock_repo(AsyncMock(side_effect=[PartialWriteError({0: error}, 1), None]))
+        buffer = WriteBehindBuffer(
+            repo, WriteBehindConfig(flush_interval_seconds=60, max_pending=1)
+        )
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        await buffer.add("entity-2", "gpt-4", {"tpm": 2_000})
+
+        assert repo.write_each.await_args.args[0] == [
+            _build_adjust("entity-2", "gpt-4", {"tpm": 2_000})
+        ]
+        assert buffer.pending == 1  # entity-1, re-buffered
+        assert buffer.stats.as_dict() == {
+            "deltas": 2,
+            "flushes": 1,
+            "writes": 1,
+            "failures": 1,
+            "dropped": 0,
+        }
+
+    async def test_outage_keeps_buffer_bounded(self):
+        """While every write fails, the buffer stays at max_pending and drops the rest."""
+        repo = _mock_repo(AsyncMock(side_effect=RuntimeError("unavailable")))
+        buffer = WriteBehindBuffer(
+            repo, WriteBehindConfig(flush_interval_seconds=60, max_pending=2)
+        )
+
+        for i in range(10):
+            await buffer.add(f"entity-{i}", "gpt-4", {"tpm": 1_000})
+            assert buffer.pending <= 2
+
+        assert buffer.stats.dropped == 8
+
+    async def test_failed_writes_rebuffered(self):
+        """Failed bucket updates are merged back and retried on the next flush."""
+        error = RuntimeError("throttled")
+        repo = _mock_repo(AsyncMock(side_effect=[PartialWriteError({1: error}, 2), None]))
+        buffer = WriteBehindBuffer(repo, WriteBehindConfig(flush_interval_seconds=60))
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        await buffer.add("entity-2", "gpt-4", {"tpm": 1_000})
+        with pytest.raises(PartialWriteError):
+            await buffer.flush()
+        assert buffer.pending == 1
+
+        await buffer.add("entity-2", "gpt-4", {"tpm": 4_000})
+        await buffer.close()
+
+        assert repo.write_each.await_args.args[0] == [
+            _build_adjust("entity-2", "gpt-4", {"tpm": 5_000})
+        ]
+        assert buffer.stats.as_dict() == {
+            "deltas": 3,
+            "flushes": 2,
+            "writes": 2,
+            "failures": 1,
+            "dropped": 0,
+        }
+
+    async def test_unexpected_error_rebuffers_everything(self):
+        """A write_each error that is not per-item re-buffers every delta."""
+        error = RuntimeError("connection reset")
+        repo = _mock_repo(AsyncMock(side_effect=error))
+        buffer = WriteBehindBuffer(repo, WriteBehindConfig(flush_interval_seconds=60))
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        with pytest.raises(PartialWriteError) as exc_info:
+            await buffer.close()
+
+        assert exc_info.value.failures == {0: error}
+        assert buffer.pending == 1
+
+    async def test_background_failure_retried(self):
+        """A failed background flush schedules another one."""
+        repo = _mock_repo(AsyncMock(side_effect=[RuntimeError("throttled"), None]))
+        buffer = WriteBehindBuffer(repo, WriteBehindConfig(flush_interval_seconds=0.01))
+
+        await buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        await asyncio.sleep(0.1)
+
+        assert repo.write_each.await_count == 2
+        assert buffer.pending == 0
+
+
+class TestSyncWriteBehindBuffer:
+    """Tests for the thread-based sync buffer."""
+
+    def test_flushed_after_interval(self):
+        """A background thread flushes the merged deltas."""
+        repo = _mock_repo(MagicMock())
+        buffer = SyncWriteBehindBuffer(repo, WriteBehindConfig(flush_interval_seconds=0.2))
+
+        buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        buffer.add("entity-1", "gpt-4", {"tpm": 1_000})
+        deadline = time.monotonic() + 5
+        while buffer.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        repo.write_each.assert_called_once_with(
+            [_build_adjust("entity-1", "gpt-4", {"tpm": 2_000})]
+        )
+
+
+class TestLimiterWriteBehind:
+    """Tests for write-behind through RateLimiter.acquire()."""
+
+    async def test_disabled_by_default(self, limiter):
+        """Write-behind is opt-in."""
+        assert limiter._write_behind is None
+        assert limiter.get_write_behind_stats() is None
+
+    async def test_adjustments_merged_and_flushed_on_close(self, limiter):
+        """Adjustments from many leases reach DynamoDB as one update on close()."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_hour("tpm", 1_000)])
+        buffered = RateLimiter(
+            repository=limiter._repository,
+            write_behind=WriteBehindConfig(flush_interval_seconds=60),
+        )
+        buffered._speculative_writes = False
+
+        for _ in range(3):
+            async with buffered.acquire("entity-1", "gpt-4", {"tpm": 100}) as lease:
+                await lease.adjust(tpm=-50)
+
+        buckets = await limiter._repository.get_buckets("entity-1", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "tpm") == 700
+
+        await buffered._write_behind.close()
+
+        buckets = await limiter._repository.get_buckets("entity-1", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "tpm") == 850
+        assert buffered.get_write_behind_stats().as_dict() == {
+            "deltas": 3,
+            "flushes": 1,
+            "writes": 1,
+            "failures": 0,
+            "dropped": 0,
+        }
+
+    async def test_failed_inline_flush_keeps_initial_consumption(self, limiter):
+        """A flush failing inside lease exit neither raises nor rolls back the acquire."""
+        await limiter.create_entity("entity-1")
+        await limiter.create_entity("entity-2")
+        await limiter.set_system_defaults([Limit.per_hour("tpm", 1_000)])
+        buffered = RateLimiter(
+            repository=limiter._repository,
+            write_behind=WriteBehindConfig(flush_interval_seconds=60, max_pending=1),
+        )
+        buffered._speculative_writes = False
+
+        async with buffered.acquire("entity-1", "gpt-4", {"tpm": 100}) as lease:
+            await lease.adjust(tpm=50)
+        with patch.object(
+            limiter._repository, "write_each", AsyncMock(side_effect=RuntimeError("throttled"))
+        ):
+            async with buffered.acquire("entity-2", "gpt-4", {"tpm": 100}) as lease:
+                await lease.adjust(tpm=50)
+
+        assert lease._committed is True
+        buckets = await limiter._repository.get_buckets("entity-2", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "tpm") == 900
+        assert buffered.get_write_behind_stats().dropped == 1
+        assert buffered._write_behind.pending == 1  # entity-1, re-buffered
+
+    async def test_rollback_bypasses_buffer(self, limiter):
+        """A failed lease rolls back directly; nothing is buffered."""
+        await limiter.create_entity("entity-1")
+        await limiter.set_system_defaults([Limit.per_hour("tpm", 1_000)])
+        buffered = RateLimiter(
+            repository=limiter._repository,
+            write_behind=WriteBehindConfig(flush_interval_seconds=60),
+        )
+
+        with pytest.raises(RuntimeError):
+            async with buffered.acquire("entity-1", "gpt-4", {"tpm": 100}) as lease:
+                await lease.adjust(tpm=50)
+                raise RuntimeError("boom")
+
+        assert buffered._write_behind.pending == 0
+        buckets = await limiter._repository.get_buckets("entity-1", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "tpm") == 1_000
+
+
+class TestSyncLimiterWriteBehind:
+    """Tests for write-behind through SyncRateLimiter.acquire()."""
+
+    def test_adjustments_flushed(self, sync_limiter):
+        """Buffered adjustments are written once flushed."""
+        sync_limiter.create_entity("entity-1")
+        sync_limiter.set_system_defaults([Limit.per_hour("tpm", 1_000)])
+        buffered = SyncRateLimiter(
+            repository=sync_limiter._repository,
+            write_behind=WriteBehindConfig(flush_interval_seconds=60),
+        )
+
+        for _ in range(2):
+            with buffered.acquire("entity-1", "gpt-4", {"tpm": 100}) as lease:
+                lease.adjust(tpm=100)
+        buffered._write_behind.close()
+
+        buckets = sync_limiter._repository.get_buckets("entity-1", resource="gpt-4")
+        assert next(b.tokens for b in buckets if b.limit_name == "tpm") == 600